@@ -9,13 +9,14 @@ import re
 import random
 import logging
 import os
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, List, Any, Optional, Union
 from dataclasses import asdict
 
 logger = logging.getLogger('reviseit.brain')
 
 from .schemas import BusinessData, ConversationMessage, GenerateReplyResponse
 from .intents import IntentType, IntentDetector
+from .keyword_scanner import get_message_scanner
 from .config import AIBrainConfig, default_config
 from .chatgpt_engine import ChatGPTEngine, IntentResult, GenerationResult
 from .conversation_manager import ConversationManager, get_conversation_manager, FlowStatus, ConversationState
@@ -38,6 +39,7 @@ from .local_responder import (
     classify_priority, RequestPriority,
 )
 from .observability import get_ai_metrics
+from .context_gatherer import GatherResult, Lookup, get_context_gatherer
 
 # LLM Usage tracking for per-business budgets
 try:
@@ -218,11 +220,17 @@ class AIBrain:
         business_id: str = None,
         user_id: str = None,
         use_cache: bool = True,
-        format_response: bool = True
+        format_response: bool = True,
+        on_segment: Optional[Callable[[str], Optional[bool]]] = None,
     ) -> Dict[str, Any]:
         """
         Generate a reply to customer message.
 
+        With on_segment, LLM replies are sent while they are generated:
+        on_segment(text) receives each WhatsApp-ready message in order, and
+        metadata["streamed_segments"] > 0 tells the caller not to send
+        "reply" again (only metadata["stream_remainder"], if any).
+
         GUARANTEED RESPONSE CONTRACT:
         This method ALWAYS returns a valid response dict — never None,
         never an empty string, never an unhandled exception.
@@ -238,6 +246,7 @@ class AIBrain:
                 user_id=user_id,
                 use_cache=use_cache,
                 format_response=format_response,
+                on_segment=on_segment,
             )
         except Exception as e:
             # SAFETY NET — this should NEVER fire in normal operation.
@@ -267,7 +276,8 @@ class AIBrain:
         business_id: str = None,
         user_id: str = None,
         use_cache: bool = True,
-        format_response: bool = True
+        format_response: bool = True,
+        on_segment: Optional[Callable[[str], Optional[bool]]] = None,
     ) -> Dict[str, Any]:
         """
         Generate a reply to customer message.
@@ -282,6 +292,7 @@ class AIBrain:
             user_id: User ID for conversation context (from WhatsApp)
             use_cache: Whether to use response caching
             format_response: Whether to format response for WhatsApp
+            on_segment: Send callback for streamed LLM replies (see generate_reply)
             
         Returns:
             Dictionary containing:
@@ -368,16 +379,51 @@ class AIBrain:
                 if flow_response:
                     return flow_response
         
+        # =====================================================
+        # CONTEXT GATHERING — Supabase/Redis lookups run concurrently
+        # (facts → booking type → order/appointment config, and memory,
+        # LLM budget, cache probe unless routing answers first);
+        # see context_gatherer.py
+        # =====================================================
+        # Get conversation history
+        if history is None and user_id:
+            history = self.conversation_manager.get_context_window(user_id)
+        
+        # Get last intent for follow-up detection
+        last_intent = self.conversation_manager.get_last_intent(user_id) if user_id else None
+        last_messages = history[-1]["content"] if history else None
+        
+        # COST OPTIMIZATION: Analyze query for optimal routing
+        cost_decision = self.cost_optimizer.analyze_query(
+            message=user_message,
+            business_id=biz_id,
+            last_intent=last_intent,
+            last_message=last_messages,
+            plan=plan
+        )
+        
+        context = self._gather_reply_context(
+            user_id=user_id,
+            biz_id=biz_id,
+            plan=plan,
+            user_message=user_message,
+            business=business,
+            history=history,
+            probe_cache=(
+                use_cache and self.config.enable_caching
+                and cost_decision.use_cache and not cost_decision.skip_llm
+            ),
+        )
+        
         # =====================================================
         # EARLY STATE CHECK: Order ID Awaiting
         # This MUST run BEFORE intent classification to catch Order ID responses
         # =====================================================
         if user_id:
-            state = self.conversation_manager.get_state(user_id)
+            state = context["state"]
             if state and state.collected_fields.get("_awaiting_order_id"):
                 logger.info(f"📦 User is awaiting Order ID - processing as order tracking")
-                context_facts = self._gather_context_facts(user_id, business)
-                tracking_response = self._handle_order_tracking(user_id, context_facts, business, user_message)
+                tracking_response = self._handle_order_tracking(user_id, context["facts"], business, user_message)
                 
                 # Add to conversation history
                 self.conversation_manager.add_message(user_id, "user", user_message)
@@ -389,8 +435,8 @@ class AIBrain:
         # ENTERPRISE INTENT DETECTION - Route to correct flow based on type
         # Uses 3-layer architecture: Context Facts → Raw Intent → Smart Router
         # =====================================================
-        # Classify booking type with context awareness (passes user_id for order history check)
-        booking_type = self._classify_booking_type(user_message, business, user_id)
+        # Booking type was classified with context awareness during gathering
+        booking_type = context["booking_type"]
         logger.info(f"📦 Enterprise booking classification: {booking_type} for message: '{user_message[:50]}...'")
         
         if booking_type and user_id and not self.conversation_manager.is_flow_active(user_id):
@@ -398,9 +444,7 @@ class AIBrain:
             # PRIORITY 1: Order Tracking (post-purchase query)
             # =====================================================
             if booking_type == "order_tracking":
-                # Gather context facts for the tracking handler
-                context_facts = self._gather_context_facts(user_id, business)
-                tracking_response = self._handle_order_tracking(user_id, context_facts, business, user_message)
+                tracking_response = self._handle_order_tracking(user_id, context["facts"], business, user_message)
                 
                 # Add to conversation history
                 self.conversation_manager.add_message(user_id, "user", user_message)
@@ -412,8 +456,7 @@ class AIBrain:
             # PRIORITY 2: Order Cancellation
             # =====================================================
             if booking_type == "order_cancellation":
-                context_facts = self._gather_context_facts(user_id, business)
-                cancel_response = self._handle_order_cancellation(user_id, context_facts, business)
+                cancel_response = self._handle_order_cancellation(user_id, context["facts"], business)
                 
                 # Add to conversation history
                 self.conversation_manager.add_message(user_id, "user", user_message)
@@ -427,8 +470,11 @@ class AIBrain:
             if booking_type == "order":
                 # Check if order booking is enabled and start order flow
                 # Pass business data for multi-domain product detection
-                if self._is_order_booking_enabled(biz_id, business):
-                    flow_response = self._start_order_flow(user_id, biz_id, user_message, business)
+                if context["order_enabled"]:
+                    flow_response = self._start_order_flow(
+                        user_id, biz_id, user_message, business,
+                        order_config=context["order_config"],
+                    )
                     if flow_response:
                         return flow_response
                 else:
@@ -439,37 +485,19 @@ class AIBrain:
             # =====================================================
             elif booking_type == "appointment":
                 # Check if appointment booking is enabled for this business
-                if self.appointment_handler:
-                    config = self.appointment_handler.get_config(biz_id)
-                    if config.get("enabled", False):
-                        # Start the structured appointment booking flow
-                        flow_response = self._start_appointment_flow(user_id, biz_id, config, user_message)
-                        if flow_response:
-                            return flow_response
+                config = context["appointment_config"]
+                if config and config.get("enabled", False):
+                    # Start the structured appointment booking flow
+                    flow_response = self._start_appointment_flow(user_id, biz_id, config, user_message)
+                    if flow_response:
+                        return flow_response
 
         
         
-        # Get conversation history
-        if history is None and user_id:
-            history = self.conversation_manager.get_context_window(user_id)
-        
         # Add user message to conversation
         if user_id:
             self.conversation_manager.add_message(user_id, "user", user_message)
         
-        # Get last intent for follow-up detection
-        last_intent = self.conversation_manager.get_last_intent(user_id) if user_id else None
-        last_messages = history[-1]["content"] if history else None
-        
-        # COST OPTIMIZATION: Analyze query for optimal routing
-        cost_decision = self.cost_optimizer.analyze_query(
-            message=user_message,
-            business_id=biz_id,
-            last_intent=last_intent,
-            last_message=last_messages,
-            plan=plan
-        )
-        
         # STRATEGY #8: Use hardcoded reply if applicable (20-40% savings)
         if cost_decision.skip_llm and cost_decision.hardcoded_reply:
             response = {
@@ -490,9 +518,9 @@ class AIBrain:
             self._track_interaction(biz_id, user_id, response, start_time, is_cached=False)
             return response
         
-        # Try cache first (40-70% savings)
+        # Try cache first (40-70% savings) — probed during context gathering
         if use_cache and self.config.enable_caching and cost_decision.use_cache:
-            cached = self._try_cache(biz_id, user_message, history)
+            cached = context["cache"]
             if cached:
                 # Track analytics for cached response
                 self._track_interaction(
@@ -525,36 +553,27 @@ class AIBrain:
         # LLM BUDGET CHECK - Use template fallback if exceeded
         # (Graceful fallback if usage tracker fails)
         # =====================================================
-        try:
-            if self.usage_tracker:
-                usage_status = self.usage_tracker.can_use_llm(biz_id, plan)
-                if not usage_status.can_use:
-                    # FALLBACK TO TEMPLATE MODE (no LLM call)
-                    return self._template_fallback_reply(
-                        business_data=business,
-                        user_message=user_message,
-                        user_id=user_id,
-                        detected_language=detected_language,
-                        reason=usage_status.reason,
-                        start_time=start_time
-                    )
-        except Exception as e:
-            print(f"⚠️ Usage tracking failed, proceeding without: {e}")
+        usage_status = context["llm_budget"]
+        if usage_status is not None and not usage_status.can_use:
+            # FALLBACK TO TEMPLATE MODE (no LLM call)
+            return self._template_fallback_reply(
+                business_data=business,
+                user_message=user_message,
+                user_id=user_id,
+                detected_language=detected_language,
+                reason=usage_status.reason,
+                start_time=start_time
+            )
         
         # Get state summary to include in prompt (PREVENTS RE-ASKING)
         state_summary = ""
         if user_id:
             state_summary = self.conversation_manager.build_state_context(user_id)
 
-        # v3.0: Gather user profile and conversation summary from memory manager
-        user_profile = None
-        conversation_summary = None
+        # v3.0: User profile and conversation summary were loaded during gathering
+        user_profile, conversation_summary = context["memory"]
         if user_id:
             try:
-                profile = self.memory_manager.get_or_create_profile(user_id)
-                user_profile = profile.to_prompt_dict() if profile else None
-                conversation_summary = self.memory_manager.get_conversation_summary(user_id, biz_id)
-
                 # Auto-extract facts from user message and update profile
                 self.memory_manager.add_message(user_id, biz_id, "user", user_message)
             except Exception as e:
@@ -688,8 +707,9 @@ class AIBrain:
             or 10
         )
 
-        if not gate.try_acquire():
-            # Gate full — try DomainAnswerer first, then degraded
+        queue_wait_ms = getattr(getattr(self.config, 'llm', None), 'queue_wait_ms', 0)
+        if not gate.try_acquire(timeout=queue_wait_ms / 1000):
+            # Gate full after bounded wait — try DomainAnswerer first, then degraded
             domain_gated = domain_answerer.answer(
                 message=user_message,
                 business_data=business,
@@ -733,7 +753,7 @@ class AIBrain:
 
         # Process message with ChatGPT engine (now single-pass architecture)
         try:
-            result = self.engine.process_message(
+            engine_kwargs = dict(
                 message=user_message,
                 business_data=business,
                 conversation_history=optimized_history,
@@ -743,6 +763,11 @@ class AIBrain:
                 conversation_summary=conversation_summary,
                 is_mixed_language=is_mixed_language,
             )
+            if on_segment is not None:
+                result = self.engine.process_message_streaming(on_segment=on_segment, **engine_kwargs)
+            else:
+                result = self.engine.process_message(**engine_kwargs)
+            streamed = bool(result.metadata.get("streamed_segments"))
             # =====================================================
             # GRACEFUL DEGRADATION — Handle __RATE_LIMITED__ sentinel
             # NEVER show "high demand" to users
@@ -836,9 +861,9 @@ class AIBrain:
             except Exception as e:
                 logger.warning(f"Usage tracking skipped: {e}")
             
-            # Format response
+            # Format response (streamed segments were formatted as they were sent)
             reply = result.reply
-            if format_response:
+            if format_response and not streamed:
                 reply = self.formatter.format(reply)
             
             # Get suggested actions
@@ -863,7 +888,8 @@ class AIBrain:
                     **result.metadata,
                     "language": detected_language,
                     "tool_called": result.tool_called,
-                    "response_time_ms": int((time.time() - start_time) * 1000)
+                    "response_time_ms": int((time.time() - start_time) * 1000),
+                    "context_gather": context.summary(),
                 }
             }
 
@@ -875,12 +901,13 @@ class AIBrain:
             from .quality_gate import get_quality_gate
 
             quality_gate = get_quality_gate()
-            response = quality_gate.check(
-                response=response,
-                message=user_message,
-                business_data=business,
-                conversation_history=optimized_history,
-            )
+            if not streamed:  # A streamed reply is already with the customer
+                response = quality_gate.check(
+                    response=response,
+                    message=user_message,
+                    business_data=business,
+                    conversation_history=optimized_history,
+                )
 
             # =====================================================
             # DRR TRACKER — Record domain response rate (GAP 7)
@@ -949,7 +976,13 @@ class AIBrain:
             "clarification_question": intent_result.clarification_question
         }
     
-    def _classify_booking_type(self, message: str, business_data: Dict[str, Any], user_id: str = None) -> Optional[str]:
+    def _classify_booking_type(
+        self,
+        message: str,
+        business_data: Dict[str, Any],
+        user_id: str = None,
+        context_facts: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
         """
         ENTERPRISE-GRADE 3-LAYER INTENT CLASSIFICATION SYSTEM
         
@@ -970,7 +1003,8 @@ class AIBrain:
         # LAYER 1: CONTEXT FACTS (No intent yet)
         # Gather facts about user's current state
         # =====================================================
-        context_facts = self._gather_context_facts(user_id, business_data)
+        if context_facts is None:
+            context_facts = self._gather_context_facts(user_id, business_data)
         logger.info(f"🧠 L1 Context Facts: has_recent_order={context_facts['has_recent_order']}, "
                    f"order_age_minutes={context_facts['order_age_minutes']}, "
                    f"has_active_flow={context_facts['has_active_flow']}")
@@ -991,14 +1025,10 @@ class AIBrain:
         
         return final_decision
     
-    def _gather_context_facts(self, user_id: str, business_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        LAYER 1: Gather context facts about the user's current state.
-        
-        Returns facts dictionary WITHOUT making any intent decisions.
-        This separation is critical for enterprise-grade routing.
-        """
-        facts = {
+    @staticmethod
+    def _empty_context_facts() -> Dict[str, Any]:
+        """Context facts for a user we know nothing about."""
+        return {
             "has_recent_order": False,
             "order_age_minutes": None,
             "order_status": None,
@@ -1008,6 +1038,89 @@ class AIBrain:
             "active_flow_name": None,
             "last_order_created_at": None,
         }
+    
+    def _gather_reply_context(
+        self,
+        *,
+        user_id: Optional[str],
+        biz_id: str,
+        plan: str,
+        user_message: str,
+        business: Dict[str, Any],
+        history: Optional[List[Dict[str, str]]],
+        probe_cache: bool,
+    ) -> GatherResult:
+        """
+        Run the pre-LLM lookups as a dependency graph.
+        
+        Booking routing and the LLM path consume the results in their
+        original order. Booking configs load only for their booking type,
+        and the LLM-path lookups (memory, budget, cache) are skipped when
+        routing is certain to answer first (awaiting an order ID, order
+        tracking or cancellation). Timeouts and errors fall back to the
+        defaults (no facts, booking disabled, no memory, budget unchecked,
+        cache miss).
+        """
+        def booking_config(values, kind, load):
+            return load() if values["booking_type"] == kind else None
+
+        def routed_before_llm(values):
+            state = values["state"]
+            if state and state.collected_fields.get("_awaiting_order_id"):
+                return True
+            return bool(user_id) and values["booking_type"] in ("order_tracking", "order_cancellation") \
+                and not (state and state.is_active())
+
+        def llm_path(load, default=None):
+            return lambda values: default if routed_before_llm(values) else load()
+
+        def memory():
+            if not user_id:
+                return None, None
+            profile = self.memory_manager.get_or_create_profile(user_id)
+            return (
+                profile.to_prompt_dict() if profile else None,
+                self.memory_manager.get_conversation_summary(user_id, biz_id),
+            )
+
+        lookups = [
+            Lookup("state", lambda _: self.conversation_manager.get_state(user_id) if user_id else None),
+            Lookup("facts", lambda _: self._gather_context_facts(user_id, business),
+                   default=self._empty_context_facts()),
+            Lookup("booking_type", lambda v: self._classify_booking_type(
+                user_message, business, user_id, context_facts=v["facts"]), deps=("facts",)),
+            Lookup("order_enabled", lambda v: booking_config(
+                v, "order", lambda: self._is_order_booking_enabled(biz_id, business)),
+                deps=("booking_type",), default=False),
+            Lookup("order_config", lambda v: booking_config(
+                v, "order", lambda: self._get_order_config(biz_id)), deps=("booking_type",)),
+            Lookup("appointment_config", lambda v: booking_config(
+                v, "appointment", lambda: self.appointment_handler.get_config(biz_id))
+                if self.appointment_handler else None, deps=("booking_type",)),
+            Lookup("memory", llm_path(memory, default=(None, None)),
+                   deps=("state", "booking_type"), default=(None, None)),
+            Lookup("llm_budget", llm_path(
+                lambda: self.usage_tracker.can_use_llm(biz_id, plan) if self.usage_tracker else None),
+                deps=("state", "booking_type")),
+            Lookup("cache", llm_path(
+                lambda: self._try_cache(biz_id, user_message, history) if probe_cache else None),
+                deps=("state", "booking_type")),
+        ]
+        context = get_context_gatherer().gather(lookups)
+        if context.timed_out or context.failed:
+            logger.warning(
+                f"⏱️ Context gathering degraded | timed_out={context.timed_out} | failed={context.failed}"
+            )
+        return context
+    
+    def _gather_context_facts(self, user_id: str, business_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        LAYER 1: Gather context facts about the user's current state.
+        
+        Returns facts dictionary WITHOUT making any intent decisions.
+        This separation is critical for enterprise-grade routing.
+        """
+        facts = self._empty_context_facts()
         
         if not user_id:
             return facts
@@ -1093,127 +1206,44 @@ class AIBrain:
         # 5. appointment - "book appointment"
         # 6. general - everything else
         
+        # One pass over the message finds every routing token/pattern
+        # (vocabulary lives in intents.ROUTING_KEYWORDS / ROUTING_PATTERNS)
+        scan = get_message_scanner().scan(msg_lower)
+        
         # Ownership tokens (required for tracking/cancel intents)
-        # Includes English, Hindi, Tamil, Kannada, Telugu, Malayalam
-        ownership_tokens = [
-            # English
-            "my", "mine", "i ordered", "i placed", "my order",
-            "i bought", "i purchased", "my purchase", "the order",
-            # Hindi
-            "mera", "meri", "maine", "mera order",
-            # Tamil
-            "en", "ennoda", "naan", "en order", "enathu",
-            # Kannada
-            "nanna", "naanu", "nanna order",
-            # Telugu
-            "naa", "naaku", "nenu", "na order",
-            # Malayalam
-            "ente", "enikku", "ente order",
-        ]
-        has_ownership = any(token in msg_lower for token in ownership_tokens)
+        has_ownership = scan.any("route:ownership")
         
         # =====================================================
         # PRIORITY 1: Order Cancellation
         # =====================================================
-        cancel_keywords = [
-            # English
-            "cancel order", "cancel my order", "cancel the order",
-            "want to cancel", "i want to cancel", "please cancel",
-            "order cancel", "cancellation", "refund",
-            # Hindi
-            "mera order cancel", "cancel krdo", "cancel karo",
-            # Tamil
-            "order cancel pannu", "cancel pannunga", "venda order",
-            # Kannada
-            "order cancel maadi", "beda order",
-            # Telugu
-            "order cancel cheyandi", "vaddu order",
-        ]
-        if any(kw in msg_lower for kw in cancel_keywords):
+        if scan.any("route:cancel"):
             return {"intent": "order_cancellation", "confidence": 0.95}
         
         # =====================================================
         # PRIORITY 2: Order Tracking / Status
         # =====================================================
-        tracking_keywords = [
-            # English
-            "when will", "where is", "order status", "track order", "tracking",
-            "delivery status", "shipping status", "my order", "the order",
-            "order come", "order arrive", "order reach", "dispatch", "dispatched",
-            "status of my order", "update on my order", "did you ship",
-            "has my order", "is my order", "order update",
-            # Hindi
-            "kab aayega", "kab milega", "order kaha", "kab pahunchega",
-            "mera order kab", "order ka status", "kitna time",
-            # Tamil
-            "epo varum", "epdi irukku", "order eppo", "enna achu",
-            "varum", "vanthuduma", "dispatch achu", "ship achu",
-            # Kannada
-            "yavaga baruthe", "order yavaga", "yelli ide",
-            # Telugu
-            "eppudu vasthadi", "ekkada undi", "order eppudu",
-            # Malayalam
-            "eppol varum", "evide aanu", "order eppol",
-        ]
-        # Tracking requires ownership OR very explicit tracking phrases
-        tracking_explicit = [
-            "track order", "order status", "tracking", "where is my order",
-            "epo varum", "kab aayega", "when will my order", "order varum",
-        ]
-        
-        if any(kw in msg_lower for kw in tracking_keywords):
+        if scan.any("route:tracking"):
             # Must have ownership token OR be very explicit
-            if has_ownership or any(kw in msg_lower for kw in tracking_explicit):
+            if has_ownership or scan.any("route:tracking_explicit"):
                 return {"intent": "order_tracking", "confidence": 0.90}
         
         # =====================================================
         # PRIORITY 3: Delivery Query (pre-purchase)
         # =====================================================
-        delivery_query_keywords = [
-            "delivery time", "delivery charges", "shipping cost", "how long to deliver",
-            "delivery available", "delivery area", "delivery fee", "free delivery",
-            "do you deliver", "can you deliver", "delivery options",
-        ]
         # Delivery query WITHOUT ownership = pre-purchase question
-        if any(kw in msg_lower for kw in delivery_query_keywords) and not has_ownership:
+        if scan.any("route:delivery_query") and not has_ownership:
             return {"intent": "delivery_query", "confidence": 0.85}
         
         # =====================================================
         # PRIORITY 4: New Order Intent
         # =====================================================
-        order_keywords = [
-            # English
-            "order", "buy", "purchase", "want to order", "want to buy", "get me",
-            "add to cart", "checkout", "place order", "how to order", "how to buy",
-            "how do i order", "how do i buy", "how can i order", "how can i buy",
-            "i want", "i need",
-            # Hindi
-            "order karna", "kharidna", "lena hai", "mangwana", "order karu",
-            "kaise order", "kaise kharide", "order chahiye",
-            # Tamil
-            "vangurathu", "vaangi", "vaanga", "edukka", "edukanum", "vangi",
-            "epdi order", "order pannu", "order pannunga", "vanganum",
-            "epdi vangurathu", "items vangurathu", "product vangurathu",
-            "vaangi edukka", "eduka", "vaanganum",
-            # Kannada
-            "order maadi", "kharidisu", "bekaagide", "hege order",
-            # Telugu
-            "order cheyandi", "konali", "konu", "ela order", "order cheyali",
-            # Malayalam
-            "order cheyyanam", "vaangaan", "vangikko", "epadi order",
-        ]
-        order_patterns = [
-            r"\b\d+\s*(x|nos?|pieces?|items?|qty)\b",  # "2 pieces", "3x"
-            r"\b(quantity|qty)\s*:?\s*\d+",
-        ]
-        
         # Check for product mentions from business catalog
         products = business_data.get("products_services", []) if isinstance(business_data, dict) else []
         product_names = [p.get("name", "").lower() for p in products if isinstance(p, dict) and p.get("name")]
         has_product_mention = any(name in msg_lower for name in product_names if name and len(name) > 2)
         
-        has_order_keyword = any(kw in msg_lower for kw in order_keywords)
-        has_order_quantity = any(re.search(p, msg_lower) for p in order_patterns)
+        has_order_keyword = scan.any("route:order")
+        has_order_quantity = scan.any("route:order_quantity")
         
         # CRITICAL: Don't trigger new order if this looks like tracking
         # "my order" should NOT trigger new order
@@ -1230,16 +1260,8 @@ class AIBrain:
         # =====================================================
         # PRIORITY 5: Appointment Booking
         # =====================================================
-        appointment_keywords = ["appointment", "schedule", "slot", "time slot", "appoint"]
-        time_patterns = [
-            r"\b(today|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
-            r"\b\d{1,2}[:/]\d{2}\b",  # Time patterns like 10:30
-            r"\b\d{1,2}\s*(am|pm)\b",  # Time patterns like 10am
-            r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b",  # Date patterns
-        ]
-        
-        has_appointment_keyword = any(kw in msg_lower for kw in appointment_keywords)
-        has_time_indicator = any(re.search(p, msg_lower) for p in time_patterns)
+        has_appointment_keyword = scan.any("route:appointment")
+        has_time_indicator = scan.any("route:time")
         
         if has_appointment_keyword:
             return {"intent": "appointment", "confidence": 0.90}
@@ -2038,7 +2060,8 @@ class AIBrain:
         user_id: str,
         business_owner_id: str,
         initial_message: str,
-        business_data: Dict[str, Any]
+        business_data: Dict[str, Any],
+        order_config: Optional[Dict] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Start AI-driven order booking flow with category navigation and variant support.
@@ -2063,8 +2086,9 @@ class AIBrain:
                 "metadata": {"generation_method": "order_flow_invalid_business", "error": "invalid_business_id"}
             }
         
-        # Get order field configuration
-        order_config = self._get_order_config(business_owner_id)
+        # Get order field configuration (may have been prefetched)
+        if order_config is None:
+            order_config = self._get_order_config(business_owner_id)
         order_fields = order_config.get("fields", [])
         
         # Build required fields list from config
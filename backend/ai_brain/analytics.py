@@ -3,12 +3,14 @@ Analytics and feedback tracking for AI Brain.
 Enables dashboards, insights, and performance monitoring.
 """
 
+import os
 import time
+from bisect import bisect_left
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from threading import Lock
 
 
@@ -79,6 +81,8 @@ class BusinessAnalytics:
     
     # Performance
     avg_response_time_ms: float = 0
+    p50_response_time_ms: float = 0
+    p95_response_time_ms: float = 0
     total_tokens: int = 0
     cache_hit_rate: float = 0
     
@@ -91,6 +95,73 @@ class BusinessAnalytics:
     top_queries: List[str] = field(default_factory=list)
 
 
+# =============================================================================
+# IN-MEMORY AGGREGATES
+# =============================================================================
+
+BUCKET_SECONDS = 600  # Aggregates are kept per 10-minute bucket
+RETENTION_HOURS = int(os.getenv("AI_ANALYTICS_RETENTION_HOURS", "168"))
+MAX_EVENTS_PER_BUSINESS = int(os.getenv("AI_ANALYTICS_EVENTS_PER_BUSINESS", "1000"))
+MAX_BUSINESSES = int(os.getenv("AI_ANALYTICS_MAX_BUSINESSES", "5000"))
+MAX_QUERIES_PER_BUCKET = 256
+
+# Response-time histogram bounds (ms): 20% steps from 10ms to ~75s, so any
+# window's quantiles come from merged bucket histograms, not raw samples
+RESPONSE_TIME_BOUNDS_MS = tuple(int(10 * 1.2 ** i) for i in range(50))
+
+
+class _Bucket:
+    """Counters for one business in one BUCKET_SECONDS slot."""
+
+    __slots__ = (
+        "count", "intents", "outcomes", "tokens", "response_time_sum",
+        "response_times", "confidence_sum", "cache_hits", "users", "queries",
+        "satisfaction_positive", "satisfaction_negative",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.intents: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.tokens = 0
+        self.response_time_sum = 0
+        self.response_times = [0] * (len(RESPONSE_TIME_BOUNDS_MS) + 1)
+        self.confidence_sum = 0.0
+        self.cache_hits = 0
+        self.users: set = set()
+        self.queries: Counter = Counter()
+        self.satisfaction_positive = 0
+        self.satisfaction_negative = 0
+
+
+class _BusinessLog:
+    """Ring buffer of recent events plus time-bucketed aggregates."""
+
+    __slots__ = ("lock", "events", "buckets", "total", "tokens", "intents", "last_seen")
+
+    def __init__(self, max_events: int):
+        self.lock = Lock()
+        self.events: deque = deque(maxlen=max_events)
+        self.buckets: Dict[int, _Bucket] = {}
+        self.total = 0
+        self.tokens = 0
+        self.intents: Counter = Counter()
+        self.last_seen = 0.0
+
+
+def _percentile(histogram: List[int], total: int, q: float) -> float:
+    """Upper bound of the histogram bin holding the q-quantile."""
+    if not total:
+        return 0
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            return RESPONSE_TIME_BOUNDS_MS[min(i, len(RESPONSE_TIME_BOUNDS_MS) - 1)]
+    return RESPONSE_TIME_BOUNDS_MS[-1]
+
+
 class AnalyticsTracker:
     """
     Analytics and feedback tracking for AI Brain.
@@ -100,35 +171,57 @@ class AnalyticsTracker:
     - Aggregate by business, time period
     - Monitor performance and quality
     - Enable dashboards and insights
+
+    Each business has its own lock, a bounded ring buffer of recent events
+    and counters per 10-minute bucket (with a response-time histogram for
+    quantiles). Recording touches only that business's counters, and a
+    dashboard read merges the buckets in its window — O(buckets), never a
+    scan over other tenants' events.
     """
     
-    def __init__(self, db_client=None):
+    def __init__(
+        self,
+        db_client=None,
+        max_events_per_business: int = MAX_EVENTS_PER_BUSINESS,
+        retention_hours: int = RETENTION_HOURS,
+        max_businesses: int = MAX_BUSINESSES,
+    ):
         """
         Initialize analytics tracker.
         
         Args:
             db_client: Optional database client for persistence
+            max_events_per_business: Ring buffer size per business
+            retention_hours: How long bucketed aggregates are kept
+            max_businesses: Idle businesses beyond this are evicted
         """
         self.db = db_client
-        
-        # In-memory storage for non-DB mode
-        self._events: List[InteractionEvent] = []
-        self._business_stats: Dict[str, Dict[str, Any]] = defaultdict(
-            lambda: {
-                "total": 0,
-                "intents": defaultdict(int),
-                "outcomes": defaultdict(int),
-                "tokens": 0,
-                "response_times": [],
-                "confidences": [],
-                "users": set(),
-                "cache_hits": 0,
-            }
-        )
-        
+        self._max_events = max_events_per_business
+        self._retention_buckets = retention_hours * 3600 // BUCKET_SECONDS
+        self._max_businesses = max_businesses
+
+        # Only taken when a business is seen for the first time
         self._lock = Lock()
-        self._max_events = 10000  # Keep last N events in memory
+        self._logs: Dict[str, _BusinessLog] = {}
     
+    def _log_for(self, business_id: str) -> _BusinessLog:
+        log = self._logs.get(business_id)
+        if log is not None:
+            return log
+        with self._lock:
+            log = self._logs.get(business_id)
+            if log is None:
+                if len(self._logs) >= self._max_businesses:
+                    self._evict_idle()
+                log = self._logs[business_id] = _BusinessLog(self._max_events)
+            return log
+
+    def _evict_idle(self):
+        """Drop the least recently active tenth of businesses (caller holds _lock)."""
+        idle = sorted(self._logs.items(), key=lambda item: item[1].last_seen)
+        for business_id, _ in idle[:max(1, len(idle) // 10)]:
+            del self._logs[business_id]
+
     def track_interaction(
         self,
         business_id: str,
@@ -151,11 +244,12 @@ class AnalyticsTracker:
         Returns:
             Event ID
         """
-        event_id = f"{business_id}_{int(time.time() * 1000)}_{user_id[:8]}"
+        now = time.time()
+        event_id = f"{business_id}_{int(now * 1000)}_{user_id[:8]}"
         
         event = InteractionEvent(
             event_id=event_id,
-            timestamp=time.time(),
+            timestamp=now,
             business_id=business_id,
             user_id=user_id,
             intent=intent,
@@ -171,31 +265,46 @@ class AnalyticsTracker:
             model=model
         )
         
-        # Store in memory
-        with self._lock:
-            self._events.append(event)
-            
-            # Trim if too many events
-            if len(self._events) > self._max_events:
-                self._events = self._events[-self._max_events:]
-            
-            # Update aggregates
-            stats = self._business_stats[business_id]
-            stats["total"] += 1
-            stats["intents"][intent] += 1
-            stats["outcomes"][outcome.value] += 1
-            stats["tokens"] += tokens_used
-            stats["response_times"].append(response_time_ms)
-            stats["confidences"].append(confidence)
-            stats["users"].add(user_id)
+        log = self._log_for(business_id)
+        slot = int(now // BUCKET_SECONDS)
+        query_key = intent + ":" + event.user_message[:50]
+        rt_bin = bisect_left(RESPONSE_TIME_BOUNDS_MS, response_time_ms)
+
+        with log.lock:
+            log.events.append(event)
+            log.last_seen = now
+            log.total += 1
+            log.tokens += tokens_used
+            log.intents[intent] += 1
+
+            bucket = log.buckets.get(slot)
+            if bucket is None:
+                bucket = log.buckets[slot] = _Bucket()
+                self._expire_buckets(log, slot)
+            bucket.count += 1
+            bucket.intents[intent] += 1
+            bucket.outcomes[outcome.value] += 1
+            bucket.tokens += tokens_used
+            bucket.response_time_sum += response_time_ms
+            bucket.response_times[rt_bin] += 1
+            bucket.confidence_sum += confidence
+            bucket.users.add(user_id)
             if is_cached:
-                stats["cache_hits"] += 1
+                bucket.cache_hits += 1
+            if query_key in bucket.queries or len(bucket.queries) < MAX_QUERIES_PER_BUCKET:
+                bucket.queries[query_key] += 1
         
         # Persist to database if available
         if self.db:
             self._persist_event(event)
         
         return event_id
+
+    def _expire_buckets(self, log: _BusinessLog, slot: int):
+        """Drop buckets older than the retention window (caller holds log.lock)."""
+        oldest = slot - self._retention_buckets
+        for old in [s for s in log.buckets if s <= oldest]:
+            del log.buckets[old]
     
     def track_feedback(
         self,
@@ -204,17 +313,38 @@ class AnalyticsTracker:
         feedback_text: str = None
     ):
         """Track user feedback for an interaction."""
-        with self._lock:
-            # Find and update event
-            for event in reversed(self._events):
-                if event.event_id == event_id:
-                    # Store feedback in metadata (simplified)
-                    break
+        for log in self._logs_for_event(event_id):
+            with log.lock:
+                event = next((e for e in reversed(log.events) if e.event_id == event_id), None)
+                if event is None:
+                    continue
+                bucket = log.buckets.get(int(event.timestamp // BUCKET_SECONDS))
+                if bucket is not None:
+                    if satisfaction == SatisfactionLevel.POSITIVE:
+                        bucket.satisfaction_positive += 1
+                    elif satisfaction == SatisfactionLevel.NEGATIVE:
+                        bucket.satisfaction_negative += 1
+                break
         
         # Persist to database if available
         if self.db:
             self._persist_feedback(event_id, satisfaction, feedback_text)
     
+    def _logs_for_event(self, event_id: str) -> List[_BusinessLog]:
+        """
+        Logs that may hold an event. IDs are "{business_id}_{ms}_{user_id[:8]}"
+        and both ids may contain "_", so every split around a numeric middle
+        part is a candidate; the caller matches the full event_id.
+        """
+        parts = event_id.split("_")
+        logs = []
+        for end in range(1, len(parts) - 1):
+            if parts[end].isdigit():
+                log = self._logs.get("_".join(parts[:end]))
+                if log is not None:
+                    logs.append(log)
+        return logs
+
     def get_business_analytics(
         self,
         business_id: str,
@@ -222,6 +352,8 @@ class AnalyticsTracker:
     ) -> BusinessAnalytics:
         """
         Get analytics for a business over a time period.
+
+        The window is resolved to whole BUCKET_SECONDS buckets.
         
         Args:
             business_id: Business identifier
@@ -230,106 +362,105 @@ class AnalyticsTracker:
         Returns:
             BusinessAnalytics object
         """
-        cutoff = time.time() - (hours * 3600)
-        
-        with self._lock:
-            # Filter events for this business and time period
-            events = [
-                e for e in self._events
-                if e.business_id == business_id and e.timestamp >= cutoff
-            ]
-            
-            if not events:
-                return BusinessAnalytics(
-                    business_id=business_id,
-                    period_start=cutoff,
-                    period_end=time.time()
-                )
-            
-            # Aggregate stats
-            intents: Dict[str, int] = defaultdict(int)
-            outcomes: Dict[str, int] = defaultdict(int)
-            users = set()
-            response_times = []
-            confidences = []
-            tokens = 0
-            cache_hits = 0
-            queries: Dict[str, int] = defaultdict(int)
-            
-            for e in events:
-                intents[e.intent] += 1
-                outcomes[e.outcome.value] += 1
-                users.add(e.user_id)
-                response_times.append(e.response_time_ms)
-                confidences.append(e.confidence)
-                tokens += e.tokens_used
-                if e.is_cached:
-                    cache_hits += 1
-                
-                # Track query frequency (simplified)
-                query_key = e.intent + ":" + e.user_message[:50]
-                queries[query_key] += 1
-            
-            # Find top queries
-            sorted_queries = sorted(queries.items(), key=lambda x: x[1], reverse=True)
-            top_queries = [q[0] for q in sorted_queries[:10]]
-            
-            return BusinessAnalytics(
-                business_id=business_id,
-                period_start=cutoff,
-                period_end=time.time(),
-                total_interactions=len(events),
-                unique_users=len(users),
-                intents=dict(intents),
-                resolved_count=outcomes.get("resolved", 0),
-                escalated_count=outcomes.get("escalated", 0),
-                failed_count=outcomes.get("failed", 0),
-                avg_response_time_ms=sum(response_times) / len(response_times) if response_times else 0,
-                total_tokens=tokens,
-                cache_hit_rate=cache_hits / len(events) if events else 0,
-                avg_confidence=sum(confidences) / len(confidences) if confidences else 0,
-                top_queries=top_queries
-            )
+        now = time.time()
+        cutoff = now - (hours * 3600)
+        first_slot = int(cutoff // BUCKET_SECONDS)
+
+        log = self._logs.get(business_id)
+        if log is None:
+            return BusinessAnalytics(business_id=business_id, period_start=cutoff, period_end=now)
+
+        total = tokens = cache_hits = positive = negative = 0
+        response_time_sum = 0
+        confidence_sum = 0.0
+        intents: Counter = Counter()
+        outcomes: Counter = Counter()
+        queries: Counter = Counter()
+        users: set = set()
+        response_times = [0] * (len(RESPONSE_TIME_BOUNDS_MS) + 1)
+
+        with log.lock:
+            for slot, b in log.buckets.items():
+                if slot < first_slot:
+                    continue
+                total += b.count
+                tokens += b.tokens
+                cache_hits += b.cache_hits
+                positive += b.satisfaction_positive
+                negative += b.satisfaction_negative
+                response_time_sum += b.response_time_sum
+                confidence_sum += b.confidence_sum
+                intents.update(b.intents)
+                outcomes.update(b.outcomes)
+                queries.update(b.queries)
+                users |= b.users
+                response_times = [x + y for x, y in zip(response_times, b.response_times)]
+
+        if not total:
+            return BusinessAnalytics(business_id=business_id, period_start=cutoff, period_end=now)
+
+        return BusinessAnalytics(
+            business_id=business_id,
+            period_start=cutoff,
+            period_end=now,
+            total_interactions=total,
+            unique_users=len(users),
+            intents=dict(intents),
+            resolved_count=outcomes.get("resolved", 0),
+            escalated_count=outcomes.get("escalated", 0),
+            failed_count=outcomes.get("failed", 0),
+            avg_response_time_ms=response_time_sum / total,
+            p50_response_time_ms=_percentile(response_times, total, 0.50),
+            p95_response_time_ms=_percentile(response_times, total, 0.95),
+            total_tokens=tokens,
+            cache_hit_rate=cache_hits / total,
+            avg_confidence=confidence_sum / total,
+            satisfaction_positive=positive,
+            satisfaction_negative=negative,
+            top_queries=[q for q, _ in queries.most_common(10)],
+        )
     
     def get_global_stats(self) -> Dict[str, Any]:
         """Get global statistics across all businesses."""
-        with self._lock:
-            total_events = len(self._events)
-            total_businesses = len(self._business_stats)
-            
-            # Aggregate across all businesses
-            total_tokens = sum(s["tokens"] for s in self._business_stats.values())
-            total_users = sum(len(s["users"]) for s in self._business_stats.values())
-            
-            # Intent distribution
-            all_intents: Dict[str, int] = defaultdict(int)
-            for stats in self._business_stats.values():
-                for intent, count in stats["intents"].items():
-                    all_intents[intent] += count
-            
-            return {
-                "total_events": total_events,
-                "total_businesses": total_businesses,
-                "total_users": total_users,
-                "total_tokens": total_tokens,
-                "intent_distribution": dict(all_intents)
-            }
+        total_events = total_tokens = total_users = 0
+        all_intents: Counter = Counter()
+
+        for log in list(self._logs.values()):
+            with log.lock:
+                total_events += len(log.events)
+                total_tokens += log.tokens
+                all_intents.update(log.intents)
+                total_users += len(set().union(*(b.users for b in log.buckets.values())))
+
+        return {
+            "total_events": total_events,
+            "total_businesses": len(self._logs),
+            "total_users": total_users,
+            "total_tokens": total_tokens,
+            "intent_distribution": dict(all_intents)
+        }
     
     def export_events(
         self,
         business_id: str = None,
         hours: int = 24
     ) -> List[Dict[str, Any]]:
-        """Export events as list of dicts for external analysis."""
+        """Export retained events as list of dicts for external analysis."""
         cutoff = time.time() - (hours * 3600)
-        
-        with self._lock:
-            events = [
-                e for e in self._events
-                if e.timestamp >= cutoff and (business_id is None or e.business_id == business_id)
-            ]
-            
-            return [asdict(e) for e in events]
+
+        if business_id is None:
+            logs = list(self._logs.values())
+        else:
+            logs = [self._logs[business_id]] if business_id in self._logs else []
+
+        events: List[InteractionEvent] = []
+        for log in logs:
+            with log.lock:
+                events.extend(e for e in log.events if e.timestamp >= cutoff)
+        if business_id is None:
+            events.sort(key=lambda e: e.timestamp)
+
+        return [asdict(e) for e in events]
     
     def _persist_event(self, event: InteractionEvent):
         """Persist event to database."""
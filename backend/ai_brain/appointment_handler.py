@@ -6,7 +6,7 @@ and booking appointments through the AI bot.
 
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime, date, time, timedelta
+from datetime import datetime, date, timedelta
 import re
 
 from .conversation_manager import FlowStatus
@@ -91,7 +91,21 @@ class AppointmentHandler:
                 "minimal_mode": False
             }
     
-    def check_availability(self, user_id: str, check_date: str, check_time: str = None) -> Dict:
+    def _slot_day(self, user_id: str, check_date: str, fresh: bool = False):
+        """
+        Capacity map for a date from the shared slot availability index, or
+        straight from the database when `fresh` (the index may lag behind
+        bookings made elsewhere).
+        """
+        from services.slot_availability import DEFAULT_SCOPE, appointment_day_loader, get_slot_index
+
+        day = date.fromisoformat(check_date)
+        loader = appointment_day_loader(self.supabase)
+        if fresh:
+            return loader(user_id, DEFAULT_SCOPE, [day]).get(day)
+        return get_slot_index().day(user_id, day, loader=loader)
+
+    def check_availability(self, user_id: str, check_date: str, check_time: str = None, fresh: bool = False) -> Dict:
         """
         Check slot availability for a given date/time, considering capacity.
         
@@ -99,36 +113,31 @@ class AppointmentHandler:
             user_id: Business owner's user ID
             check_date: Date to check (YYYY-MM-DD format)
             check_time: Optional specific time to check (HH:MM format)
+            fresh: Read the database instead of the cached slot index
             
         Returns:
             Dict with availability info and available slots
         """
         try:
-            # Get service configuration for capacity
-            config_result = self.supabase.table("ai_capabilities").select("appointment_services").eq("user_id", user_id).single().execute()
-            services = config_result.data.get("appointment_services", []) if config_result.data else []
-            default_capacity = services[0].get("capacity", 1) if services else 1
-            
-            # Get existing appointments for the date
-            result = self.supabase.table("appointments").select("time, duration, status").eq("user_id", user_id).eq("date", check_date).neq("status", "cancelled").execute()
-            
-            # Count bookings per time slot
-            bookings_per_slot = {}
-            if result.data:
-                for apt in result.data:
-                    time_slot = apt["time"]
-                    bookings_per_slot[time_slot] = bookings_per_slot.get(time_slot, 0) + 1
+            grid = self._slot_day(user_id, check_date, fresh=fresh)
+            if grid is None:
+                return {"available": False, "error": "availability unavailable"}
+
+            slots = grid.slots()
+            default_capacity = max((s["capacity"] for s in slots), default=0)
+            bookings_per_slot = {
+                s["time"]: s["capacity"] - s["remaining"] for s in slots if s["remaining"] < s["capacity"]
+            }
             
             # If checking specific time, check against capacity
             if check_time:
-                current_bookings = bookings_per_slot.get(check_time, 0)
-                is_available = current_bookings < default_capacity
+                slot = next((s for s in slots if s["time"] == check_time), None)
                 return {
-                    "available": is_available,
+                    "available": bool(slot and slot["remaining"]),
                     "date": check_date,
                     "time": check_time,
-                    "current_bookings": current_bookings,
-                    "capacity": default_capacity,
+                    "current_bookings": bookings_per_slot.get(check_time, 0),
+                    "capacity": slot["capacity"] if slot else default_capacity,
                     "bookings_per_slot": bookings_per_slot
                 }
             
@@ -151,46 +160,15 @@ class AppointmentHandler:
         Args:
             user_id: Business owner's user ID
             check_date: Date to check
-            config: Optional appointment config (will fetch if not provided)
+            config: Unused; business hours come from the slot availability
+                index (kept for backward compatibility)
             
         Returns:
             List of available time strings
         """
         try:
-            if not config:
-                # Sync version - use execute() directly
-                result = self.supabase.table("ai_capabilities").select("appointment_business_hours, appointment_services").eq("user_id", user_id).single().execute()
-                business_hours = result.data.get("appointment_business_hours", {"start": "09:00", "end": "18:00", "duration": 60}) if result.data else {"start": "09:00", "end": "18:00", "duration": 60}
-                services = result.data.get("appointment_services", []) if result.data else []
-            else:
-                business_hours = config.get("business_hours", {"start": "09:00", "end": "18:00", "duration": 60})
-                services = config.get("services", [])
-            
-            # Get default capacity from services
-            default_capacity = services[0].get("capacity", 1) if services else 1
-            
-            # Get booked slots with capacity info
-            availability = self.check_availability(user_id, check_date)
-            bookings_per_slot = availability.get("bookings_per_slot", {})
-            
-            # Generate available slots
-            start_hour, start_min = map(int, business_hours["start"].split(":"))
-            end_hour, end_min = map(int, business_hours["end"].split(":"))
-            duration = business_hours.get("duration", 60)
-            
-            available_slots = []
-            current = datetime.combine(date.today(), time(start_hour, start_min))
-            end = datetime.combine(date.today(), time(end_hour, end_min))
-            
-            while current < end:
-                time_str = current.strftime("%H:%M")
-                current_bookings = bookings_per_slot.get(time_str, 0)
-                # Slot is available if under capacity
-                if current_bookings < default_capacity:
-                    available_slots.append(time_str)
-                current += timedelta(minutes=duration)
-            
-            return available_slots
+            grid = self._slot_day(user_id, check_date)
+            return grid.free_times() if grid is not None else []
             
         except Exception as e:
             logger.error(f"Error getting available slots: {e}")
@@ -657,9 +635,14 @@ class AppointmentHandler:
         data = session["collected_data"]
         
         try:
-            # Final availability check
-            availability = self.check_availability(user_id, data["date"], data["time"])
+            from services.slot_availability import get_slot_index
+
+            # Final availability check against the database; the slot index
+            # only drives suggestions
+            availability = self.check_availability(user_id, data["date"], data["time"], fresh=True)
             if not availability.get("available", True):
+                # The cached map offered this slot: rebuild it for the suggestions
+                get_slot_index().invalidate(user_id, date.fromisoformat(data["date"]))
                 available_slots = self.get_available_slots(user_id, data["date"])
                 return {
                     "success": False,
@@ -683,6 +666,8 @@ class AppointmentHandler:
             result = self.supabase.table("appointments").insert(appointment_data).execute()
             
             if result.data:
+                get_slot_index().record_booking(user_id, date.fromisoformat(data["date"]), data["time"])
+
                 # Clear the session
                 del self.booking_sessions[session_key]
                 
@@ -11,12 +11,14 @@ Enterprise features:
 - Single-call optimization for simple queries
 - Retry with exponential backoff
 - Timeout protection
+- Single-flight coalescing of identical prompts (single_flight.py)
 """
 
 import json
 import re
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -42,6 +44,9 @@ from .gemini_client import (
     extract_usage,
 )
 from .system_health import get_system_health
+from .single_flight import FOLLOWER, CompletionSnapshot, flight_key, get_single_flight
+from .streaming import JsonFieldStream
+from .whatsapp_formatter import MessageSegmenter, get_formatter
 
 logger = logging.getLogger('reviseit.engine')
 
@@ -140,8 +145,31 @@ class ChatGPTEngine:
             timeout_seconds=self.config.llm.timeout_seconds,
             rate_limit_max_retries=self.config.llm.rate_limit_max_retries,
             min_request_interval_ms=self.config.llm.min_request_interval_ms,
+            queue_wait_ms=self.config.llm.queue_wait_ms,
         )
 
+    def _generate(self, business_data: Dict[str, Any], intent: str, **request) -> Tuple[Any, bool]:
+        """
+        client.generate() through the single-flight layer.
+
+        Returns (response, coalesced). A coalesced response is another
+        caller's identical completion and reports zero token usage.
+        The business and its plan are passed on for fair queuing.
+        """
+        business_id = str(business_data.get("business_id") or business_data.get("user_id") or "default")
+        scheduling = {"tenant_id": business_id, "plan": business_data.get("plan")}
+        flight = get_single_flight()
+        if flight is None:
+            return self.client.generate(**request, **scheduling), False
+
+        # Tool objects are rebuilt per call; the schema set itself is constant
+        prompt = {k: v for k, v in request.items() if k != "tools"}
+        key = flight_key(business_id, intent, tools=bool(request.get("tools")), **prompt)
+        response, role = flight.do(
+            key, lambda: self.client.generate(**request, **scheduling), business_id=business_id
+        )
+        return response, role == FOLLOWER
+
     # =========================================================================
     # RESPONSE STYLE ENGINE — Detect complexity, adjust tokens/style
     # =========================================================================
@@ -455,7 +483,9 @@ class ChatGPTEngine:
             logger.info(f"Low confidence ({intent_result.confidence:.2f}) -> boosted tokens to {max_tokens}")
 
         try:
-            response = self.client.generate(
+            response, coalesced = self._generate(
+                business_data,
+                intent_result.intent.value,
                 model=generation_model,
                 system_prompt=full_prompt,
                 messages=messages,
@@ -540,6 +570,7 @@ class ChatGPTEngine:
                     "completion_tokens": gen_completion_tokens,
                     "generation_prompt_tokens": gen_prompt_tokens,
                     "generation_completion_tokens": gen_completion_tokens,
+                    "coalesced": coalesced,
                 }
             )
 
@@ -886,20 +917,20 @@ Generate a better response. Be natural and directly answer the question."""
         Returns the same GenerationResult for backward compatibility.
         Falls back to two-step for tool-calling intents (booking, orders).
         """
-        # Build single-pass prompt with all 6 layers
-        system_prompt = build_single_pass_prompt(
-            business_data=business_data,
-            user_message=message,
-            language="en",  # Will be detected by the model
-            is_mixed_language=is_mixed_language,
+        context = dict(
             conversation_history=conversation_history,
+            user_id=user_id,
             conversation_state_summary=conversation_state_summary,
             user_profile=user_profile,
             conversation_summary=conversation_summary,
+            is_mixed_language=is_mixed_language,
         )
+        system_prompt = self._build_single_pass_prompt(message, business_data, context)
 
         try:
-            response = self.client.generate(
+            response, coalesced = self._generate(
+                business_data,
+                "single_pass",
                 model=self.config.llm.generation_model,
                 system_prompt=system_prompt,
                 messages=[{"role": "user", "content": message}],
@@ -909,108 +940,14 @@ Generate a better response. Be natural and directly answer the question."""
             )
 
             usage = extract_usage(response)
-            total_prompt = usage["prompt_tokens"]
-            total_completion = usage["completion_tokens"]
-
-            result = extract_json(
-                response,
-                default={
-                    "intent": "general_enquiry",
-                    "confidence": 0.5,
-                    "response": "I'd be happy to help! Could you tell me more about what you're looking for?",
-                    "language": "en",
-                    "entities": {},
-                    "needs_human": False,
-                }
-            )
-
-            # Parse intent
-            intent_str = result.get("intent", "general_enquiry").lower()
-            try:
-                intent = IntentType(intent_str)
-            except ValueError:
-                intent = IntentType.GENERAL_ENQUIRY
-
-            confidence = float(result.get("confidence", 0.7))
-            reply = result.get("response", "").strip()
-            language = result.get("language", "en")
-            entities = result.get("entities", {})
-            needs_human = result.get("needs_human", False)
-
-            # Quality gate: if response is empty, use default
-            if not reply:
-                reply = "I'd be happy to help! Could you tell me more about what you're looking for?"
-
-            # Validate prices in response (no LLM call — pure regex)
-            if self.config.enable_response_validation:
-                reply = self._validate_response(reply, business_data)
-
-            # Check if this intent needs tool calling (fallback to two-step)
-            tool_intents = {
-                IntentType.BOOKING, IntentType.ORDER_BOOKING,
-                IntentType.ORDER_STATUS, IntentType.COMPLAINT,
-            }
-            if intent in tool_intents and self.config.enable_function_calling:
-                # Fall back to two-step for tool-calling intents
-                logger.info(
-                    f"🔧 Single-pass detected tool intent '{intent_str}' — "
-                    f"falling back to two-step for function calling"
-                )
-                intent_result = IntentResult(
-                    intent=intent,
-                    confidence=confidence,
-                    language=language,
-                    entities=entities,
-                    needs_clarification=False,
-                    clarification_question=None,
-                    raw_response={"single_pass": True, "_intent_prompt_tokens": 0, "_intent_completion_tokens": 0},
-                )
-                return self.generate_response(
-                    message=message,
-                    intent_result=intent_result,
-                    business_data=business_data,
-                    conversation_history=conversation_history,
-                    use_tools=True,
-                    conversation_state_summary=conversation_state_summary,
-                    user_id=user_id,
-                    user_profile=user_profile,
-                    conversation_summary=conversation_summary,
-                    is_mixed_language=is_mixed_language,
-                    _skip_self_check=True,  # Single-pass already validated quality
-                )
-
-            return GenerationResult(
-                reply=reply,
-                intent=intent,
-                confidence=confidence,
-                tool_called=None,
-                tool_result=None,
-                needs_human=needs_human,
-                language=language,
-                emotion=result.get("emotion", "neutral"),
-                metadata={
-                    "generation_method": "single_pass",
-                    "model": self.config.llm.generation_model,
-                    "prompt_tokens": total_prompt,
-                    "completion_tokens": total_completion,
-                    "generation_prompt_tokens": total_prompt,
-                    "generation_completion_tokens": total_completion,
-                    "intent_prompt_tokens": 0,
-                    "intent_completion_tokens": 0,
-                }
+            result = extract_json(response, default=self._single_pass_default())
+            return self._single_pass_result(
+                result, usage, coalesced, message, business_data, **context
             )
 
         except (RateLimitError, CircuitOpenError) as e:
             logger.warning(f"⚠️ Single-pass blocked ({type(e).__name__}): {e}")
-            # Return sentinel for graceful degradation
-            return GenerationResult(
-                reply="__RATE_LIMITED__",
-                intent=IntentType.GENERAL_ENQUIRY,
-                confidence=0.5,
-                tool_called=None, tool_result=None, needs_human=False,
-                language="en",
-                metadata={"generation_method": "rate_limit_fallback", "error": str(e), "rate_limited": True}
-            )
+            return self._rate_limited_result(e)
 
         except Exception as e:
             logger.error(f"Single-pass error: {e}")
@@ -1027,6 +964,254 @@ Generate a better response. Be natural and directly answer the question."""
                 is_mixed_language=is_mixed_language,
             )
 
+    @staticmethod
+    def _rate_limited_result(error: Exception) -> GenerationResult:
+        """Sentinel for graceful degradation (AIBrain answers locally)."""
+        return GenerationResult(
+            reply="__RATE_LIMITED__",
+            intent=IntentType.GENERAL_ENQUIRY,
+            confidence=0.5,
+            tool_called=None, tool_result=None, needs_human=False,
+            language="en",
+            metadata={"generation_method": "rate_limit_fallback", "error": str(error), "rate_limited": True}
+        )
+
+    # Intents that need function calling: single-pass falls back to two-step
+    SINGLE_PASS_TOOL_INTENTS = frozenset({
+        IntentType.BOOKING, IntentType.ORDER_BOOKING,
+        IntentType.ORDER_STATUS, IntentType.COMPLAINT,
+    })
+
+    def _build_single_pass_prompt(
+        self, message: str, business_data: Dict[str, Any], context: Dict[str, Any]
+    ) -> str:
+        """Single-pass prompt (precompiled business prefix + per-message layers)."""
+        return build_single_pass_prompt(
+            business_data=business_data,
+            user_message=message,
+            language="en",  # Will be detected by the model
+            is_mixed_language=context["is_mixed_language"],
+            conversation_history=context["conversation_history"],
+            conversation_state_summary=context["conversation_state_summary"],
+            user_profile=context["user_profile"],
+            conversation_summary=context["conversation_summary"],
+        )
+
+    @staticmethod
+    def _single_pass_default() -> Dict[str, Any]:
+        return {
+            "intent": "general_enquiry",
+            "confidence": 0.5,
+            "response": "I'd be happy to help! Could you tell me more about what you're looking for?",
+            "language": "en",
+            "entities": {},
+            "needs_human": False,
+        }
+
+    def _single_pass_result(
+        self,
+        result: Dict[str, Any],
+        usage: Dict[str, int],
+        coalesced: bool,
+        message: str,
+        business_data: Dict[str, Any],
+        **context,
+    ) -> GenerationResult:
+        """Turn the parsed single-pass JSON into a GenerationResult."""
+        total_prompt = usage["prompt_tokens"]
+        total_completion = usage["completion_tokens"]
+
+        # Parse intent
+        intent_str = result.get("intent", "general_enquiry").lower()
+        try:
+            intent = IntentType(intent_str)
+        except ValueError:
+            intent = IntentType.GENERAL_ENQUIRY
+
+        confidence = float(result.get("confidence", 0.7))
+        reply = result.get("response", "").strip()
+        language = result.get("language", "en")
+        entities = result.get("entities", {})
+        needs_human = result.get("needs_human", False)
+
+        # Quality gate: if response is empty, use default
+        if not reply:
+            reply = "I'd be happy to help! Could you tell me more about what you're looking for?"
+
+        # Validate prices in response (no LLM call — pure regex)
+        if self.config.enable_response_validation:
+            reply = self._validate_response(reply, business_data)
+
+        # Check if this intent needs tool calling (fallback to two-step)
+        if intent in self.SINGLE_PASS_TOOL_INTENTS and self.config.enable_function_calling:
+            # Fall back to two-step for tool-calling intents
+            logger.info(
+                f"🔧 Single-pass detected tool intent '{intent_str}' — "
+                f"falling back to two-step for function calling"
+            )
+            intent_result = IntentResult(
+                intent=intent,
+                confidence=confidence,
+                language=language,
+                entities=entities,
+                needs_clarification=False,
+                clarification_question=None,
+                raw_response={"single_pass": True, "_intent_prompt_tokens": 0, "_intent_completion_tokens": 0},
+            )
+            return self.generate_response(
+                message=message,
+                intent_result=intent_result,
+                business_data=business_data,
+                use_tools=True,
+                **context,
+                _skip_self_check=True,  # Single-pass already validated quality
+            )
+
+        return GenerationResult(
+            reply=reply,
+            intent=intent,
+            confidence=confidence,
+            tool_called=None,
+            tool_result=None,
+            needs_human=needs_human,
+            language=language,
+            emotion=result.get("emotion", "neutral"),
+            metadata={
+                "generation_method": "single_pass",
+                "model": self.config.llm.generation_model,
+                "prompt_tokens": total_prompt,
+                "completion_tokens": total_completion,
+                "generation_prompt_tokens": total_prompt,
+                "generation_completion_tokens": total_completion,
+                "intent_prompt_tokens": 0,
+                "intent_completion_tokens": 0,
+                "cached_prompt_tokens": usage.get("cached_tokens", 0),
+                "coalesced": coalesced,
+            }
+        )
+
+    def process_message_streaming(
+        self,
+        message: str,
+        business_data: Dict[str, Any],
+        on_segment: Callable[[str], Optional[bool]],
+        conversation_history: List[Dict[str, str]] = None,
+        user_id: str = None,
+        conversation_state_summary: str = "",
+        user_profile: Dict[str, Any] = None,
+        conversation_summary: str = None,
+        is_mixed_language: bool = False,
+    ) -> GenerationResult:
+        """
+        Single-pass processing that sends the reply while it is generated.
+
+        The single-pass JSON is streamed. Once its "response" field starts
+        (the prompt emits "intent" first), complete paragraphs are price-
+        validated, formatted and passed to on_segment(text) in order, on
+        this thread. on_segment returns False to stop streaming (e.g. a send
+        failed); text not sent is returned in metadata["stream_remainder"].
+
+        Tool intents, and streams whose intent cannot be read before the
+        response starts, are not streamed: the result is the same as
+        process_message_single_pass() and nothing has been sent.
+        """
+        context = dict(
+            conversation_history=conversation_history,
+            user_id=user_id,
+            conversation_state_summary=conversation_state_summary,
+            user_profile=user_profile,
+            conversation_summary=conversation_summary,
+            is_mixed_language=is_mixed_language,
+        )
+        system_prompt = self._build_single_pass_prompt(message, business_data, context)
+        formatter = get_formatter()
+        field = JsonFieldStream("response")
+        segmenter = MessageSegmenter()
+        usage: Dict[str, int] = {}
+        sent: List[str] = []
+        unsent: List[str] = []
+        state = {"streaming": None, "first_segment_ms": None}
+        start = time.monotonic()
+
+        def dispatch(segments: List[str]) -> None:
+            for segment in segments:
+                if self.config.enable_response_validation:
+                    segment = self._validate_response(segment, business_data)
+                segment = formatter.format_segment(segment)
+                if not state["streaming"] or on_segment(segment) is False:
+                    state["streaming"] = False
+                    unsent.append(segment)
+                    continue
+                sent.append(segment)
+                if state["first_segment_ms"] is None:
+                    state["first_segment_ms"] = int((time.monotonic() - start) * 1000)
+
+        try:
+            for chunk in self.client.generate_stream(
+                model=self.config.llm.generation_model,
+                system_prompt=system_prompt,
+                messages=[{"role": "user", "content": message}],
+                temperature=self.config.llm.temperature,
+                max_tokens=self.config.style.medium_max_tokens,
+                json_mode=True,
+                usage=usage,
+                tenant_id=str(business_data.get("business_id") or business_data.get("user_id") or "default"),
+                plan=business_data.get("plan"),
+            ):
+                text = field.feed(chunk)
+                if state["streaming"] is None and field.started:
+                    state["streaming"] = self._streamable_intent(field.field_before("intent"))
+                if state["streaming"]:
+                    dispatch(segmenter.feed(text))
+        except Exception as e:
+            if not sent:
+                logger.warning(f"Streaming single-pass failed before first send ({type(e).__name__}): {e}")
+                if isinstance(e, (RateLimitError, CircuitOpenError)):
+                    return self._rate_limited_result(e)
+                return self.process_message_two_step(message, business_data, **context)
+            # Part of the reply is already with the customer: stop here
+            logger.error(f"Streaming interrupted after {len(sent)} segment(s): {e}")
+            return GenerationResult(
+                reply="\n\n".join(sent),
+                intent=IntentType(field.field_before("intent").lower()),
+                confidence=0.7,
+                tool_called=None, tool_result=None, needs_human=False,
+                language="en",
+                metadata={
+                    "generation_method": "single_pass_stream",
+                    "model": self.config.llm.generation_model,
+                    "streamed_segments": len(sent),
+                    "stream_remainder": "",
+                    "stream_interrupted": True,
+                    "first_segment_ms": state["first_segment_ms"],
+                    "error": str(e),
+                },
+            )
+
+        result = extract_json(CompletionSnapshot(field.raw), default=self._single_pass_default())
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, **usage}
+        generation = self._single_pass_result(result, usage, False, message, business_data, **context)
+        if not state["streaming"] and not sent:
+            return generation
+
+        dispatch(segmenter.flush())
+        generation.reply = "\n\n".join(sent + unsent)
+        generation.metadata.update({
+            "generation_method": "single_pass_stream",
+            "streamed_segments": len(sent),
+            "stream_remainder": "\n\n".join(unsent),
+            "first_segment_ms": state["first_segment_ms"],
+        })
+        return generation
+
+    def _streamable_intent(self, intent_str: Optional[str]) -> bool:
+        """Only plain answers stream; tool intents go through function calling."""
+        try:
+            intent = IntentType((intent_str or "").lower())
+        except ValueError:
+            return False
+        return not (intent in self.SINGLE_PASS_TOOL_INTENTS and self.config.enable_function_calling)
+
     def process_message_two_step(
         self,
         message: str,
@@ -4,8 +4,9 @@ Concurrency Gate — Global inflight request limiter for LLM calls.
 FAANG-grade production pattern: prevent system collapse under load
 by capping the number of simultaneous LLM API calls.
 
-When the gate is full, callers get an immediate signal to use
-local fallback instead of queueing — this prevents cascading latency.
+When the gate is full, callers wait a short, bounded time for a slot
+(a burst usually drains within a second) and then get the signal to use
+local fallback — queueing stays bounded, so latency cannot cascade.
 
 Thread-safe: uses threading.Semaphore (the correct primitive for this).
 """
@@ -24,7 +25,7 @@ class ConcurrencyGate:
 
     Usage:
         gate = get_concurrency_gate()
-        if not gate.try_acquire():
+        if not gate.try_acquire(timeout=1.5):
             return local_fallback()
         try:
             result = call_llm(...)
@@ -45,19 +46,31 @@ class ConcurrencyGate:
         self._current_inflight = 0
         self._total_acquired = 0
         self._total_rejected = 0
+        self._total_queued = 0
         self._peak_inflight = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
 
         logger.info(
             f"⚡ ConcurrencyGate initialized (max_inflight={max_inflight})"
         )
 
-    def try_acquire(self) -> bool:
+    def try_acquire(self, timeout: float = 0.0) -> bool:
         """
         Try to acquire a slot. Returns True if acquired, False if gate is full.
-        Non-blocking — returns immediately.
+        Waits at most `timeout` seconds for a slot (0 = non-blocking).
         """
         acquired = self._semaphore.acquire(blocking=False)
+        waited_ms = 0.0
+        if not acquired and timeout > 0:
+            start = time.monotonic()
+            acquired = self._semaphore.acquire(timeout=timeout)
+            waited_ms = (time.monotonic() - start) * 1000
         with self._lock:
+            if waited_ms:
+                self._total_queued += 1
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
             if acquired:
                 self._current_inflight += 1
                 self._total_acquired += 1
@@ -98,6 +111,9 @@ class ConcurrencyGate:
                 "total_acquired": self._total_acquired,
                 "total_rejected": self._total_rejected,
                 "peak_inflight": self._peak_inflight,
+                "total_queued": self._total_queued,
+                "avg_queue_wait_ms": round(self._wait_ms_total / max(self._total_queued, 1), 1),
+                "max_queue_wait_ms": round(self._wait_ms_max, 1),
                 "rejection_rate_pct": round(
                     self._total_rejected / max(self._total_acquired + self._total_rejected, 1) * 100, 1
                 ),
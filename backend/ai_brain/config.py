@@ -75,7 +75,7 @@ class LLMConfig:
 
     # 429 rate-limit resilience (v5.0: increased from 2→5 retries)
     rate_limit_max_retries: int = 5             # Max retries specifically for 429 RESOURCE_EXHAUSTED
-    min_request_interval_ms: int = 200          # Min milliseconds between API calls (burst prevention)
+    min_request_interval_ms: int = 200          # Initial per-key spacing (scheduler adapts it to 429s)
 
     # Circuit breaker settings (v5.0: FAANG-grade resilience)
     circuit_breaker_threshold: int = 5          # Failures before circuit opens
@@ -84,6 +84,7 @@ class LLMConfig:
     # Concurrency control (v6.0: prevents system collapse under load)
     max_inflight_requests: int = 10             # Max simultaneous LLM API calls
     sla_timeout_seconds: float = 15.0           # Max time before falling back to local
+    queue_wait_ms: int = 1500                   # Max wait for a gate slot / key token before fallback
 
     # Confidence-based token escalation
     # When confidence < this threshold, use more tokens for better reasoning
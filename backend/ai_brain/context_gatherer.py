@@ -0,0 +1,243 @@
+"""
+Concurrent context gathering for AIBrain.generate_reply.
+
+Before the LLM call a reply used to run its lookups one after another —
+order history (Supabase), flow state (Redis), order/appointment config
+(Supabase), user profile and summary (Redis), LLM budget, response cache
+— so pre-LLM latency was the sum of all of them. The lookups are now
+declared as a small dependency graph and run on a bounded shared pool:
+
+    facts ──► booking_type ──┬──► order_enabled
+                             ├──► order_config
+                             └──► appointment_config
+    state, memory, llm_budget, cache        (no dependencies)
+
+A lookup starts as soon as its dependencies have settled and receives
+their values. Its deadline runs from when a worker picks it up, so time
+spent queued behind other requests does not eat into it; a lookup still
+queued after its timeout is cancelled. A lookup that times out or raises
+settles with its default and the reply degrades instead of failing (a
+running worker thread finishes in the background). The pool is sized so
+every request thread (GUNICORN_THREADS) can have its whole graph in
+flight at once. Latency, timeouts and errors are tracked per lookup name
+for /api/metrics.
+
+Lookups must not call gather() themselves: a full pool would deadlock.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('reviseit.context_gatherer')
+
+CONTEXT_GATHER_PARALLEL = os.getenv("CONTEXT_GATHER_PARALLEL", "true").lower() == "true"
+# Lookups one reply can have running at once (roots of the graph + slack)
+CONTEXT_GATHER_LOOKUPS_PER_REPLY = 8
+CONTEXT_GATHER_WORKERS = int(os.getenv(
+    "CONTEXT_GATHER_WORKERS",
+    str(int(os.getenv("GUNICORN_THREADS", "4")) * CONTEXT_GATHER_LOOKUPS_PER_REPLY),
+))
+CONTEXT_GATHER_TIMEOUT_MS = int(os.getenv("CONTEXT_GATHER_TIMEOUT_MS", "1500"))
+
+
+@dataclass
+class Lookup:
+    """One node of the graph: fn(values of deps) -> value."""
+
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    default: Any = None
+    timeout_ms: Optional[int] = None
+
+
+@dataclass
+class GatherResult:
+    values: Dict[str, Any]
+    timings_ms: Dict[str, float]
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    wall_ms: float = 0.0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact form for response metadata."""
+        return {
+            "wall_ms": round(self.wall_ms, 1),
+            "lookups_ms": {k: round(v, 1) for k, v in self.timings_ms.items()},
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+        }
+
+
+def _run(lookup: Lookup, inputs: Dict[str, Any], started: Optional[Dict[str, float]] = None) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    if started is not None:
+        started[lookup.name] = start
+    value = lookup.fn(inputs)
+    return value, (time.perf_counter() - start) * 1000
+
+
+class ContextGatherer:
+    """Runs a lookup graph on a bounded thread pool with per-lookup deadlines."""
+
+    def __init__(
+        self,
+        max_workers: int = CONTEXT_GATHER_WORKERS,
+        default_timeout_ms: int = CONTEXT_GATHER_TIMEOUT_MS,
+        parallel: bool = CONTEXT_GATHER_PARALLEL,
+    ):
+        self.default_timeout_ms = default_timeout_ms
+        self.parallel = parallel
+        self._executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ctx-gather")
+            if parallel else None
+        )
+        self._lock = threading.Lock()
+        self._gathers = 0
+        self._wall_ms = 0.0
+        self._sequential_ms = 0.0
+        self._per_lookup: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0, "errors": 0}
+        )
+
+    def gather(self, lookups: Iterable[Lookup]) -> GatherResult:
+        """Resolve every lookup; never raises for lookup failures."""
+        graph = {lookup.name: lookup for lookup in lookups}
+        for lookup in graph.values():
+            unknown = [d for d in lookup.deps if d not in graph]
+            if unknown:
+                raise ValueError(f"lookup {lookup.name!r} depends on unknown {unknown}")
+
+        start = time.perf_counter()
+        result = GatherResult(values={}, timings_ms={})
+        waiting = dict(graph)
+        # future -> (lookup, submitted at); `started` is filled in by the worker
+        running: Dict[concurrent.futures.Future, Tuple[Lookup, float]] = {}
+        started: Dict[str, float] = {}
+
+        def deadline(lookup: Lookup, submitted: float) -> float:
+            timeout = (lookup.timeout_ms or self.default_timeout_ms) / 1000
+            return started.get(lookup.name, submitted) + timeout
+
+        while waiting or running:
+            ready = [l for l in waiting.values() if all(d in result.values for d in l.deps)]
+            if not ready and not running:
+                raise ValueError(f"dependency cycle among {sorted(waiting)}")
+            for lookup in ready:
+                del waiting[lookup.name]
+                inputs = {d: result.values[d] for d in lookup.deps}
+                if self._executor is None:
+                    self._settle_inline(lookup, inputs, result)
+                    continue
+                running[self._executor.submit(_run, lookup, inputs, started)] = (lookup, time.perf_counter())
+            if not running:
+                continue
+
+            nearest = min(deadline(lookup, submitted) for lookup, submitted in running.values())
+            done, _ = concurrent.futures.wait(
+                running, timeout=max(0.0, nearest - time.perf_counter()),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                lookup, _ = running.pop(future)
+                try:
+                    value, elapsed = future.result()
+                    result.values[lookup.name] = value
+                    result.timings_ms[lookup.name] = elapsed
+                except Exception as e:
+                    logger.warning(f"context lookup {lookup.name} failed: {e}")
+                    result.values[lookup.name] = lookup.default
+                    result.failed.append(lookup.name)
+            now = time.perf_counter()
+            for future, (lookup, submitted) in list(running.items()):
+                if deadline(lookup, submitted) <= now:
+                    del running[future]
+                    # Frees the pool slot if it never started; a running
+                    # lookup finishes in the background
+                    queued = future.cancel()
+                    logger.warning(
+                        f"context lookup {lookup.name} timed out"
+                        f"{' in the queue' if queued else ''}, using default"
+                    )
+                    result.values[lookup.name] = lookup.default
+                    result.timed_out.append(lookup.name)
+                    result.timings_ms[lookup.name] = (lookup.timeout_ms or self.default_timeout_ms)
+
+        result.wall_ms = (time.perf_counter() - start) * 1000
+        self._record(result)
+        return result
+
+    def _settle_inline(self, lookup: Lookup, inputs: Dict[str, Any], result: GatherResult) -> None:
+        try:
+            value, elapsed = _run(lookup, inputs)
+            result.values[lookup.name] = value
+            result.timings_ms[lookup.name] = elapsed
+        except Exception as e:
+            logger.warning(f"context lookup {lookup.name} failed: {e}")
+            result.values[lookup.name] = lookup.default
+            result.failed.append(lookup.name)
+
+    def _record(self, result: GatherResult) -> None:
+        with self._lock:
+            self._gathers += 1
+            self._wall_ms += result.wall_ms
+            self._sequential_ms += sum(result.timings_ms.values())
+            for name, ms in result.timings_ms.items():
+                stats = self._per_lookup[name]
+                stats["count"] += 1
+                stats["total_ms"] += ms
+                stats["max_ms"] = max(stats["max_ms"], ms)
+            for name in result.timed_out:
+                self._per_lookup[name]["timeouts"] += 1
+            for name in result.failed:
+                self._per_lookup[name]["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            gathers = self._gathers
+            return {
+                "parallel": self.parallel,
+                "gathers": gathers,
+                "avg_wall_ms": round(self._wall_ms / gathers, 1) if gathers else 0.0,
+                "avg_sequential_ms": round(self._sequential_ms / gathers, 1) if gathers else 0.0,
+                "lookups": {
+                    name: {
+                        "count": int(s["count"]),
+                        "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+                        "max_ms": round(s["max_ms"], 1),
+                        "timeouts": int(s["timeouts"]),
+                        "errors": int(s["errors"]),
+                    }
+                    for name, s in self._per_lookup.items()
+                },
+            }
+
+
+_gatherer: Optional[ContextGatherer] = None
+_gatherer_lock = threading.Lock()
+
+
+def get_context_gatherer() -> ContextGatherer:
+    """Process-wide gatherer sharing one bounded pool."""
+    global _gatherer
+    if _gatherer is None:
+        with _gatherer_lock:
+            if _gatherer is None:
+                _gatherer = ContextGatherer()
+    return _gatherer
+
+
+def context_gather_stats() -> Dict[str, Any]:
+    """Stats for /api/metrics (without creating the pool)."""
+    return _gatherer.get_stats() if _gatherer is not None else {"initialized": False}
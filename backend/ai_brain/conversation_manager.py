@@ -10,20 +10,25 @@ v2.0 Additions:
 
 IMPORTANT: Conversation state is now persisted to Redis to survive server restarts.
 This is critical for order/appointment booking flows that span multiple messages.
+Only the fields that changed are written on each turn (see conversation_state_store.py),
+and the in-process session map is LRU-bounded.
 """
 
 import time
 import os
-import json
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field, asdict
-from collections import defaultdict
+from collections import OrderedDict
 from threading import Lock
 from enum import Enum
 
 logger = logging.getLogger('reviseit.conversation')
 
+# In-process bounds: sessions kept in memory, messages kept per session
+MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "5000"))
+MAX_SESSION_MESSAGES = 50
+
 # Try to import Redis
 try:
     import redis
@@ -158,7 +163,7 @@ class UserProfile:
         return "USER PROFILE (use this context in your response):\n" + "\n".join(f"- {p}" for p in parts)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationState:
     """
     Structured state for deterministic conversation flows.
@@ -190,6 +195,9 @@ class ConversationState:
     
     # Timestamp when flow was started
     flow_started_at: Optional[float] = None
+
+    # Set while an order is being written (not persisted)
+    _persistence_locked: bool = False
     
     def start_flow(self, flow_name: str, required_fields: List[str], config: Dict = None):
         """Start a new conversation flow."""
@@ -273,7 +281,7 @@ class ConversationState:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationSession:
     """A single user's conversation session with structured state tracking."""
     user_id: str
@@ -290,6 +298,12 @@ class ConversationSession:
     
     # ADDED: Structured conversation state for flows like appointment booking
     conversation_state: ConversationState = field(default_factory=ConversationState)
+
+    # Messages ever added (the state store persists only the new ones)
+    message_seq: int = 0
+
+    # What the state store last wrote for this session
+    persist_marker: Optional[Any] = field(default=None, repr=False, compare=False)
     
     def add_message(self, role: str, content: str):
         """Add a message to the session."""
@@ -298,6 +312,9 @@ class ConversationSession:
             "content": content,
             "timestamp": time.time()
         })
+        if len(self.messages) > MAX_SESSION_MESSAGES:
+            del self.messages[:-MAX_SESSION_MESSAGES]
+        self.message_seq += 1
         self.last_activity = time.time()
     
     def get_history(self, max_messages: int = 10) -> List[Dict[str, str]]:
@@ -323,7 +340,7 @@ class ConversationManager:
     - Per-user session management
     - Message history with sliding window
     - Context persistence across messages
-    - Session expiration and cleanup
+    - Session expiration and cleanup (LRU-bounded in memory)
     - Thread-safe operations
     - Redis persistence for flow state survival across restarts
     
@@ -331,8 +348,7 @@ class ConversationManager:
     persisted to Redis to prevent loss during server restarts.
     """
     
-    # Redis key prefix for conversation states
-    REDIS_KEY_PREFIX = "conversation_state"
+    # Key layout lives in ConversationStateStore
     REDIS_STATE_TTL = 7200  # 2 hours - longer than session TTL for safety
     
     def __init__(
@@ -340,19 +356,22 @@ class ConversationManager:
         max_history: int = 10,
         session_ttl: int = 3600,  # 1 hour
         cleanup_interval: int = 300,  # 5 minutes
-        redis_url: str = None
+        redis_url: str = None,
+        max_sessions: int = MAX_SESSIONS
     ):
         self.max_history = max_history
         self.session_ttl = session_ttl
         self.cleanup_interval = cleanup_interval
+        self.max_sessions = max_sessions
         
-        self._sessions: Dict[str, ConversationSession] = {}
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
         self._lock = Lock()
         self._last_cleanup = time.time()
         
         # Redis connection for persistent state storage
         self._redis: Optional[redis.Redis] = None
         self._redis_available = False
+        self._state_store = None
         self._redis_url = redis_url or os.getenv("REDIS_URL")
         self._connect_redis()
     
@@ -362,31 +381,25 @@ class ConversationManager:
             logger.warning("Redis not available for conversation state - using memory only (state will be lost on restart)")
             return
         
-        try:
-            self._redis = redis.from_url(
-                self._redis_url,
-                decode_responses=True,
-                socket_timeout=5.0,
-                socket_connect_timeout=5.0,
-                retry_on_timeout=True,
-            )
-            self._redis.ping()
-            self._redis_available = True
+        from connections import get_redis
+        from .conversation_state_store import ConversationStateStore
+
+        # Binary client: state fields are msgpack-encoded
+        self._redis = get_redis("conversation_state", url=self._redis_url, decode_responses=False)
+        self._redis_available = self._redis is not None
+        if self._redis_available:
+            self._state_store = ConversationStateStore(self._redis, self.REDIS_STATE_TTL)
             logger.info(f"✅ Conversation state persistence enabled (Redis)")
-        except Exception as e:
-            logger.error(f"❌ Redis connection failed for conversation state: {e}")
-            self._redis_available = False
-    
-    def _get_redis_key(self, user_id: str) -> str:
-        """Generate Redis key for user's conversation state."""
-        return f"{self.REDIS_KEY_PREFIX}:{user_id}"
+        else:
+            logger.error("❌ Redis connection failed for conversation state")
     
     def _persist_state_to_redis(self, user_id: str, session: ConversationSession) -> bool:
         """
         Persist conversation state to Redis.
         
         CRITICAL: Called after every state change during active flows
-        to ensure state survives server restarts.
+        to ensure state survives server restarts. Only fields that changed
+        since the previous call (and new messages) are written.
         """
         if not self._redis_available:
             return False
@@ -398,26 +411,8 @@ class ConversationManager:
             if not state.active_flow and not state.collected_fields:
                 return True  # Nothing to persist
             
-            state_data = {
-                "user_id": user_id,
-                "active_flow": state.active_flow,
-                "flow_status": state.flow_status.value if state.flow_status else "idle",
-                "collected_fields": state.collected_fields,
-                "missing_fields": state.missing_fields,
-                "current_field": state.current_field,
-                "last_question": state.last_question,
-                "flow_config": state.flow_config,
-                "flow_started_at": state.flow_started_at,
-                "last_activity": session.last_activity,
-                "last_intent": session.last_intent,
-                "context": session.context,
-                # Store recent messages for context recovery
-                "recent_messages": session.messages[-10:] if session.messages else [],
-            }
-            
-            key = self._get_redis_key(user_id)
-            self._redis.setex(key, self.REDIS_STATE_TTL, json.dumps(state_data))
-            logger.info(f"💾 Persisted conversation state for {user_id[:12]}... (flow: {state.active_flow}, status: {state.flow_status}, fields: {len(state.collected_fields)})")
+            written = self._state_store.save(user_id, session)
+            logger.info(f"💾 Persisted conversation state for {user_id[:12]}... (flow: {state.active_flow}, status: {state.flow_status}, fields: {len(state.collected_fields)}, bytes: {written})")
             return True
             
         except Exception as e:
@@ -435,14 +430,11 @@ class ConversationManager:
             return None
         
         try:
-            key = self._get_redis_key(user_id)
-            data = self._redis.get(key)
+            state_data = self._state_store.load(user_id)
             
-            if not data:
+            if not state_data:
                 return None
             
-            state_data = json.loads(data)
-            
             # Reconstruct session
             session = ConversationSession(user_id=user_id)
             session.last_activity = state_data.get("last_activity", time.time())
@@ -478,12 +470,14 @@ class ConversationManager:
     
     def _delete_state_from_redis(self, user_id: str):
         """Delete conversation state from Redis when flow completes."""
+        session = self._sessions.get(user_id)
+        if session is not None:
+            session.persist_marker = None
         if not self._redis_available:
             return
         
         try:
-            key = self._get_redis_key(user_id)
-            self._redis.delete(key)
+            self._state_store.delete(user_id)
             logger.debug(f"🗑️ Deleted conversation state for {user_id[:12]}...")
         except Exception as e:
             logger.error(f"Failed to delete conversation state from Redis: {e}")
@@ -494,34 +488,42 @@ class ConversationManager:
             # Periodic cleanup
             self._maybe_cleanup()
             
-            if user_id not in self._sessions:
-                # Try to recover from Redis first (critical for flow recovery after restart)
-                recovered_session = self._load_state_from_redis(user_id)
-                if recovered_session:
-                    self._sessions[user_id] = recovered_session
-                    return recovered_session
-                
-                # Create new session
-                self._sessions[user_id] = ConversationSession(user_id=user_id)
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+                return session
             
-            return self._sessions[user_id]
+            # Try to recover from Redis first (critical for flow recovery after restart)
+            session = self._load_state_from_redis(user_id) or ConversationSession(user_id=user_id)
+            self._remember_session(user_id, session)
+            return session
     
     def get_session(self, user_id: str) -> Optional[ConversationSession]:
         """Get session if exists, otherwise None. Recovers from Redis if needed."""
         with self._lock:
             session = self._sessions.get(user_id)
             if session and not session.is_expired(self.session_ttl):
+                self._sessions.move_to_end(user_id)
                 return session
             
             # Session not in memory or expired - try Redis recovery
             if not session:
                 recovered_session = self._load_state_from_redis(user_id)
                 if recovered_session and not recovered_session.is_expired(self.session_ttl):
-                    self._sessions[user_id] = recovered_session
+                    self._remember_session(user_id, recovered_session)
                     return recovered_session
             
             return None
     
+    def _remember_session(self, user_id: str, session: ConversationSession):
+        """Insert a session, evicting the least recently used beyond max_sessions."""
+        self._sessions[user_id] = session
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, evicted = self._sessions.popitem(last=False)
+            # Active flows are already in Redis; flush any unsaved delta
+            if evicted.conversation_state.is_active():
+                self._persist_state_to_redis(evicted_id, evicted)
+    
     def add_message(
         self,
         user_id: str,
@@ -0,0 +1,300 @@
+"""
+Delta-persisted conversation state (Redis hashes + msgpack).
+
+ConversationManager used to write the whole session as one JSON blob on
+every state change: flow_config, context and the last 10 messages, even
+when a turn only moved `current_field`. The state now lives in:
+
+    conversation_state:v2:{user}       HASH  one msgpack value per field
+    conversation_state:v2:{user}:msgs  LIST  last N messages (RPUSH + LTRIM)
+    conversation_flow_config:{digest}  STR   flow_config, shared by content
+
+    save(session)
+        field unchanged since last save ──► skipped
+        field changed                   ──► HSET of that field only
+        new messages                    ──► RPUSH of the new ones only
+        flow_config                     ──► reference + small per-user delta
+                                            (e.g. `_available_slots`)
+
+A full rewrite happens when the flow (re)starts, after a recovery from
+Redis, and every TTL/2 so partial writes never land on an expired hash.
+Legacy single-key JSON states are still read (and replaced on next save).
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('reviseit.conversation')
+
+try:
+    import msgpack
+
+    def _pack(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True, default=str)
+
+    def _unpack(blob: bytes) -> Any:
+        return msgpack.unpackb(blob, raw=False, strict_map_key=False)
+
+except ImportError:  # pragma: no cover - msgpack is in requirements.txt
+    msgpack = None
+
+    def _pack(value: Any) -> bytes:
+        return json.dumps(value, default=str, separators=(',', ':')).encode('utf-8')
+
+    def _unpack(blob: bytes) -> Any:
+        return json.loads(blob)
+
+
+_FLOW_CONFIG_CACHE_SIZE = 256
+
+# Hash fields written per session (flow_config is stored by reference)
+STATE_FIELDS = (
+    "active_flow",
+    "flow_status",
+    "collected_fields",
+    "missing_fields",
+    "current_field",
+    "last_question",
+    "flow_started_at",
+    "flow_config_ref",
+    "flow_config_delta",
+    "last_activity",
+    "last_intent",
+    "context",
+)
+
+
+class PersistMarker:
+    """What was last written for a session (compared on the next save)."""
+
+    __slots__ = ("digests", "message_seq", "flow_started_at", "flow_config_ref", "written_at")
+
+    def __init__(self, flow_started_at: Optional[float], flow_config_ref: Optional[str]):
+        self.digests: Dict[str, int] = {}
+        self.message_seq = 0
+        self.flow_started_at = flow_started_at
+        self.flow_config_ref = flow_config_ref
+        self.written_at = time.time()
+
+
+class ConversationStateStore:
+    """Redis-backed store for ConversationSession flow state."""
+
+    KEY_PREFIX = "conversation_state:v2"
+    LEGACY_KEY_PREFIX = "conversation_state"
+    FLOW_CONFIG_PREFIX = "conversation_flow_config"
+
+    def __init__(self, redis_client, ttl: int, max_messages: int = 10):
+        """
+        Args:
+            redis_client: Binary-safe client (decode_responses=False)
+            ttl: Seconds a state survives without saves
+            max_messages: Messages kept for context recovery
+        """
+        self._redis = redis_client
+        self.ttl = ttl
+        self.max_messages = max_messages
+        # digest -> (decoded config, last SET time); shared by every user of a business
+        self._flow_configs: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"saves": 0, "full_saves": 0, "bytes_written": 0}
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}"
+
+    def _messages_key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}:msgs"
+
+    # ------------------------------------------------------------------
+    # Save
+    # ------------------------------------------------------------------
+
+    def save(self, user_id: str, session) -> int:
+        """Write what changed since the last save; returns bytes written."""
+        state = session.conversation_state
+        marker: Optional[PersistMarker] = session.persist_marker
+        now = time.time()
+
+        full = (
+            marker is None
+            or marker.flow_started_at != state.flow_started_at
+            or now - marker.written_at > self.ttl / 2
+            or (marker.flow_config_ref and marker.flow_config_ref not in self._flow_configs)
+        )
+        pipe = self._redis.pipeline(transaction=False)
+        written = 0
+
+        if full:
+            flow_ref, written = self._put_flow_config(pipe, state.flow_config, now)
+            marker = PersistMarker(state.flow_started_at, flow_ref)
+            pipe.delete(
+                self._key(user_id),
+                self._messages_key(user_id),
+                f"{self.LEGACY_KEY_PREFIX}:{user_id}",
+            )
+
+        changed: Dict[str, bytes] = {}
+        for name, value in self._field_values(session, marker).items():
+            blob = _pack(value)
+            digest = hash(blob)
+            if marker.digests.get(name) != digest:
+                changed[name] = blob
+                marker.digests[name] = digest
+        if changed:
+            pipe.hset(self._key(user_id), mapping=changed)
+            written += sum(len(k) + len(v) for k, v in changed.items())
+
+        new_messages = session.message_seq - marker.message_seq
+        if full:
+            new_messages = len(session.messages)
+        if new_messages > 0:
+            blobs = [_pack(m) for m in session.messages[-min(new_messages, self.max_messages):]]
+            if blobs:
+                pipe.rpush(self._messages_key(user_id), *blobs)
+                pipe.ltrim(self._messages_key(user_id), -self.max_messages, -1)
+                written += sum(len(b) for b in blobs)
+        marker.message_seq = session.message_seq
+
+        pipe.expire(self._key(user_id), self.ttl)
+        pipe.expire(self._messages_key(user_id), self.ttl)
+        try:
+            pipe.execute()
+        except Exception:
+            # Nothing is known to be written: next save rewrites everything
+            session.persist_marker = None
+            raise
+
+        if full:
+            marker.written_at = now
+        session.persist_marker = marker
+        with self._lock:
+            self._stats["saves"] += 1
+            self._stats["full_saves"] += int(full)
+            self._stats["bytes_written"] += written
+        return written
+
+    def _field_values(self, session, marker: PersistMarker) -> Dict[str, Any]:
+        state = session.conversation_state
+        return {
+            "active_flow": state.active_flow,
+            "flow_status": state.flow_status.value if state.flow_status else "idle",
+            "collected_fields": state.collected_fields,
+            "missing_fields": state.missing_fields,
+            "current_field": state.current_field,
+            "last_question": state.last_question,
+            "flow_started_at": state.flow_started_at,
+            "flow_config_ref": marker.flow_config_ref,
+            "flow_config_delta": self._flow_config_delta(state.flow_config, marker.flow_config_ref),
+            "last_activity": session.last_activity,
+            "last_intent": session.last_intent,
+            "context": session.context,
+        }
+
+    def _put_flow_config(self, pipe, config: Dict[str, Any], now: float) -> Tuple[Optional[str], int]:
+        """Queue the shared flow_config write (once per TTL/2 per digest)."""
+        if not config:
+            return None, 0
+        blob = _pack(config)
+        digest = hashlib.sha1(
+            json.dumps(config, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:20]
+        with self._lock:
+            cached = self._flow_configs.get(digest)
+            if cached and now - cached[1] < self.ttl / 2:
+                self._flow_configs.move_to_end(digest)
+                return digest, 0
+            self._remember_flow_config(digest, _unpack(blob), now)
+        # Outlives every session hash that can reference it
+        pipe.set(f"{self.FLOW_CONFIG_PREFIX}:{digest}", blob, ex=self.ttl * 3)
+        return digest, len(blob)
+
+    def _remember_flow_config(self, digest: str, config: Dict[str, Any], stored_at: float) -> None:
+        self._flow_configs[digest] = (config, stored_at)
+        self._flow_configs.move_to_end(digest)
+        while len(self._flow_configs) > _FLOW_CONFIG_CACHE_SIZE:
+            self._flow_configs.popitem(last=False)
+
+    def _flow_config_delta(self, config: Dict[str, Any], ref: Optional[str]) -> List[Any]:
+        """[changed_or_added, removed_keys] relative to the shared base."""
+        if not ref:
+            return [config or {}, []]
+        with self._lock:
+            cached = self._flow_configs.get(ref)
+        base = cached[0] if cached else {}
+        changed = {k: v for k, v in (config or {}).items() if k not in base or base[k] != v}
+        removed = [k for k in base if k not in (config or {})]
+        return [changed, removed]
+
+    # ------------------------------------------------------------------
+    # Load / delete
+    # ------------------------------------------------------------------
+
+    def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        State in the shape ConversationManager restores from, or None.
+
+        The recovered session carries no PersistMarker, so its first save
+        is a full rewrite (which also retires a legacy JSON key).
+        """
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(self._key(user_id))
+        pipe.lrange(self._messages_key(user_id), 0, -1)
+        raw_fields, raw_messages = pipe.execute()
+
+        if not raw_fields:
+            legacy = self._redis.get(f"{self.LEGACY_KEY_PREFIX}:{user_id}")
+            return json.loads(legacy) if legacy else None
+
+        data = {
+            (k.decode('utf-8') if isinstance(k, bytes) else k): _unpack(v)
+            for k, v in raw_fields.items()
+        }
+        changed, removed = data.pop("flow_config_delta", None) or [{}, []]
+        config = dict(self._get_flow_config(data.pop("flow_config_ref", None)) or {})
+        for key in removed:
+            config.pop(key, None)
+        config.update(changed)
+        data["flow_config"] = config
+        data["recent_messages"] = [_unpack(m) for m in raw_messages]
+        return data
+
+    def _get_flow_config(self, ref: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not ref:
+            return None
+        with self._lock:
+            cached = self._flow_configs.get(ref)
+            if cached:
+                self._flow_configs.move_to_end(ref)
+                return _unpack(_pack(cached[0]))
+        blob = self._redis.get(f"{self.FLOW_CONFIG_PREFIX}:{ref}")
+        if blob is None:
+            logger.warning(f"flow_config {ref} expired; restoring per-user delta only")
+            return None
+        config = _unpack(blob)
+        with self._lock:
+            # Not refreshed by us yet: the next full save re-SETs it
+            self._remember_flow_config(ref, _unpack(blob), 0.0)
+        return config
+
+    def delete(self, user_id: str) -> None:
+        self._redis.delete(
+            self._key(user_id),
+            self._messages_key(user_id),
+            f"{self.LEGACY_KEY_PREFIX}:{user_id}",
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["bytes_per_save"] = round(stats["bytes_written"] / stats["saves"], 1) if stats["saves"] else 0
+        stats["flow_configs_cached"] = len(self._flow_configs)
+        return stats
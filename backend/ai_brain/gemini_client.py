@@ -3,14 +3,15 @@ Gemini Client Wrapper for AI Brain v5.0 — FAANG-grade resilience.
 
 Centralised Gemini API client with:
 - Circuit breaker integration (CLOSED/OPEN/HALF_OPEN state machine)
-- Per-key cooldown tracking (skip exhausted keys, rotate to available ones)
-- Multi-key rotation with intelligent selection (GEMINI_API_KEY, GEMINI_API_KEY_2, ...)
+- Adaptive multi-key scheduling (GEMINI_API_KEY, GEMINI_API_KEY_2, ...):
+  per-key token buckets learned from Retry-After, fair queuing by plan
+- Hedged requests for tail latency
 - Retry with exponential backoff + jitter (via tenacity)
 - 429 RESOURCE_EXHAUSTED aware retry with Retry-After parsing
 - Adaptive load shedding (skip self-check when under pressure)
 - Observability metrics integration
-- Request spacing to prevent burst rate-limiting
 - Timeout protection
+- Gemini context caching of the static per-business prompt prefix
 - OpenAI tool-schema → Gemini function-declaration conversion
 - Unified response parsing for both streaming and non-streaming
 - Token usage extraction
@@ -20,7 +21,6 @@ import json
 import os
 import re
 import time
-import random
 import logging
 import threading
 import uuid
@@ -37,10 +37,11 @@ from tenacity import (
 
 from .circuit_breaker import (
     CircuitBreaker,
-    PerKeyCooldownTracker,
     get_circuit_breaker,
 )
+from .llm_scheduler import LLM_KEY_MAX_RPS, Lease, SchedulerTimeout, get_llm_scheduler
 from .observability import get_ai_metrics
+from .prompt_artifacts import SplitPrompt, get_context_caches
 from .system_health import get_system_health
 
 logger = logging.getLogger('reviseit.gemini')
@@ -49,6 +50,13 @@ logger = logging.getLogger('reviseit.gemini')
 _genai_module = None
 _genai_types = None
 
+# Hedged calls share one bounded pool; a call that finds every thread busy
+# runs unhedged on its own thread rather than queueing behind others
+GEMINI_HEDGE_MAX_THREADS = int(os.getenv('GEMINI_HEDGE_MAX_THREADS', '32'))
+_hedge_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+_hedge_slots = threading.BoundedSemaphore(GEMINI_HEDGE_MAX_THREADS)
+
 
 # =========================================================================
 # CUSTOM EXCEPTIONS
@@ -124,6 +132,26 @@ def _ensure_genai():
     return _genai_module, _genai_types
 
 
+def _submit_hedged(fn, *args) -> Optional[concurrent.futures.Future]:
+    """Run fn on the shared hedge pool; None when all its threads are busy."""
+    global _hedge_pool
+    if not _hedge_slots.acquire(blocking=False):
+        return None
+    try:
+        if _hedge_pool is None:
+            with _hedge_pool_lock:
+                if _hedge_pool is None:
+                    _hedge_pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=GEMINI_HEDGE_MAX_THREADS, thread_name_prefix='gemini-hedge'
+                    )
+        future = _hedge_pool.submit(fn, *args)
+    except Exception:
+        _hedge_slots.release()
+        raise
+    future.add_done_callback(lambda _f: _hedge_slots.release())
+    return future
+
+
 # =========================================================================
 # TOOL SCHEMA CONVERTER: OpenAI → Gemini
 # =========================================================================
@@ -261,8 +289,9 @@ def extract_usage(response) -> Dict[str, int]:
             "prompt_tokens": getattr(meta, "prompt_token_count", 0) or 0,
             "completion_tokens": getattr(meta, "candidates_token_count", 0) or 0,
             "total_tokens": getattr(meta, "total_token_count", 0) or 0,
+            "cached_tokens": getattr(meta, "cached_content_token_count", 0) or 0,
         }
-    return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_tokens": 0}
 
 
 # =========================================================================
@@ -296,7 +325,7 @@ def _collect_api_keys(primary_key: str = None) -> List[str]:
 
 
 # =========================================================================
-# GEMINI CLIENT — v5.0 with Circuit Breaker + Per-Key Cooldown
+# GEMINI CLIENT — v5.0 with Circuit Breaker + Adaptive Key Scheduler
 # =========================================================================
 
 class GeminiClient:
@@ -305,11 +334,10 @@ class GeminiClient:
 
     Features:
     - Circuit breaker (CLOSED/OPEN/HALF_OPEN) — proactive failure prevention
-    - Per-key cooldown tracking — skip exhausted keys intelligently
-    - Multi-key rotation — round-robin with cooldown awareness
+    - LLMScheduler — per-key token buckets, weighted fair queue by plan,
+      bounded queue wait, hedged requests
     - Retry with exponential backoff (configurable attempts)
-    - 429 RESOURCE_EXHAUSTED: retry with Retry-After delay + jitter
-    - Request spacing: configurable minimum interval between requests
+    - 429 RESOURCE_EXHAUSTED: key blocked for Retry-After, call rescheduled
     - Timeout protection
     - Observability metrics integration
     - JSON-mode support
@@ -324,6 +352,7 @@ class GeminiClient:
         timeout_seconds: int = 30,
         rate_limit_max_retries: int = 5,
         min_request_interval_ms: int = 200,
+        queue_wait_ms: int = 1500,
     ):
         genai, types = _ensure_genai()
         self._types = types
@@ -331,18 +360,15 @@ class GeminiClient:
         self.max_retries = max_retries
         self.timeout_seconds = timeout_seconds
         self._rate_limit_max_retries = rate_limit_max_retries
-        self._min_request_interval = min_request_interval_ms / 1000.0  # Convert to seconds
 
-        # Multi-key rotation
-        self._api_keys = _collect_api_keys(api_key)
-        self._current_key_index = 0
-        self._key_lock = threading.Lock()
-
-        # Per-key cooldown tracker (NEW in v5.0)
-        self._key_cooldowns = PerKeyCooldownTracker()
-
-        # Create initial client
-        self._client = genai.Client(api_key=self._api_keys[0] if self._api_keys else api_key)
+        # Multi-key scheduling: min_request_interval_ms is now the initial
+        # per-key spacing; each key's rate then adapts to its 429s
+        self._api_keys = _collect_api_keys(api_key) or [api_key]
+        self._scheduler = get_llm_scheduler(
+            len(self._api_keys),
+            rate_per_key=1000.0 / min_request_interval_ms if min_request_interval_ms > 0 else LLM_KEY_MAX_RPS,
+            max_wait=queue_wait_ms / 1000.0,
+        )
         self._clients: Dict[int, Any] = {}  # Cache clients per key index
 
         # Circuit breaker (singleton, shared across all instances)
@@ -351,10 +377,6 @@ class GeminiClient:
         # Observability metrics
         self._metrics = get_ai_metrics()
 
-        # Request spacing
-        self._last_request_time = 0.0
-        self._request_lock = threading.Lock()
-
         # Thread-safe client cache lock
         self._client_cache_lock = threading.Lock()
 
@@ -379,53 +401,14 @@ class GeminiClient:
                 )
             return self._clients[key_index]
 
-    def _select_best_key(self) -> int:
-        """Select the best available API key (one not in cooldown)."""
-        available = self._key_cooldowns.get_next_available_key(
-            len(self._api_keys), self._current_key_index
-        )
-        if available is not None:
-            return available
-        # All keys in cooldown — return current and let retry handle it
-        return self._current_key_index
-
-    def _rotate_key(self) -> bool:
-        """Rotate to the next available API key. Returns True if a new key found."""
-        with self._key_lock:
-            if len(self._api_keys) <= 1:
-                return False
-
-            # Find an available key (skip cooldown keys)
-            for offset in range(1, len(self._api_keys)):
-                candidate = (self._current_key_index + offset) % len(self._api_keys)
-                if self._key_cooldowns.is_available(candidate):
-                    self._current_key_index = candidate
-                    self._client = self._get_client_for_key(candidate)
-                    logger.info(f"🔑 Rotated to API key #{candidate + 1} (available)")
-                    return True
-
-            # All keys in cooldown — rotate anyway (will wait)
-            self._current_key_index = (self._current_key_index + 1) % len(self._api_keys)
-            self._client = self._get_client_for_key(self._current_key_index)
-            logger.warning(f"🔑 All keys in cooldown, rotated to #{self._current_key_index + 1}")
-            return True
-
-    # -----------------------------------------------------------------
-    # REQUEST SPACING
-    # -----------------------------------------------------------------
-
-    def _wait_for_spacing(self):
-        """Enforce minimum interval between API requests to avoid bursts."""
-        if self._min_request_interval <= 0:
-            return
-
-        with self._request_lock:
-            now = time.monotonic()
-            elapsed = now - self._last_request_time
-            if elapsed < self._min_request_interval:
-                wait_time = self._min_request_interval - elapsed
-                time.sleep(wait_time)
-            self._last_request_time = time.monotonic()
+    def _acquire(self, tenant_id: Optional[str], plan: Optional[str]) -> Lease:
+        """Lease a key from the scheduler (bounded wait)."""
+        try:
+            return self._scheduler.acquire(tenant_id, plan)
+        except SchedulerTimeout as e:
+            raise RateLimitError(
+                f"No Gemini key available: {e}", retry_after=e.retry_after, original_error=e,
+            ) from e
 
     # -----------------------------------------------------------------
     # CORE: Non-streaming completion
@@ -441,19 +424,24 @@ class GeminiClient:
         json_mode: bool = False,
         tools=None,
         tool_choice: str = None,
+        tenant_id: Optional[str] = None,
+        plan: Optional[str] = None,
     ):
         """
         Generate a response (non-streaming).
 
         Args:
             model: Gemini model name (e.g. "gemini-2.5-flash")
-            system_prompt: System instruction
+            system_prompt: System instruction (a SplitPrompt's static prefix
+                is served from a context cache when one is available)
             messages: List of {"role": "user"|"model", "content": str}
             temperature: Sampling temperature
             max_tokens: Max output tokens
             json_mode: If True, force JSON output
             tools: Gemini tool objects (already converted)
             tool_choice: Not used by Gemini (auto by default)
+            tenant_id: Business ID used for fair queuing between tenants
+            plan: Subscription plan of the tenant (queue weight)
 
         Raises:
             CircuitOpenError: If circuit breaker is OPEN (use fallback)
@@ -483,7 +471,9 @@ class GeminiClient:
         if json_mode:
             gen_config.response_mime_type = "application/json"
 
-        return self._call_with_retry(model, contents, gen_config)
+        return self._call_with_retry(
+            model, contents, gen_config, tenant_id=tenant_id, plan=plan, prompt=system_prompt,
+        )
 
     def _call_api_with_timeout(self, client, model, contents, config):
         """Call Gemini API with SLA timeout enforcement.
@@ -517,10 +507,17 @@ class GeminiClient:
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: int = 500,
+        tenant_id: Optional[str] = None,
+        plan: Optional[str] = None,
+        json_mode: bool = False,
+        usage: Optional[Dict[str, int]] = None,
     ) -> Generator[str, None, None]:
         """
         Stream a response token-by-token.
         Yields text chunks as they arrive.
+
+        If a `usage` dict is passed, it is filled with the token counts
+        reported on the final chunk (same keys as extract_usage()).
         """
         # Circuit breaker check
         if not self._circuit_breaker.can_execute():
@@ -535,29 +532,158 @@ class GeminiClient:
             temperature=temperature,
             max_output_tokens=max_tokens,
         )
+        if json_mode:
+            gen_config.response_mime_type = "application/json"
 
-        self._wait_for_spacing()
-
-        stream = self._client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=gen_config,
+        lease = self._acquire(tenant_id, plan)
+        start = time.monotonic()
+        contents, gen_config, cache_name = self._with_context_cache(
+            lease.key_index, model, contents, gen_config, system_prompt
         )
+        try:
+            stream = self._get_client_for_key(lease.key_index).models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=gen_config,
+            )
 
-        for chunk in stream:
-            text = getattr(chunk, "text", None)
-            if text:
-                yield text
+            for chunk in stream:
+                if usage is not None and getattr(chunk, "usage_metadata", None):
+                    usage.update(extract_usage(chunk))
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        except Exception as e:
+            self._forget_context_cache(cache_name, e)
+            self._scheduler.release(
+                lease, ok=False,
+                retry_after=_parse_retry_after(e) if _is_rate_limit_error(e) else None,
+            )
+            raise
+        finally:
+            # No-op if already released above
+            self._scheduler.release(lease, latency=time.monotonic() - start)
 
     # -----------------------------------------------------------------
     # INTERNAL: retry, 429 handling, circuit breaker, content builder
     # -----------------------------------------------------------------
 
-    def _call_with_retry(self, model, contents, config):
-        """Call Gemini API with retry + 429-aware backoff + key rotation + circuit breaker."""
+    def _with_context_cache(self, key_index: int, model, contents, config, prompt):
+        """
+        Serve a SplitPrompt's static prefix from a Gemini context cache.
+
+        Returns (contents, config, cache_name). Without a cache (disabled,
+        prefix too small, tool calls, creation failed) the call is sent
+        unchanged — the prefix still comes first for implicit caching.
+        """
+        caches = get_context_caches()
+        if caches is None or not isinstance(prompt, SplitPrompt) or getattr(config, "tools", None):
+            return contents, config, None
+
+        name = caches.get_or_create(
+            key_index, model, prompt,
+            lambda: self._create_context_cache(key_index, model, prompt, caches.ttl_seconds),
+        )
+        if not name:
+            return contents, config, None
+
+        config = config.model_copy(update={"system_instruction": None, "cached_content": name})
+        if prompt.suffix:
+            # The per-message layers travel as a leading user turn
+            contents = [
+                self._types.Content(role="user", parts=[self._types.Part(text=prompt.suffix)])
+            ] + list(contents)
+        return contents, config, name
+
+    def _create_context_cache(self, key_index: int, model, prompt: SplitPrompt, ttl_seconds: int) -> str:
+        cache = self._get_client_for_key(key_index).caches.create(
+            model=model,
+            config=self._types.CreateCachedContentConfig(
+                system_instruction=prompt.prefix,
+                display_name=prompt.cache_key[:128],
+                ttl=f"{ttl_seconds}s",
+            ),
+        )
+        logger.info(f"🧊 Context cache created for {prompt.cache_key} on key #{key_index + 1}")
+        return cache.name
+
+    @staticmethod
+    def _forget_context_cache(cache_name: Optional[str], error: Exception) -> None:
+        """Drop a cache the API reports as expired or missing."""
+        if cache_name and "cache" in str(error).lower():
+            caches = get_context_caches()
+            if caches is not None:
+                caches.invalidate(cache_name)
+
+    def _call_on_key(self, lease: Lease, model, contents, config, prompt=None):
+        """One API call on the leased key; the outcome feeds the key's bucket."""
+        start = time.monotonic()
+        contents, config, cache_name = self._with_context_cache(
+            lease.key_index, model, contents, config, prompt
+        )
+        try:
+            result = self._call_api_with_timeout(
+                self._get_client_for_key(lease.key_index), model, contents, config
+            )
+        except Exception as e:
+            self._forget_context_cache(cache_name, e)
+            self._scheduler.release(
+                lease, ok=False,
+                retry_after=_parse_retry_after(e) if _is_rate_limit_error(e) else None,
+            )
+            e._gemini_key_index = lease.key_index
+            raise
+        self._scheduler.release(lease, ok=True, latency=time.monotonic() - start)
+        return result
+
+    def _call_hedged(self, lease: Lease, delay: float, model, contents, config, prompt=None):
+        """
+        Run the call; if it is still pending after `delay` (recent p95) and
+        another key is idle, send the same request there. First success wins;
+        the slower call finishes in the background and releases its key.
+        """
+        primary = _submit_hedged(self._call_on_key, lease, model, contents, config, prompt)
+        if primary is None:
+            return self._call_on_key(lease, model, contents, config, prompt), lease.key_index
+        futures = {primary: lease}
+        done, _ = concurrent.futures.wait(futures, timeout=delay)
+        if not done:
+            hedge = self._scheduler.try_acquire_hedge([lease.key_index], lease.tenant_id)
+            if hedge is not None:
+                future = _submit_hedged(self._call_on_key, hedge, model, contents, config, prompt)
+                if future is None:
+                    self._scheduler.release(hedge, ok=False)
+                else:
+                    logger.info(
+                        f"🪁 Hedging slow call ({delay:.1f}s) on key #{hedge.key_index + 1}"
+                    )
+                    futures[future] = hedge
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                winner = futures[future]
+                if winner.hedge:
+                    self._scheduler.record_hedge_win()
+                return result, winner.key_index
+        raise error
+
+    def _call_with_retry(self, model, contents, config, tenant_id=None, plan=None, prompt=None):
+        """Call Gemini API with retry + 429-aware rescheduling + circuit breaker."""
 
         def _is_retryable(exc):
             """Return True if the error should be retried (non-429, non-auth)."""
+            if isinstance(exc, RateLimitError):
+                return False  # Scheduler queue wait already spent
             error_str = str(exc)
             # 429 handled separately by the outer loop — don't retry here
             if '429' in error_str or 'RESOURCE_EXHAUSTED' in error_str:
@@ -575,32 +701,26 @@ class GeminiClient:
             reraise=True,
         )
         def _do_call():
-            self._wait_for_spacing()
-
-            # Select best available key before each attempt
-            best_key = self._select_best_key()
-            if best_key != self._current_key_index:
-                with self._key_lock:
-                    self._current_key_index = best_key
-                    self._client = self._get_client_for_key(best_key)
-
-            return self._call_api_with_timeout(
-                self._client, model, contents, config
-            )
-
-        # Outer loop: handle 429 with Retry-After + key rotation + circuit breaker
+            lease = self._acquire(tenant_id, plan)
+            delay = self._scheduler.hedge_delay()
+            if delay is None or delay >= self.timeout_seconds:
+                return self._call_on_key(lease, model, contents, config, prompt), lease.key_index
+            return self._call_hedged(lease, delay, model, contents, config, prompt)
+
+        # Outer loop: a 429 blocks that key in the scheduler and the call is
+        # re-queued (bounded wait) instead of sleeping for Retry-After here
         last_429_error = None
         total_retries = 0
 
         for attempt in range(self._rate_limit_max_retries + 1):
             try:
-                result = _do_call()
+                result, key_index = _do_call()
 
                 # SUCCESS — record metrics, system health, and reset circuit breaker
                 self._circuit_breaker.record_success()
                 self._system_health.record_success()
                 self._metrics.record_success(
-                    key_index=self._current_key_index,
+                    key_index=key_index,
                     retries=total_retries,
                 )
                 return result
@@ -613,29 +733,16 @@ class GeminiClient:
                 total_retries += 1
                 retry_after = _parse_retry_after(e)
 
+                key_index = getattr(e, "_gemini_key_index", -1)
+
                 # Record failure in circuit breaker, system health, and metrics
                 self._circuit_breaker.record_failure()
                 self._system_health.record_failure(is_rate_limit=True)
                 self._metrics.record_rate_limit(
-                    key_index=self._current_key_index,
+                    key_index=key_index,
                     retry_after=retry_after,
                 )
 
-                # Mark current key as exhausted with cooldown
-                self._key_cooldowns.mark_exhausted(
-                    self._current_key_index, retry_after
-                )
-
-                # Try rotating to another available key first (instant, no wait)
-                if self._rotate_key() and self._key_cooldowns.is_available(self._current_key_index):
-                    logger.warning(
-                        f"⚠️ 429 on key #{(self._current_key_index - 1) % len(self._api_keys) + 1}. "
-                        f"Rotated to key #{self._current_key_index + 1}, retrying "
-                        f"(attempt {attempt + 1}/{self._rate_limit_max_retries + 1})"
-                    )
-                    continue
-
-                # No available keys — check circuit breaker before waiting
                 if not self._circuit_breaker.can_execute():
                     logger.error(
                         f"⛔ Circuit breaker OPEN after {attempt + 1} failures. "
@@ -643,21 +750,10 @@ class GeminiClient:
                     )
                     break
 
-                # Wait with jitter and retry
-                if attempt < self._rate_limit_max_retries:
-                    jitter = random.uniform(1.0, 5.0)
-                    wait_time = min(retry_after + jitter, 60.0)  # Cap at 60s
-                    logger.warning(
-                        f"🔄 Rate limited (429). Waiting {wait_time:.1f}s before retry "
-                        f"(attempt {attempt + 1}/{self._rate_limit_max_retries + 1}, "
-                        f"key #{self._current_key_index + 1})"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(
-                        f"❌ Rate limit exhausted after {self._rate_limit_max_retries + 1} attempts. "
-                        f"Retry-After was {retry_after:.1f}s"
-                    )
+                logger.warning(
+                    f"⚠️ 429 on key #{key_index + 1} (Retry-After {retry_after:.1f}s). "
+                    f"Rescheduling (attempt {attempt + 1}/{self._rate_limit_max_retries + 1})"
+                )
 
         # All retries exhausted — raise a specific RateLimitError
         raise RateLimitError(
@@ -119,6 +119,108 @@ INTENT_KEYWORDS: Dict[IntentType, List[str]] = {
 }
 
 
+# Order/appointment routing vocabulary (AIBrain._classify_raw_intent).
+# Plain substrings: a token matches anywhere in the lower-cased message.
+ROUTING_KEYWORDS: Dict[str, List[str]] = {
+    # Ownership tokens (required for tracking/cancel intents)
+    # Includes English, Hindi, Tamil, Kannada, Telugu, Malayalam
+    "ownership": [
+        # English
+        "my", "mine", "i ordered", "i placed", "my order",
+        "i bought", "i purchased", "my purchase", "the order",
+        # Hindi
+        "mera", "meri", "maine", "mera order",
+        # Tamil
+        "en", "ennoda", "naan", "en order", "enathu",
+        # Kannada
+        "nanna", "naanu", "nanna order",
+        # Telugu
+        "naa", "naaku", "nenu", "na order",
+        # Malayalam
+        "ente", "enikku", "ente order",
+    ],
+    "cancel": [
+        # English
+        "cancel order", "cancel my order", "cancel the order",
+        "want to cancel", "i want to cancel", "please cancel",
+        "order cancel", "cancellation", "refund",
+        # Hindi
+        "mera order cancel", "cancel krdo", "cancel karo",
+        # Tamil
+        "order cancel pannu", "cancel pannunga", "venda order",
+        # Kannada
+        "order cancel maadi", "beda order",
+        # Telugu
+        "order cancel cheyandi", "vaddu order",
+    ],
+    "tracking": [
+        # English
+        "when will", "where is", "order status", "track order", "tracking",
+        "delivery status", "shipping status", "my order", "the order",
+        "order come", "order arrive", "order reach", "dispatch", "dispatched",
+        "status of my order", "update on my order", "did you ship",
+        "has my order", "is my order", "order update",
+        # Hindi
+        "kab aayega", "kab milega", "order kaha", "kab pahunchega",
+        "mera order kab", "order ka status", "kitna time",
+        # Tamil
+        "epo varum", "epdi irukku", "order eppo", "enna achu",
+        "varum", "vanthuduma", "dispatch achu", "ship achu",
+        # Kannada
+        "yavaga baruthe", "order yavaga", "yelli ide",
+        # Telugu
+        "eppudu vasthadi", "ekkada undi", "order eppudu",
+        # Malayalam
+        "eppol varum", "evide aanu", "order eppol",
+    ],
+    # Tracking requires ownership OR very explicit tracking phrases
+    "tracking_explicit": [
+        "track order", "order status", "tracking", "where is my order",
+        "epo varum", "kab aayega", "when will my order", "order varum",
+    ],
+    "delivery_query": [
+        "delivery time", "delivery charges", "shipping cost", "how long to deliver",
+        "delivery available", "delivery area", "delivery fee", "free delivery",
+        "do you deliver", "can you deliver", "delivery options",
+    ],
+    "order": [
+        # English
+        "order", "buy", "purchase", "want to order", "want to buy", "get me",
+        "add to cart", "checkout", "place order", "how to order", "how to buy",
+        "how do i order", "how do i buy", "how can i order", "how can i buy",
+        "i want", "i need",
+        # Hindi
+        "order karna", "kharidna", "lena hai", "mangwana", "order karu",
+        "kaise order", "kaise kharide", "order chahiye",
+        # Tamil
+        "vangurathu", "vaangi", "vaanga", "edukka", "edukanum", "vangi",
+        "epdi order", "order pannu", "order pannunga", "vanganum",
+        "epdi vangurathu", "items vangurathu", "product vangurathu",
+        "vaangi edukka", "eduka", "vaanganum",
+        # Kannada
+        "order maadi", "kharidisu", "bekaagide", "hege order",
+        # Telugu
+        "order cheyandi", "konali", "konu", "ela order", "order cheyali",
+        # Malayalam
+        "order cheyyanam", "vaangaan", "vangikko", "epadi order",
+    ],
+    "appointment": ["appointment", "schedule", "slot", "time slot", "appoint"],
+}
+
+ROUTING_PATTERNS: Dict[str, List[str]] = {
+    "order_quantity": [
+        r"\b\d+\s*(x|nos?|pieces?|items?|qty)\b",  # "2 pieces", "3x"
+        r"\b(quantity|qty)\s*:?\s*\d+",
+    ],
+    "time": [
+        r"\b(today|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+        r"\b\d{1,2}[:/]\d{2}\b",  # Time patterns like 10:30
+        r"\b\d{1,2}\s*(am|pm)\b",  # Time patterns like 10am
+        r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b",  # Date patterns
+    ],
+}
+
+
 # Intent descriptions for LLM classification
 INTENT_DESCRIPTIONS = {
     IntentType.GREETING: "Customer is greeting or saying hello",
@@ -145,12 +247,9 @@ class IntentDetector:
     """
     
     def __init__(self):
-        # Compile regex patterns for efficiency
-        self._compiled_patterns: Dict[IntentType, List[re.Pattern]] = {}
-        for intent, patterns in INTENT_KEYWORDS.items():
-            self._compiled_patterns[intent] = [
-                re.compile(p, re.IGNORECASE) for p in patterns
-            ]
+        # All intent patterns are compiled into the shared single-pass scanner
+        from .keyword_scanner import get_message_scanner
+        self._scanner = get_message_scanner()
     
     def detect(self, message: str, history: List[dict] = None) -> Tuple[IntentType, float]:
         """
@@ -188,11 +287,9 @@ class IntentDetector:
         """Match message against keyword patterns."""
         scores: Dict[IntentType, int] = {}
         
-        for intent, patterns in self._compiled_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = pattern.findall(message)
-                score += len(matches)
+        scan = self._scanner.scan(message)
+        for intent in INTENT_KEYWORDS:
+            score = scan.count(f"intent:{intent.value}")
             if score > 0:
                 scores[intent] = score
         
@@ -0,0 +1,224 @@
+"""
+Single-pass keyword scanner for language, intent and routing vocabulary.
+
+Every message used to be scanned many times over: the language detector
+ran each Roman-script indicator regex for 8 languages, IntentDetector ran
+findall() for every intent pattern, and the order/appointment router did
+dozens of `token in msg_lower` checks over lists rebuilt on each call.
+
+All of that vocabulary is compiled once into one Aho-Corasick automaton
+(utils/aho_corasick.py, shared with the automation rule matcher); this
+module adds the word-boundary, anchoring and group handling:
+
+    text ──lower/strip──► one automaton pass ──► hits per pattern
+                          + the few true regexes (precompiled)
+
+Pattern forms understood as literals (the automaton):
+    \\b(a|b|c)\\b      word-bounded alternatives   (re: findall semantics)
+    ^(a|b|c)$         whole message
+    ^(a|b|c)\\b        message prefix
+    plain substrings  `token in text` semantics
+
+Anything else (quantifiers, classes, escapes) stays a compiled regex.
+Counts follow re.findall(): leftmost, first alternative wins, no overlap,
+so callers get exactly the scores the per-pattern loops produced.
+
+    scan = get_message_scanner().scan(message)
+    scan.patterns_hit("lang:tamil")     # how many indicator patterns hit
+    scan.count("intent:pricing")        # total findall() matches
+    scan.any("route:ownership")         # any token present
+
+Results are memoized per normalized text, so the language detector, the
+intent detector and the order router share one scan of the same message.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.aho_corasick import AhoCorasick
+
+_LITERAL = r"[^\\()\[\]{}*+?.^$|]+"
+_WORD_ALTS = re.compile(r"^\\b\((%s(?:\|%s)*)\)\\b$" % (_LITERAL, _LITERAL))
+_EXACT_ALTS = re.compile(r"^\^\((%s(?:\|%s)*)\)\$$" % (_LITERAL, _LITERAL))
+_PREFIX_ALTS = re.compile(r"^\^\((%s(?:\|%s)*)\)\\b$" % (_LITERAL, _LITERAL))
+
+WORD, EXACT, PREFIX, SUBSTRING = "word", "exact", "prefix", "substring"
+
+_SCAN_CACHE_SIZE = 512
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+@dataclass(frozen=True)
+class _Spec:
+    group: str
+    mode: str  # WORD / EXACT / PREFIX / SUBSTRING / "regex"
+    regex: Optional[re.Pattern] = None
+
+
+class ScanResult:
+    """Per-pattern match counts for one message."""
+
+    __slots__ = ("_counts", "_groups")
+
+    def __init__(self, counts: List[int], groups: Dict[str, List[int]]):
+        self._counts = counts
+        self._groups = groups
+
+    def count(self, group: str) -> int:
+        """Total matches across the group's patterns (sum of findall lengths)."""
+        return sum(self._counts[i] for i in self._groups.get(group, ()))
+
+    def patterns_hit(self, group: str) -> int:
+        """Number of the group's patterns that matched at least once."""
+        return sum(1 for i in self._groups.get(group, ()) if self._counts[i])
+
+    def any(self, group: str) -> bool:
+        return any(self._counts[i] for i in self._groups.get(group, ()))
+
+
+class KeywordScanner:
+    """Compiles many pattern groups into one automaton plus residual regexes."""
+
+    def __init__(self):
+        self._specs: List[_Spec] = []
+        self._groups: Dict[str, List[int]] = {}
+        # Automaton payloads: (spec_index, alt_index, length)
+        self._automaton = AhoCorasick()
+        self._regex_specs: List[int] = []
+        self._cache: "OrderedDict[str, ScanResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add_patterns(self, group: str, patterns: Iterable[str]) -> None:
+        """Add regex patterns (matched case-insensitively) to a group."""
+        for pattern in patterns:
+            for regex, mode in ((_WORD_ALTS, WORD), (_EXACT_ALTS, EXACT), (_PREFIX_ALTS, PREFIX)):
+                match = regex.match(pattern)
+                if match:
+                    self._add_literals(group, mode, match.group(1).split("|"))
+                    break
+            else:
+                index = self._new_spec(_Spec(group, "regex", re.compile(pattern, re.IGNORECASE)))
+                self._regex_specs.append(index)
+
+    def add_substrings(self, group: str, tokens: Iterable[str]) -> None:
+        """Add plain substrings (`token in text`) to a group, one pattern each."""
+        for token in tokens:
+            self._add_literals(group, SUBSTRING, [token])
+
+    def build(self) -> "KeywordScanner":
+        self._automaton.build()
+        return self
+
+    def _new_spec(self, spec: _Spec) -> int:
+        index = len(self._specs)
+        self._specs.append(spec)
+        self._groups.setdefault(spec.group, []).append(index)
+        return index
+
+    def _add_literals(self, group: str, mode: str, alternatives: List[str]) -> None:
+        index = self._new_spec(_Spec(group, mode))
+        for alt_index, alt in enumerate(alternatives):
+            literal = alt.lower()
+            if literal:
+                self._automaton.add(literal, (index, alt_index, len(literal)))
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def scan(self, text: str) -> ScanResult:
+        """Scan a message once; repeated scans of the same text are memoized."""
+        normalized = (text or "").strip().lower()
+        with self._cache_lock:
+            cached = self._cache.get(normalized)
+            if cached is not None:
+                self._cache.move_to_end(normalized)
+                return cached
+
+        result = self._scan(normalized)
+        with self._cache_lock:
+            self._cache[normalized] = result
+            while len(self._cache) > _SCAN_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _scan(self, text: str) -> ScanResult:
+        counts = [0] * len(self._specs)
+        n = len(text)
+
+        def boundary(pos: int) -> bool:
+            before = pos > 0 and _is_word(text[pos - 1])
+            after = pos < n and _is_word(text[pos])
+            return before != after
+
+        # spec -> [(start, alt_index, end)] for word-bounded / prefix patterns
+        bounded: Dict[int, List[Tuple[int, int, int]]] = {}
+        specs = self._specs
+        for i, (spec_index, alt_index, length) in self._automaton.iter_matches(text):
+            start = i - length + 1
+            mode = specs[spec_index].mode
+            if mode == SUBSTRING:
+                counts[spec_index] = 1
+            elif mode == EXACT:
+                if start == 0 and i == n - 1:
+                    counts[spec_index] = 1
+            elif mode == PREFIX:
+                if start == 0 and boundary(i + 1):
+                    counts[spec_index] = 1
+            elif boundary(start) and boundary(i + 1):
+                bounded.setdefault(spec_index, []).append((start, alt_index, i + 1))
+
+        # findall(): leftmost match, first alternative at that position, no overlap
+        for spec_index, hits in bounded.items():
+            hits.sort()
+            position = 0
+            for start, _, end in hits:
+                if start >= position:
+                    counts[spec_index] += 1
+                    position = end
+
+        for spec_index in self._regex_specs:
+            counts[spec_index] = len(specs[spec_index].regex.findall(text))
+
+        return ScanResult(counts, self._groups)
+
+
+_scanner: Optional[KeywordScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_message_scanner() -> KeywordScanner:
+    """Shared scanner with language indicators, intent keywords and routing tokens."""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = _build_message_scanner()
+    return _scanner
+
+
+def _build_message_scanner() -> KeywordScanner:
+    from . import language_detector, intents
+
+    scanner = KeywordScanner()
+    for language, patterns in language_detector.ROMAN_INDICATORS.items():
+        scanner.add_patterns(f"lang:{language}", patterns)
+    for intent, patterns in intents.INTENT_KEYWORDS.items():
+        scanner.add_patterns(f"intent:{intent.value}", patterns)
+    for name, tokens in intents.ROUTING_KEYWORDS.items():
+        scanner.add_substrings(f"route:{name}", tokens)
+    for name, patterns in intents.ROUTING_PATTERNS.items():
+        scanner.add_patterns(f"route:{name}", patterns)
+    return scanner.build()
@@ -6,7 +6,6 @@ v2.0: Added Roman-script detection for Gujarati, Bengali, Marathi, Punjabi, Urdu
       Improved code-switching confidence for Hinglish.
 """
 
-import re
 from typing import Dict, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
@@ -115,6 +114,36 @@ URDU_INDICATORS = [
     r'\b(aap|janab|sahab|bibi|inshallah|mashallah)\b',
 ]
 
+# Roman-script indicators per language, compiled into the shared
+# single-pass scanner (keyword_scanner.get_message_scanner)
+ROMAN_INDICATORS = {
+    'hinglish': HINGLISH_INDICATORS,
+    'tamil': TAMIL_INDICATORS,
+    'telugu': TELUGU_INDICATORS,
+    'gujarati': GUJARATI_INDICATORS,
+    'bengali': BENGALI_INDICATORS,
+    'marathi': MARATHI_INDICATORS,
+    'punjabi': PUNJABI_INDICATORS,
+    'urdu': URDU_INDICATORS,
+}
+
+
+# Common English words (Hinglish code-mixing heuristic)
+COMMON_ENGLISH_WORDS = frozenset({
+    'the', 'is', 'are', 'was', 'were', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'can', 'may', 'might', 'must', 'shall',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their',
+    'this', 'that', 'these', 'those',
+    'what', 'which', 'who', 'whom', 'whose', 'when', 'where', 'why', 'how',
+    'a', 'an', 'the', 'and', 'but', 'or', 'not', 'no', 'yes',
+    'for', 'to', 'from', 'with', 'about', 'of', 'in', 'on', 'at',
+    'please', 'thanks', 'thank', 'hello', 'hi', 'bye', 'okay', 'ok',
+    'price', 'cost', 'book', 'booking', 'time', 'date', 'day',
+    'service', 'product', 'order', 'delivery', 'address', 'location'
+})
+
 
 class LanguageDetector:
     """
@@ -127,31 +156,9 @@ class LanguageDetector:
     """
 
     def __init__(self):
-        # Compile regex patterns
-        self._hinglish_patterns = [
-            re.compile(p, re.IGNORECASE) for p in HINGLISH_INDICATORS
-        ]
-        self._tamil_patterns = [
-            re.compile(p, re.IGNORECASE) for p in TAMIL_INDICATORS
-        ]
-        self._telugu_patterns = [
-            re.compile(p, re.IGNORECASE) for p in TELUGU_INDICATORS
-        ]
-        self._gujarati_patterns = [
-            re.compile(p, re.IGNORECASE) for p in GUJARATI_INDICATORS
-        ]
-        self._bengali_patterns = [
-            re.compile(p, re.IGNORECASE) for p in BENGALI_INDICATORS
-        ]
-        self._marathi_patterns = [
-            re.compile(p, re.IGNORECASE) for p in MARATHI_INDICATORS
-        ]
-        self._punjabi_patterns = [
-            re.compile(p, re.IGNORECASE) for p in PUNJABI_INDICATORS
-        ]
-        self._urdu_patterns = [
-            re.compile(p, re.IGNORECASE) for p in URDU_INDICATORS
-        ]
+        # Indicator patterns live in the shared scanner (built on first use)
+        from .keyword_scanner import get_message_scanner
+        self._scanner = get_message_scanner()
     
     def detect(self, text: str) -> LanguageDetectionResult:
         """
@@ -246,57 +253,13 @@ class LanguageDetector:
         if total_words == 0:
             return None
         
-        # Count Hinglish indicators
-        hinglish_matches = sum(
-            1 for pattern in self._hinglish_patterns
-            if pattern.search(text_lower)
-        )
-
-        # Count Tamil indicators
-        tamil_matches = sum(
-            1 for pattern in self._tamil_patterns
-            if pattern.search(text_lower)
-        )
-
-        # Count Telugu indicators
-        telugu_matches = sum(
-            1 for pattern in self._telugu_patterns
-            if pattern.search(text_lower)
-        )
-
-        # Count new language indicators (v2.0)
-        gujarati_matches = sum(
-            1 for pattern in self._gujarati_patterns
-            if pattern.search(text_lower)
-        )
-        bengali_matches = sum(
-            1 for pattern in self._bengali_patterns
-            if pattern.search(text_lower)
-        )
-        marathi_matches = sum(
-            1 for pattern in self._marathi_patterns
-            if pattern.search(text_lower)
-        )
-        punjabi_matches = sum(
-            1 for pattern in self._punjabi_patterns
-            if pattern.search(text_lower)
-        )
-        urdu_matches = sum(
-            1 for pattern in self._urdu_patterns
-            if pattern.search(text_lower)
-        )
-
-        # Determine best language match
+        # Count indicator patterns hit per language (one pass over the text)
+        scan = self._scanner.scan(text_lower)
         all_scores = {
-            'hinglish': hinglish_matches,
-            'tamil': tamil_matches,
-            'telugu': telugu_matches,
-            'gujarati': gujarati_matches,
-            'bengali': bengali_matches,
-            'marathi': marathi_matches,
-            'punjabi': punjabi_matches,
-            'urdu': urdu_matches,
+            language: scan.patterns_hit(f"lang:{language}")
+            for language in ROMAN_INDICATORS
         }
+        hinglish_matches = all_scores['hinglish']
         max_lang = max(all_scores, key=all_scores.get)
         max_matches = all_scores[max_lang]
 
@@ -353,21 +316,7 @@ class LanguageDetector:
     def _is_english_word(self, word: str) -> bool:
         """Check if a word is likely English."""
         # Simple heuristic - common English words
-        common_english = {
-            'the', 'is', 'are', 'was', 'were', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should',
-            'can', 'may', 'might', 'must', 'shall',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'my', 'your', 'his', 'her', 'its', 'our', 'their',
-            'this', 'that', 'these', 'those',
-            'what', 'which', 'who', 'whom', 'whose', 'when', 'where', 'why', 'how',
-            'a', 'an', 'the', 'and', 'but', 'or', 'not', 'no', 'yes',
-            'for', 'to', 'from', 'with', 'about', 'of', 'in', 'on', 'at',
-            'please', 'thanks', 'thank', 'hello', 'hi', 'bye', 'okay', 'ok',
-            'price', 'cost', 'book', 'booking', 'time', 'date', 'day',
-            'service', 'product', 'order', 'delivery', 'address', 'location'
-        }
-        return word.lower() in common_english
+        return word.lower() in COMMON_ENGLISH_WORDS
 
 
 # =============================================================================
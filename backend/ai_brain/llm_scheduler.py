@@ -0,0 +1,394 @@
+"""
+Adaptive multi-key scheduler for Gemini calls.
+
+Replaces the fixed global request spacing (one sleeping thread per call)
+and round-robin key rotation in GeminiClient:
+
+    acquire(tenant, plan)
+        ├─ free key token and nobody queued ──► lease immediately
+        └─ otherwise queue (bounded wait, bounded depth)
+             ordered by weighted fair queuing: each tenant's virtual
+             finish time advances by 1/weight, weight from the plan's
+             AIGovernor requests_per_hour
+    release(lease, ok / retry_after / latency)
+        success ──► key rate += additive step (up to max)
+        429     ──► key blocked for Retry-After, rate halved (AIMD)
+
+Each API key has a token bucket whose rate is learned from those 429s.
+A caller that cannot get a token within `max_wait` gets SchedulerTimeout
+(GeminiClient turns it into RateLimitError → local fallback).
+
+Hedging: when a call has run longer than the recent p95 latency and a
+different key has a spare token, a second identical call is started and
+the first result wins. Hedges are capped at `hedge_max_ratio` of calls.
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger('reviseit.llm_scheduler')
+
+LLM_KEY_MAX_RPS = float(os.getenv("LLM_KEY_MAX_RPS", "10"))
+LLM_KEY_BURST = int(os.getenv("LLM_KEY_BURST", "3"))
+LLM_QUEUE_MAX_DEPTH = int(os.getenv("LLM_QUEUE_MAX_DEPTH", "200"))
+LLM_HEDGE_MIN_DELAY_MS = int(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "2500"))
+LLM_HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.05"))
+
+_MIN_RATE = 0.05             # Never learn a key below one call per 20s
+_RATE_STEP = 0.05            # Additive increase per success (calls/s)
+_LATENCY_SAMPLES = 200
+_MIN_HEDGE_SAMPLES = 20
+_WAIT_SAMPLES = 1000
+
+# Fallback when the messaging package is unavailable
+_DEFAULT_PLAN_RPH = {"free": 20, "starter": 50, "business": 200, "pro": 1000, "enterprise": 5000}
+
+
+def plan_weights() -> Dict[str, float]:
+    """Relative scheduling weight per plan (starter = 1)."""
+    try:
+        from services.messaging.ai_governor import AIGovernor
+        rph = {plan: limits["requests_per_hour"] for plan, limits in AIGovernor.PLAN_LIMITS.items()}
+    except Exception:
+        rph = dict(_DEFAULT_PLAN_RPH)
+    base = rph.get("starter") or 1
+    return {plan: value / base for plan, value in rph.items()}
+
+
+class SchedulerTimeout(Exception):
+    """No key token within the bounded wait (or the queue is full)."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeyBucket:
+    """Token bucket for one API key; rate adapts to observed 429s."""
+
+    __slots__ = (
+        "index", "rate", "max_rate", "capacity", "tokens", "updated",
+        "blocked_until", "inflight", "granted", "rate_limited", "recent_grants",
+    )
+
+    def __init__(self, index: int, rate: float, capacity: int, now: float):
+        self.index = index
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+        self.blocked_until = 0.0
+        self.inflight = 0
+        self.granted = 0
+        self.rate_limited = 0
+        self.recent_grants: deque = deque()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_in(self, now: float) -> float:
+        """Seconds until this key can be leased (0 = now)."""
+        self.refill(now)
+        blocked = max(0.0, self.blocked_until - now)
+        missing = max(0.0, 1.0 - self.tokens) / self.rate
+        return max(blocked, missing)
+
+    def take(self, now: float) -> None:
+        self.tokens -= 1.0
+        self.inflight += 1
+        self.granted += 1
+        self.recent_grants.append(now)
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + _RATE_STEP)
+
+    def on_rate_limit(self, retry_after: float, now: float) -> None:
+        self.rate_limited += 1
+        self.rate = max(_MIN_RATE, self.rate / 2)
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.tokens = 0.0
+
+
+class Lease:
+    """A granted slot on one key."""
+
+    __slots__ = ("key_index", "tenant_id", "waited", "hedge", "released")
+
+    def __init__(self, key_index: int, tenant_id: str, waited: float, hedge: bool = False):
+        self.key_index = key_index
+        self.tenant_id = tenant_id
+        self.waited = waited
+        self.hedge = hedge
+        self.released = False
+
+
+class _Waiter:
+    __slots__ = ("tenant_id", "start_tag", "cancelled")
+
+    def __init__(self, tenant_id: str, start_tag: float):
+        self.tenant_id = tenant_id
+        self.start_tag = start_tag
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """Per-key token buckets + weighted fair queue across tenants."""
+
+    def __init__(
+        self,
+        num_keys: int,
+        rate_per_key: float = LLM_KEY_MAX_RPS,
+        burst: int = LLM_KEY_BURST,
+        max_wait: float = 1.5,
+        max_queue: int = LLM_QUEUE_MAX_DEPTH,
+        hedge_min_delay: float = LLM_HEDGE_MIN_DELAY_MS / 1000,
+        hedge_max_ratio: float = LLM_HEDGE_MAX_RATIO,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        now = clock()
+        self._keys = [KeyBucket(i, rate_per_key, burst, now) for i in range(max(1, num_keys))]
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        self._weights = plan_weights()
+
+        self._cond = threading.Condition()
+        self._queue: List[Any] = []  # heap of (finish_tag, seq, waiter)
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+
+        self._latencies: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self._waits: deque = deque(maxlen=_WAIT_SAMPLES)
+        self._stats = {
+            "leases": 0, "queued": 0, "timeouts": 0, "queue_full": 0,
+            "peak_queue": 0, "hedges": 0, "hedge_wins": 0,
+        }
+
+    @property
+    def num_keys(self) -> int:
+        return len(self._keys)
+
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
+
+    def acquire(self, tenant_id: Optional[str] = None, plan: Optional[str] = None,
+                timeout: Optional[float] = None) -> Lease:
+        """Lease a key, waiting at most `timeout` (default max_wait)."""
+        tenant_id = tenant_id or "_anonymous"
+        timeout = self.max_wait if timeout is None else timeout
+        start = self._clock()
+        deadline = start + timeout
+
+        with self._cond:
+            if not self._queue:
+                bucket = self._best_key(start)
+                if bucket is not None:
+                    return self._grant(bucket, tenant_id, start, start)
+
+            if len(self._queue) >= self.max_queue:
+                self._stats["queue_full"] += 1
+                raise SchedulerTimeout("LLM queue full", retry_after=self._soonest(start))
+
+            waiter = self._enqueue(tenant_id, plan)
+            try:
+                while True:
+                    now = self._clock()
+                    self._drop_cancelled_head()
+                    if self._queue and self._queue[0][2] is waiter:
+                        bucket = self._best_key(now)
+                        if bucket is not None:
+                            heapq.heappop(self._queue)
+                            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+                            self._cond.notify_all()
+                            return self._grant(bucket, tenant_id, start, now)
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        waiter.cancelled = True
+                        self._stats["timeouts"] += 1
+                        self._cond.notify_all()
+                        raise SchedulerTimeout(
+                            f"No Gemini key available within {timeout:.1f}s",
+                            retry_after=self._soonest(now),
+                        )
+                    self._cond.wait(min(remaining, max(self._soonest(now), 0.005)))
+            except BaseException:
+                waiter.cancelled = True
+                raise
+
+    def try_acquire_hedge(self, exclude: Iterable[int], tenant_id: Optional[str] = None) -> Optional[Lease]:
+        """A lease on a different idle key for a hedged request, or None."""
+        with self._cond:
+            if self._queue:
+                return None  # Never hedge while real requests wait
+            if self._stats["hedges"] >= self.hedge_max_ratio * max(self._stats["leases"], 1):
+                return None
+            now = self._clock()
+            bucket = self._best_key(now, exclude=set(exclude))
+            if bucket is None:
+                return None
+            self._stats["hedges"] += 1
+            lease = self._grant(bucket, tenant_id or "_anonymous", now, now)
+            lease.hedge = True
+            return lease
+
+    def release(self, lease: Lease, ok: bool = True, latency: Optional[float] = None,
+                retry_after: Optional[float] = None) -> None:
+        """Return a lease; a 429 (retry_after set) blocks and slows the key."""
+        with self._cond:
+            if lease.released:
+                return
+            lease.released = True
+            bucket = self._keys[lease.key_index]
+            bucket.inflight = max(0, bucket.inflight - 1)
+            if retry_after is not None:
+                bucket.on_rate_limit(retry_after, self._clock())
+                logger.info(
+                    f"🔑 Key #{bucket.index + 1} 429: blocked {retry_after:.1f}s, "
+                    f"rate → {bucket.rate:.2f}/s"
+                )
+            elif ok:
+                bucket.on_success()
+                if latency is not None:
+                    self._latencies.append(latency)
+            self._cond.notify_all()
+
+    def record_hedge_win(self) -> None:
+        with self._cond:
+            self._stats["hedge_wins"] += 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a hedge is worth sending (None = don't hedge)."""
+        if self.num_keys < 2 or self.hedge_max_ratio <= 0:
+            return None
+        with self._cond:
+            if len(self._latencies) < _MIN_HEDGE_SAMPLES:
+                return None
+            p95 = _percentile(sorted(self._latencies), 95)
+        return max(self.hedge_min_delay, p95)
+
+    # ------------------------------------------------------------------
+    # Internals (called with the condition held)
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, tenant_id: str, plan: Optional[str]) -> _Waiter:
+        weight = self._weights.get(plan or "starter", 1.0) or 1.0
+        start_tag = max(self._virtual_time, self._finish_tags.get(tenant_id, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        self._finish_tags[tenant_id] = finish_tag
+        if len(self._finish_tags) > 1000:
+            self._finish_tags = {
+                t: f for t, f in self._finish_tags.items() if f > self._virtual_time
+            }
+        waiter = _Waiter(tenant_id, start_tag)
+        heapq.heappush(self._queue, (finish_tag, next(self._seq), waiter))
+        self._stats["queued"] += 1
+        self._stats["peak_queue"] = max(self._stats["peak_queue"], len(self._queue))
+        return waiter
+
+    def _drop_cancelled_head(self) -> None:
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+
+    def _best_key(self, now: float, exclude: Optional[set] = None) -> Optional[KeyBucket]:
+        best = None
+        for bucket in self._keys:
+            if exclude and bucket.index in exclude:
+                continue
+            if bucket.ready_in(now) > 0:
+                continue
+            if best is None or (bucket.inflight, -bucket.tokens) < (best.inflight, -best.tokens):
+                best = bucket
+        return best
+
+    def _soonest(self, now: float) -> float:
+        return min(bucket.ready_in(now) for bucket in self._keys)
+
+    def _grant(self, bucket: KeyBucket, tenant_id: str, start: float, now: float) -> Lease:
+        bucket.take(now)
+        waited = now - start
+        self._waits.append(waited)
+        self._stats["leases"] += 1
+        return Lease(bucket.index, tenant_id, waited)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = self._clock()
+            waits = sorted(self._waits)
+            keys = []
+            for bucket in self._keys:
+                bucket.refill(now)
+                while bucket.recent_grants and bucket.recent_grants[0] < now - 60:
+                    bucket.recent_grants.popleft()
+                keys.append({
+                    "key": bucket.index + 1,
+                    "rate_per_s": round(bucket.rate, 3),
+                    "tokens": round(bucket.tokens, 2),
+                    "blocked_for_s": round(max(0.0, bucket.blocked_until - now), 1),
+                    "inflight": bucket.inflight,
+                    "granted": bucket.granted,
+                    "rate_limited": bucket.rate_limited,
+                    # Share of the learned per-minute capacity used in the last minute
+                    "saturation_pct": round(
+                        min(100.0, len(bucket.recent_grants) / max(bucket.rate * 60, 1e-9) * 100), 1
+                    ),
+                })
+            return {
+                **self._stats,
+                "queue_depth": sum(1 for _, _, w in self._queue if not w.cancelled),
+                "queue_wait_ms": {
+                    "p50": round(_percentile(waits, 50) * 1000, 1),
+                    "p95": round(_percentile(waits, 95) * 1000, 1),
+                    "max": round((waits[-1] if waits else 0.0) * 1000, 1),
+                },
+                "hedge_delay_ms": (
+                    round(_percentile(sorted(self._latencies), 95) * 1000)
+                    if len(self._latencies) >= _MIN_HEDGE_SAMPLES else None
+                ),
+                "keys": keys,
+            }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler(num_keys: int = 1, **kwargs) -> LLMScheduler:
+    """Process-wide scheduler (all GeminiClients share the same API keys)."""
+    global _scheduler
+    if _scheduler is None or _scheduler.num_keys != max(1, num_keys):
+        with _scheduler_lock:
+            if _scheduler is None or _scheduler.num_keys != max(1, num_keys):
+                _scheduler = LLMScheduler(num_keys, **kwargs)
+    return _scheduler
+
+
+def llm_scheduler_stats() -> Optional[Dict[str, Any]]:
+    """Stats for /api/metrics (None until the first GeminiClient exists)."""
+    return _scheduler.get_stats() if _scheduler is not None else None
@@ -378,13 +378,13 @@ class AdvancedMemoryManager:
         # Redis for cross-session profiles
         self._redis = None
         if redis_url and REDIS_AVAILABLE:
-            try:
-                self._redis = redis_lib.from_url(redis_url, decode_responses=True)
-                self._redis.ping()
+            from connections import get_redis
+
+            self._redis = get_redis("memory", url=redis_url)
+            if self._redis is not None:
                 logger.info("Memory Manager: Redis connected for cross-session profiles")
-            except Exception as e:
-                logger.warning(f"Memory Manager: Redis unavailable ({e}), using in-memory only")
-                self._redis = None
+            else:
+                logger.warning("Memory Manager: Redis unavailable, using in-memory only")
 
     # =========================================================================
     # USER PROFILES — Redis-backed with 30-day TTL
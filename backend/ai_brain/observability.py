@@ -9,6 +9,7 @@ Tracks:
 - Success vs fallback ratio
 - Local vs LLM response ratio
 - Per-key usage and cooldown stats
+- Per-business single-flight coalescing (leaders / followers / wait)
 
 All metrics are thread-safe and designed for structured logging.
 """
@@ -17,10 +18,13 @@ import time
 import threading
 import logging
 from typing import Dict, Any, Optional
-from collections import deque
+from collections import OrderedDict, deque
 
 logger = logging.getLogger('reviseit.ai_metrics')
 
+# Businesses tracked for coalescing stats (least recently active dropped)
+_MAX_COALESCING_BUSINESSES = 500
+
 
 class AIMetrics:
     """
@@ -56,6 +60,10 @@ class AIMetrics:
         self._per_key_429: Dict[int, int] = {}
         self._per_key_success: Dict[int, int] = {}
 
+        # Single-flight coalescing: business -> {leader, follower, fallthrough, wait_ms}
+        self._coalescing: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._total_coalesced: int = 0
+
     def _prune(self, buffer: deque):
         """Remove entries older than the window."""
         cutoff = time.monotonic() - self._window
@@ -124,6 +132,40 @@ class AIMetrics:
         with self._lock:
             self._total_circuit_blocked += 1
 
+    def record_coalescing(self, business_id: str, role: str, waited_ms: float = 0.0):
+        """Record a single-flight outcome (leader / follower / fallthrough)."""
+        with self._lock:
+            entry = self._coalescing.get(business_id)
+            if entry is None:
+                entry = self._coalescing[business_id] = {
+                    "leader": 0, "follower": 0, "fallthrough": 0, "wait_ms": 0.0,
+                }
+                while len(self._coalescing) > _MAX_COALESCING_BUSINESSES:
+                    self._coalescing.popitem(last=False)
+            else:
+                self._coalescing.move_to_end(business_id)
+            entry[role] = entry.get(role, 0) + 1
+            entry["wait_ms"] += waited_ms
+            if role == "follower":
+                self._total_coalesced += 1
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Per-business coalescing: LLM calls saved and average follower wait."""
+        with self._lock:
+            per_business = {}
+            for business_id, entry in self._coalescing.items():
+                waiters = entry["follower"] + entry["fallthrough"]
+                per_business[business_id] = {
+                    "leaders": entry["leader"],
+                    "followers": entry["follower"],
+                    "fallthrough": entry["fallthrough"],
+                    "avg_wait_ms": round(entry["wait_ms"] / waiters, 1) if waiters else 0.0,
+                }
+            return {
+                "total_coalesced": self._total_coalesced,
+                "per_business": per_business,
+            }
+
     def get_stats(self) -> Dict[str, Any]:
         """Get current metrics snapshot."""
         with self._lock:
@@ -172,6 +214,8 @@ class AIMetrics:
                 # Per-key
                 "per_key_429": dict(self._per_key_429),
                 "per_key_success": dict(self._per_key_success),
+                # Single-flight
+                "total_coalesced": self._total_coalesced,
             }
 
     def log_summary(self):
@@ -199,6 +243,18 @@ class AIMetrics:
         except Exception:
             gate_info = ""
 
+        # Include LLM scheduler queue stats if available
+        try:
+            from .llm_scheduler import llm_scheduler_stats
+            sched = llm_scheduler_stats()
+            sched_info = (
+                f"llm_queue={sched['queue_depth']} "
+                f"llm_wait_p95={sched['queue_wait_ms']['p95']}ms "
+                f"llm_queue_timeouts={sched['timeouts']} "
+            ) if sched else ""
+        except Exception:
+            sched_info = ""
+
         logger.info(
             f"[AI-METRICS] "
             f"system_state={system_state} "
@@ -206,11 +262,13 @@ class AIMetrics:
             f"rate_limit_rate={stats['rate_limit_pct']}% "
             f"local_rate={stats['local_pct']}% "
             f"{gate_info}"
+            f"{sched_info}"
             f"total_req={stats['total_requests']} "
             f"total_429={stats['total_rate_limits']} "
             f"total_fallback={stats['total_fallback']} "
             f"circuit_trips={stats['total_circuit_trips']} "
-            f"retries={stats['total_retries']}"
+            f"retries={stats['total_retries']} "
+            f"coalesced={stats['total_coalesced']}"
         )
 
 
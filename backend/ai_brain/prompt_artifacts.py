@@ -0,0 +1,347 @@
+"""
+Precompiled per-business prompt artifacts and Gemini context caches.
+
+Every message used to rebuild the full 8-layer system prompt, including
+the formatted business data and product list, although only the
+customer-specific layers (language style, profile, memory) change
+between messages. The prompt builders now split the system prompt into
+
+    static prefix  ── core, personality, industry, BUSINESS DATA,
+                      emotional/reasoning layers, format rules, task
+    dynamic suffix ── language style, customer context, memory, intent
+
+The prefix is compiled once per (business, kind) and versioned by a hash
+of the business data, so editing a product or timing rebuilds it on the
+next message. Because the prefix is byte-stable it can be served from a
+Gemini explicit context cache (cachedContents) and, when that is not
+available, still benefits from implicit prefix caching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger('reviseit.prompt_artifacts')
+
+PROMPT_ARTIFACT_MAX_ENTRIES = int(os.getenv("PROMPT_ARTIFACT_MAX_ENTRIES", "2000"))
+GEMINI_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# Gemini rejects explicit caches below its minimum input size
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+# A prefix gets an explicit cache only once it has been sent this many times
+GEMINI_CONTEXT_CACHE_MIN_USES = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_USES", "2"))
+CONTEXT_CACHE_RETRY_SECONDS = 600
+CONTEXT_CACHE_REDIS_PREFIX = "gemini_ctx_cache"
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used for thresholds and benchmarks."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def business_key(business_data: Dict[str, Any]) -> str:
+    """Stable identifier for a business profile."""
+    return str(
+        business_data.get("business_id")
+        or business_data.get("user_id")
+        or business_data.get("business_name")
+        or "default"
+    )
+
+
+def business_data_version(business_data: Dict[str, Any]) -> str:
+    """Content hash of the business data (private `_` keys are ignored)."""
+    public = {k: v for k, v in business_data.items() if not str(k).startswith("_")}
+    raw = json.dumps(public, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class SplitPrompt(str):
+    """
+    A system prompt that remembers its static prefix and dynamic suffix.
+
+    Behaves exactly like the joined string, so existing callers keep
+    working; the Gemini client uses `prefix`/`cache_key` for caching.
+    """
+
+    def __new__(cls, prefix: str, suffix: str = "", cache_key: str = ""):
+        prompt = super().__new__(cls, f"{prefix}\n\n{suffix}" if suffix else prefix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        prompt.cache_key = cache_key
+        return prompt
+
+
+class PromptArtifactCache:
+    """LRU of compiled prompt prefixes, one current version per business."""
+
+    def __init__(self, max_entries: int = PROMPT_ARTIFACT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._builds = 0
+        self._rebuilds = 0
+
+    def get(
+        self,
+        business_data: Dict[str, Any],
+        kind: str,
+        build: Callable[[Dict[str, Any]], str],
+    ) -> Tuple[str, str]:
+        """Return (prefix, cache_key), compiling when the data changed."""
+        key = (business_key(business_data), kind)
+        version = business_data_version(business_data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1], f"{key[0]}:{kind}:{version}"
+
+        prefix = build(business_data)
+        with self._lock:
+            if key in self._entries:
+                self._rebuilds += 1
+            self._builds += 1
+            self._entries[key] = (version, prefix)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prefix, f"{key[0]}:{kind}:{version}"
+
+    def invalidate(self, business_id: str) -> None:
+        """Drop every compiled artifact of a business."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == business_id]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._builds
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "builds": self._builds,
+                "rebuilds": self._rebuilds,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ContextCacheRegistry:
+    """
+    Tracks Gemini explicit context caches per (API key, model, prefix).
+
+    Caches belong to the project of the key that created them, so each key
+    gets its own. With Redis the cache names are shared by every worker
+    process, and a prefix is cached only once it has been used
+    `min_uses` times across them; one-off prompts go inline. Creation
+    failures (unsupported model, prefix too small, quota) are remembered
+    for a while and the call proceeds uncached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+        min_tokens: int = GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+        max_entries: int = PROMPT_ARTIFACT_MAX_ENTRIES,
+        min_uses: int = GEMINI_CONTEXT_CACHE_MIN_USES,
+        redis_client: Any = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self.min_uses = min_uses
+        self._redis = redis_client
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[int, str, str], Tuple[str, float]]" = OrderedDict()
+        self._uses: "OrderedDict[Tuple[int, str, str], int]" = OrderedDict()
+        self._failed: Dict[Tuple[int, str, str], float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._shared_hits = 0
+        self._creates = 0
+        self._deferred = 0
+        self._failures = 0
+        self._skipped_small = 0
+
+    def get_or_create(
+        self,
+        key_index: int,
+        model: str,
+        prompt: SplitPrompt,
+        create: Callable[[], str],
+    ) -> Optional[str]:
+        """Cached-content name for the prompt prefix, or None to send it inline."""
+        if not prompt.cache_key:
+            return None
+        if estimate_tokens(prompt.prefix) < self.min_tokens:
+            with self._lock:
+                self._skipped_small += 1
+            return None
+
+        key = (key_index, model, prompt.cache_key)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            # Leave a minute of headroom so a cache never expires mid-call
+            if entry is not None and entry[1] - 60 > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if self._failed.get(key, 0.0) > now:
+                return None
+
+        shared = self._read_shared(key)
+        if shared is not None and shared[1] - 60 > now:
+            with self._lock:
+                self._shared_hits += 1
+                self._remember(key, *shared)
+            return shared[0]
+
+        if self._count_use(key) < self.min_uses:
+            with self._lock:
+                self._deferred += 1
+            return None
+
+        try:
+            name = create()
+        except Exception as e:
+            logger.debug(f"context cache unavailable for {prompt.cache_key}: {e}")
+            with self._lock:
+                self._failures += 1
+                self._failed[key] = now + CONTEXT_CACHE_RETRY_SECONDS
+            return None
+
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._creates += 1
+            self._remember(key, name, expires_at)
+        self._write_shared(key, name, expires_at)
+        return name
+
+    def invalidate(self, name: str) -> None:
+        """Forget a cache the API no longer knows about."""
+        with self._lock:
+            keys = [k for k, v in self._entries.items() if v[0] == name]
+            for key in keys:
+                del self._entries[key]
+        if self._redis is not None and keys:
+            try:
+                self._redis.delete(*(self._shared_key(key) for key in keys))
+            except Exception as e:
+                logger.debug(f"context cache invalidate failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": GEMINI_CONTEXT_CACHE_ENABLED,
+                "shared": self._redis is not None,
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "shared_hits": self._shared_hits,
+                "creates": self._creates,
+                "deferred": self._deferred,
+                "failures": self._failures,
+                "skipped_small": self._skipped_small,
+            }
+
+    def _remember(self, key: Tuple[int, str, str], name: str, expires_at: float) -> None:
+        self._entries[key] = (name, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _shared_key(key: Tuple[int, str, str], kind: str = "name") -> str:
+        return f"{CONTEXT_CACHE_REDIS_PREFIX}:{kind}:{key[0]}:{key[1]}:{key[2]}"
+
+    def _read_shared(self, key: Tuple[int, str, str]) -> Optional[Tuple[str, float]]:
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(self._shared_key(key))
+            if raw:
+                entry = json.loads(raw)
+                return entry["name"], float(entry["expires_at"])
+        except Exception as e:
+            logger.debug(f"context cache lookup failed: {e}")
+        return None
+
+    def _write_shared(self, key: Tuple[int, str, str], name: str, expires_at: float) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(
+                self._shared_key(key),
+                json.dumps({"name": name, "expires_at": expires_at}),
+                ex=max(1, self.ttl_seconds - 60),
+            )
+        except Exception as e:
+            logger.debug(f"context cache publish failed: {e}")
+
+    def _count_use(self, key: Tuple[int, str, str]) -> int:
+        """Times this prefix has been requested (across processes with Redis)."""
+        if self._redis is not None:
+            try:
+                uses_key = self._shared_key(key, "uses")
+                uses = int(self._redis.incr(uses_key))
+                if uses == 1:
+                    self._redis.expire(uses_key, self.ttl_seconds)
+                return uses
+            except Exception as e:
+                logger.debug(f"context cache use count failed: {e}")
+        with self._lock:
+            uses = self._uses.get(key, 0) + 1
+            self._uses[key] = uses
+            self._uses.move_to_end(key)
+            while len(self._uses) > self.max_entries:
+                self._uses.popitem(last=False)
+            return uses
+
+
+_artifacts: Optional[PromptArtifactCache] = None
+_context_caches: Optional[ContextCacheRegistry] = None
+_singleton_lock = threading.Lock()
+
+
+def get_prompt_artifacts() -> PromptArtifactCache:
+    """Process-wide compiled prompt cache."""
+    global _artifacts
+    if _artifacts is None:
+        with _singleton_lock:
+            if _artifacts is None:
+                _artifacts = PromptArtifactCache()
+    return _artifacts
+
+
+def get_context_caches() -> Optional[ContextCacheRegistry]:
+    """Process-wide context cache registry, or None when disabled."""
+    global _context_caches
+    if not GEMINI_CONTEXT_CACHE_ENABLED:
+        return None
+    if _context_caches is None:
+        with _singleton_lock:
+            if _context_caches is None:
+                from connections import get_redis
+
+                _context_caches = ContextCacheRegistry(redis_client=get_redis("gemini_context_cache"))
+    return _context_caches
+
+
+def prompt_cache_stats() -> Dict[str, Any]:
+    """Stats for /api/metrics."""
+    caches = get_context_caches()
+    return {
+        "artifacts": get_prompt_artifacts().get_stats(),
+        "context_cache": caches.get_stats() if caches else {"enabled": False},
+    }
@@ -15,12 +15,18 @@ This architecture is what separates reasoning agents from basic bots.
 The hidden reasoning layer (Layer 8) is the secret sauce — it forces
 the model to THINK before responding, resulting in dramatically
 higher quality without revealing the thought process to the user.
+
+Layers that only depend on the business (1, 3, 4, business data, 7, 8 and
+the format/task rules) form a static prefix that is compiled once per
+business data version (see prompt_artifacts.py); the per-message layers
+follow it as a suffix.
 """
 
 from typing import Dict, Any, List, Optional
 from enum import Enum
 
 from .personality import PERSONALITY_PROMPT, get_language_style_prompt
+from .prompt_artifacts import SplitPrompt, get_prompt_artifacts
 
 
 class PromptLanguage(str, Enum):
@@ -405,15 +411,18 @@ def _build_industry_prompt(industry: str) -> str:
 
 
 # =============================================================================
-# LAYER 5: CONTEXT BUILDER (User profile + Summary + Business data)
+# LAYER 5: CONTEXT BUILDER (User profile + Summary; business data is in the prefix)
 # =============================================================================
 
 def _build_context_prompt(
-    business_data: Dict[str, Any],
     user_profile: Optional[Dict[str, Any]] = None,
     conversation_summary: Optional[str] = None,
 ) -> str:
-    """Layer 5: Build context from business data, user profile, and conversation summary."""
+    """Layer 5: Build customer context from user profile and conversation summary.
+
+    Business data is part of the precompiled static prefix (see
+    prompt_artifacts), so it is no longer formatted here per message.
+    """
     parts = []
 
     # User context (if we know anything about this customer)
@@ -434,10 +443,6 @@ def _build_context_prompt(
     if conversation_summary:
         parts.append(f"PREVIOUS CONVERSATION SUMMARY:\n{conversation_summary}")
 
-    # Business data
-    biz_context = format_business_data_for_prompt(business_data)
-    parts.append(f"BUSINESS DATA:\n{biz_context}")
-
     return "\n\n".join(parts)
 
 
@@ -470,85 +475,87 @@ def _build_memory_prompt(
 
 
 # =============================================================================
-# DYNAMIC PROMPT BUILDER — Assembles all 6 layers
+# DYNAMIC PROMPT BUILDER — Static per-business prefix + per-message suffix
 # =============================================================================
 
-def build_dynamic_prompt(
-    business_data: Dict[str, Any],
-    intent: str,
-    user_message: str,
-    language: str = "en",
-    is_mixed_language: bool = False,
-    conversation_history: Optional[List[Dict[str, str]]] = None,
-    conversation_state_summary: str = "",
-    user_profile: Optional[Dict[str, Any]] = None,
-    conversation_summary: Optional[str] = None,
-) -> str:
-    """
-    Build a complete prompt from 6 dynamic layers.
+WHATSAPP_FORMAT_RULES = """WHATSAPP FORMAT RULES:
+- Keep messages concise — this is mobile chat, not email.
+- Use bullet points only when listing 3+ items.
+- Maximum 1-2 emojis per message, placed naturally.
+- End with a follow-up question or CTA only when it adds value."""
+
 
-    This is the core of the enterprise prompt architecture.
-    Each layer is independent and can be customized per request.
+def _build_static_prefix(business_data: Dict[str, Any]) -> str:
+    """
+    Layers that only depend on the business: identity, personality,
+    industry behavior, business data, emotional/reasoning layers and
+    format rules. Compiled once per business data version.
     """
     business_name = business_data.get('business_name', 'our business')
     industry = business_data.get('industry', 'other')
 
-    # Layer 1: Core system prompt (identity + ground rules)
-    core = _build_core_prompt(business_name)
-
-    # Layer 2: Intent-specific guidance
-    intent_guidance = _build_intent_prompt(intent)
-
-    # Layer 3: Industry behavioral instructions
-    industry_guidance = _build_industry_prompt(industry)
-
-    # Layer 4: Personality (from personality.py)
-    personality = PERSONALITY_PROMPT
-
-    # Language style matching
-    language_style = get_language_style_prompt(language, is_mixed_language)
+    return f"""{_build_core_prompt(business_name)}
 
-    # Layer 5: Context (user profile + summary + business data)
-    context = _build_context_prompt(business_data, user_profile, conversation_summary)
+{PERSONALITY_PROMPT}
 
-    # Layer 6: Memory (conversation history + state)
-    memory = _build_memory_prompt(conversation_history, conversation_state_summary)
+{_build_industry_prompt(industry)}
 
-    # Layer 7: Emotional Intelligence Layer (NEW in v4.0)
-    emotional_intelligence = _build_emotional_intelligence_layer()
+BUSINESS DATA:
+{format_business_data_for_prompt(business_data)}
 
-    # Layer 8: Hidden Reasoning Layer (NEW in v4.0 — Anthropic-level quality)
-    hidden_reasoning = _build_hidden_reasoning_layer()
+{_build_emotional_intelligence_layer()}
 
-    # Assemble the full prompt
-    prompt = f"""{core}
+{_build_hidden_reasoning_layer()}
 
-{personality}
+{WHATSAPP_FORMAT_RULES}"""
 
-{intent_guidance}
 
-{industry_guidance}
-
-LANGUAGE STYLE:
-{language_style}
+def _build_dynamic_suffix(
+    language: str,
+    is_mixed_language: bool,
+    conversation_history: Optional[List[Dict[str, str]]],
+    conversation_state_summary: str,
+    user_profile: Optional[Dict[str, Any]],
+    conversation_summary: Optional[str],
+) -> str:
+    """Per-message layers: language style, customer context and memory."""
+    parts = [f"LANGUAGE STYLE:\n{get_language_style_prompt(language, is_mixed_language)}"]
+    context = _build_context_prompt(user_profile, conversation_summary)
+    if context:
+        parts.append(context)
+    memory = _build_memory_prompt(conversation_history, conversation_state_summary)
+    if memory:
+        parts.append(memory)
+    return "\n\n".join(parts)
 
-{context}
 
-{memory}
+def build_dynamic_prompt(
+    business_data: Dict[str, Any],
+    intent: str,
+    user_message: str,
+    language: str = "en",
+    is_mixed_language: bool = False,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    conversation_state_summary: str = "",
+    user_profile: Optional[Dict[str, Any]] = None,
+    conversation_summary: Optional[str] = None,
+) -> SplitPrompt:
+    """
+    Build a complete prompt from the 8 layers.
 
-{emotional_intelligence}
+    The business-only layers form a precompiled prefix (rebuilt when the
+    business data changes); intent guidance, language style, customer
+    context and memory are appended per message.
+    """
+    prefix, cache_key = get_prompt_artifacts().get(business_data, "dynamic", _build_static_prefix)
 
-{hidden_reasoning}
+    suffix = f"""{_build_intent_prompt(intent)}
 
-WHATSAPP FORMAT RULES:
-- Keep messages concise — this is mobile chat, not email.
-- Use bullet points only when listing 3+ items.
-- Maximum 1-2 emojis per message, placed naturally.
-- End with a follow-up question or CTA only when it adds value.
+{_build_dynamic_suffix(language, is_mixed_language, conversation_history, conversation_state_summary, user_profile, conversation_summary)}
 
 Detected intent: {intent}"""
 
-    return prompt
+    return SplitPrompt(prefix, suffix, cache_key)
 
 
 # =============================================================================
@@ -751,86 +758,7 @@ SINGLE_PASS_INTENT_LIST = """INTENTS:
 - unknown: Intent cannot be determined"""
 
 
-def build_single_pass_prompt(
-    business_data: Dict[str, Any],
-    user_message: str,
-    language: str = "en",
-    is_mixed_language: bool = False,
-    conversation_history: Optional[List[Dict[str, str]]] = None,
-    conversation_state_summary: str = "",
-    user_profile: Optional[Dict[str, Any]] = None,
-    conversation_summary: Optional[str] = None,
-) -> str:
-    """
-    Build a SINGLE-PASS prompt that classifies intent AND generates response
-    in ONE LLM call.
-
-    This is the core FAANG-level optimization:
-    - Before: classify_intent (1 call) + generate_response (1 call) + self_check (1 call) = 3 calls
-    - After: single_pass (1 call) = 1 call → 66% reduction in API usage
-
-    The prompt instructs Gemini to return JSON:
-    {
-        "intent": "greeting",
-        "confidence": 0.95,
-        "response": "Hello! Welcome to Style Studio! How can I help?",
-        "language": "en",
-        "entities": {},
-        "needs_human": false
-    }
-    """
-    business_name = business_data.get('business_name', 'our business')
-    industry = business_data.get('industry', 'other')
-
-    # Layer 1: Core identity
-    core = _build_core_prompt(business_name)
-
-    # Layer 3: Industry behavior
-    industry_guidance = _build_industry_prompt(industry)
-
-    # Layer 4: Personality
-    personality = PERSONALITY_PROMPT
-
-    # Language style
-    language_style = get_language_style_prompt(language, is_mixed_language)
-
-    # Layer 5: Context
-    context = _build_context_prompt(business_data, user_profile, conversation_summary)
-
-    # Layer 6: Memory
-    memory = _build_memory_prompt(conversation_history, conversation_state_summary)
-
-    # Layer 7: Emotional Intelligence (NEW in v4.0)
-    emotional_intelligence = _build_emotional_intelligence_layer()
-
-    # Layer 8: Hidden Reasoning (NEW in v4.0)
-    hidden_reasoning = _build_hidden_reasoning_layer()
-
-    # Build the combined single-pass prompt
-    prompt = f"""{core}
-
-{personality}
-
-{industry_guidance}
-
-LANGUAGE STYLE:
-{language_style}
-
-{context}
-
-{memory}
-
-{emotional_intelligence}
-
-{hidden_reasoning}
-
-WHATSAPP FORMAT RULES:
-- Keep messages concise — this is mobile chat, not email.
-- Use bullet points only when listing 3+ items.
-- Maximum 1-2 emojis per message, placed naturally.
-- End with a follow-up question or CTA only when it adds value.
-
-SINGLE-PASS TASK:
+SINGLE_PASS_TASK = f"""SINGLE-PASS TASK:
 You must do TWO things in one step:
 1. CLASSIFY the user's intent from the list below
 2. GENERATE a natural WhatsApp response based on that intent
@@ -861,7 +789,51 @@ Return ONLY valid JSON (no markdown, no preamble):
     "needs_human": false
 }}"""
 
-    return prompt
+
+def _build_single_pass_prefix(business_data: Dict[str, Any]) -> str:
+    """Static single-pass prefix: business layers followed by the JSON task."""
+    return f"{_build_static_prefix(business_data)}\n\n{SINGLE_PASS_TASK}"
+
+
+def build_single_pass_prompt(
+    business_data: Dict[str, Any],
+    user_message: str,
+    language: str = "en",
+    is_mixed_language: bool = False,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    conversation_state_summary: str = "",
+    user_profile: Optional[Dict[str, Any]] = None,
+    conversation_summary: Optional[str] = None,
+) -> SplitPrompt:
+    """
+    Build a SINGLE-PASS prompt that classifies intent AND generates response
+    in ONE LLM call.
+
+    This is the core FAANG-level optimization:
+    - Before: classify_intent (1 call) + generate_response (1 call) + self_check (1 call) = 3 calls
+    - After: single_pass (1 call) = 1 call → 66% reduction in API usage
+
+    The static part (business layers + task + JSON schema) is compiled once
+    per business data version and comes first so Gemini can cache it; only
+    language style, customer context and memory are built per message.
+
+    The prompt instructs Gemini to return JSON:
+    {
+        "intent": "greeting",
+        "confidence": 0.95,
+        "response": "Hello! Welcome to Style Studio! How can I help?",
+        "language": "en",
+        "entities": {},
+        "needs_human": false
+    }
+    """
+    prefix, cache_key = get_prompt_artifacts().get(business_data, "single_pass", _build_single_pass_prefix)
+
+    suffix = f"""{_build_dynamic_suffix(language, is_mixed_language, conversation_history, conversation_state_summary, user_profile, conversation_summary)}
+
+Classify and answer the customer's latest message using the JSON format above."""
+
+    return SplitPrompt(prefix, suffix, cache_key)
 
 
 # Legacy reference — hallucination prevention is now baked into core prompt (Layer 1)
@@ -994,6 +966,44 @@ The customer should feel like they're talking to a thoughtful human, not a syste
 # BUSINESS DATA FORMATTER
 # =============================================================================
 
+def _table_cell(value: Any, limit: int = 0) -> str:
+    text = " ".join(str(value).split()).replace("|", "/")
+    return text[:limit] if limit else text
+
+
+def _format_products_table(products: List[Dict[str, Any]]) -> str:
+    """
+    Compact tabular encoding of the product list.
+
+    One header row instead of per-line labels, categories as group rows
+    instead of a tag on every product, and columns that are empty for
+    every product dropped entirely.
+    """
+    has_stock = any(p.get("stock_status") for p in products)
+    has_note = any(p.get("description") for p in products)
+    has_category = any(p.get("category") for p in products)
+
+    header = ["name", "price"] + (["stock"] if has_stock else []) + (["note"] if has_note else [])
+    lines = [" | ".join(header)]
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for p in products:
+        groups.setdefault(p.get("category") or "", []).append(p)
+
+    for category, items in groups.items():
+        if has_category:
+            lines.append(f"[{_table_cell(category) or 'Other'}]")
+        for p in items:
+            price = p.get("price")
+            row = [_table_cell(p.get("name", "")), f"₹{_table_cell(price)}" if price else "on request"]
+            if has_stock:
+                row.append(_table_cell(p.get("stock_status") or ""))
+            if has_note:
+                row.append(_table_cell(p.get("description") or "", 80))
+            lines.append(" | ".join(row).rstrip(" |"))
+    return "\n".join(lines)
+
+
 def format_business_data_for_prompt(data: Dict[str, Any], max_chars: int = 2500) -> str:
     """Format business data into a concise prompt-friendly string."""
     parts = []
@@ -1052,19 +1062,7 @@ def format_business_data_for_prompt(data: Dict[str, Any], max_chars: int = 2500)
     products = data.get("products_services", [])
     if products:
         parts.append(f"\nPRODUCTS/SERVICES (TOTAL: {len(products)} — these are ALL the products, no others exist):")
-        for p in products[:15]:
-            name = p.get("name", "")
-            price = p.get("price")
-            price_str = f"₹{price}" if price else "Price on request"
-            category = p.get("category", "")
-            cat_str = f" [Category: {category}]" if category else ""
-            stock = p.get("stock_status", "")
-            stock_str = f" [{stock}]" if stock else ""
-            desc = p.get("description", "")[:80] if p.get("description") else ""
-            line = f"- {name}: {price_str}{cat_str}{stock_str}"
-            if desc:
-                line += f" — {desc}"
-            parts.append(line)
+        parts.append(_format_products_table(products[:15]))
     else:
         parts.append("\nPRODUCTS/SERVICES: None listed. Do not invent any.")
 
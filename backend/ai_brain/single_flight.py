@@ -0,0 +1,222 @@
+"""
+Single-flight coalescing for identical Gemini calls.
+
+Broadcast replies and viral posts make hundreds of users send the same
+message ("price?", "details") to one business within seconds — all of
+them miss the response cache because nothing has been generated yet.
+Identical prompts now share one LLM call:
+
+    caller ──key──► in-process flight?  ── yes ──► wait on its Event
+                         │ no
+                         ▼
+                    Redis SET NX lock   ── held elsewhere ──► poll result key
+                         │ acquired                            (lock released with
+                         ▼                                      no result → call)
+                    call Gemini ──► publish result (short TTL) ──► fan out
+
+Keys follow the response-cache layout `{business_id}:{intent}:{hash}`,
+with the hash taken over the full prompt (system prompt, messages, model
+and sampling settings), so only byte-identical prompts coalesce.
+
+Only plain text completions are shared; tool calls are executed per user.
+Followers receive a CompletionSnapshot with zero token usage (they did not
+consume any), which the extract_* helpers read like a Gemini response.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .observability import get_ai_metrics
+
+logger = logging.getLogger('reviseit.single_flight')
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+SINGLE_FLIGHT_WAIT_SECONDS = int(os.getenv("SINGLE_FLIGHT_WAIT_MS", "4000")) / 1000
+SINGLE_FLIGHT_LOCK_SECONDS = 20
+SINGLE_FLIGHT_RESULT_SECONDS = 15
+
+LEADER, FOLLOWER, FALLTHROUGH = "leader", "follower", "fallthrough"
+
+
+class CompletionSnapshot:
+    """Serializable stand-in for a text-only Gemini response."""
+
+    candidates = ()
+    usage_metadata = None  # Followers consumed no tokens
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @classmethod
+    def from_response(cls, response) -> Optional["CompletionSnapshot"]:
+        """Snapshot of a shareable response, or None (tool call / empty)."""
+        from .gemini_client import extract_text, extract_tool_call
+
+        if extract_tool_call(response):
+            return None
+        text = extract_text(response)
+        return cls(text) if text else None
+
+
+def flight_key(business_id: str, intent: str, **prompt: Any) -> str:
+    """Response-cache style key over the complete prompt."""
+    raw = json.dumps(prompt, sort_keys=True, default=str)
+    return f"{business_id}:{intent}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]}"
+
+
+class _Flight:
+    __slots__ = ("done", "snapshot", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.snapshot: Optional[CompletionSnapshot] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces identical calls within a process and across workers."""
+
+    LOCK_PREFIX = "ai_singleflight:lock"
+    RESULT_PREFIX = "ai_singleflight:result"
+
+    def __init__(
+        self,
+        redis_client=None,
+        wait_seconds: float = SINGLE_FLIGHT_WAIT_SECONDS,
+        lock_seconds: int = SINGLE_FLIGHT_LOCK_SECONDS,
+        result_seconds: int = SINGLE_FLIGHT_RESULT_SECONDS,
+        metrics=None,
+    ):
+        self._redis = redis_client
+        self.wait_seconds = wait_seconds
+        self.lock_seconds = lock_seconds
+        self.result_seconds = result_seconds
+        self._metrics = metrics or get_ai_metrics()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], business_id: str = "unknown") -> Tuple[Any, str]:
+        """
+        Run `fn` once per key; returns (response, role).
+
+        role is LEADER (fn ran here), FOLLOWER (shared result) or
+        FALLTHROUGH (waited, nothing shareable arrived, fn ran here).
+        """
+        start = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait(self.wait_seconds)
+            if flight.error is not None:
+                raise flight.error
+            if flight.snapshot is not None:
+                self._record(business_id, FOLLOWER, start)
+                return flight.snapshot, FOLLOWER
+            self._record(business_id, FALLTHROUGH, start)
+            return fn(), FALLTHROUGH
+
+        role = LEADER
+        try:
+            token = self._try_lock(key)
+            if token is None and self._redis is not None:
+                # Another worker is generating this exact prompt
+                flight.snapshot = self._await_remote(key, start)
+                if flight.snapshot is not None:
+                    self._record(business_id, FOLLOWER, start)
+                    return flight.snapshot, FOLLOWER
+                role = FALLTHROUGH
+
+            self._record(business_id, role, start)
+            try:
+                response = fn()
+                flight.snapshot = CompletionSnapshot.from_response(response)
+            finally:
+                if token:
+                    self._release(key, token, flight)
+            return response, role
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _record(self, business_id: str, role: str, start: float) -> None:
+        waited_ms = 0.0 if role == LEADER else (time.monotonic() - start) * 1000
+        self._metrics.record_coalescing(business_id, role, waited_ms)
+
+    # ------------------------------------------------------------------
+    # Cross-worker fan-out
+    # ------------------------------------------------------------------
+
+    def _try_lock(self, key: str) -> Optional[str]:
+        if self._redis is None:
+            return None
+        token = uuid.uuid4().hex
+        try:
+            if self._redis.set(f"{self.LOCK_PREFIX}:{key}", token, nx=True, ex=self.lock_seconds):
+                return token
+            return None
+        except Exception as e:
+            logger.debug(f"single_flight lock unavailable: {e}")
+            return ""  # Redis down: behave as a local-only leader
+
+    def _release(self, key: str, token: str, flight: _Flight) -> None:
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            if flight.snapshot is not None:
+                pipe.set(f"{self.RESULT_PREFIX}:{key}", flight.snapshot.text, ex=self.result_seconds)
+            pipe.delete(f"{self.LOCK_PREFIX}:{key}")
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"single_flight publish failed: {e}")
+
+    def _await_remote(self, key: str, start: float) -> Optional[CompletionSnapshot]:
+        delay = 0.05
+        deadline = start + self.wait_seconds
+        while time.monotonic() < deadline:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                pipe.get(f"{self.RESULT_PREFIX}:{key}")
+                pipe.exists(f"{self.LOCK_PREFIX}:{key}")
+                text, locked = pipe.execute()
+            except Exception:
+                return None
+            if text:
+                return CompletionSnapshot(text)
+            if not locked:
+                return None  # Leader finished without a shareable result
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 1.5, 0.25)
+        return None
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Shared coalescer, or None when disabled."""
+    global _single_flight
+    if not SINGLE_FLIGHT_ENABLED:
+        return None
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                from connections import get_redis
+
+                _single_flight = SingleFlight(redis_client=get_redis("ai_singleflight"))
+    return _single_flight
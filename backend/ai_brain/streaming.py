@@ -7,9 +7,13 @@ Features:
 - Human pause simulation (random 120-200ms before first token)
 - Token-by-token streaming from Gemini 2.5 Flash
 - Graceful error handling with fallback to full response
+- JsonFieldStream: incremental decoding of the single-pass JSON "response"
+  field, used to send WhatsApp replies while they are generated
 """
 
 import json
+import os
+import re
 import time
 import random
 import logging
@@ -17,6 +21,86 @@ from typing import Dict, Any, Generator, Optional
 
 logger = logging.getLogger('reviseit.brain.streaming')
 
+# Send WhatsApp replies paragraph by paragraph while Gemini generates them
+WHATSAPP_STREAMING_ENABLED = os.getenv("WHATSAPP_STREAMING_REPLIES", "true").lower() == "true"
+
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonFieldStream:
+    """
+    Incrementally decodes one string field of a streamed JSON object.
+
+    feed() returns the newly decoded characters of the field. Once the
+    field has started, `prefix` holds the raw JSON before it, so earlier
+    keys (the single-pass prompt emits "intent" first) can be inspected
+    before any of the value is used. `raw` accumulates the whole document.
+    """
+
+    def __init__(self, field: str):
+        self._opener = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.raw = ""
+        self.prefix: Optional[str] = None
+        self.done = False
+        self._pos: Optional[int] = None
+
+    @property
+    def started(self) -> bool:
+        return self._pos is not None
+
+    def feed(self, chunk: str) -> str:
+        self.raw += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._opener.search(self.raw)
+            if not match:
+                return ""
+            self.prefix = self.raw[:match.start()]
+            self._pos = match.end()
+
+        raw, i = self.raw, self._pos
+        out = []
+        while i < len(raw):
+            char = raw[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest if it is split across chunks
+            if i + 1 >= len(raw):
+                break
+            if raw[i + 1] != 'u':
+                out.append(_JSON_ESCAPES.get(raw[i + 1], raw[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(raw):
+                break
+            code = int(raw[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # Surrogate pair (emoji escaped as \uD83D\uDE0A)
+                if i + 12 > len(raw):
+                    break
+                low = int(raw[i + 8:i + 12], 16)
+                out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                i += 12
+                continue
+            out.append(chr(code))
+            i += 6
+        self._pos = i
+        return "".join(out)
+
+    def field_before(self, name: str) -> Optional[str]:
+        """A string value that appeared before the streamed field, if any."""
+        if self.prefix is None:
+            return None
+        match = re.search(r'"%s"\s*:\s*"([^"]*)"' % re.escape(name), self.prefix)
+        return match.group(1) if match else None
+
 
 def human_pause():
     """
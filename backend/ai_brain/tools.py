@@ -375,24 +375,24 @@ class ToolExecutor:
             )
         
         try:
-            # Call the frontend API to check actual availability
-            api_url = f"{self.FRONTEND_API_URL}/api/ai-appointment-book"
-            params = {"user_id": self.business_owner_id, "date": date}
-            
-            response = requests.get(
-                api_url,
-                params=params,
-                headers={
-                    "Content-Type": "application/json",
-                    "x-api-key": self.INTERNAL_API_KEY
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                available_slots = result.get("available_slots", [])
-                
+            # Shared slot index first; the frontend API only if it has no data
+            available_slots = self._indexed_slots(date)
+            if available_slots is None:
+                response = requests.get(
+                    f"{self.FRONTEND_API_URL}/api/ai-appointment-book",
+                    params={"user_id": self.business_owner_id, "date": date},
+                    headers={
+                        "Content-Type": "application/json",
+                        "x-api-key": self.INTERNAL_API_KEY
+                    },
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    available_slots = response.json().get("available_slots", [])
+                else:
+                    logger.warning(f"Availability check failed: {response.status_code}")
+
+            if available_slots is not None:
                 # Format date for display (DD-MM-YY)
                 try:
                     from datetime import datetime
@@ -441,13 +441,23 @@ class ToolExecutor:
                             message=f"Available times on {display_date}: {slots_str}. Which time works best for you?"
                         )
                     else:
+                        next_slots = self._next_free_slots(date)
+                        if next_slots:
+                            suggestions = ", ".join(
+                                f"{datetime.strptime(s['date'], '%Y-%m-%d').strftime('%d-%m-%y')} {format_time_12h(s['time'])}"
+                                for s in next_slots
+                            )
+                            return ToolResult(
+                                success=True,
+                                data={"date": date, "available_slots": [], "next_available": next_slots},
+                                message=f"Sorry, no slots available on {display_date}. Next available: {suggestions}. Would any of these work?"
+                            )
                         return ToolResult(
                             success=True,
                             data={"date": date, "available_slots": []},
                             message=f"Sorry, no slots available on {display_date}. Would you like to try a different date?"
                         )
             else:
-                logger.warning(f"Availability check failed: {response.status_code}")
                 return ToolResult(
                     success=False,
                     data={"date": date, "time": time, "error": "api_error"},
@@ -462,6 +472,47 @@ class ToolExecutor:
                 message="I'm having trouble checking availability right now. Please try again shortly."
             )
     
+    def _indexed_slots(self, date: str) -> Optional[List[str]]:
+        """Free slots from the slot availability index, or None if unknown."""
+        try:
+            from datetime import date as date_cls
+            from services.slot_availability import get_slot_index
+
+            return get_slot_index().free_slots(self.business_owner_id, date_cls.fromisoformat(date))
+        except Exception as e:
+            logger.debug(f"Slot index unavailable: {e}")
+            return None
+
+    def _next_free_slots(self, date: str, count: int = 3, days: int = 7) -> List[Dict[str, Any]]:
+        """Next free slots after `date` across the following days (one index read)."""
+        try:
+            from datetime import date as date_cls, timedelta
+            from services.slot_availability import get_slot_index
+
+            start = date_cls.fromisoformat(date) + timedelta(days=1)
+            return get_slot_index().next_free_slots(
+                self.business_owner_id, count=count, days=days, start=start,
+                tz=self.business_data.get("timezone") or "Asia/Kolkata",
+            )
+        except Exception as e:
+            logger.debug(f"Slot index unavailable: {e}")
+            return []
+
+    def _record_slot_change(self, date: str, time: str, booked: bool) -> None:
+        """Keep the slot index in step with a booking made through the API."""
+        try:
+            from datetime import date as date_cls
+            from services.slot_availability import get_slot_index
+
+            index = get_slot_index()
+            day = date_cls.fromisoformat(date)
+            if booked:
+                index.record_booking(self.business_owner_id, day, time)
+            else:
+                index.invalidate(self.business_owner_id, day)
+        except Exception as e:
+            logger.debug(f"Slot index update skipped: {e}")
+
     def _normalize_date(self, date_str: str) -> str:
         """Normalize date to YYYY-MM-DD format. Expects DD-MM-YY input."""
         import re
@@ -631,6 +682,7 @@ class ToolExecutor:
             
             if response.status_code == 200 and result.get("success"):
                 # Booking successful!
+                self._record_slot_change(normalized_date, normalized_time, booked=True)
                 appointment = result.get("appointment", {})
                 return ToolResult(
                     success=True,
@@ -643,7 +695,8 @@ class ToolExecutor:
                 )
             
             elif response.status_code == 409:
-                # Time slot conflict
+                # Time slot conflict: the index thought it was free, rebuild it
+                self._record_slot_change(normalized_date, normalized_time, booked=False)
                 available_slots = result.get("available_slots", [])
                 slots_str = ", ".join(available_slots[:5]) if available_slots else "No slots available"
                 return ToolResult(
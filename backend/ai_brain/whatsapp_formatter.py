@@ -59,6 +59,24 @@ class WhatsAppFormatter:
         
         return text.strip()
     
+    def format_segment(self, text: str) -> str:
+        """
+        Format one streamed message segment.
+        
+        Same steps as format() without the length limit: MessageSegmenter
+        already bounds segment size, and truncating mid-stream would drop
+        text between two messages.
+        """
+        if not text:
+            return ""
+        
+        text = self._normalize_whitespace(text)
+        text = self._format_lists(text)
+        text = self._limit_emojis(text)
+        text = self._add_line_breaks(text)
+        
+        return text.strip()
+    
     def format_list(self, items: List[str], title: str = None) -> str:
         """
         Format a list of items for WhatsApp.
@@ -310,6 +328,63 @@ class WhatsAppFormatter:
         return chunks
 
 
+class MessageSegmenter:
+    """
+    Cuts streamed text into WhatsApp messages as soon as they are complete.
+    
+    A segment is released at a paragraph break once it holds at least
+    min_chars, or at the last sentence end when the buffer outgrows
+    max_chars (at the last space if there is no sentence end). Segments
+    come out in stream order; flush() returns what is left at the end.
+    """
+    
+    _SENTENCE_END = re.compile(r'[.!?।][\'")\]]*\s+')
+    
+    def __init__(self, min_chars: int = 160, rules: FormattingRules = None):
+        rules = rules or DEFAULT_RULES
+        self.min_chars = min_chars
+        self.max_chars = rules.max_chars
+        self._buffer = ""
+    
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the segments completed by it."""
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:].lstrip()
+            if segment:
+                segments.append(segment)
+        return segments
+    
+    def flush(self) -> List[str]:
+        """End of stream: the remaining text as final segment(s)."""
+        segments = self.feed("")
+        rest = self._buffer.strip()
+        self._buffer = ""
+        if rest:
+            segments.append(rest)
+        return segments
+    
+    def _find_cut(self) -> Optional[int]:
+        buffer = self._buffer
+        paragraph = buffer.rfind("\n\n", 0, self.max_chars + 1)
+        if paragraph >= self.min_chars:
+            return paragraph
+        if len(buffer) <= self.max_chars:
+            return None
+        
+        window = buffer[:self.max_chars]
+        sentence_ends = [m.end() for m in self._SENTENCE_END.finditer(window)]
+        if sentence_ends:
+            return sentence_ends[-1]
+        space = window.rfind(" ")
+        return space if space > 0 else self.max_chars
+
+
 # =============================================================================
 # CONVENIENCE FUNCTIONS
 # =============================================================================
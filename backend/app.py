@@ -20,6 +20,8 @@ if hasattr(sys.stdout, 'reconfigure'):
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
+# Start the startup clock before anything heavy is imported
+from startup_profiler import checkpoint as startup_checkpoint, finish_startup
 
 import os
 import time
@@ -108,6 +110,16 @@ _validate_custom_domain_runtime_config()
 # =============================================================================
 
 from whatsapp_service import WhatsAppService
+from services.messaging.whatsapp_ingest import (
+    TIME_LIMIT_EXCEPTIONS,
+    enqueue_raw_payload as enqueue_whatsapp_payload,
+    fan_out_payload as fan_out_whatsapp_payload,
+    ingest_queue_enabled,
+    verify_signature as verify_whatsapp_signature,
+)
+
+# Legacy /api/whatsapp/webhook: ACK + enqueue instead of processing inline
+WHATSAPP_WEBHOOK_INGEST_QUEUE = ingest_queue_enabled()
 
 # New modular routes
 try:
@@ -146,6 +158,7 @@ try:
         get_business_from_supabase,  # New consolidated business data
         store_message,
         update_message_status,
+        update_message_statuses_batch,
         get_or_create_conversation
     )
     SUPABASE_AVAILABLE = True
@@ -166,6 +179,7 @@ except ImportError as e:
             get_business_from_supabase,
             store_message,
             update_message_status,
+            update_message_statuses_batch,
             get_or_create_conversation
         )
         SUPABASE_AVAILABLE = True
@@ -180,6 +194,7 @@ except ImportError as e:
         get_business_from_supabase = None
         store_message = None
         update_message_status = None
+        update_message_statuses_batch = None
         get_or_create_conversation = None
 
 # Firebase client for business data (Firestore)
@@ -256,6 +271,8 @@ except Exception as e:
 # Flask App Initialization
 # =============================================================================
 
+startup_checkpoint("service_imports")
+
 app = Flask(__name__)
 
 try:
@@ -357,9 +374,15 @@ try:
 except ImportError as e:
     logger.warning(f"CSRF middleware not available: {e}")
 
-# Register modular routes
+startup_checkpoint("app_setup")
+
+# Register modular routes (blueprint modules are imported here, not by `import routes`)
 if ROUTES_AVAILABLE and register_routes:
-    register_routes(app)
+    try:
+        register_routes(app)
+    except ImportError as e:
+        logger.warning(f"Routes module not available: {e}")
+        ROUTES_AVAILABLE = False
 
 # Register Pricing API routes
 try:
@@ -532,6 +555,8 @@ except Exception as e:
     if _files_tools_required_at_startup():
         raise
 
+startup_checkpoint("blueprints")
+
 # Initialize Omni-Channel Messaging SDK
 try:
     from services.messaging.sdk import init_messaging
@@ -557,16 +582,27 @@ except Exception as e:
 # =============================================================================
 # Checkout Background Worker (zero-dependency async Razorpay processing)
 # =============================================================================
-try:
-    from services.checkout_worker import get_checkout_worker
-    _checkout_worker = get_checkout_worker()
-    if _checkout_worker is not None:
-        _checkout_worker.start()
-        logger.info("✅ Checkout background worker started (2 workers, max 10 queued)")
-    else:
-        logger.info("ℹ️ Checkout worker disabled (CHECKOUT_WORKER_ENABLED=false)")
-except Exception as e:
-    logger.warning(f"⚠️ Checkout worker not started (non-fatal): {e}")
+# Threads do not survive fork(): with gunicorn preload_app the master imports
+# this module once and each worker starts its own threads from post_fork.
+DEFER_BACKGROUND_WORKERS = os.getenv('APP_DEFER_BACKGROUND_WORKERS', 'false').lower() == 'true'
+
+
+def start_background_workers():
+    """Start per-process background threads (checkout worker)."""
+    try:
+        from services.checkout_worker import get_checkout_worker
+        _checkout_worker = get_checkout_worker()
+        if _checkout_worker is not None:
+            _checkout_worker.start()
+            logger.info("✅ Checkout background worker started (2 workers, max 10 queued)")
+        else:
+            logger.info("ℹ️ Checkout worker disabled (CHECKOUT_WORKER_ENABLED=false)")
+    except Exception as e:
+        logger.warning(f"⚠️ Checkout worker not started (non-fatal): {e}")
+
+
+if not DEFER_BACKGROUND_WORKERS:
+    start_background_workers()
 
 # Checkout dispatch pool graceful shutdown (bounded async Razorpay)
 try:
@@ -606,6 +642,8 @@ try:
         logger.warning("⚠️ Could not validate contact schema — Supabase client not available")
 except Exception as _schema_err:
     logger.warning(f"⚠️ Contact schema validation skipped: {_schema_err}")
+startup_checkpoint("background_services")
+
 # Initialize webhook security
 webhook_security = None
 if RATE_LIMIT_AVAILABLE and get_webhook_security:
@@ -653,6 +691,8 @@ except ImportError as e:
 except Exception as e:
     logger.warning(f"⚠️ Environment detection issue (non-fatal): {e}")
 
+startup_checkpoint("startup_checks")
+
 # =============================================================================
 # Request Timing Middleware
 # =============================================================================
@@ -1101,65 +1141,130 @@ def verify_webhook():
 @app.route('/api/whatsapp/webhook', methods=['POST'])
 def webhook():
     """Receive incoming WhatsApp messages and respond with AI."""
-    start_time = time.time()
-    
+    if WHATSAPP_WEBHOOK_INGEST_QUEUE:
+        return _ingest_whatsapp_webhook()
+
     try:
         data = request.get_json()
+        return process_whatsapp_webhook_payload(data)
+    except Exception as e:
+        logger.error(f"❌ Webhook error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+def _ingest_whatsapp_webhook():
+    """Fast-ACK mode: verify, enqueue the raw body for the ingest workers, return 200."""
+    raw_body = request.get_data(as_text=False)
+    if not verify_whatsapp_signature(request.headers.get('X-Hub-Signature-256', ''), raw_body):
+        logger.warning("❌ Webhook signature invalid")
+        return jsonify({'status': 'error', 'message': 'Invalid signature'}), 401
+
+    if enqueue_whatsapp_payload(raw_body):
+        return jsonify({'status': 'ok'}), 200
+
+    # Broker unavailable - process inline rather than drop the delivery
+    logger.warning("⚠️ Webhook ingest queue unavailable, processing inline")
+    try:
+        return process_whatsapp_webhook_payload(request.get_json(force=True, silent=True) or {})
+    except Exception as e:
+        logger.error(f"❌ Webhook error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+def process_whatsapp_webhook_payload(data):
+    """Process every entry, change, status and message of a webhook payload in order."""
+    start_time = time.time()
+    statuses, jobs = fan_out_whatsapp_payload(data)
+
+    # Enhanced logging: show what type of event we received
+    event_type = "message" if jobs else ("status" if statuses else "other")
+    phone_ids = sorted({(job['value'].get('metadata') or {}).get('phone_number_id') or '' for job in jobs})
+    logger.info(f"📨 Webhook received: type={event_type}, phone_ids={phone_ids}, msgs={len(jobs)}, statuses={len(statuses)}")
+
+    # Handle status updates
+    if statuses:
+        apply_whatsapp_statuses(statuses)
+
+    response = (jsonify({'status': 'ok'}), 200)
+    for job in jobs:
+        result = process_whatsapp_message(job['value'], job['message'], start_time)
+        if response[1] < 500:
+            response = result
+    return response
+
 
-        # Extract message data
-        entry = data.get('entry', [{}])[0]
-        changes = entry.get('changes', [{}])[0]
-        value = changes.get('value', {})
-        messages = value.get('messages', [])
-        statuses = value.get('statuses', [])
+def apply_whatsapp_statuses(statuses, buffered=True):
+    """
+    Persist delivery/read status updates from a webhook.
+
+    Receipts are applied in apply_message_status_batch RPCs: buffered and
+    flushed by size/interval on the request path, or as one batch per
+    payload by the ingest workers (buffered=False).
+    """
+    if not (SUPABASE_AVAILABLE and update_message_statuses_batch):
+        return
+    from datetime import datetime
+    records = []
+    for status_update in statuses:
+        status_msg_id = status_update.get('id')
+        status = status_update.get('status')
+        timestamp = status_update.get('timestamp')
+
+        if status_msg_id and status:
+            iso_timestamp = None
+            if timestamp:
+                try:
+                    iso_timestamp = datetime.fromtimestamp(int(timestamp)).isoformat()
+                except:
+                    pass
+            records.append({'wamid': status_msg_id, 'status': status, 'ts': iso_timestamp})
 
+    if not records:
+        return
+    if buffered:
+        from services.messaging.status_buffer import get_status_buffer
+        get_status_buffer().add_many(records)
+    else:
+        update_message_statuses_batch(records)
+
+
+def process_whatsapp_message(value, message, start_time=None):
+    """
+    Process ONE inbound message: dedupe, resolve credentials, run the AI, send the reply.
+
+    `value` is the webhook change value the message came from (metadata +
+    contacts). Called by the synchronous webhook path and, inside an app
+    context, by the ingest queue workers in tasks/whatsapp_ingest.py.
+    """
+    msg_id = message.get('id')
+
+    # DEDUPLICATION: Skip if we've already processed this message
+    # Use cache manager to track processed messages (expires after 1 hour)
+    cache_key = f"processed_msg:{msg_id}" if cache_manager and msg_id else None
+    if cache_key and cache_manager.get(cache_key):
+        logger.info(f"⏭️ Skipping duplicate message: {msg_id[:20]}...")
+        return jsonify({'status': 'ok', 'message': 'duplicate'}), 200
+
+    response = _handle_whatsapp_message(value, message, start_time or time.time())
+
+    # Marked only once handled: a message re-queued after a crash or a
+    # failed attempt must not be mistaken for a duplicate
+    if cache_key and response[1] < 500:
+        cache_manager.set(cache_key, True, ttl=3600)
+    return response
+
+
+def _handle_whatsapp_message(value, message, start_time):
+    try:
         metadata = value.get('metadata', {})
         phone_number_id = metadata.get('phone_number_id')
         display_phone = metadata.get('display_phone_number', 'Unknown')
 
-        # Enhanced logging: show what type of event we received
-        event_type = "message" if messages else ("status" if statuses else "other")
-        logger.info(f"📨 Webhook received: type={event_type}, phone_id={phone_number_id}, display={display_phone}, msgs={len(messages)}, statuses={len(statuses)}")
-
-        # Handle status updates
-        if statuses and SUPABASE_AVAILABLE and update_message_status:
-            for status_update in statuses:
-                status_msg_id = status_update.get('id')
-                status = status_update.get('status')
-                timestamp = status_update.get('timestamp')
-                
-                if status_msg_id and status:
-                    from datetime import datetime
-                    iso_timestamp = None
-                    if timestamp:
-                        try:
-                            iso_timestamp = datetime.fromtimestamp(int(timestamp)).isoformat()
-                        except:
-                            pass
-                    update_message_status(status_msg_id, status, iso_timestamp)
-        
-        # Return early if no messages (status update only)
-        if not messages:
-            return jsonify({'status': 'ok'}), 200
-        
-        message = messages[0]
         msg_id = message.get('id')
-        
-        # DEDUPLICATION: Skip if we've already processed this message
-        # Use cache manager to track processed messages (expires after 1 hour)
-        if cache_manager and msg_id:
-            cache_key = f"processed_msg:{msg_id}"
-            if cache_manager.get(cache_key):
-                logger.info(f"⏭️ Skipping duplicate message: {msg_id[:20]}...")
-                return jsonify({'status': 'ok', 'message': 'duplicate'}), 200
-            # Mark as processed (expires in 3600 seconds = 1 hour)
-            cache_manager.set(cache_key, True, ttl=3600)
-        
-        message = messages[0]
+
         from_number = message.get('from')
         message_type = message.get('type')
-        msg_id = message.get('id')
-        
+
         contacts = value.get('contacts', [])
         contact_name = contacts[0].get('profile', {}).get('name') if contacts else None
         
@@ -1427,16 +1532,34 @@ def webhook():
         # Track button metadata for interactive messages
         ai_metadata = {}
         tokens_used = 0
+        streamed_message_ids = []
+        
+        def send_segment(text):
+            """Send one streamed reply segment; False stops the stream."""
+            part_result = whatsapp_service.send_message_with_credentials(
+                phone_number_id=credentials['phone_number_id'],
+                access_token=credentials['access_token'],
+                to=from_number,
+                message=text
+            )
+            if part_result.get('success'):
+                streamed_message_ids.append(part_result.get('message_id'))
+                return True
+            logger.warning(f"⚠️ Streamed segment send failed: {part_result.get('error')}")
+            return False
         
         if message_type == 'text':
             if AI_BRAIN_AVAILABLE and ai_brain:
                 try:
+                    from ai_brain.streaming import WHATSAPP_STREAMING_ENABLED
+                    stream_reply = WHATSAPP_STREAMING_ENABLED and bool(credentials and credentials.get('access_token'))
                     result = ai_brain.generate_reply(
                         business_data=business_data,
                         user_message=message_text,
                         user_id=from_number,
                         history=None,
-                        business_id=business_data.get('business_id')
+                        business_id=business_data.get('business_id'),
+                        on_segment=send_segment if stream_reply else None,
                     )
                     
                     reply_text = result.get('reply', "I'll connect you with our team shortly.")
@@ -1484,6 +1607,33 @@ def webhook():
         else:
             reply_text = f"Thank you for sending a {message_type}! Our team will review it shortly."
         
+        # Streamed reply: paragraphs were sent while Gemini generated them
+        if ai_metadata.get('streamed_segments') and streamed_message_ids:
+            remainder = ai_metadata.get('stream_remainder')
+            if remainder:
+                send_segment(remainder)
+            logger.info(
+                f"📤 Streamed reply: {len(streamed_message_ids)} message(s), "
+                f"first after {ai_metadata.get('first_segment_ms')}ms"
+            )
+            if SUPABASE_AVAILABLE and store_message and user_id:
+                store_message(
+                    user_id=user_id,
+                    phone_number_id=phone_number_id,
+                    message_id=streamed_message_ids[-1],
+                    direction='outbound',
+                    from_number=display_phone,
+                    to_number=from_number,
+                    message_type='text',
+                    message_body=reply_text,
+                    status='sent',
+                    wamid=streamed_message_ids[-1],
+                    conversation_origin='business_initiated',
+                    is_ai_generated=True,
+                    tokens_used=tokens_used
+                )
+            return jsonify({'status': 'ok'}), 200
+        
         # Split long replies (WhatsApp 1600 char limit)
         if len(reply_text) > 1500:
             # Split at sentence boundaries
@@ -1854,6 +2004,8 @@ def webhook():
         
         return jsonify({'status': 'ok'}), 200
         
+    except TIME_LIMIT_EXCEPTIONS:
+        raise
     except Exception as e:
         logger.error(f"❌ Webhook error: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -2217,6 +2369,27 @@ def get_metrics():
     
     if AI_BRAIN_AVAILABLE and ai_brain:
         metrics['ai_cache'] = ai_brain.get_cache_stats()
+        from ai_brain.observability import get_ai_metrics
+        metrics['ai_coalescing'] = get_ai_metrics().get_coalescing_stats()
+        from ai_brain.llm_scheduler import llm_scheduler_stats
+        from ai_brain.concurrency_gate import get_concurrency_gate
+        metrics['llm_scheduler'] = llm_scheduler_stats()
+        metrics['llm_gate'] = get_concurrency_gate().get_stats()
+        from ai_brain.prompt_artifacts import prompt_cache_stats
+        metrics['ai_prompt_cache'] = prompt_cache_stats()
+        from ai_brain.context_gatherer import context_gather_stats
+        metrics['ai_context_gather'] = context_gather_stats()
+    
+    from connections import connection_stats
+    from services.reconciliation_engine import reconciliation_stats
+    from services.slot_availability import slot_index_stats
+    from services.storefront_invalidation import invalidation_stats
+    from startup_profiler import startup_report
+    metrics['connections'] = connection_stats()
+    metrics['storefront_invalidation'] = invalidation_stats()
+    metrics['slot_availability'] = slot_index_stats()
+    metrics['razorpay_reconciliation'] = reconciliation_stats()
+    metrics['startup'] = startup_report()
     
     return jsonify(metrics), 200
 
@@ -2295,6 +2468,8 @@ def _start_dev_billing_scheduler():
     )
 
 
+finish_startup()
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', os.getenv('FLASK_PORT', 5000)))
     debug = os.getenv('FLASK_ENV') == 'development'
@@ -157,20 +157,14 @@ class CacheManager:
             logger.warning("Redis not available, using L1 cache only")
             return
         
-        try:
-            self._redis = redis.from_url(
-                self.redis_url,
-                decode_responses=True,
-                socket_timeout=5.0,
-                socket_connect_timeout=5.0,
-                retry_on_timeout=True,
-            )
-            self._redis.ping()
-            self._redis_available = True
-            logger.info(f"✅ Redis connected: {self.redis_url[:30]}...")
-        except Exception as e:
-            logger.error(f"❌ Redis connection failed: {e}")
-            self._redis_available = False
+        from connections import get_redis
+
+        self._redis = get_redis("cache", url=self.redis_url)
+        self._redis_available = self._redis is not None
+        if self._redis_available:
+            logger.info("✅ Redis connected for L2 cache")
+        else:
+            logger.error("❌ Redis connection failed, using L1 cache only")
     
     def _make_key(self, prefix: str, *parts: str) -> str:
         """Generate a cache key from parts."""
@@ -49,6 +49,7 @@ try:
             "tasks.forms_maintenance",  # Form soft-delete purge (enterprise two-phase delete)
             "tasks.usage_events",  # Feature usage event processing
             "tasks.messaging_tasks",  # Instagram/WhatsApp omni-channel messaging
+            "tasks.whatsapp_ingest",  # Legacy WhatsApp webhook fast-ACK ingest queue
             "tasks.auth_sync_jobs",  # Auth sync durable background jobs
             "tasks.whatsapp_connection",  # WhatsApp connection v2 cleanup/sync
             "tasks.file_tools_video",  # File Tools video upload assembly and conversion
@@ -58,13 +59,16 @@ try:
         ]
     )
     
-    # Test connection to verify Redis is available (don't wait long)
-    try:
-        # Try to ping Redis with short timeout
-        celery_app.broker_connection().ensure_connection(max_retries=1, timeout=2)
-        logger.info("✅ Celery initialized successfully with Redis")
-    except Exception as conn_error:
-        logger.warning(f"⚠️ Redis connection test failed: {conn_error}. Background tasks will run synchronously.")
+    # Optional broker check. Off by default: it blocks every import of this
+    # module (up to 2s when Redis is down) and, under gunicorn preload_app,
+    # would open a broker socket in the master that every worker inherits.
+    if os.getenv("CELERY_CHECK_BROKER_ON_IMPORT", "false").lower() == "true":
+        try:
+            # Try to ping Redis with short timeout
+            celery_app.broker_connection().ensure_connection(max_retries=1, timeout=2)
+            logger.info("✅ Celery initialized successfully with Redis")
+        except Exception as conn_error:
+            logger.warning(f"⚠️ Redis connection test failed: {conn_error}. Background tasks will run synchronously.")
         
 except Exception as e:
     celery_app = None
@@ -173,6 +177,8 @@ celery_app.conf.task_routes = {
     "messaging.refresh_tokens": {"queue": "low"},
     "messaging.cleanup_idempotency": {"queue": "low"},
     "messaging.cleanup_outbox": {"queue": "low"},
+    "whatsapp.ingest_webhook": {"queue": "high"},
+    "whatsapp.drain_conversation": {"queue": "high"},
 
     # WhatsApp connection v2 lifecycle tasks
     "whatsapp_connection.cleanup": {"queue": "low"},
@@ -442,8 +448,8 @@ celery_app.conf.beat_schedule = {
     # Phase B: Subscription Event Projection (every 2 seconds)
     # =========================================================================
     # Reads unprocessed subscription_events and projects them onto
-    # subscriptions.status. For 100ms latency, deploy the standalone
-    # subscription_projection_daemon.py separately.
+    # subscriptions.status. For sub-second latency, deploy the standalone
+    # services/projection_daemon.py (LISTEN/NOTIFY, shardable) separately.
     "subscription-projection-batch": {
         "task": "subscription_projection_worker.process_batch",
         "schedule": 2.0,  # Every 2 seconds
@@ -0,0 +1,307 @@
+"""
+Connection Registry — Shared Redis Pools and Supabase Client
+=============================================================
+
+Every module used to open its own Redis connection (often at import time,
+with a PING) and a couple created their own Supabase client, so each
+gunicorn/Celery worker held dozens of idle sockets. All runtime code now
+goes through this registry:
+
+    from connections import get_redis, get_supabase
+
+    r = get_redis("rate_limiter")                 # decoded str responses
+    r = get_redis("invoice_store", decode_responses=False)   # binary-safe
+    db = get_supabase()
+
+Named clients:
+    The name identifies the caller for metrics and lets a workload be moved
+    to its own Redis with REDIS_URL_<NAME> (e.g. REDIS_URL_RATE_LIMITER).
+    Clients that resolve to the same (url, decode_responses, client-side
+    cache) share ONE blocking connection pool per process.
+
+Laziness:
+    Nothing connects at import. The first get_redis() for a pool PINGs once;
+    the result is cached (failures are re-checked after
+    REDIS_HEALTH_RECHECK_SECONDS) and None is returned while Redis is down,
+    so callers keep their existing in-memory fallbacks.
+
+Client-side caching:
+    get_redis(..., client_side_cache=True) enables RESP3 client-side
+    caching when REDIS_CLIENT_SIDE_CACHE=true and the installed redis-py
+    supports it (>= 5.1); otherwise a normal pool is used.
+
+Metrics:
+    connection_stats() reports per-pool created/in-use/available/max
+    connections and per-name lookups; exposed on /api/metrics.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger('reviseit.connections')
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/1"
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+REDIS_HEALTH_RECHECK_SECONDS = float(os.getenv("REDIS_HEALTH_RECHECK_SECONDS", "30"))
+REDIS_CLIENT_SIDE_CACHE = os.getenv("REDIS_CLIENT_SIDE_CACHE", "false").lower() in ("1", "true", "yes")
+REDIS_CLIENT_CACHE_MAX_KEYS = int(os.getenv("REDIS_CLIENT_CACHE_MAX_KEYS", "10000"))
+
+PoolKey = Tuple[str, bool, bool]
+
+
+class _PoolEntry:
+    __slots__ = ("pool", "client", "healthy", "checked_at", "client_side_cache")
+
+    def __init__(self, pool, client, client_side_cache: bool):
+        self.pool = pool
+        self.client = client
+        self.healthy: Optional[bool] = None
+        self.checked_at = 0.0
+        self.client_side_cache = client_side_cache
+
+
+_pools: Dict[PoolKey, _PoolEntry] = {}
+_lookups: Dict[str, int] = {}
+_lock = threading.Lock()
+_csc_warning_logged = False
+
+
+def get_redis_url(name: str = "default") -> str:
+    """REDIS_URL_<NAME> if set, else REDIS_URL, else the local default."""
+    override = os.getenv(f"REDIS_URL_{name.upper()}")
+    return override or os.getenv("REDIS_URL") or DEFAULT_REDIS_URL
+
+
+def get_redis(
+    name: str = "default",
+    *,
+    url: Optional[str] = None,
+    decode_responses: bool = True,
+    client_side_cache: bool = False,
+    check: bool = True,
+):
+    """
+    Shared Redis client for `name`, or None when Redis is unavailable.
+
+    Args:
+        name: Caller identity (metrics + REDIS_URL_<NAME> override)
+        url: Explicit URL (constructor arguments); defaults to get_redis_url(name)
+        decode_responses: False for binary payloads (PDFs, zlib snapshots)
+        client_side_cache: Opt in to RESP3 client-side caching (read-mostly keys)
+        check: PING the pool once (cached) and return None if unreachable
+    """
+    if not REDIS_AVAILABLE:
+        return None
+
+    url = url or get_redis_url(name)
+    use_csc = client_side_cache and REDIS_CLIENT_SIDE_CACHE
+    key: PoolKey = (url, decode_responses, use_csc)
+
+    with _lock:
+        _lookups[name] = _lookups.get(name, 0) + 1
+        entry = _pools.get(key)
+        if entry is None:
+            try:
+                entry = _create_pool(url, decode_responses, use_csc)
+            except Exception as e:
+                logger.warning(f"⚠️ Redis pool creation failed for '{name}': {e}")
+                return None
+            _pools[key] = entry
+
+    if not check:
+        return entry.client
+    return entry.client if _is_healthy(entry, name) else None
+
+
+def get_supabase():
+    """The process-wide Supabase client (httpx-pooled), or None if not configured."""
+    from supabase_client import get_supabase_client
+
+    return get_supabase_client()
+
+
+def connection_stats() -> Dict[str, Any]:
+    """Pool utilization for monitoring dashboards."""
+    with _lock:
+        entries = list(_pools.items())
+        lookups = dict(_lookups)
+
+    pools = []
+    for (url, decode_responses, csc), entry in entries:
+        pool = entry.pool
+        created = len(getattr(pool, "_connections", ()) or ())
+        # BlockingConnectionPool parks idle connections in a queue padded with None
+        idle_queue = getattr(getattr(pool, "pool", None), "queue", ()) or ()
+        available = sum(1 for conn in idle_queue if conn is not None)
+        in_use = max(created - available, 0)
+        max_connections = getattr(pool, "max_connections", None)
+        pools.append({
+            "url": _redact(url),
+            "decode_responses": decode_responses,
+            "client_side_cache": entry.client_side_cache,
+            "healthy": entry.healthy,
+            "created": created,
+            "in_use": in_use,
+            "available": available,
+            "max": max_connections,
+            "utilization": round(in_use / max_connections, 3) if max_connections else None,
+        })
+
+    return {
+        "redis": {"pools": pools, "lookups": lookups},
+        "supabase": _supabase_stats(),
+    }
+
+
+def prepare_for_fork() -> None:
+    """
+    Close sockets opened while the gunicorn master imported the app.
+
+    With preload_app every worker is forked from the master; sockets still
+    open there would be shared by all workers. Pools stay registered and
+    reconnect lazily in each worker (redis-py also resets pools on PID change).
+    """
+    with _lock:
+        entries = list(_pools.values())
+    for entry in entries:
+        try:
+            entry.pool.disconnect()
+        except Exception:
+            pass
+
+    try:
+        import supabase_client
+
+        postgrest = getattr(supabase_client._supabase_client, "_postgrest", None)
+        if postgrest is not None:
+            # Transport-level close keeps the httpx.Client usable
+            postgrest.session._transport.close()
+    except Exception as e:
+        logger.debug(f"Supabase pre-fork close skipped: {e}")
+
+
+def reset_connections() -> None:
+    """Drop all pools (tests, or after config changes)."""
+    with _lock:
+        entries = list(_pools.values())
+        _pools.clear()
+        _lookups.clear()
+    for entry in entries:
+        try:
+            entry.pool.disconnect()
+        except Exception:
+            pass
+
+
+# =============================================================================
+# Internals
+# =============================================================================
+
+def _create_pool(url: str, decode_responses: bool, use_csc: bool) -> _PoolEntry:
+    kwargs: Dict[str, Any] = {
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "decode_responses": decode_responses,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_SOCKET_TIMEOUT,
+        "retry_on_timeout": True,
+        "health_check_interval": 30,
+    }
+
+    csc_enabled = False
+    if use_csc:
+        csc_kwargs = _client_side_cache_kwargs()
+        if csc_kwargs:
+            try:
+                pool = redis.BlockingConnectionPool.from_url(url, **kwargs, **csc_kwargs)
+                csc_enabled = True
+            except TypeError:
+                _warn_csc_unsupported()
+                pool = redis.BlockingConnectionPool.from_url(url, **kwargs)
+        else:
+            pool = redis.BlockingConnectionPool.from_url(url, **kwargs)
+    else:
+        pool = redis.BlockingConnectionPool.from_url(url, **kwargs)
+
+    client = redis.Redis(connection_pool=pool)
+    return _PoolEntry(pool, client, csc_enabled)
+
+
+def _client_side_cache_kwargs() -> Optional[Dict[str, Any]]:
+    try:
+        from redis.cache import CacheConfig
+    except ImportError:
+        _warn_csc_unsupported()
+        return None
+    return {"protocol": 3, "cache_config": CacheConfig(max_size=REDIS_CLIENT_CACHE_MAX_KEYS)}
+
+
+def _warn_csc_unsupported() -> None:
+    global _csc_warning_logged
+    if not _csc_warning_logged:
+        _csc_warning_logged = True
+        logger.warning(
+            "REDIS_CLIENT_SIDE_CACHE is enabled but this redis-py has no RESP3 "
+            "client-side caching (needs >= 5.1); using regular pools"
+        )
+
+
+def _is_healthy(entry: _PoolEntry, name: str) -> bool:
+    now = time.monotonic()
+    if entry.healthy or (
+        entry.healthy is False and now - entry.checked_at < REDIS_HEALTH_RECHECK_SECONDS
+    ):
+        return bool(entry.healthy)
+
+    try:
+        entry.client.ping()
+        healthy = True
+    except Exception as e:
+        logger.warning(f"⚠️ Redis unavailable (first user: '{name}'): {e}")
+        healthy = False
+    entry.healthy = healthy
+    entry.checked_at = now
+    return healthy
+
+
+def _supabase_stats() -> Dict[str, Any]:
+    try:
+        import supabase_client
+
+        client = supabase_client._supabase_client
+    except Exception:
+        client = None
+    if client is None:
+        return {"initialized": False}
+
+    stats: Dict[str, Any] = {"initialized": True}
+    try:
+        # postgrest → httpx.Client → transport pool (best effort, private API)
+        pool = client._postgrest.session._transport._pool
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["http_connections"] = len(connections)
+        stats["http_idle"] = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    except Exception:
+        pass
+    return stats
+
+
+def _redact(url: str) -> str:
+    if "@" not in url:
+        return url
+    scheme, _, rest = url.partition("://")
+    return f"{scheme}://***@{rest.split('@', 1)[1]}"
@@ -261,22 +261,15 @@ class EnterpriseCredentialManager:
             logger.info("ℹ️ Redis URL not configured, L2 cache disabled")
             return
         
-        try:
-            import redis
-            self._redis = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                socket_timeout=3.0,
-                socket_connect_timeout=3.0,
-                retry_on_timeout=True,
-                max_connections=20,
-            )
-            self._redis.ping()
-            self._redis_available = True
+        from connections import get_redis
+
+        # Credentials are read on every message and rarely change
+        self._redis = get_redis("credentials", client_side_cache=True)
+        self._redis_available = self._redis is not None
+        if self._redis_available:
             logger.info("✅ Redis L2 cache connected")
-        except Exception as e:
-            logger.warning(f"⚠️ Redis connection failed, L2 cache disabled: {e}")
-            self._redis_available = False
+        else:
+            logger.warning("⚠️ Redis connection failed, L2 cache disabled")
     
     def _get_circuit_breaker(self, service: str) -> CircuitBreakerState:
         """Get or create circuit breaker for a service."""
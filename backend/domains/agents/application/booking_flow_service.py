@@ -119,6 +119,25 @@ class BookingFlowService:
                         source="voice_booking_availability",
                         confidence=0.9,
                     )
+                upcoming = self._availability.next_available_slots(
+                    session.tenant,
+                    service_id=service.get("id"),
+                    start=date_only + timedelta(days=1),
+                    timezone=business_data.get("timezone") or "Asia/Kolkata",
+                )
+                if upcoming:
+                    first = upcoming[0]
+                    next_date = datetime.fromisoformat(first["date"]).strftime("%d %b")
+                    same_day = [slot for slot in upcoming if slot["date"] == first["date"]]
+                    return AgentResponse(
+                        text=(
+                            f"I do not see available slots for {service['name']} on {date_only.strftime('%d %b')}. "
+                            f"The next opening is on {next_date}: {format_slot_choices(same_day)}. Would that work?"
+                        ),
+                        language=session.language,
+                        source="voice_booking_no_availability",
+                        confidence=0.9,
+                    )
                 return AgentResponse(
                     text=f"I do not see available slots for {service['name']} on {date_only.strftime('%d %b')}. Would you like another date?",
                     language=session.language,
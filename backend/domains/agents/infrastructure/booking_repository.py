@@ -11,6 +11,7 @@ import threading
 import uuid
 from datetime import datetime
 from typing import Any
+from zoneinfo import ZoneInfo
 
 from ..domain.booking_entities import BookingConfirmation, BookingDraft, RescheduleRequest
 from ..domain.entities import TenantContext
@@ -81,7 +82,9 @@ class BookingRepository:
         self._ensure_enabled()
         if self._memory_only or self._supabase is None:
             return self._reserve_memory(draft)
-        return self._reserve_supabase(draft)
+        confirmation = self._reserve_supabase(draft)
+        _invalidate_slot_day(draft.tenant, draft.starts_at, draft.timezone)
+        return confirmation
 
     def cancel_booking(
         self,
@@ -103,9 +106,11 @@ class BookingRepository:
         try:
             result = self._supabase.rpc("cancel_voice_booking", params).execute()
             appointment_id = str(result.data)
-            return self._fetch_confirmation_by_id(appointment_id)
+            confirmation = self._fetch_confirmation_by_id(appointment_id)
         except Exception as exc:
             raise BookingGatewayError(str(exc), code="voice_booking_cancel_failed") from exc
+        _invalidate_slot_day(tenant, confirmation.starts_at)
+        return confirmation
 
     def reschedule_booking(self, request: RescheduleRequest) -> BookingConfirmation:
         self._ensure_enabled()
@@ -120,9 +125,12 @@ class BookingRepository:
         try:
             result = self._supabase.rpc("reschedule_voice_booking", params).execute()
             data = result.data or {}
-            return self._fetch_confirmation_by_id(str(data.get("new_appointment_id") or data))
+            confirmation = self._fetch_confirmation_by_id(str(data.get("new_appointment_id") or data))
         except Exception as exc:
             raise BookingGatewayError(str(exc), code="voice_booking_reschedule_failed") from exc
+        # The old day is freed too; its map catches up when the TTL expires
+        _invalidate_slot_day(request.tenant, request.new_draft.starts_at, request.new_draft.timezone)
+        return confirmation
 
     def _reserve_supabase(self, draft: BookingDraft) -> BookingConfirmation:
         try:
@@ -212,6 +220,21 @@ class BookingRepository:
             raise BookingGatedError("Voice booking writes are disabled.")
 
 
+def _invalidate_slot_day(tenant: TenantContext, starts_at: datetime, timezone: str = "Asia/Kolkata") -> None:
+    """Drop the cached slot maps of the booking's local day so availability reloads."""
+    user_id = tenant.firebase_uid or tenant.user_id or tenant.business_id
+    if not user_id:
+        return
+    try:
+        from services.slot_availability import get_slot_index
+
+        if starts_at.tzinfo is not None:
+            starts_at = starts_at.astimezone(ZoneInfo(timezone))
+        get_slot_index().invalidate(user_id, starts_at.date())
+    except Exception:
+        pass
+
+
 def _draft_to_memory_row(draft: BookingDraft) -> dict[str, Any]:
     appointment_id = str(uuid.uuid4())
     return {
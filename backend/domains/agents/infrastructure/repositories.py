@@ -183,37 +183,86 @@ class AgentsRepository:
         target_date: date,
         slot_granularity: int = 30,
     ) -> list[dict[str, Any]]:
-        """Use the existing booking RPC for staff-aware availability."""
+        """Staff-aware availability from the slot index (filled by the booking RPC)."""
         user_id = tenant.firebase_uid or tenant.user_id or tenant.business_id
         if self._supabase is None or not user_id or not service_id:
             return []
-        try:
-            result = self._supabase.rpc(
-                "get_available_slots",
-                {
-                    "p_user_id": user_id,
-                    "p_service_id": service_id,
-                    "p_date": target_date.isoformat(),
-                    "p_slot_granularity": slot_granularity,
-                },
-            ).execute()
-        except Exception:
+        from services.slot_availability import get_slot_index
+
+        grid = get_slot_index().day(
+            user_id,
+            target_date,
+            scope=f"service:{service_id}",
+            loader=self._service_slot_loader(service_id, slot_granularity),
+            tz=timezone,
+        )
+        if grid is None:
+            return []
+        return [
+            {
+                "time": slot["time"],
+                "available": slot["remaining"] > 0,
+                "capacity": slot["remaining"],
+                "totalStaff": slot["capacity"],
+            }
+            for slot in grid.slots()
+        ]
+
+    def next_available_slots(
+        self,
+        tenant: TenantContext,
+        *,
+        service_id: str | None,
+        start: date,
+        count: int = 3,
+        days: int = 7,
+        slot_granularity: int = 30,
+        timezone: str = "Asia/Kolkata",
+    ) -> list[dict[str, Any]]:
+        """The next free slots for a service across the coming days."""
+        user_id = tenant.firebase_uid or tenant.user_id or tenant.business_id
+        if self._supabase is None or not user_id or not service_id:
             return []
+        from services.slot_availability import get_slot_index
+
+        return get_slot_index().next_free_slots(
+            user_id,
+            count=count,
+            days=days,
+            start=start,
+            scope=f"service:{service_id}",
+            loader=self._service_slot_loader(service_id, slot_granularity),
+        )
 
-        slots: list[dict[str, Any]] = []
-        for row in result.data or []:
-            raw_time = str(row.get("slot_time") or "")
-            time_text = raw_time[:5] if len(raw_time) >= 5 else raw_time
-            available_count = int(row.get("available_count") or 0)
-            slots.append(
-                {
-                    "time": time_text,
-                    "available": available_count > 0,
-                    "capacity": available_count,
-                    "totalStaff": int(row.get("total_staff") or 0),
-                }
-            )
-        return slots
+    def _service_slot_loader(self, service_id: str, slot_granularity: int):
+        """Index loader calling the existing get_available_slots RPC per day."""
+        from services.slot_availability import DayGrid
+
+        def load(user_id: str, scope: str, days: list[date]) -> dict[date, DayGrid]:
+            grids: dict[date, DayGrid] = {}
+            for day in days:
+                try:
+                    result = self._supabase.rpc(
+                        "get_available_slots",
+                        {
+                            "p_user_id": user_id,
+                            "p_service_id": service_id,
+                            "p_date": day.isoformat(),
+                            "p_slot_granularity": slot_granularity,
+                        },
+                    ).execute()
+                except Exception:
+                    continue
+                slots: dict[str, tuple[int, int]] = {}
+                for row in result.data or []:
+                    raw_time = str(row.get("slot_time") or "")
+                    time_text = raw_time[:5] if len(raw_time) >= 5 else raw_time
+                    if time_text:
+                        slots[time_text] = (int(row.get("total_staff") or 0), int(row.get("available_count") or 0))
+                grids[day] = DayGrid.from_slots(slots, slot_granularity)
+            return grids
+
+        return load
 
     def _load_business_via_existing_loader(self, firebase_uid: str) -> dict[str, Any] | None:
         try:
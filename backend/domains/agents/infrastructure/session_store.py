@@ -71,12 +71,8 @@ def create_session_store(redis_url: str | None = None) -> SessionStore:
     redis_url = redis_url or os.getenv("REDIS_URL")
     if not redis_url:
         return InMemorySessionStore()
-    try:
-        import redis
+    from connections import get_redis
 
-        client = redis.from_url(redis_url, decode_responses=True, socket_timeout=1, socket_connect_timeout=1)
-        client.ping()
-        return RedisSessionStore(client)
-    except Exception:
-        return InMemorySessionStore()
+    client = get_redis("agents", url=redis_url)
+    return RedisSessionStore(client) if client is not None else InMemorySessionStore()
 
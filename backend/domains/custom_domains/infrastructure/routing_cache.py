@@ -41,12 +41,9 @@ class DomainRoutingCache:
         self._hard_check_after_seconds = int(os.getenv("DOMAIN_ROUTING_HARD_CHECK_SECONDS", "30"))
         redis_url = redis_url or os.getenv("REDIS_URL")
         if redis_url:
-            try:
-                import redis
-                self._redis = redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
-                self._redis.ping()
-            except Exception:
-                self._redis = None
+            from connections import get_redis
+
+            self._redis = get_redis("domain_routing", url=redis_url, decode_responses=False)
 
     @property
     def hard_check_after_seconds(self) -> int:
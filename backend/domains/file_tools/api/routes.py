@@ -37,7 +37,7 @@ from ..domain.entities import FileToolOwner
 from ..domain.enums import OwnerType
 from ..domain.errors import FeatureDisabledError, FileToolError, NotFoundError, PermissionDeniedError
 from ..domain.events import FILE_TOOL_DOWNLOADED
-from ..infrastructure.observability import set_video_gauge, video_metrics_snapshot
+from ..infrastructure.observability import content_cache_metrics_snapshot, set_video_gauge, video_metrics_snapshot
 from ..infrastructure.queue.ocr_queue import OcrQueue
 from ..infrastructure.queue.video_queue import VideoQueue
 from ..infrastructure.repositories import FileToolsRepository
@@ -118,6 +118,7 @@ def file_tools_health():
         checks["ffmpeg"] = FfmpegService().is_available()
         checks["ffprobe"] = FfprobeService().is_available()
         details["video"] = _video_runtime_status()
+        details["content_cache"] = content_cache_metrics_snapshot()
 
     ready = all(checks.values())
     payload = {
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from ..domain.errors import StorageError
 from ..domain.events import FILE_TOOL_EXPIRED
 from ..infrastructure.repositories import FileToolsRepository
 from ..infrastructure.storage.base import ArtifactStorage
@@ -13,12 +14,32 @@ class CleanupService:
         self.storage = storage
 
     def cleanup_expired(self) -> dict:
-        expired = self.repository.cleanup_expired()
+        expired = self.repository.list_expired_artifacts()
         deleted = 0
+        released = 0
+        deferred = 0
         for artifact in expired:
             try:
-                self.storage.delete(artifact.storage_key)
-                deleted += 1
+                remaining = self.repository.release_content_cache_reference(
+                    artifact.storage_provider,
+                    artifact.storage_key,
+                )
+            except StorageError:
+                # The object may still be shared; keep the artifact row (and
+                # the object) so the next run retries the release.
+                deferred += 1
+                continue
+            # The reference is gone: drop the row now so a retry can never
+            # release it twice.
+            self.repository.delete_artifact(artifact.id)
+            try:
+                if remaining is not None:
+                    released += 1
+                # Cached outputs are shared between artifacts; the object goes
+                # only with its last reference.
+                if remaining is None or remaining == 0:
+                    self.storage.delete(artifact.storage_key)
+                    deleted += 1
                 self.repository.record_event(
                     artifact.owner,
                     FILE_TOOL_EXPIRED,
@@ -27,4 +48,10 @@ class CleanupService:
                 )
             except Exception:
                 continue
-        return {"success": True, "expiredArtifacts": len(expired), "deletedObjects": deleted}
+        return {
+            "success": True,
+            "expiredArtifacts": len(expired) - deferred,
+            "deletedObjects": deleted,
+            "releasedCacheReferences": released,
+            "deferredReleases": deferred,
+        }
@@ -2,27 +2,45 @@
 
 from __future__ import annotations
 
+import json
+import os
 import re
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import datetime
 
 from ..contracts.common import ArtifactResponse, GenerateResponse, JobResponse, RequestContext
 from ..contracts.image_converter import ImageConvertRequest
 from ..contracts.text_to_pdf import TextPdfGenerateRequest
-from ..domain.entities import FileToolArtifact
-from ..domain.errors import ConversionError, FileToolError, ValidationError
+from ..converters.base import ConversionResult
+from ..domain.entities import ContentCacheEntry, FileToolArtifact, FileToolJob
+from ..domain.errors import ConversionError, FileToolError, StorageError, ValidationError
 from ..domain.events import FILE_TOOL_FAILED, FILE_TOOL_JOB_CREATED, IMAGE_CONVERTED, TEXT_PDF_GENERATED
 from ..domain.policies import IMAGE_CONVERSION_LIMITS, SAFE_FILENAME_FALLBACK, TEXT_TO_PDF_LIMITS
-from ..infrastructure.observability import hash_identifier, log_event, log_failure
+from ..infrastructure.observability import hash_identifier, log_event, log_failure, record_content_cache_lookup
 from ..infrastructure.repositories import FileToolsRepository, utc_now
-from ..infrastructure.security.content_hash import sha256_hex
+from ..infrastructure.security.content_hash import content_cache_key, sha256_hex
 from ..infrastructure.security.signed_downloads import create_download_token
 from ..infrastructure.storage.base import ArtifactStorage
 from .rate_limit_service import InMemoryRateLimitService
 from .tool_registry import ToolRegistry
 
 
+@dataclass(frozen=True)
+class StoredOutput:
+    mime_type: str
+    extension: str
+    size_bytes: int
+    sha256: str
+    page_count: int
+    storage_provider: str
+    storage_key: str
+    cache_key: str | None = None
+    cache_hit: bool = False
+
+
 class ConversionOrchestrator:
     def __init__(
         self,
@@ -64,58 +82,49 @@ class ConversionOrchestrator:
         self.repository.record_event(context.owner, FILE_TOOL_JOB_CREATED, "text_to_pdf", {"job_id": job.id})
 
         try:
-            stage = "convert"
-            result = tool.converter.convert(request)
-            stage = "validate_output_limits"
-            if result.page_count > TEXT_TO_PDF_LIMITS.max_pages:
-                raise ValidationError(
-                    "PAGE_LIMIT_EXCEEDED",
-                    f"Generated PDF exceeds {TEXT_TO_PDF_LIMITS.max_pages} pages.",
+            stage = "cache_lookup"
+            cache_key = self._content_cache_key(
+                "text_to_pdf",
+                tool.converter,
+                _canonical_digest(request.document.model_dump(mode="json")),
+                request.options.model_dump(mode="json"),
+            )
+            artifact_id = str(uuid.uuid4())
+            output = self._reuse_cached_output("text_to_pdf", cache_key)
+            if output is None:
+                stage = "convert"
+                result = tool.converter.convert(request)
+                stage = "validate_output_limits"
+                if result.page_count > TEXT_TO_PDF_LIMITS.max_pages:
+                    raise ValidationError(
+                        "PAGE_LIMIT_EXCEEDED",
+                        f"Generated PDF exceeds {TEXT_TO_PDF_LIMITS.max_pages} pages.",
+                    )
+                if len(result.bytes) > TEXT_TO_PDF_LIMITS.max_pdf_size_bytes:
+                    raise ValidationError("PDF_SIZE_EXCEEDED", "Generated PDF is too large.")
+
+                stage = "storage_put"
+                output = self._store_output(
+                    job,
+                    context,
+                    result,
+                    artifact_id=artifact_id,
+                    cache_key=cache_key,
+                    converter_version=tool.converter.version,
+                    metadata={"tool_key": "text_to_pdf"},
                 )
-            if len(result.bytes) > TEXT_TO_PDF_LIMITS.max_pdf_size_bytes:
-                raise ValidationError("PDF_SIZE_EXCEEDED", "Generated PDF is too large.")
 
-            artifact_id = str(uuid.uuid4())
             filename = self._filename(request.document.title)
-            storage_key = (
-                f"file-tools/{context.owner.storage_partition}/text_to_pdf/"
-                f"{job.id}/{artifact_id}.pdf"
-            )
-            digest = sha256_hex(result.bytes)
-            stage = "storage_put"
-            stored = self.storage.put_bytes(
-                storage_key,
-                result.bytes,
-                result.mime_type,
-                metadata={
-                    "tool_key": "text_to_pdf",
-                    "job_id": job.id,
-                    "artifact_id": artifact_id,
-                    "sha256": digest,
-                },
-            )
-
             stage = "artifact_create"
             expires_at = utc_now() + (
                 TEXT_TO_PDF_LIMITS.authenticated_retention
                 if context.owner.is_authenticated
                 else TEXT_TO_PDF_LIMITS.guest_retention
             )
-            artifact = self.repository.create_artifact(
-                job=job,
-                artifact_id=artifact_id,
-                filename=filename,
-                mime_type=result.mime_type,
-                size_bytes=stored.size_bytes,
-                sha256=digest,
-                storage_provider=stored.provider,
-                storage_key=stored.key,
-                expires_at=expires_at,
-                page_count=result.page_count,
-            )
+            artifact = self._create_artifact(job, output, artifact_id, filename, expires_at)
             duration_ms = int((time.perf_counter() - started) * 1000)
             stage = "job_succeeded"
-            self.repository.mark_job_succeeded(job.id, result.page_count, duration_ms)
+            self.repository.mark_job_succeeded(job.id, output.page_count, duration_ms)
             self.repository.record_event(
                 context.owner,
                 TEXT_PDF_GENERATED,
@@ -124,8 +133,9 @@ class ConversionOrchestrator:
                     "job_id": job.id,
                     "artifact_id": artifact.id,
                     "duration_ms": duration_ms,
-                    "page_count": result.page_count,
+                    "page_count": output.page_count,
                     "size_bytes": artifact.size_bytes,
+                    "cache_hit": output.cache_hit,
                 },
             )
             log_event(
@@ -135,8 +145,9 @@ class ConversionOrchestrator:
                 tool_key="text_to_pdf",
                 user_id_hash=hash_identifier(context.owner.owner_id),
                 duration_ms=duration_ms,
-                page_count=result.page_count,
+                page_count=output.page_count,
                 pdf_size=artifact.size_bytes,
+                cache_hit=output.cache_hit,
             )
             return self._generate_response(job.id, artifact, context.owner.token_subject)
         except FileToolError as exc:
@@ -215,54 +226,48 @@ class ConversionOrchestrator:
         self.repository.record_event(context.owner, FILE_TOOL_JOB_CREATED, "image_converter", {"job_id": job.id})
 
         try:
-            stage = "convert"
-            result = self._convert_with_timeout(tool.converter, request)
-            stage = "validate_output_limits"
-            if len(result.bytes) > IMAGE_CONVERSION_LIMITS.max_output_bytes:
-                raise ValidationError("IMAGE_OUTPUT_TOO_LARGE", "Converted image is too large.")
-
-            artifact_id = str(uuid.uuid4())
-            filename = self._image_filename(request.filename, result.extension)
-            storage_key = (
-                f"file-tools/{context.owner.storage_partition}/image_converter/"
-                f"{job.id}/{artifact_id}.{result.extension}"
-            )
-            digest = sha256_hex(result.bytes)
-            stage = "storage_put"
-            stored = self.storage.put_bytes(
-                storage_key,
-                result.bytes,
-                result.mime_type,
-                metadata={
-                    "tool_key": "image_converter",
-                    "job_id": job.id,
-                    "artifact_id": artifact_id,
-                    "sha256": digest,
-                    "output_format": request.output_format,
+            stage = "cache_lookup"
+            cache_key = self._content_cache_key(
+                "image_converter",
+                tool.converter,
+                sha256_hex(request.file_bytes),
+                {
+                    "outputFormat": request.output_format,
+                    "quality": request.quality,
+                    "background": request.background,
                 },
             )
+            artifact_id = str(uuid.uuid4())
+            output = self._reuse_cached_output("image_converter", cache_key)
+            if output is None:
+                stage = "convert"
+                result = self._convert_with_timeout(tool.converter, request)
+                stage = "validate_output_limits"
+                if len(result.bytes) > IMAGE_CONVERSION_LIMITS.max_output_bytes:
+                    raise ValidationError("IMAGE_OUTPUT_TOO_LARGE", "Converted image is too large.")
 
+                stage = "storage_put"
+                output = self._store_output(
+                    job,
+                    context,
+                    result,
+                    artifact_id=artifact_id,
+                    cache_key=cache_key,
+                    converter_version=tool.converter.version,
+                    metadata={"tool_key": "image_converter", "output_format": request.output_format},
+                )
+
+            filename = self._image_filename(request.filename, output.extension)
             stage = "artifact_create"
             expires_at = utc_now() + (
                 IMAGE_CONVERSION_LIMITS.authenticated_retention
                 if context.owner.is_authenticated
                 else IMAGE_CONVERSION_LIMITS.guest_retention
             )
-            artifact = self.repository.create_artifact(
-                job=job,
-                artifact_id=artifact_id,
-                filename=filename,
-                mime_type=result.mime_type,
-                size_bytes=stored.size_bytes,
-                sha256=digest,
-                storage_provider=stored.provider,
-                storage_key=stored.key,
-                expires_at=expires_at,
-                page_count=result.page_count,
-            )
+            artifact = self._create_artifact(job, output, artifact_id, filename, expires_at)
             duration_ms = int((time.perf_counter() - started) * 1000)
             stage = "job_succeeded"
-            self.repository.mark_job_succeeded(job.id, result.page_count, duration_ms)
+            self.repository.mark_job_succeeded(job.id, output.page_count, duration_ms)
             self.repository.record_event(
                 context.owner,
                 IMAGE_CONVERTED,
@@ -273,6 +278,7 @@ class ConversionOrchestrator:
                     "duration_ms": duration_ms,
                     "size_bytes": artifact.size_bytes,
                     "output_format": request.output_format,
+                    "cache_hit": output.cache_hit,
                 },
             )
             log_event(
@@ -284,6 +290,7 @@ class ConversionOrchestrator:
                 duration_ms=duration_ms,
                 output_format=request.output_format,
                 image_size=artifact.size_bytes,
+                cache_hit=output.cache_hit,
             )
             return self._generate_response(job.id, artifact, context.owner.token_subject)
         except FileToolError as exc:
@@ -336,6 +343,124 @@ class ConversionOrchestrator:
             )
             raise ConversionError("Image conversion failed.", "IMAGE_CONVERSION_FAILED") from exc
 
+    def _content_cache_key(self, tool_key: str, converter, input_sha256: str, options: dict) -> str | None:
+        if not content_cache_enabled():
+            return None
+        return content_cache_key(tool_key, getattr(converter, "version", "1"), input_sha256, options)
+
+    def _reuse_cached_output(self, tool_key: str, cache_key: str | None) -> StoredOutput | None:
+        if cache_key is None:
+            return None
+        try:
+            entry = self.repository.acquire_content_cache_entry(cache_key)
+        except Exception:
+            entry = None
+        record_content_cache_lookup(tool_key, hit=entry is not None, size_bytes=entry.size_bytes if entry else 0)
+        if entry is None:
+            return None
+        return StoredOutput(
+            mime_type=entry.mime_type,
+            extension=entry.extension,
+            size_bytes=entry.size_bytes,
+            sha256=entry.sha256,
+            page_count=entry.page_count,
+            storage_provider=entry.storage_provider,
+            storage_key=entry.storage_key,
+            cache_key=cache_key,
+            cache_hit=True,
+        )
+
+    def _store_output(
+        self,
+        job: FileToolJob,
+        context: RequestContext,
+        result: ConversionResult,
+        *,
+        artifact_id: str,
+        cache_key: str | None,
+        converter_version: str,
+        metadata: dict[str, str],
+    ) -> StoredOutput:
+        digest = sha256_hex(result.bytes)
+        if cache_key is None:
+            storage_key = (
+                f"file-tools/{context.owner.storage_partition}/{job.tool_key}/"
+                f"{job.id}/{artifact_id}.{result.extension}"
+            )
+        else:
+            # The random suffix keeps a re-upload after the last reference was
+            # released from racing the cleanup that deletes the old object.
+            storage_key = (
+                f"file-tools/cache/{job.tool_key}/{cache_key[:2]}/"
+                f"{cache_key}-{uuid.uuid4().hex[:12]}.{result.extension}"
+            )
+        stored = self.storage.put_bytes(
+            storage_key,
+            result.bytes,
+            result.mime_type,
+            metadata={**metadata, "job_id": job.id, "artifact_id": artifact_id, "sha256": digest},
+        )
+        registered = False
+        if cache_key is not None:
+            try:
+                registered = self.repository.register_content_cache_entry(
+                    ContentCacheEntry(
+                        cache_key=cache_key,
+                        tool_key=job.tool_key,
+                        converter_version=converter_version,
+                        mime_type=result.mime_type,
+                        extension=result.extension,
+                        size_bytes=stored.size_bytes,
+                        sha256=digest,
+                        page_count=result.page_count,
+                        storage_provider=stored.provider,
+                        storage_key=stored.key,
+                        ref_count=1,
+                    )
+                )
+            except Exception:
+                registered = False
+        return StoredOutput(
+            mime_type=result.mime_type,
+            extension=result.extension,
+            size_bytes=stored.size_bytes,
+            sha256=digest,
+            page_count=result.page_count,
+            storage_provider=stored.provider,
+            storage_key=stored.key,
+            cache_key=cache_key if registered else None,
+        )
+
+    def _create_artifact(
+        self,
+        job: FileToolJob,
+        output: StoredOutput,
+        artifact_id: str,
+        filename: str,
+        expires_at: datetime,
+    ) -> FileToolArtifact:
+        try:
+            return self.repository.create_artifact(
+                job=job,
+                artifact_id=artifact_id,
+                filename=filename,
+                mime_type=output.mime_type,
+                size_bytes=output.size_bytes,
+                sha256=output.sha256,
+                storage_provider=output.storage_provider,
+                storage_key=output.storage_key,
+                expires_at=expires_at,
+                page_count=output.page_count,
+            )
+        except Exception:
+            if output.cache_key is not None:
+                try:
+                    self.repository.release_content_cache_reference(output.storage_provider, output.storage_key)
+                except StorageError:
+                    # A leaked reference only keeps the cached object alive longer
+                    pass
+            raise
+
     def _convert_with_timeout(self, converter, request: ImageConvertRequest):
         executor = ThreadPoolExecutor(max_workers=1)
         future = executor.submit(converter.convert, request)
@@ -379,3 +504,11 @@ class ConversionOrchestrator:
             slug = "flowauxi-image"
         max_stem = max(1, IMAGE_CONVERSION_LIMITS.max_filename_length - len(extension) - 1)
         return f"{slug[:max_stem]}.{extension}"
+
+
+def content_cache_enabled() -> bool:
+    return os.getenv("FILE_TOOLS_CONTENT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def _canonical_digest(payload: dict) -> str:
+    return sha256_hex(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
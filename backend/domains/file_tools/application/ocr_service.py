@@ -10,11 +10,10 @@ import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from ..contracts.common import RequestContext
 from ..contracts.ocr import TOOL_KEY, OcrUploadRequest
-from ..converters.ocr.preprocessor import OcrPreprocessor
 from ..converters.ocr.tesseract_service import TesseractService
 from ..domain.entities import FileToolArtifact, FileToolJob
 from ..domain.enums import FileToolStatus
@@ -26,6 +25,9 @@ from ..infrastructure.repositories import FileToolsRepository, utc_now
 from ..infrastructure.storage.base import ArtifactStorage
 from ..validators.ocr_validator import OcrValidator, sanitize_ocr_filename
 
+if TYPE_CHECKING:
+    from ..converters.ocr.preprocessor import OcrPreprocessor
+
 
 class OcrService:
     def __init__(
@@ -41,9 +43,18 @@ class OcrService:
         self.storage = storage
         self.validator = validator or OcrValidator()
         self.queue = queue
-        self.preprocessor = preprocessor or OcrPreprocessor()
+        self._preprocessor = preprocessor
         self.engine = engine or TesseractService()
 
+    @property
+    def preprocessor(self) -> OcrPreprocessor:
+        # Pillow is only needed by the OCR worker, not the upload path
+        if self._preprocessor is None:
+            from ..converters.ocr.preprocessor import OcrPreprocessor
+
+            self._preprocessor = OcrPreprocessor()
+        return self._preprocessor
+
     def upload(self, files, form, context: RequestContext) -> dict[str, Any]:
         started = time.perf_counter()
         request = OcrUploadRequest.parse_or_raise(files, form)
@@ -3,26 +3,57 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from functools import cached_property
+from typing import Any, Callable
 
-from ..converters.image_converter.pillow_converter import PillowImageConverter
-from ..converters.text_to_pdf.reportlab_converter import ReportLabTextToPdfConverter
 from ..domain.policies import IMAGE_CONVERSION_LIMITS, OCR_LIMITS, TEXT_TO_PDF_LIMITS, VIDEO_CONVERSION_LIMITS
-from ..validators.image_converter_validator import ImageConverterValidator
-from ..validators.text_to_pdf_validator import TextToPdfValidator
+
+
+def _text_to_pdf_converter():
+    from ..converters.text_to_pdf.reportlab_converter import ReportLabTextToPdfConverter
+
+    return ReportLabTextToPdfConverter()
+
+
+def _text_to_pdf_validator():
+    from ..validators.text_to_pdf_validator import TextToPdfValidator
+
+    return TextToPdfValidator()
+
+
+def _image_converter():
+    from ..converters.image_converter.pillow_converter import PillowImageConverter
+
+    return PillowImageConverter()
+
+
+def _image_validator():
+    from ..validators.image_converter_validator import ImageConverterValidator
+
+    return ImageConverterValidator()
 
 
 @dataclass(frozen=True)
 class FileToolDefinition:
+    """Tool metadata; converter/validator (ReportLab, Pillow) are built on first use."""
+
     key: str
     name: str
     description: str
     category: str
     execution: str
-    converter: Any
-    validator: Any
+    converter_factory: Callable[[], Any] | None
+    validator_factory: Callable[[], Any] | None
     limits: dict[str, int]
 
+    @cached_property
+    def converter(self) -> Any:
+        return self.converter_factory() if self.converter_factory else None
+
+    @cached_property
+    def validator(self) -> Any:
+        return self.validator_factory() if self.validator_factory else None
+
 
 class ToolRegistry:
     def __init__(self):
@@ -33,8 +64,8 @@ class ToolRegistry:
                 description="Create a clean PDF from safe rich text blocks.",
                 category="convert",
                 execution="sync",
-                converter=ReportLabTextToPdfConverter(),
-                validator=TextToPdfValidator(),
+                converter_factory=_text_to_pdf_converter,
+                validator_factory=_text_to_pdf_validator,
                 limits={
                     "guestCharacters": TEXT_TO_PDF_LIMITS.guest_character_limit,
                     "authenticatedCharacters": TEXT_TO_PDF_LIMITS.authenticated_character_limit,
@@ -48,8 +79,8 @@ class ToolRegistry:
                 description="Convert images between JPG, PNG, WebP, and available modern formats.",
                 category="convert",
                 execution="sync",
-                converter=PillowImageConverter(),
-                validator=ImageConverterValidator(),
+                converter_factory=_image_converter,
+                validator_factory=_image_validator,
                 limits={
                     "guestMaxInputBytes": IMAGE_CONVERSION_LIMITS.guest_max_input_bytes,
                     "authenticatedMaxInputBytes": IMAGE_CONVERSION_LIMITS.authenticated_max_input_bytes,
@@ -65,8 +96,8 @@ class ToolRegistry:
                 description="Extract text from image documents with local Tesseract OCR.",
                 category="ai",
                 execution="async",
-                converter=None,
-                validator=None,
+                converter_factory=None,
+                validator_factory=None,
                 limits={
                     "guestMaxInputBytes": OCR_LIMITS.guest_max_input_bytes,
                     "authenticatedMaxInputBytes": OCR_LIMITS.authenticated_max_input_bytes,
@@ -81,8 +112,8 @@ class ToolRegistry:
                 description="Convert videos to mobile-friendly MP4 with H.264, AAC, and fast-start playback.",
                 category="convert",
                 execution="async",
-                converter=None,
-                validator=None,
+                converter_factory=None,
+                validator_factory=None,
                 limits={
                     "guestMaxInputBytes": VIDEO_CONVERSION_LIMITS.guest_max_input_bytes,
                     "authenticatedMaxInputBytes": VIDEO_CONVERSION_LIMITS.authenticated_max_input_bytes,
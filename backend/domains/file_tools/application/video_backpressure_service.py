@@ -96,11 +96,6 @@ return 1
         redis_url = os.getenv("REDIS_URL")
         if not redis_url:
             return None
-        try:
-            import redis
+        from connections import get_redis
 
-            client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
-            client.ping()
-            return client
-        except Exception:
-            return None
+        return get_redis("video_backpressure", url=redis_url, decode_responses=False)
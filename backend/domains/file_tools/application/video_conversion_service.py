@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import shutil
 import tempfile
 import time
@@ -11,8 +12,13 @@ from pathlib import Path
 
 from ..contracts.video_converter import TOOL_KEY, VideoConversionOptions
 from ..converters.video_converter.ffmpeg_service import FfmpegService
-from ..converters.video_converter.ffprobe_service import FfprobeService, output_is_faststart
-from ..converters.video_converter.processing_plan import build_processing_plan
+from ..converters.video_converter.ffprobe_service import FfprobeService, output_is_faststart, source_start_time
+from ..converters.video_converter.processing_plan import (
+    VideoProcessingPlan,
+    VideoSegment,
+    build_processing_plan,
+    plan_segments,
+)
 from ..domain.enums import FileToolStatus
 from ..domain.errors import ConversionError, FileToolError, ValidationError
 from ..domain.policies import VIDEO_CONVERSION_LIMITS
@@ -79,15 +85,19 @@ class VideoConversionService:
             stage = "planning"
             self._progress(job_id, stage, 8)
             plan = build_processing_plan(options, source_path, output_path)
+            segments = self._plan_segments(plan, probe)
 
             stage = "converting"
             self._progress(job_id, stage, 10)
-            self.ffmpeg.convert(
-                plan,
-                duration_ms=probe.duration_ms,
-                on_progress=lambda progress: self._conversion_progress(job_id, progress),
-                should_cancel=lambda: self.repository.is_cancellation_requested(job_id),
-            )
+            if len(segments) > 1:
+                self._convert_segmented(job_id, plan, probe, segments)
+            else:
+                self.ffmpeg.convert(
+                    plan,
+                    duration_ms=probe.duration_ms,
+                    on_progress=lambda progress: self._conversion_progress(job_id, progress),
+                    should_cancel=lambda: self.repository.is_cancellation_requested(job_id),
+                )
             self._raise_if_cancelled(job_id)
 
             stage = "validating"
@@ -178,6 +188,37 @@ class VideoConversionService:
         finally:
             shutil.rmtree(temp_root, ignore_errors=True)
 
+    def _plan_segments(self, plan: VideoProcessingPlan, probe) -> list[VideoSegment]:
+        options = plan.options
+        if not segmented_encoding_enabled() or segment_worker_count() < 2:
+            return []
+        # Trimmed jobs keep the single-pass command so their cut semantics stay identical.
+        if options.trim_start_seconds is not None or options.trim_end_seconds is not None:
+            return []
+        if not probe.duration_seconds or probe.duration_seconds < VIDEO_CONVERSION_LIMITS.segmented_min_duration_seconds:
+            return []
+        keyframes = self.ffprobe.keyframe_times(plan.input_path, start_time=source_start_time(probe))
+        return plan_segments(keyframes, probe.duration_seconds, VIDEO_CONVERSION_LIMITS.segment_target_seconds)
+
+    def _convert_segmented(self, job_id: str, plan: VideoProcessingPlan, probe, segments: list[VideoSegment]) -> None:
+        workers = segment_worker_count()
+        started = time.perf_counter()
+        log_event("video_conversion_segmented", job_id=job_id, segments=len(segments), workers=workers)
+        self.ffmpeg.convert_segmented(
+            plan,
+            segments,
+            include_audio=not plan.options.remove_audio and probe.audio_streams > 0,
+            workers=workers,
+            on_progress=lambda progress: self._conversion_progress(job_id, progress),
+            should_cancel=lambda: self.repository.is_cancellation_requested(job_id),
+        )
+        observe_video_histogram(
+            "file_tools_video_segmented_encode_seconds",
+            time.perf_counter() - started,
+            preset=plan.options.quality_preset,
+        )
+        increment_video_counter("file_tools_video_segments_total", len(segments), preset=plan.options.quality_preset)
+
     def _validate_probe(self, job, probe) -> None:
         if probe.video_streams != 1:
             raise ValidationError("UNSUPPORTED_VIDEO_STREAMS", "Video must contain exactly one video stream.")
@@ -281,6 +322,19 @@ class VideoConversionService:
             raise ConversionError("Video conversion was cancelled.", "VIDEO_CONVERSION_CANCELLED")
 
 
+def segmented_encoding_enabled() -> bool:
+    return os.getenv("FILE_TOOLS_VIDEO_SEGMENTED_ENCODING", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def segment_worker_count() -> int:
+    configured = os.getenv("FILE_TOOLS_VIDEO_SEGMENT_WORKERS")
+    try:
+        workers = int(configured) if configured else (os.cpu_count() or 1)
+    except ValueError:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, VIDEO_CONVERSION_LIMITS.max_segment_workers))
+
+
 def _thumbnail_second(duration_seconds: float | None) -> float:
     if not duration_seconds:
         return 0.1
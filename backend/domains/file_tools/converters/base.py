@@ -19,6 +19,7 @@ class ConversionResult:
 
 class Converter(ABC, Generic[InputT]):
     tool_key: str
+    version: str = "1"
 
     @abstractmethod
     def convert(self, request: InputT) -> ConversionResult:
@@ -5,6 +5,7 @@ from __future__ import annotations
 from io import BytesIO
 
 from PIL import Image, ImageOps
+from PIL import __version__ as PILLOW_VERSION
 
 from ...contracts.image_converter import ImageConvertRequest, default_quality_for
 from ...domain.errors import ConversionError, ValidationError
@@ -29,6 +30,9 @@ PIL_OUTPUT_FORMATS = {
 
 class PillowImageConverter:
     tool_key = "image_converter"
+    # Bump the trailing revision whenever conversion output changes; it is part
+    # of the content cache key, so old cached outputs stop matching.
+    version = f"pillow-{PILLOW_VERSION}:1"
 
     def convert(self, request: ImageConvertRequest) -> ConversionResult:
         try:
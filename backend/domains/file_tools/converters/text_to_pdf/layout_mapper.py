@@ -25,6 +25,12 @@ ALIGNMENTS = {
     "justify": TA_JUSTIFY,
 }
 
+# ParagraphStyle objects are immutable once built, so they are shared across
+# documents. Keys carry every option the style reads; fontSize and lineHeight
+# are client-controlled floats, so the cache is reset rather than left to grow.
+_STYLE_CACHE: dict[tuple, ParagraphStyle] = {}
+_STYLE_CACHE_MAX_ENTRIES = 512
+
 
 def get_page_size(options: TextPdfOptions) -> tuple[float, float]:
     size = PAGE_SIZES[options.pageSize]
@@ -48,15 +54,21 @@ def paragraph_style(
     text: str = "",
 ) -> ParagraphStyle:
     font_name = resolve_font_name(options.fontFamily, marks, text)
-    return ParagraphStyle(
-        name=f"Body-{font_name}-{align}",
-        fontName=font_name,
-        fontSize=options.fontSize,
-        leading=options.fontSize * options.lineHeight,
-        alignment=ALIGNMENTS.get(align or "left", TA_LEFT),
-        spaceAfter=options.fontSize * 0.65,
-        shaping=1 if requires_complex_shaping(text) else 0,
-    )
+    shaping = 1 if requires_complex_shaping(text) else 0
+    key = ("body", font_name, align, shaping, options.fontSize, options.lineHeight)
+    style = _STYLE_CACHE.get(key)
+    if style is None:
+        style = ParagraphStyle(
+            name=f"Body-{font_name}-{align}",
+            fontName=font_name,
+            fontSize=options.fontSize,
+            leading=options.fontSize * options.lineHeight,
+            alignment=ALIGNMENTS.get(align or "left", TA_LEFT),
+            spaceAfter=options.fontSize * 0.65,
+            shaping=shaping,
+        )
+        _cache_style(key, style)
+    return style
 
 
 def heading_style(
@@ -68,16 +80,48 @@ def heading_style(
     scale = {1: 1.85, 2: 1.45, 3: 1.2}.get(level, 1.2)
     font_name = resolve_font_name(options.fontFamily, [*(marks or []), "bold"], text)
     font_size = min(options.fontSize * scale, 36)
-    return ParagraphStyle(
-        name=f"Heading-{level}-{font_name}",
-        fontName=font_name,
-        fontSize=font_size,
-        leading=font_size * 1.22,
-        alignment=TA_LEFT,
-        spaceBefore=options.fontSize * 0.4,
-        spaceAfter=options.fontSize * 0.7,
-        shaping=1 if requires_complex_shaping(text) else 0,
-    )
+    shaping = 1 if requires_complex_shaping(text) else 0
+    key = ("heading", font_name, level, shaping, options.fontSize)
+    style = _STYLE_CACHE.get(key)
+    if style is None:
+        style = ParagraphStyle(
+            name=f"Heading-{level}-{font_name}",
+            fontName=font_name,
+            fontSize=font_size,
+            leading=font_size * 1.22,
+            alignment=TA_LEFT,
+            spaceBefore=options.fontSize * 0.4,
+            spaceAfter=options.fontSize * 0.7,
+            shaping=shaping,
+        )
+        _cache_style(key, style)
+    return style
+
+
+def chrome_style(options: TextPdfOptions, font_size: float, text: str = "") -> ParagraphStyle:
+    """Style for header/footer text, drawn at a smaller size than the body."""
+    font_name = resolve_font_name(options.fontFamily, None, text)
+    shaping = 1 if requires_complex_shaping(text) else 0
+    key = ("chrome", font_name, shaping, font_size)
+    style = _STYLE_CACHE.get(key)
+    if style is None:
+        style = ParagraphStyle(
+            name=f"Chrome-{font_name}",
+            fontName=font_name,
+            fontSize=font_size,
+            leading=font_size * 1.15,
+            alignment=TA_LEFT,
+            spaceAfter=font_size * 0.65,
+            shaping=shaping,
+        )
+        _cache_style(key, style)
+    return style
+
+
+def _cache_style(key: tuple, style: ParagraphStyle) -> None:
+    if len(_STYLE_CACHE) >= _STYLE_CACHE_MAX_ENTRIES:
+        _STYLE_CACHE.clear()
+    _STYLE_CACHE[key] = style
 
 
 def document_padding_for_chrome(options: TextPdfOptions) -> tuple[float, float]:
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from io import BytesIO
 
+from reportlab import Version as REPORTLAB_VERSION
 from reportlab.lib.colors import HexColor
 from reportlab.lib.units import inch
 from reportlab.pdfgen.canvas import Canvas
@@ -13,7 +14,14 @@ from ...contracts.text_to_pdf import HeadingBlock, ListBlock, PageBreakBlock, Pa
 from ...domain.errors import ConversionError
 from ..base import ConversionResult, Converter
 from .font_registry import PdfFontEngineError, assert_text_pdf_fonts_ready, resolve_font_name
-from .layout_mapper import document_padding_for_chrome, get_page_size, heading_style, paragraph_style, pdf_markup
+from .layout_mapper import (
+    chrome_style,
+    document_padding_for_chrome,
+    get_page_size,
+    heading_style,
+    paragraph_style,
+    pdf_markup,
+)
 
 
 class PageCountingCanvas(Canvas):
@@ -39,6 +47,9 @@ class PageCountingCanvas(Canvas):
 
 class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
     tool_key = "text_to_pdf"
+    # Bump the trailing revision whenever rendering output changes; it is part
+    # of the content cache key, so old cached PDFs stop matching.
+    version = f"reportlab-{REPORTLAB_VERSION}:1"
 
     def convert(self, request: TextPdfGenerateRequest) -> ConversionResult:
         try:
@@ -67,6 +78,8 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
 
         story = self._build_story(request)
         canvas_ref: dict[str, PageCountingCanvas] = {}
+        # Header text repeats on every page; build its markup once per document.
+        chrome_markup: dict[str, str] = {}
 
         def canvas_factory(*args, **kwargs):
             canvas = PageCountingCanvas(*args, **kwargs)
@@ -74,7 +87,7 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
             return canvas
 
         def draw_chrome(canvas: Canvas, _doc):
-            self._draw_header_footer(canvas, request, page_width, page_height)
+            self._draw_header_footer(canvas, request, page_width, page_height, chrome_markup)
 
         try:
             doc.build(
@@ -217,7 +230,15 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
             text = f"<u>{text}</u>"
         return text
 
-    def _draw_header_footer(self, canvas: Canvas, request: TextPdfGenerateRequest, page_width: float, page_height: float) -> None:
+    def _draw_header_footer(
+        self,
+        canvas: Canvas,
+        request: TextPdfGenerateRequest,
+        page_width: float,
+        page_height: float,
+        chrome_markup: dict[str, str] | None = None,
+    ) -> None:
+        chrome_markup = {} if chrome_markup is None else chrome_markup
         options = request.options
         canvas.saveState()
         canvas.setFillColor(HexColor("#111827"))
@@ -230,6 +251,7 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
                 canvas,
                 options.header.text[:160],
                 request,
+                chrome_markup,
                 options.margins.left,
                 y - 2,
                 page_width - options.margins.left - options.margins.right,
@@ -250,6 +272,7 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
                     canvas,
                     footer_text[:180],
                     request,
+                    chrome_markup,
                     options.margins.left,
                     y - 2,
                     page_width - options.margins.left - options.margins.right,
@@ -263,21 +286,17 @@ class ReportLabTextToPdfConverter(Converter[TextPdfGenerateRequest]):
         canvas: Canvas,
         text: str,
         request: TextPdfGenerateRequest,
+        chrome_markup: dict[str, str],
         x: float,
         y: float,
         width: float,
         font_size: float,
     ) -> None:
-        options = request.options.model_copy(
-            update={
-                "fontSize": font_size,
-                "lineHeight": 1.15,
-            }
-        )
-        paragraph = Paragraph(
-            pdf_markup(text, options),
-            paragraph_style(options, text=text),
-        )
+        options = request.options
+        markup = chrome_markup.get(text)
+        if markup is None:
+            markup = chrome_markup[text] = pdf_markup(text, options)
+        paragraph = Paragraph(markup, chrome_style(options, font_size, text))
         paragraph.wrapOn(canvas, width, font_size * 1.6)
         paragraph.drawOn(canvas, x, y)
 
@@ -9,12 +9,13 @@ import subprocess
 import tempfile
 import threading
 import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Callable
 
 from ...domain.errors import ConversionError
 from ...domain.policies import VIDEO_CONVERSION_LIMITS
-from .processing_plan import VideoProcessingPlan
+from .processing_plan import VideoProcessingPlan, VideoSegment
 from .progress_parser import parse_progress_block
 
 
@@ -49,9 +50,121 @@ class FfmpegService:
         args = plan.ffmpeg_args(self.binary)
         self._run_ffmpeg_progress(args, duration_ms=duration_ms, on_progress=on_progress, should_cancel=should_cancel)
 
+    def convert_segmented(
+        self,
+        plan: VideoProcessingPlan,
+        segments: list[VideoSegment],
+        *,
+        include_audio: bool,
+        workers: int,
+        on_progress: ProgressCallback,
+        should_cancel: CancelCallback,
+    ) -> None:
+        """Encode keyframe-aligned segments concurrently and stream-copy them together.
+
+        Each segment is its own ffmpeg process; the pool threads only supervise them.
+        Progress from every segment is folded into one job-level report, and a
+        cancellation (or any segment failing) terminates all running encodes.
+        """
+        if not segments:
+            raise ConversionError("Video conversion failed.", "VIDEO_CONVERSION_FAILED")
+        workers = max(1, min(workers, len(segments)))
+        encoder_threads = max(1, (os.cpu_count() or 1) // workers)
+        work_dir = plan.output_path.parent / "segments"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        segment_paths = [work_dir / f"segment-{segment.index:05d}.ts" for segment in segments]
+        audio_path = work_dir / "audio.m4a" if include_audio else None
+        tracker = _SegmentProgressTracker(segments)
+        abort = threading.Event()
+        throttled_cancel = _ThrottledCancel(should_cancel, VIDEO_CONVERSION_LIMITS.cancel_poll_interval_seconds)
+
+        def run_segment(segment: VideoSegment, output_path: Path) -> None:
+            self._run_ffmpeg_progress(
+                plan.segment_args(self.binary, segment, output_path, threads=encoder_threads),
+                duration_ms=segment.duration_ms,
+                on_progress=lambda progress: tracker.update(segment.index, progress),
+                should_cancel=abort.is_set,
+            )
+            tracker.complete(segment.index)
+
+        def run_audio(output_path: Path) -> None:
+            self._run_simple(
+                plan.audio_args(self.binary, output_path),
+                should_cancel=abort.is_set,
+                failure_message="Video audio encoding failed.",
+                failure_code="VIDEO_CONVERSION_FAILED",
+            )
+
+        try:
+            # Audio is one cheap pass over the whole file; starting it first keeps it
+            # off the critical path while the video segments saturate the pool.
+            with ThreadPoolExecutor(max_workers=workers + (1 if audio_path else 0), thread_name_prefix="ffmpeg-segment") as executor:
+                futures: list[Future] = []
+                if audio_path is not None:
+                    futures.append(executor.submit(run_audio, audio_path))
+                futures.extend(
+                    executor.submit(run_segment, segment, path)
+                    for segment, path in zip(segments, segment_paths)
+                )
+                try:
+                    self._supervise_segments(futures, tracker, on_progress=on_progress, should_cancel=throttled_cancel)
+                finally:
+                    abort.set()
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+            on_progress(tracker.snapshot())
+            list_path = work_dir / "segments.txt"
+            list_path.write_text("".join(f"file '{_concat_path(path)}'\n" for path in segment_paths), encoding="utf-8")
+            self._run_simple(
+                plan.concat_args(self.binary, list_path, audio_path),
+                should_cancel=throttled_cancel,
+                failure_message="Video segment concatenation failed.",
+                failure_code="VIDEO_CONVERSION_FAILED",
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
     def generate_still(self, args: list[str], should_cancel: CancelCallback) -> None:
         self._run_simple(args, should_cancel=should_cancel)
 
+    def _supervise_segments(
+        self,
+        futures: list[Future],
+        tracker: _SegmentProgressTracker,
+        *,
+        on_progress: ProgressCallback,
+        should_cancel: CancelCallback,
+    ) -> None:
+        started = time.monotonic()
+        last_emit = 0.0
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=VIDEO_CONVERSION_LIMITS.cancel_poll_interval_seconds,
+                return_when=FIRST_EXCEPTION,
+            )
+            if any(future.exception() is not None for future in done):
+                break
+            if should_cancel():
+                raise ConversionError("Video conversion was cancelled.", "VIDEO_CONVERSION_CANCELLED")
+            if time.monotonic() - started > VIDEO_CONVERSION_LIMITS.conversion_timeout_seconds:
+                raise ConversionError("Video conversion timed out.", "VIDEO_CONVERSION_TIMEOUT")
+            now = time.monotonic()
+            if pending and now - last_emit >= VIDEO_CONVERSION_LIMITS.progress_emit_interval_seconds:
+                on_progress(tracker.snapshot())
+                last_emit = now
+
+        errors = [future.exception() for future in futures if future.done() and future.exception() is not None]
+        if not errors:
+            return
+        # Sibling segments are aborted once one fails; surface the root cause rather
+        # than the cancellations it triggered.
+        for error in errors:
+            if not (isinstance(error, ConversionError) and error.code == "VIDEO_CONVERSION_CANCELLED"):
+                raise error
+        raise errors[0]
+
     def _run_ffmpeg_progress(
         self,
         args: list[str],
@@ -124,7 +237,14 @@ class FfmpegService:
                 if process.stdout:
                     process.stdout.close()
 
-    def _run_simple(self, args: list[str], *, should_cancel: CancelCallback) -> None:
+    def _run_simple(
+        self,
+        args: list[str],
+        *,
+        should_cancel: CancelCallback,
+        failure_message: str = "Video thumbnail generation failed.",
+        failure_code: str = "VIDEO_THUMBNAIL_FAILED",
+    ) -> None:
         with tempfile.TemporaryFile(mode="w+t", encoding="utf-8", errors="replace") as stderr_file:
             try:
                 process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=stderr_file, text=True)
@@ -138,7 +258,7 @@ class FfmpegService:
                     break
                 time.sleep(0.05)
             if process.returncode != 0:
-                raise ConversionError("Video thumbnail generation failed.", "VIDEO_THUMBNAIL_FAILED") from RuntimeError(_stderr_tail(stderr_file))
+                raise ConversionError(failure_message, failure_code) from RuntimeError(_stderr_tail(stderr_file))
 
     def _terminate(self, process: subprocess.Popen) -> None:
         if process.poll() is not None:
@@ -151,6 +271,74 @@ class FfmpegService:
             process.wait(timeout=5)
 
 
+class _SegmentProgressTracker:
+    def __init__(self, segments: list[VideoSegment]):
+        self._lock = threading.Lock()
+        self._durations = {segment.index: segment.duration_ms for segment in segments}
+        self._processed = {segment.index: 0 for segment in segments}
+        self._speeds: dict[int, float] = {}
+        self._completed: set[int] = set()
+        self.total_ms = sum(self._durations.values())
+
+    def update(self, index: int, progress: dict[str, object]) -> None:
+        processed = progress.get("processedMs")
+        speed = progress.get("speed")
+        with self._lock:
+            if isinstance(processed, int):
+                self._processed[index] = max(0, min(processed, self._durations[index]))
+            if isinstance(speed, (int, float)) and index not in self._completed:
+                self._speeds[index] = float(speed)
+
+    def complete(self, index: int) -> None:
+        with self._lock:
+            self._processed[index] = self._durations[index]
+            self._speeds.pop(index, None)
+            self._completed.add(index)
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            processed = sum(self._processed.values())
+            speed = sum(self._speeds.values()) or None
+            completed = len(self._completed)
+        percent = None
+        eta = None
+        if self.total_ms > 0:
+            percent = max(0.0, min(99.0, (processed / self.total_ms) * 100))
+            if speed:
+                eta = int(((self.total_ms - processed) / 1000) / max(speed, 0.01))
+        return {
+            "processedMs": processed,
+            "percent": percent,
+            "speed": speed,
+            "etaSeconds": eta,
+            "segmentsCompleted": completed,
+            "segmentsTotal": len(self._durations),
+        }
+
+
+class _ThrottledCancel:
+    """Rate-limits an expensive cancellation check (a repository read) and latches once true."""
+
+    def __init__(self, check: CancelCallback, interval_seconds: float):
+        self._check = check
+        self._interval = interval_seconds
+        self._last_checked = 0.0
+        self._cancelled = False
+
+    def __call__(self) -> bool:
+        if self._cancelled:
+            return True
+        now = time.monotonic()
+        if now - self._last_checked >= self._interval:
+            self._last_checked = now
+            self._cancelled = bool(self._check())
+        return self._cancelled
+
+
+def _concat_path(path: Path) -> str:
+    return str(path.resolve()).replace("'", "'\\''")
+
+
 def _read_stdout_lines(stream, lines: queue.Queue[str | None]) -> None:
     try:
         if stream is None:
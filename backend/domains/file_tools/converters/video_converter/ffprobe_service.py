@@ -87,6 +87,32 @@ class FfprobeService:
             raise ValidationError("INVALID_VIDEO_METADATA", "Video metadata could not be parsed.") from exc
         return normalize_probe(data)
 
+    def keyframe_times(self, path: str | Path, *, start_time: float = 0.0) -> list[float]:
+        """Return video keyframe timestamps relative to ``start_time``.
+
+        Reads packet flags only (no decoding). Any failure returns an empty list so
+        callers fall back to single-pass conversion.
+        """
+        args = [
+            self.binary,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(path),
+        ]
+        try:
+            result = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=120)
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return []
+        if result.returncode != 0:
+            return []
+        return parse_keyframe_times(result.stdout, start_time=start_time)
+
 
 def normalize_probe(data: dict[str, Any]) -> VideoProbeResult:
     streams = data.get("streams") or []
@@ -111,6 +137,24 @@ def normalize_probe(data: dict[str, Any]) -> VideoProbeResult:
     )
 
 
+def parse_keyframe_times(output: str, *, start_time: float = 0.0) -> list[float]:
+    times: set[float] = set()
+    for line in output.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or "K" not in parts[1]:
+            continue
+        pts = _float_or_none(parts[0])
+        if pts is None:
+            continue
+        times.add(round(max(0.0, pts - start_time), 3))
+    return sorted(times)
+
+
+def source_start_time(probe: VideoProbeResult) -> float:
+    fmt = probe.raw.get("format") or {}
+    return _float_or_none(fmt.get("start_time")) or 0.0
+
+
 def output_is_faststart(path: str | Path) -> bool:
     sample = Path(path).read_bytes()[:1024 * 1024]
     moov = sample.find(b"moov")
@@ -9,6 +9,21 @@ from ...contracts.video_converter import VideoConversionOptions
 from .presets import PRESETS, RESOLUTION_HEIGHTS
 
 
+@dataclass(frozen=True)
+class VideoSegment:
+    index: int
+    start_seconds: float
+    end_seconds: float
+
+    @property
+    def duration_seconds(self) -> float:
+        return max(0.0, self.end_seconds - self.start_seconds)
+
+    @property
+    def duration_ms(self) -> int:
+        return int(self.duration_seconds * 1000)
+
+
 @dataclass(frozen=True)
 class VideoProcessingPlan:
     options: VideoConversionOptions
@@ -24,34 +39,7 @@ class VideoProcessingPlan:
         if self.options.trim_end_seconds is not None:
             args.extend(["-to", _seconds(self.options.trim_end_seconds)])
 
-        video_filters = self._video_filters()
-        if video_filters:
-            args.extend(["-vf", ",".join(video_filters)])
-
-        args.extend([
-            "-map",
-            "0:v:0",
-            "-c:v",
-            "libx264",
-            "-preset",
-            preset.x264_preset,
-            "-crf",
-            str(preset.crf),
-            "-profile:v",
-            preset.profile,
-            "-pix_fmt",
-            "yuv420p",
-        ])
-
-        if preset.bframes is not None:
-            args.extend(["-bf", str(preset.bframes)])
-        if preset.maxrate:
-            args.extend(["-maxrate", preset.maxrate])
-        if preset.bufsize:
-            args.extend(["-bufsize", preset.bufsize])
-        if self.options.bitrate_kbps:
-            args.extend(["-b:v", f"{self.options.bitrate_kbps}k"])
-
+        args.extend(self._video_encoder_args())
         if self.options.remove_audio:
             args.append("-an")
         else:
@@ -71,6 +59,80 @@ class VideoProcessingPlan:
         ])
         return args
 
+    def segment_args(
+        self,
+        ffmpeg_binary: str,
+        segment: VideoSegment,
+        output_path: Path,
+        *,
+        threads: int | None = None,
+    ) -> list[str]:
+        args = [
+            ffmpeg_binary,
+            "-hide_banner",
+            "-y",
+            "-ss",
+            _seconds(segment.start_seconds),
+            "-i",
+            str(self.input_path),
+            "-t",
+            _seconds(segment.duration_seconds),
+        ]
+        args.extend(self._video_encoder_args())
+        if threads:
+            args.extend(["-threads", str(threads)])
+        args.extend([
+            "-an",
+            "-f",
+            "mpegts",
+            "-progress",
+            "pipe:1",
+            "-nostats",
+            str(output_path),
+        ])
+        return args
+
+    def audio_args(self, ffmpeg_binary: str, output_path: Path) -> list[str]:
+        preset = PRESETS[self.options.quality_preset]
+        args = [
+            ffmpeg_binary,
+            "-hide_banner",
+            "-y",
+            "-i",
+            str(self.input_path),
+            "-vn",
+            "-map",
+            "0:a:0",
+            "-c:a",
+            "aac",
+            "-b:a",
+            preset.audio_bitrate,
+            "-ac",
+            "2",
+        ]
+        if self.options.normalize_audio:
+            args.extend(["-af", "loudnorm=I=-16:TP=-1.5:LRA=11"])
+        args.append(str(output_path))
+        return args
+
+    def concat_args(self, ffmpeg_binary: str, list_path: Path, audio_path: Path | None) -> list[str]:
+        args = [ffmpeg_binary, "-hide_banner", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+        if audio_path is not None:
+            args.extend(["-i", str(audio_path)])
+        args.extend(["-map", "0:v:0"])
+        if audio_path is not None:
+            args.extend(["-map", "1:a:0"])
+        args.extend([
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            "-max_muxing_queue_size",
+            "1024",
+            str(self.output_path),
+        ])
+        return args
+
     def thumbnail_args(self, ffmpeg_binary: str, output_path: Path, at_seconds: float) -> list[str]:
         return [
             ffmpeg_binary,
@@ -87,6 +149,38 @@ class VideoProcessingPlan:
             str(output_path),
         ]
 
+    def _video_encoder_args(self) -> list[str]:
+        preset = PRESETS[self.options.quality_preset]
+        args: list[str] = []
+        video_filters = self._video_filters()
+        if video_filters:
+            args.extend(["-vf", ",".join(video_filters)])
+
+        args.extend([
+            "-map",
+            "0:v:0",
+            "-c:v",
+            "libx264",
+            "-preset",
+            preset.x264_preset,
+            "-crf",
+            str(preset.crf),
+            "-profile:v",
+            preset.profile,
+            "-pix_fmt",
+            "yuv420p",
+        ])
+
+        if preset.bframes is not None:
+            args.extend(["-bf", str(preset.bframes)])
+        if preset.maxrate:
+            args.extend(["-maxrate", preset.maxrate])
+        if preset.bufsize:
+            args.extend(["-bufsize", preset.bufsize])
+        if self.options.bitrate_kbps:
+            args.extend(["-b:v", f"{self.options.bitrate_kbps}k"])
+        return args
+
     def _video_filters(self) -> list[str]:
         filters: list[str] = []
         height = self._target_height()
@@ -113,6 +207,34 @@ def build_processing_plan(options: VideoConversionOptions, input_path: Path, out
     return VideoProcessingPlan(options=options, input_path=input_path, output_path=output_path)
 
 
+def plan_segments(
+    keyframe_seconds: list[float],
+    duration_seconds: float,
+    target_seconds: float,
+) -> list[VideoSegment]:
+    """Split the source into keyframe-aligned segments of roughly ``target_seconds``.
+
+    Cuts only ever land on keyframes so every segment decodes independently, and
+    a trailing remainder shorter than half the target is folded into the previous
+    segment instead of becoming its own tiny encode.
+    """
+    if duration_seconds <= 0 or target_seconds <= 0:
+        return []
+    cuts = [0.0]
+    min_tail = target_seconds / 2
+    for keyframe in sorted(keyframe_seconds):
+        if keyframe - cuts[-1] < target_seconds:
+            continue
+        if duration_seconds - keyframe < min_tail:
+            break
+        cuts.append(keyframe)
+    cuts.append(duration_seconds)
+    return [
+        VideoSegment(index=index, start_seconds=start, end_seconds=end)
+        for index, (start, end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
 def preset_payload() -> dict[str, object]:
     return {
         "qualityPresets": [
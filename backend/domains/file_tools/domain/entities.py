@@ -61,3 +61,18 @@ class FileToolArtifact:
     expires_at: datetime
     created_at: datetime
     download_count: int = 0
+
+
+@dataclass(frozen=True)
+class ContentCacheEntry:
+    cache_key: str
+    tool_key: str
+    converter_version: str
+    mime_type: str
+    extension: str
+    size_bytes: int
+    sha256: str
+    page_count: int
+    storage_provider: str
+    storage_key: str
+    ref_count: int
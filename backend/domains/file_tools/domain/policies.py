@@ -97,6 +97,10 @@ class VideoConversionLimits:
     max_filename_length: int = 180
     max_audio_streams: int = 16
     max_video_streams: int = 1
+    segmented_min_duration_seconds: int = 3 * 60
+    segment_target_seconds: int = 45
+    max_segment_workers: int = 8
+    cancel_poll_interval_seconds: float = 0.5
 
 
 VIDEO_CONVERSION_LIMITS = VideoConversionLimits()
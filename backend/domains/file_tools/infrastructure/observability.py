@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import threading
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass, field
@@ -39,6 +40,8 @@ class _InMemoryVideoMetrics:
 
 _memory_video_metrics = _InMemoryVideoMetrics()
 _video_prometheus: dict[str, Any] = {}
+_content_cache_lock = threading.Lock()
+_content_cache_lookups: dict[str, dict[str, int]] = {}
 
 
 def hash_identifier(value: Optional[str]) -> Optional[str]:
@@ -116,6 +119,32 @@ def video_metrics_snapshot() -> dict[str, Any]:
     }
 
 
+def record_content_cache_lookup(tool_key: str, *, hit: bool, size_bytes: int = 0) -> None:
+    result = "hit" if hit else "miss"
+    metric = _prometheus_metric("file_tools_content_cache_lookups_total", "counter", {"tool_key": tool_key, "result": result})
+    if metric is not None:
+        metric.labels(tool_key=tool_key, result=result).inc()
+    if hit and size_bytes:
+        saved = _prometheus_metric("file_tools_content_cache_bytes_reused_total", "counter", {"tool_key": tool_key})
+        if saved is not None:
+            saved.labels(tool_key=tool_key).inc(size_bytes)
+    with _content_cache_lock:
+        counts = _content_cache_lookups.setdefault(tool_key, {"hit": 0, "miss": 0, "bytesReused": 0})
+        counts[result] += 1
+        if hit:
+            counts["bytesReused"] += size_bytes
+
+
+def content_cache_metrics_snapshot() -> dict[str, Any]:
+    """Per-tool hit rate of the content-addressed conversion cache for this process."""
+    with _content_cache_lock:
+        snapshot = {tool_key: dict(counts) for tool_key, counts in _content_cache_lookups.items()}
+    for counts in snapshot.values():
+        total = counts["hit"] + counts["miss"]
+        counts["hitRate"] = round(counts["hit"] / total, 4) if total else 0.0
+    return snapshot
+
+
 def _prometheus_metric(name: str, kind: str, labels: dict[str, Any]) -> Any | None:
     if not _PROMETHEUS:
         return None
@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 import copy
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-from ..domain.entities import FileToolArtifact, FileToolJob, FileToolOwner
+from ..domain.entities import ContentCacheEntry, FileToolArtifact, FileToolJob, FileToolOwner
 from ..domain.enums import ExecutionMode, FileToolStatus, OwnerType
+from ..domain.errors import StorageError
+from .observability import log_failure
 
 
 def utc_now() -> datetime:
@@ -42,6 +45,8 @@ class FileToolsRepository:
     _memory_video_metadata: dict[str, dict[str, Any]] = {}
     _memory_video_outputs: dict[str, dict[str, Any]] = {}
     _memory_ocr_results: dict[str, dict[str, Any]] = {}
+    _memory_content_cache: dict[str, dict[str, Any]] = {}
+    _memory_content_cache_lock = threading.Lock()
 
     def __init__(self, supabase_client: Any | None = None):
         self._supabase = supabase_client
@@ -684,7 +689,101 @@ class FileToolsRepository:
                 pass
         self._memory_ocr_results.pop(job_id, None)
 
-    def cleanup_expired(self, now: datetime | None = None) -> list[FileToolArtifact]:
+    def acquire_content_cache_entry(self, cache_key: str) -> ContentCacheEntry | None:
+        """Take a reference on a live cache entry, or return None on a miss."""
+        if self._supabase is not None:
+            try:
+                result = self._supabase.rpc("file_tool_content_cache_acquire", {"p_cache_key": cache_key}).execute()
+                rows = result.data or []
+                return self._row_to_cache_entry(rows[0]) if rows else None
+            except Exception:
+                pass
+        with self._memory_content_cache_lock:
+            row = self._memory_content_cache.get(cache_key)
+            if not row or int(row.get("ref_count") or 0) <= 0:
+                return None
+            row["ref_count"] = int(row["ref_count"]) + 1
+            row["hit_count"] = int(row.get("hit_count") or 0) + 1
+            row["last_hit_at"] = _iso(utc_now())
+            return self._row_to_cache_entry(row)
+
+    def register_content_cache_entry(self, entry: ContentCacheEntry) -> bool:
+        """Insert a new entry holding one reference.
+
+        Returns False when another request registered the same key first; the
+        caller's stored object then stays a plain, uncached artifact.
+        """
+        now = _iso(utc_now())
+        row = {
+            "cache_key": entry.cache_key,
+            "tool_key": entry.tool_key,
+            "converter_version": entry.converter_version,
+            "mime_type": entry.mime_type,
+            "extension": entry.extension,
+            "size_bytes": entry.size_bytes,
+            "sha256": entry.sha256,
+            "page_count": entry.page_count,
+            "storage_provider": entry.storage_provider,
+            "storage_key": entry.storage_key,
+            "ref_count": 1,
+            "hit_count": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if self._supabase is not None:
+            if self._insert("file_tool_content_cache", row):
+                return True
+            if self._select_one("file_tool_content_cache", "cache_key", entry.cache_key):
+                return False
+        with self._memory_content_cache_lock:
+            existing = self._memory_content_cache.get(entry.cache_key)
+            if existing and int(existing.get("ref_count") or 0) > 0:
+                return False
+            self._memory_content_cache[entry.cache_key] = row
+            return True
+
+    def release_content_cache_reference(self, storage_provider: str, storage_key: str) -> int | None:
+        """Drop one reference for a stored object.
+
+        Returns the remaining reference count, or None when the object is not
+        owned by the content cache (so the caller deletes it as before).
+        Raises StorageError when the release could not be recorded: the
+        object may still be shared, so the caller must not delete it.
+        """
+        if self._supabase is not None:
+            try:
+                result = self._supabase.rpc(
+                    "file_tool_content_cache_release",
+                    {"p_storage_provider": storage_provider, "p_storage_key": storage_key},
+                ).execute()
+            except Exception as exc:
+                log_failure(
+                    "content_cache_release_failed",
+                    storage_provider=storage_provider,
+                    storage_key=storage_key,
+                    error=str(exc),
+                )
+                raise StorageError("Content cache release failed.") from exc
+            data = result.data
+            if isinstance(data, list):
+                data = data[0] if data else None
+            if isinstance(data, dict):
+                data = next(iter(data.values()), None)
+            return int(data) if data is not None else None
+        with self._memory_content_cache_lock:
+            for cache_key, row in list(self._memory_content_cache.items()):
+                if row.get("storage_provider") != storage_provider or row.get("storage_key") != storage_key:
+                    continue
+                remaining = max(0, int(row.get("ref_count") or 0) - 1)
+                row["ref_count"] = remaining
+                row["updated_at"] = _iso(utc_now())
+                if remaining == 0:
+                    self._memory_content_cache.pop(cache_key, None)
+                return remaining
+        return None
+
+    def list_expired_artifacts(self, now: datetime | None = None) -> list[FileToolArtifact]:
+        """Expired artifacts; rows stay until delete_artifact is called."""
         now = now or utc_now()
         expired: list[FileToolArtifact] = []
         if self._supabase is not None:
@@ -698,22 +797,24 @@ class FileToolsRepository:
                 )
                 for row in result.data or []:
                     expired.append(self._row_to_artifact(row))
-                if expired:
-                    ids = [artifact.id for artifact in expired]
-                    self._supabase.table("file_tool_artifacts").delete().in_("id", ids).execute()
             except Exception:
                 expired = []
 
         if not expired:
-            to_delete = []
-            for artifact_id, row in self._memory_artifacts.items():
+            for row in self._memory_artifacts.values():
                 if _parse_dt(row.get("retention_expires_at")) < now:
                     expired.append(self._row_to_artifact(row))
-                    to_delete.append(artifact_id)
-            for artifact_id in to_delete:
-                self._memory_artifacts.pop(artifact_id, None)
         return expired
 
+    def delete_artifact(self, artifact_id: str) -> None:
+        self._memory_artifacts.pop(artifact_id, None)
+        if self._supabase is None:
+            return
+        try:
+            self._supabase.table("file_tool_artifacts").delete().eq("id", artifact_id).execute()
+        except Exception as exc:
+            log_failure("file_tools.artifact_delete_failed", artifact_id=artifact_id, error=str(exc))
+
     def _insert(self, table: str, row: dict[str, Any]) -> bool:
         if self._supabase is None:
             return False
@@ -784,6 +885,21 @@ class FileToolsRepository:
             error_message=row.get("error_message"),
         )
 
+    def _row_to_cache_entry(self, row: dict[str, Any]) -> ContentCacheEntry:
+        return ContentCacheEntry(
+            cache_key=row["cache_key"],
+            tool_key=row["tool_key"],
+            converter_version=row.get("converter_version") or "",
+            mime_type=row["mime_type"],
+            extension=row.get("extension") or "",
+            size_bytes=int(row.get("size_bytes") or 0),
+            sha256=row.get("sha256") or "",
+            page_count=int(row.get("page_count") or 1),
+            storage_provider=row["storage_provider"],
+            storage_key=row["storage_key"],
+            ref_count=int(row.get("ref_count") or 0),
+        )
+
     def _row_to_artifact(self, row: dict[str, Any]) -> FileToolArtifact:
         return FileToolArtifact(
             id=row["id"],
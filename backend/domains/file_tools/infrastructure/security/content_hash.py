@@ -3,7 +3,25 @@
 from __future__ import annotations
 
 import hashlib
+import json
+from typing import Any
 
 
 def sha256_hex(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
+
+
+def content_cache_key(
+    tool_key: str,
+    converter_version: str,
+    input_sha256: str,
+    options: dict[str, Any],
+) -> str:
+    """Key for the content-addressed conversion cache.
+
+    Options are serialized canonically (sorted keys, no whitespace) so the same
+    logical request always hashes the same regardless of client field order.
+    """
+    canonical_options = json.dumps(options, sort_keys=True, separators=(",", ":"), default=str)
+    material = "\n".join([tool_key, converter_version, input_sha256, canonical_options])
+    return sha256_hex(material.encode("utf-8"))
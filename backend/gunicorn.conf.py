@@ -3,6 +3,7 @@ Gunicorn Configuration for Production WhatsApp Chatbot API.
 Optimized for high-performance async I/O with gevent.
 """
 
+import gc
 import os
 import multiprocessing
 
@@ -36,6 +37,15 @@ worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50  # Randomize to prevent thundering herd
 
+# Import the app once in the master and fork workers from it. Recycled
+# workers then start in milliseconds instead of re-importing every route,
+# SDK and service, and unchanged pages are shared copy-on-write.
+# Set GUNICORN_PRELOAD=false to import per worker (e.g. for --reload).
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+if preload_app:
+    # Background threads don't survive fork(); post_fork starts them per worker
+    os.environ.setdefault("APP_DEFER_BACKGROUND_WORKERS", "true")
+
 # =============================================================================
 # Timeouts
 # =============================================================================
@@ -98,6 +108,8 @@ def on_reload(server):
 
 def when_ready(server):
     """Called just after the server is started."""
+    if preload_app:
+        _prepare_master_for_fork()
     print(f"✅ Gunicorn server ready on {bind}")
     print(f"   Workers: {workers} × gevent")
     print(f"   Max connections per worker: {worker_connections}")
@@ -120,6 +132,9 @@ def pre_fork(server, worker):
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
+    if preload_app:
+        from app import start_background_workers
+        start_background_workers()
     print(f"👷 Worker {worker.pid} spawned")
 
 
@@ -142,3 +157,16 @@ def nworkers_changed(server, new_value, old_value):
     """Called when number of workers changes."""
     print(f"📊 Workers changed: {old_value} → {new_value}")
 
+
+def _prepare_master_for_fork():
+    """Copy-on-write friendly master: no shared sockets, no GC page writes."""
+    try:
+        from connections import prepare_for_fork
+        prepare_for_fork()
+    except Exception as e:
+        print(f"⚠️ Pre-fork connection cleanup skipped: {e}")
+    # Move everything imported so far into the permanent generation so the
+    # collector in each worker never touches (and un-shares) those pages.
+    gc.collect()
+    gc.freeze()
+    print(f"🧊 Preloaded app frozen for fork ({gc.get_freeze_count()} objects)")
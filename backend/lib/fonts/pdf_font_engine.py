@@ -120,9 +120,14 @@ AUTO_FONT_FAMILY = "Auto"
 _REGISTERED_FONTS: dict[tuple[str, str, str], str] = {}
 _REGISTERED_FONT_PATHS: dict[str, Path] = {}
 _CMAP_CACHE: dict[Path, set[int]] = {}
+_SHAPING_STACK_READY = False
 
 
 def assert_shaping_stack_available() -> None:
+    global _SHAPING_STACK_READY
+    if _SHAPING_STACK_READY:
+        return
+
     if _version_tuple(reportlab.Version) < (4, 4, 4):
         raise PdfFontEngineError(
             "PDF_SHAPING_UNAVAILABLE",
@@ -142,6 +147,7 @@ def assert_shaping_stack_available() -> None:
                 f"in the active backend Python: {sys.executable}."
             ),
         ) from exc
+    _SHAPING_STACK_READY = True
 
 
 def assert_fonttools_available() -> None:
@@ -194,7 +200,8 @@ def build_reportlab_markup(
 
 def preflight_texts(requested_family: str, texts: Iterable[str]) -> None:
     values = [value for value in texts if value]
-    if any(requires_complex_shaping(value) for value in values):
+    shaping_flags = [requires_complex_shaping(value) for value in values]
+    if any(shaping_flags):
         assert_shaping_stack_available()
 
     needs_glyph_preflight = any(
@@ -204,8 +211,7 @@ def preflight_texts(requested_family: str, texts: Iterable[str]) -> None:
     if needs_glyph_preflight:
         assert_fonttools_available()
 
-    for value in values:
-        value_requires_shaping = requires_complex_shaping(value)
+    for value, value_requires_shaping in zip(values, shaping_flags):
         for run in segment_script_runs(value):
             if not run.text.strip():
                 continue
@@ -244,13 +250,15 @@ def _register_noto_font(family: str, weight: str, shapable: bool) -> str:
     if not spec:
         raise PdfFontEngineError("FONT_NOT_REGISTERED", f"Unknown PDF font family: {family}.")
 
-    if shapable:
-        assert_shaping_stack_available()
-
+    # Fonts are registered once per process; later requests resolve the alias
+    # without touching the font file or re-checking the shaping stack.
     cache_key = (family, weight, "shaped" if shapable else "plain")
     if cache_key in _REGISTERED_FONTS:
         return _REGISTERED_FONTS[cache_key]
 
+    if shapable:
+        assert_shaping_stack_available()
+
     font_path = _resolve_font_path(spec, weight)
     alias = f"Flowauxi{family}{weight.title()}{'Shaped' if shapable else ''}"
 
@@ -322,7 +330,7 @@ def _font_directories() -> list[Path]:
 
 def _assert_glyph_coverage(font_name: str, font_path: Path, text: str) -> None:
     cmap = _font_cmap(font_path)
-    for char in text:
+    for char in dict.fromkeys(text):
         if char.isspace():
             continue
         script = script_for_char(char)
@@ -353,13 +361,10 @@ def _font_cmap(font_path: Path) -> set[int]:
 
 
 def _core_font_safe(text: str) -> bool:
-    for char in text:
-        if char in {"\n", "\r", "\t"}:
-            continue
-        try:
-            char.encode("cp1252")
-        except UnicodeEncodeError:
-            return False
+    try:
+        text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
     return True
 
 
@@ -46,16 +46,13 @@ class OTPRateLimiter:
     def _init_redis(self):
         """Initialize Redis connection if not provided."""
         if self.redis is None:
-            try:
-                import os
-                import redis
-                redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-                self.redis = redis.from_url(redis_url)
-                self.redis.ping()
+            from connections import get_redis
+
+            self.redis = get_redis("otp_rate_limiter", decode_responses=False)
+            if self.redis is not None:
                 logger.info("OTP Rate limiter connected to Redis")
-            except Exception as e:
-                logger.warning(f"Redis not available for rate limiting: {e}")
-                self.redis = None
+            else:
+                logger.warning("Redis not available for rate limiting")
     
     def _get_supabase(self):
         """Get Supabase client lazily."""
@@ -43,13 +43,13 @@ class RateLimiter:
         # Try to connect to Redis
         redis_url = redis_url or os.getenv('REDIS_URL')
         if redis_url and REDIS_AVAILABLE:
-            try:
-                self.redis_client = redis.from_url(redis_url)
-                self.redis_client.ping()
+            from connections import get_redis
+
+            self.redis_client = get_redis("rate_limiter", url=redis_url, decode_responses=False)
+            if self.redis_client is not None:
                 print("✅ Rate limiter connected to Redis")
-            except Exception as e:
-                print(f"⚠️ Redis connection failed, using in-memory: {e}")
-                self.redis_client = None
+            else:
+                print("⚠️ Redis connection failed, using in-memory")
         else:
             print("⚠️ Rate limiter using in-memory storage (not suitable for production)")
     
@@ -0,0 +1,99 @@
+-- Content-addressed conversion cache for File Tools.
+--
+-- Identical inputs (same bytes, same normalized options, same converter
+-- version) share one stored output. Each artifact that points at a cached
+-- object holds one reference; the object is only deleted from storage once
+-- the last referencing artifact expires.
+
+CREATE TABLE IF NOT EXISTS public.file_tool_content_cache (
+    cache_key TEXT PRIMARY KEY,
+    tool_key TEXT NOT NULL,
+    converter_version TEXT NOT NULL,
+    mime_type TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    sha256 TEXT NOT NULL,
+    page_count INTEGER NOT NULL DEFAULT 1,
+    storage_provider TEXT NOT NULL,
+    storage_key TEXT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 1 CHECK (ref_count >= 0),
+    hit_count BIGINT NOT NULL DEFAULT 0,
+    last_hit_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_file_tool_content_cache_storage_key
+    ON public.file_tool_content_cache (storage_provider, storage_key);
+
+-- Cached objects are shared by several artifacts, so the storage key is no
+-- longer unique per artifact.
+DROP INDEX IF EXISTS public.idx_file_tool_artifacts_storage_key;
+CREATE INDEX IF NOT EXISTS idx_file_tool_artifacts_storage_key
+    ON public.file_tool_artifacts (storage_provider, storage_key);
+
+ALTER TABLE public.file_tool_content_cache ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS file_tool_content_cache_service_role ON public.file_tool_content_cache;
+CREATE POLICY file_tool_content_cache_service_role ON public.file_tool_content_cache
+    FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+-- Take a reference on a live cache entry. Entries whose last reference was
+-- released are gone, so a hit can never resurrect an object being deleted.
+CREATE OR REPLACE FUNCTION public.file_tool_content_cache_acquire(p_cache_key TEXT)
+RETURNS SETOF public.file_tool_content_cache
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    UPDATE public.file_tool_content_cache
+    SET ref_count = ref_count + 1,
+        hit_count = hit_count + 1,
+        last_hit_at = NOW(),
+        updated_at = NOW()
+    WHERE cache_key = p_cache_key
+      AND ref_count > 0
+    RETURNING *;
+$$;
+
+-- Drop one reference for a storage object. Returns the remaining reference
+-- count, or NULL when the object is not a cached object. The entry row is
+-- removed in the same statement that takes the count to zero.
+CREATE OR REPLACE FUNCTION public.file_tool_content_cache_release(
+    p_storage_provider TEXT,
+    p_storage_key TEXT
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_remaining INTEGER;
+BEGIN
+    UPDATE public.file_tool_content_cache
+    SET ref_count = GREATEST(ref_count - 1, 0),
+        updated_at = NOW()
+    WHERE storage_provider = p_storage_provider
+      AND storage_key = p_storage_key
+    RETURNING ref_count INTO v_remaining;
+
+    IF v_remaining IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    IF v_remaining = 0 THEN
+        DELETE FROM public.file_tool_content_cache
+        WHERE storage_provider = p_storage_provider
+          AND storage_key = p_storage_key
+          AND ref_count = 0;
+    END IF;
+
+    RETURN v_remaining;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.file_tool_content_cache_acquire(TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.file_tool_content_cache_release(TEXT, TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.file_tool_content_cache_acquire(TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION public.file_tool_content_cache_release(TEXT, TEXT) TO service_role;
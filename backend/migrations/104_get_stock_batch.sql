@@ -0,0 +1,110 @@
+-- ============================================
+-- BATCHED STOCK LOOKUP
+-- Migration: 104_get_stock_batch.sql
+--
+-- Resolves every (product, variant, size) tuple of a cart in ONE round-trip:
+-- raw stock, active reservations, product/variant name and the Showcase
+-- fallback. Replaces the per-item product/variant/showcase/reservation
+-- queries made by InventoryService.validate_stock and validate_and_reserve.
+--
+-- Read-only (STABLE); reservation itself still goes through
+-- reserve_stock_batch.
+-- ============================================
+
+-- Active-reservation sums are filtered by (user_id, product_id, status)
+CREATE INDEX IF NOT EXISTS idx_reservations_user_product_active
+    ON stock_reservations (user_id, product_id, variant_id, size)
+    WHERE status = 'reserved';
+
+CREATE OR REPLACE FUNCTION get_stock_batch(
+    p_user_id TEXT,
+    p_items JSONB  -- Array of {product_id, variant_id, size}
+)
+RETURNS JSONB AS $$
+    WITH req AS (
+        SELECT
+            (t.ord - 1)::int AS idx,
+            t.item->>'product_id' AS product_id,
+            NULLIF(t.item->>'variant_id', '') AS variant_id,
+            NULLIF(t.item->>'size', '') AS size
+        FROM jsonb_array_elements(p_items) WITH ORDINALITY AS t(item, ord)
+    ),
+    typed AS (
+        -- Malformed ids resolve to "not found" instead of failing the batch
+        SELECT
+            req.*,
+            CASE WHEN product_id ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+                 THEN product_id::uuid END AS product_uuid,
+            CASE WHEN variant_id ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+                 THEN variant_id::uuid END AS variant_uuid
+        FROM req
+    ),
+    resolved AS (
+        SELECT
+            r.idx,
+            r.product_uuid,
+            p.id IS NOT NULL AS in_products,
+            CASE WHEN r.variant_id IS NOT NULL THEN v.id IS NOT NULL ELSE p.id IS NOT NULL END AS found,
+            CASE
+                WHEN r.variant_id IS NOT NULL AND r.size IS NOT NULL THEN
+                    CASE WHEN (v.size_stocks->>r.size) ~ '^-?[0-9]+$' THEN (v.size_stocks->>r.size)::int ELSE 0 END
+                WHEN r.variant_id IS NOT NULL THEN COALESCE(v.stock_quantity, 0)
+                WHEN r.size IS NOT NULL THEN
+                    CASE WHEN (p.size_stocks->>r.size) ~ '^-?[0-9]+$' THEN (p.size_stocks->>r.size)::int ELSE 0 END
+                ELSE COALESCE(p.stock_quantity, 0)
+            END AS available,
+            CASE WHEN r.variant_id IS NOT NULL THEN vp.name ELSE p.name END AS name
+        FROM typed r
+        LEFT JOIN products p ON p.id = r.product_uuid AND p.user_id = p_user_id
+        LEFT JOIN product_variants v ON v.id = r.variant_uuid AND v.user_id = p_user_id
+        LEFT JOIN products vp ON vp.id = v.product_id
+    ),
+    reserved AS (
+        SELECT r.idx, COALESCE(SUM(sr.quantity), 0)::int AS reserved
+        FROM typed r
+        JOIN stock_reservations sr
+          ON sr.user_id = p_user_id
+         AND sr.product_id = r.product_uuid
+         AND (r.variant_uuid IS NULL OR sr.variant_id = r.variant_uuid)
+         AND (r.size IS NULL OR sr.size = r.size)
+         AND sr.status = 'reserved'
+        GROUP BY r.idx
+    ),
+    showcase AS (
+        -- Showcase checkout items live in showcase_items, not products
+        SELECT
+            r.idx,
+            s.title,
+            CASE
+                WHEN s.commerce->'inventory'->>'status' = 'out_of_stock' THEN 0
+                WHEN (s.commerce->'inventory'->>'quantity') ~ '^-?[0-9]+$'
+                    THEN (s.commerce->'inventory'->>'quantity')::int
+                ELSE 0
+            END AS available
+        FROM resolved r
+        JOIN showcase_items s ON s.id = r.product_uuid
+        WHERE NOT r.in_products
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'idx', r.idx,
+                'in_products', r.in_products,
+                'found', r.found,
+                'name', r.name,
+                'available', r.available,
+                'reserved', CASE WHEN r.found THEN COALESCE(rs.reserved, 0) ELSE 0 END,
+                'showcase_found', sc.idx IS NOT NULL,
+                'showcase_name', sc.title,
+                'showcase_available', COALESCE(sc.available, 0)
+            )
+            ORDER BY r.idx
+        ),
+        '[]'::jsonb
+    )
+    FROM resolved r
+    LEFT JOIN reserved rs ON rs.idx = r.idx
+    LEFT JOIN showcase sc ON sc.idx = r.idx;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION get_stock_batch(TEXT, JSONB) TO service_role;
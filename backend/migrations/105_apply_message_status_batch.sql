@@ -0,0 +1,102 @@
+-- ============================================
+-- BATCHED MESSAGE STATUS INGESTION
+-- Migration: 105_apply_message_status_batch.sql
+--
+-- Applies a batch of WhatsApp delivery receipts in ONE round-trip:
+--   1. UPDATE whatsapp_messages ... FROM (batch) by wamid
+--   2. Resolve tenant (business_id → connected_business_managers.user_id)
+--      in the same statement
+--   3. Fold delivered/read/failed increments into analytics_daily
+--
+-- Replaces the per-receipt UPDATE + 2 SELECTs + analytics SELECT/UPDATE
+-- made by supabase_client.update_message_status (5 round-trips each).
+--
+-- Status is monotonic: pending < sent < delivered < read, failed terminal.
+-- A late "delivered" never overwrites "read", and only real transitions
+-- are counted, so redelivered receipts don't double-count analytics.
+-- ============================================
+
+-- Receipts look messages up by wamid
+CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_wamid
+    ON whatsapp_messages (wamid);
+
+CREATE OR REPLACE FUNCTION message_status_rank(p_status TEXT)
+RETURNS INT AS $$
+    SELECT CASE lower(coalesce(p_status, ''))
+        WHEN 'pending' THEN 0
+        WHEN 'sent' THEN 1
+        WHEN 'delivered' THEN 2
+        WHEN 'read' THEN 3
+        WHEN 'failed' THEN 4
+        ELSE 0
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION apply_message_status_batch(
+    p_updates JSONB  -- Array of {wamid, status, ts}
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_updated INT := 0;
+    v_analytics INT := 0;
+BEGIN
+    WITH batch AS (
+        -- One row per wamid: the most advanced status in this batch wins
+        SELECT DISTINCT ON (b.wamid)
+            b.wamid,
+            lower(b.status) AS status,
+            message_status_rank(b.status) AS status_rank,
+            b.ts
+        FROM jsonb_to_recordset(p_updates) AS b(wamid TEXT, status TEXT, ts TIMESTAMPTZ)
+        WHERE b.wamid IS NOT NULL AND b.status IS NOT NULL
+        ORDER BY b.wamid, message_status_rank(b.status) DESC, b.ts DESC NULLS LAST
+    ),
+    previous AS (
+        SELECT m.id, message_status_rank(m.status) AS old_rank
+        FROM whatsapp_messages m
+        JOIN batch ON batch.wamid = m.wamid
+        FOR UPDATE OF m
+    ),
+    changed AS (
+        UPDATE whatsapp_messages m
+        SET status = batch.status,
+            status_updated_at = COALESCE(batch.ts, now())
+        FROM batch, previous
+        WHERE m.wamid = batch.wamid
+          AND previous.id = m.id
+          AND batch.status_rank > previous.old_rank
+        RETURNING m.business_id, previous.old_rank, batch.status_rank
+    ),
+    increments AS (
+        SELECT
+            bm.user_id,
+            CURRENT_DATE AS day,
+            -- A read that skipped "delivered" still counts as delivered
+            COUNT(*) FILTER (WHERE c.old_rank < 2 AND c.status_rank IN (2, 3))::int AS delivered_count,
+            COUNT(*) FILTER (WHERE c.status_rank = 3)::int AS read_count,
+            COUNT(*) FILTER (WHERE c.status_rank = 4)::int AS failed_count
+        FROM changed c
+        JOIN connected_business_managers bm ON bm.id = c.business_id
+        WHERE bm.user_id IS NOT NULL
+        GROUP BY bm.user_id
+    ),
+    upserted AS (
+        INSERT INTO analytics_daily (user_id, date, messages_delivered, messages_read, messages_failed)
+        SELECT user_id, day, delivered_count, read_count, failed_count
+        FROM increments
+        WHERE delivered_count + read_count + failed_count > 0
+        ON CONFLICT (user_id, date) DO UPDATE SET
+            messages_delivered = COALESCE(analytics_daily.messages_delivered, 0) + EXCLUDED.messages_delivered,
+            messages_read = COALESCE(analytics_daily.messages_read, 0) + EXCLUDED.messages_read,
+            messages_failed = COALESCE(analytics_daily.messages_failed, 0) + EXCLUDED.messages_failed,
+            updated_at = now()
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM changed), (SELECT COUNT(*) FROM upserted)
+    INTO v_updated, v_analytics;
+
+    RETURN jsonb_build_object('updated', v_updated, 'analytics_rows', v_analytics);
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION apply_message_status_batch(JSONB) TO service_role;
@@ -0,0 +1,36 @@
+-- ============================================
+-- BATCHED AUTOMATION RULE TRIGGER COUNTS
+-- Migration: 106_increment_rule_triggers_batch.sql
+--
+-- RuleEngine buffers rule matches in memory and flushes them every few
+-- seconds as one batch of {rule_id, count, last_triggered_at}, instead of
+-- one increment_rule_trigger RPC per matched inbound message.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION increment_rule_triggers_batch(
+    p_counts JSONB  -- Array of {rule_id, count, last_triggered_at}
+)
+RETURNS INT AS $$
+DECLARE
+    v_updated INT := 0;
+BEGIN
+    UPDATE automation_rules r
+    SET trigger_count = COALESCE(r.trigger_count, 0) + b.count,
+        last_triggered_at = GREATEST(
+            COALESCE(r.last_triggered_at, b.last_triggered_at),
+            b.last_triggered_at
+        )
+    FROM (
+        SELECT rule_id, SUM(count)::INT AS count, MAX(last_triggered_at) AS last_triggered_at
+        FROM jsonb_to_recordset(p_counts)
+            AS x(rule_id UUID, count INT, last_triggered_at TIMESTAMPTZ)
+        GROUP BY rule_id
+    ) b
+    WHERE r.id = b.rule_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION increment_rule_triggers_batch(JSONB) TO service_role;
@@ -0,0 +1,156 @@
+-- ============================================
+-- SET-BASED SUBSCRIPTION PROJECTION
+-- Migration: 107_subscription_projection_batch.sql
+--
+-- The projector used to take pg_advisory_xact_lock in one RPC and run
+-- one subscriptions UPDATE per subscription in separate requests, so the
+-- "lock" was released before the update ran, and the checkpoint was
+-- advanced in yet another request.
+--
+--   1. fetch_subscription_events_shard: next events of one shard
+--      (hash of subscription_id), so several projectors can run
+--   2. apply_subscription_projection: ONE transaction that
+--        - locks the projector's checkpoint row (fences other instances
+--          of the same shard: a stale expected checkpoint is rejected)
+--        - applies every projected state with one UPDATE ... FROM
+--        - advances the checkpoint and lag
+--   3. NOTIFY subscription_events after each INSERT statement so the
+--      daemon wakes immediately instead of polling
+--
+-- subscriptions.projected_event_id makes projection monotonic: a state
+-- from an older event never overwrites one from a newer event, whichever
+-- projector (daemon shard, Celery fallback) gets there first.
+-- ============================================
+
+ALTER TABLE subscriptions
+    ADD COLUMN IF NOT EXISTS projected_event_id BIGINT;
+
+CREATE OR REPLACE FUNCTION fetch_subscription_events_shard(
+    p_after_id BIGINT,
+    p_shard INT,
+    p_shard_count INT,
+    p_limit INT DEFAULT 100
+)
+RETURNS SETOF subscription_events AS $$
+    SELECT *
+    FROM subscription_events
+    WHERE id > p_after_id
+      AND (hashtext(subscription_id::text) & 2147483647) % p_shard_count = p_shard
+    ORDER BY id
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION apply_subscription_projection(
+    p_projector TEXT,
+    p_expected_event_id BIGINT,
+    p_last_event_id BIGINT,
+    p_last_event_at TIMESTAMPTZ,
+    p_states JSONB  -- Array of {subscription_id, event_id, status, current_period_start, current_period_end}
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_current BIGINT;
+    v_projected INT := 0;
+    v_lag INT;
+BEGIN
+    -- New shard checkpoints start where the caller says (the shared one)
+    INSERT INTO projection_checkpoints (projector_name, last_processed_event_id)
+    VALUES (p_projector, p_expected_event_id)
+    ON CONFLICT (projector_name) DO NOTHING;
+
+    SELECT last_processed_event_id INTO v_current
+    FROM projection_checkpoints
+    WHERE projector_name = p_projector
+    FOR UPDATE;
+
+    IF v_current <> p_expected_event_id THEN
+        -- Another instance of this shard already applied the batch
+        RETURN jsonb_build_object('applied', false, 'checkpoint', v_current);
+    END IF;
+
+    -- Lock rows in id order so concurrent projectors cannot deadlock
+    PERFORM 1
+    FROM subscriptions
+    WHERE id IN (SELECT (s->>'subscription_id')::UUID FROM jsonb_array_elements(p_states) s)
+    ORDER BY id
+    FOR UPDATE;
+
+    WITH st AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_states) AS x(
+            subscription_id UUID,
+            event_id BIGINT,
+            status TEXT,
+            current_period_start TIMESTAMPTZ,
+            current_period_end TIMESTAMPTZ
+        )
+    ), upd AS (
+        UPDATE subscriptions s
+        SET status = st.status,
+            current_period_start = COALESCE(st.current_period_start, s.current_period_start),
+            current_period_end = COALESCE(st.current_period_end, s.current_period_end),
+            projected_event_id = st.event_id,
+            updated_at = NOW()
+        FROM st
+        WHERE s.id = st.subscription_id
+          AND (s.projected_event_id IS NULL OR s.projected_event_id < st.event_id)
+        RETURNING s.id
+    )
+    SELECT count(*) INTO v_projected FROM upd;
+
+    v_lag := GREATEST(0, EXTRACT(EPOCH FROM (NOW() - p_last_event_at))::INT);
+
+    UPDATE projection_checkpoints
+    SET last_processed_event_id = p_last_event_id,
+        last_processed_at = NOW(),
+        lag_seconds = v_lag,
+        status = 'running',
+        error_message = NULL
+    WHERE projector_name = p_projector;
+
+    RETURN jsonb_build_object(
+        'applied', true,
+        'projected', v_projected,
+        'checkpoint', p_last_event_id,
+        'lag_seconds', v_lag
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_subscription_events()
+RETURNS trigger AS $$
+BEGIN
+    -- Empty payload: identical notifications in one transaction collapse
+    PERFORM pg_notify('subscription_events', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_subscription_events ON subscription_events;
+CREATE TRIGGER trg_notify_subscription_events
+    AFTER INSERT ON subscription_events
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_subscription_events();
+
+-- The per-row lag trigger updated the single checkpoint row on every
+-- event INSERT (serializing writers behind the projector's row lock)
+-- and always wrote ~0s. apply_subscription_projection maintains lag now.
+DO $$
+DECLARE
+    part_name TEXT;
+BEGIN
+    FOR part_name IN
+        SELECT inhrelid::regclass::text
+        FROM pg_inherits
+        WHERE inhparent = 'subscription_events'::regclass
+    LOOP
+        EXECUTE format(
+            'DROP TRIGGER IF EXISTS trg_update_projection_lag ON %I',
+            part_name
+        );
+    END LOOP;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION fetch_subscription_events_shard(BIGINT, INT, INT, INT) TO service_role;
+GRANT EXECUTE ON FUNCTION apply_subscription_projection(TEXT, BIGINT, BIGINT, TIMESTAMPTZ, JSONB) TO service_role;
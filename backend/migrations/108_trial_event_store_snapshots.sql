@@ -0,0 +1,133 @@
+-- ============================================
+-- TRIAL EVENT STORE: SEQUENCES, SNAPSHOTS, ONE-CALL APPEND
+-- Migration: 108_trial_event_store_snapshots.sql
+--
+-- services/trial_event_store.py appended with three requests (idempotency
+-- lookup, MAX(sequence) read, INSERT), rebuilt trial state by replaying
+-- every event of a trial, and replay_all read the whole table at once.
+--
+--   1. trial_events.sequence: per-trial, gap-free order, assigned by a
+--      BEFORE INSERT trigger so the SQL trial functions that insert
+--      directly get one too (existing rows are backfilled)
+--   2. trial_events.position: global insertion order, the keyset cursor
+--      for paginated replay_all
+--   3. trial_event_snapshots: latest projected state of a trial at a
+--      sequence; projection = snapshot + events after it
+--   4. append_trial_event: idempotency check + sequence + INSERT in ONE
+--      round trip; a repeated idempotency key returns the stored event
+-- ============================================
+
+ALTER TABLE trial_events
+    ADD COLUMN IF NOT EXISTS sequence BIGINT,
+    ADD COLUMN IF NOT EXISTS event_version SMALLINT NOT NULL DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS causation_id TEXT,
+    ADD COLUMN IF NOT EXISTS correlation_id TEXT,
+    ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS position BIGINT GENERATED BY DEFAULT AS IDENTITY;
+
+UPDATE trial_events e
+SET sequence = numbered.seq
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY trial_id ORDER BY created_at, id) AS seq
+    FROM trial_events
+) numbered
+WHERE e.id = numbered.id
+  AND e.sequence IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trial_events_trial_sequence
+ON trial_events(trial_id, sequence);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trial_events_position
+ON trial_events(position);
+
+CREATE OR REPLACE FUNCTION assign_trial_event_sequence()
+RETURNS trigger AS $$
+BEGIN
+    IF NEW.sequence IS NULL THEN
+        -- Serialize appends per trial; other trials are not blocked
+        PERFORM pg_advisory_xact_lock(hashtext('trial_events:' || NEW.trial_id::text));
+        SELECT COALESCE(MAX(sequence), 0) + 1 INTO NEW.sequence
+        FROM trial_events
+        WHERE trial_id = NEW.trial_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_assign_trial_event_sequence ON trial_events;
+CREATE TRIGGER trg_assign_trial_event_sequence
+    BEFORE INSERT ON trial_events
+    FOR EACH ROW
+    EXECUTE FUNCTION assign_trial_event_sequence();
+
+CREATE TABLE IF NOT EXISTS trial_event_snapshots (
+    trial_id UUID PRIMARY KEY REFERENCES free_trials(id) ON DELETE CASCADE,
+    sequence BIGINT NOT NULL,
+    projection_version INT NOT NULL,
+    state JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE trial_event_snapshots ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS trial_event_snapshots_service_policy ON trial_event_snapshots;
+CREATE POLICY trial_event_snapshots_service_policy ON trial_event_snapshots
+    FOR ALL USING (auth.jwt() ->> 'role' = 'service_role');
+
+CREATE OR REPLACE FUNCTION append_trial_event(
+    p_event_id UUID,
+    p_trial_id UUID,
+    p_event_type TEXT,
+    p_event_version INT,
+    p_created_at TIMESTAMPTZ,
+    p_event_data JSONB,
+    p_triggered_by TEXT DEFAULT 'system',
+    p_idempotency_key TEXT DEFAULT NULL,
+    p_causation_id TEXT DEFAULT NULL,
+    p_correlation_id TEXT DEFAULT NULL,
+    p_metadata JSONB DEFAULT '{}'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF p_idempotency_key IS NOT NULL THEN
+        SELECT to_jsonb(e) INTO v_row
+        FROM trial_events e
+        WHERE e.idempotency_key = p_idempotency_key;
+        IF v_row IS NOT NULL THEN
+            RETURN v_row || jsonb_build_object('duplicate', true);
+        END IF;
+    END IF;
+
+    BEGIN
+        -- sequence is assigned by trg_assign_trial_event_sequence
+        INSERT INTO trial_events (
+            id, trial_id, event_type, event_version, event_data, triggered_by,
+            idempotency_key, causation_id, correlation_id, metadata, created_at
+        ) VALUES (
+            p_event_id, p_trial_id, p_event_type, p_event_version, COALESCE(p_event_data, '{}'),
+            p_triggered_by, p_idempotency_key, p_causation_id, p_correlation_id,
+            COALESCE(p_metadata, '{}'), COALESCE(p_created_at, NOW())
+        )
+        RETURNING to_jsonb(trial_events.*) INTO v_row;
+    EXCEPTION WHEN unique_violation THEN
+        -- Lost a race on the same idempotency key
+        SELECT to_jsonb(e) INTO v_row
+        FROM trial_events e
+        WHERE e.idempotency_key = p_idempotency_key;
+        IF v_row IS NULL THEN
+            RAISE;
+        END IF;
+        RETURN v_row || jsonb_build_object('duplicate', true);
+    END;
+
+    RETURN v_row;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE trial_event_snapshots IS 'Latest projected trial state at a sequence (trial_event_store)';
+COMMENT ON COLUMN trial_events.sequence IS 'Per-trial order, assigned on insert';
+COMMENT ON COLUMN trial_events.position IS 'Global insertion order (replay cursor)';
+
+GRANT EXECUTE ON FUNCTION append_trial_event(UUID, UUID, TEXT, INT, TIMESTAMPTZ, JSONB, TEXT, TEXT, TEXT, TEXT, JSONB) TO service_role;
@@ -43,6 +43,7 @@ class StockLookupResult:
     name: str
     available: int
     reserved: int  # Count of active reservations
+    is_showcase: bool = False  # Not in products table (Showcase checkout item)
 
 
 class InventoryRepository:
@@ -191,6 +192,98 @@ class InventoryRepository:
                 name="Unknown", available=0, reserved=0
             )
     
+    def get_available_stock_batch(
+        self,
+        user_id: str,
+        items: List[StockItem],
+    ) -> List[StockLookupResult]:
+        """
+        Resolve stock for a whole cart in ONE round-trip (get_stock_batch RPC).
+
+        Results are index-aligned with `items`. Items missing from the
+        products table come back with is_showcase=True and their stock read
+        from showcase_items.commerce.inventory, so callers can split
+        Showcase and catalog items without extra queries.
+
+        Falls back to per-item lookups if the RPC is not deployed yet.
+        """
+        if not items:
+            return []
+
+        payload = [
+            {
+                "product_id": item.product_id,
+                "variant_id": item.variant_id,
+                "size": item.size,
+            }
+            for item in items
+        ]
+
+        try:
+            result = self.db.rpc("get_stock_batch", {
+                "p_user_id": user_id,
+                "p_items": payload,
+            }).execute()
+            rows = result.data
+            if not isinstance(rows, list) or len(rows) != len(items):
+                raise ValueError(f"get_stock_batch returned {type(rows).__name__} for {len(items)} items")
+        except Exception as e:
+            logger.warning(f"get_stock_batch unavailable, using per-item lookups: {e}")
+            return [self._get_available_stock_single(user_id, item) for item in items]
+
+        rows = sorted(rows, key=lambda row: row.get("idx", 0))
+        lookups = []
+        for item, row in zip(items, rows):
+            if not row.get("in_products"):
+                lookups.append(StockLookupResult(
+                    product_id=item.product_id,
+                    variant_id=None,
+                    size=None,
+                    name=row.get("showcase_name") or "Unknown",
+                    available=int(row.get("showcase_available") or 0),
+                    reserved=0,  # No reservations for showcase items yet
+                    is_showcase=True,
+                ))
+                continue
+
+            lookups.append(StockLookupResult(
+                product_id=item.product_id,
+                variant_id=item.variant_id,
+                size=item.size,
+                name=row.get("name") or "Unknown",
+                available=int(row.get("available") or 0),
+                reserved=int(row.get("reserved") or 0),
+            ))
+        return lookups
+
+    def _get_available_stock_single(self, user_id: str, item: StockItem) -> StockLookupResult:
+        """Legacy per-item path used when get_stock_batch is unavailable."""
+        try:
+            product = self.db.table(self.PRODUCTS_TABLE).select("id").eq(
+                "id", item.product_id
+            ).eq("user_id", user_id).single().execute()
+            in_products = product.data is not None
+        except Exception as e:
+            logger.warning(f"Error checking if showcase item: {e}, assuming showcase=True")
+            in_products = False
+
+        if not in_products:
+            showcase = self._get_showcase_item_stock(item.product_id)
+            if showcase:
+                showcase.is_showcase = True
+                return showcase
+            return StockLookupResult(
+                product_id=item.product_id, variant_id=None, size=None,
+                name="Unknown", available=0, reserved=0, is_showcase=True
+            )
+
+        return self.get_available_stock(
+            user_id=user_id,
+            product_id=item.product_id,
+            variant_id=item.variant_id,
+            size=item.size,
+        )
+
     def _get_showcase_item_stock(self, item_id: str) -> Optional[StockLookupResult]:
         """
         Get stock from showcase_items table for Showcase checkout.
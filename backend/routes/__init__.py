@@ -1,64 +1,71 @@
 """
 Routes package initialization.
 Register all blueprints here.
+
+Blueprint modules are imported by register_routes() (or on first attribute
+access), not when the package is imported, so `from routes.payments import
+...` in Celery tasks and scripts no longer loads every route module.
 """
 
-from .templates import templates_bp
-from .contacts import contacts_bp
-from .analytics import analytics_bp
-from .campaigns import campaigns_bp
-from .bulk_campaigns import bulk_campaigns_bp
-from .test_push import register_test_routes
-from .appointments import appointments_bp
-from .messaging import register_messaging_routes
-from .orders import orders_bp
-from .payments import payments_bp
-from .inventory import inventory_bp
-from .showcase_api import showcase_bp
-from .slug_cache import slug_cache_bp  # ✅ Slug cache invalidation
-from .shop_business import shop_business_bp  # ✅ Shop business update (replaces service-role writes)
-from .monitor import monitor_bp  # Platform monitoring dashboard
-from .health_api import health_bp  # Health check endpoints
-from .billing_api import billing_bp  # Billing API endpoints
+import importlib
+
+# Exported name -> (module, attribute)
+_EXPORTS = {
+    'templates_bp': ('.templates', 'templates_bp'),
+    'contacts_bp': ('.contacts', 'contacts_bp'),
+    'analytics_bp': ('.analytics', 'analytics_bp'),
+    'campaigns_bp': ('.campaigns', 'campaigns_bp'),
+    'bulk_campaigns_bp': ('.bulk_campaigns', 'bulk_campaigns_bp'),
+    'register_test_routes': ('.test_push', 'register_test_routes'),
+    'appointments_bp': ('.appointments', 'appointments_bp'),
+    'register_messaging_routes': ('.messaging', 'register_messaging_routes'),
+    'orders_bp': ('.orders', 'orders_bp'),
+    'payments_bp': ('.payments', 'payments_bp'),
+    'inventory_bp': ('.inventory', 'inventory_bp'),
+    'showcase_bp': ('.showcase_api', 'showcase_bp'),
+    'slug_cache_bp': ('.slug_cache', 'slug_cache_bp'),  # ✅ Slug cache invalidation
+    'shop_business_bp': ('.shop_business', 'shop_business_bp'),  # ✅ Shop business update (replaces service-role writes)
+    'monitor_bp': ('.monitor', 'monitor_bp'),  # Platform monitoring dashboard
+    'health_bp': ('.health_api', 'health_bp'),  # Health check endpoints
+    'billing_bp': ('.billing_api', 'billing_bp'),  # Billing API endpoints
+}
 
-__all__ = [
+__all__ = list(_EXPORTS)
+
+# Registration order matters: health must be registered before billing
+_BLUEPRINTS = (
     'templates_bp',
     'contacts_bp',
     'analytics_bp',
     'campaigns_bp',
     'bulk_campaigns_bp',
-    'register_test_routes',
     'appointments_bp',
-    'register_messaging_routes',
     'orders_bp',
     'payments_bp',
     'inventory_bp',
-    'showcase_bp',
-    'slug_cache_bp',  # ✅ Export slug cache
-    'shop_business_bp',  # ✅ Shop business update
-    'monitor_bp',  # Platform monitoring
-    'health_bp',  # Health check endpoints
+    'showcase_bp',  # Enterprise showcase system
+    'slug_cache_bp',  # ✅ Slug cache invalidation
+    'shop_business_bp',  # ✅ Shop business update (entitlement-gated)
+    'monitor_bp',  # Platform monitoring dashboard
+    'health_bp',  # Health check endpoints (MUST be registered before billing)
     'billing_bp',  # Billing API endpoints
-]
+)
+
+
+def __getattr__(name):
+    target = _EXPORTS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = target
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
 
 
 def register_routes(app):
     """Register all route blueprints with the Flask app."""
-    app.register_blueprint(templates_bp)
-    app.register_blueprint(contacts_bp)
-    app.register_blueprint(analytics_bp)
-    app.register_blueprint(campaigns_bp)
-    app.register_blueprint(bulk_campaigns_bp)
-    app.register_blueprint(appointments_bp)
-    app.register_blueprint(orders_bp)
-    app.register_blueprint(payments_bp)
-    app.register_blueprint(inventory_bp)
-    app.register_blueprint(showcase_bp)  # Enterprise showcase system
-    app.register_blueprint(slug_cache_bp)  # ✅ Slug cache invalidation
-    app.register_blueprint(shop_business_bp)  # ✅ Shop business update (entitlement-gated)
-    app.register_blueprint(monitor_bp)  # Platform monitoring dashboard
-    app.register_blueprint(health_bp)  # Health check endpoints (MUST be registered before billing)
-    app.register_blueprint(billing_bp)  # Billing API endpoints
+    for name in _BLUEPRINTS:
+        app.register_blueprint(__getattr__(name))
     try:
         from domains.file_tools.api.routes import file_tools_bp
 
@@ -66,9 +73,6 @@ def register_routes(app):
         print("Registered Files Tools routes: /api/file-tools/*")
     except Exception as exc:
         print(f"Files Tools routes unavailable: {exc}")
-    register_test_routes(app)  # Register test push endpoint
-    register_messaging_routes(app)  # Register messaging endpoint
+    __getattr__('register_test_routes')(app)  # Register test push endpoint
+    __getattr__('register_messaging_routes')(app)  # Register messaging endpoint
     print("✅ Registered API routes: templates, contacts, analytics, campaigns, bulk-campaigns, appointments, orders, payments, inventory, showcase, slug-cache, monitor, health, billing, test-push, messaging")
-
-
-
@@ -125,11 +125,11 @@ def clear_user_cache(firebase_uid):
         total_deleted = 0
         try:
             import os
-            import redis
+            from connections import get_redis
             
             redis_url = os.getenv('REDIS_URL')
-            if redis_url:
-                r = redis.from_url(redis_url, decode_responses=True)
+            r = get_redis("admin") if redis_url else None
+            if r is not None:
                 
                 # Delete all cache keys for this user
                 patterns = [
@@ -33,9 +33,8 @@ try:
     from app import supabase
 except ImportError:
     # Fallback for standalone testing
-    from os import getenv
-    from supabase import create_client
-    supabase = create_client(getenv('SUPABASE_URL'), getenv('SUPABASE_SERVICE_ROLE_KEY'))
+    from connections import get_supabase
+    supabase = get_supabase()
 
 # Import feature gate engine for cache invalidation
 try:
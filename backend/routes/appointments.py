@@ -6,6 +6,7 @@ These endpoints are used by the AI brain to check availability and book appointm
 from flask import Blueprint, request, jsonify, g
 import logging
 from datetime import datetime, date
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import os
 import requests
 
@@ -18,6 +19,17 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 INTERNAL_API_KEY = os.environ.get('INTERNAL_API_KEY', 'flowauxi-internal-key')
 
 
+def _indexed_slots(user_id: str, check_date: str):
+    """Free slots from the slot availability index, or None if unknown."""
+    try:
+        from services.slot_availability import get_slot_index
+
+        return get_slot_index().free_slots(user_id, date.fromisoformat(check_date))
+    except Exception as e:
+        logger.debug(f"Slot index unavailable: {e}")
+        return None
+
+
 def get_internal_headers():
     """Get headers for internal API calls."""
     return {
@@ -101,22 +113,23 @@ def check_availability():
                 'error': 'user_id and date are required'
             }), 400
         
-        # Call frontend API
-        response = requests.get(
-            f'{FRONTEND_URL}/api/ai-appointment-book',
-            params={'user_id': user_id, 'date': check_date},
-            headers=get_internal_headers(),
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to check availability'
-            }), 500
-        
-        result = response.json()
-        available_slots = result.get('available_slots', [])
+        available_slots = _indexed_slots(user_id, check_date)
+        if available_slots is None:
+            # No index data (e.g. Supabase unreachable): ask the frontend API
+            response = requests.get(
+                f'{FRONTEND_URL}/api/ai-appointment-book',
+                params={'user_id': user_id, 'date': check_date},
+                headers=get_internal_headers(),
+                timeout=10
+            )
+            
+            if response.status_code != 200:
+                return jsonify({
+                    'success': False,
+                    'error': 'Failed to check availability'
+                }), 500
+            
+            available_slots = response.json().get('available_slots', [])
         
         if check_time:
             # Check specific time
@@ -145,6 +158,37 @@ def check_availability():
         }), 500
 
 
+@appointments_bp.route('/api/appointments/next-slots', methods=['GET'])
+def next_available_slots():
+    """
+    Next free slots across the coming days.
+    
+    Query params:
+        user_id: Business owner's Firebase UID
+        count: Number of slots to return (default 5, max 50)
+        days: Days to look ahead (default 7, max 60)
+        from: First date to consider (YYYY-MM-DD, default today)
+        timezone: Business timezone (IANA name, default Asia/Kolkata)
+    """
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'error': 'user_id is required'}), 400
+    
+    try:
+        count = min(max(int(request.args.get('count', 5)), 1), 50)
+        days = min(max(int(request.args.get('days', 7)), 1), 60)
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        tz = request.args.get('timezone') or 'Asia/Kolkata'
+        ZoneInfo(tz)
+    except (ValueError, ZoneInfoNotFoundError):
+        return jsonify({'success': False, 'error': 'Invalid count, days, from or timezone'}), 400
+    
+    from services.slot_availability import get_slot_index
+    
+    slots = get_slot_index().next_free_slots(user_id, count=count, days=days, start=start, tz=tz)
+    return jsonify({'success': True, 'slots': slots, 'total': len(slots)})
+
+
 @appointments_bp.route('/api/appointments/book', methods=['POST'])
 def book_appointment():
     """
@@ -190,6 +234,7 @@ def book_appointment():
         result = response.json()
         
         if response.status_code == 200 and result.get('success'):
+            _record_slot_change(data['user_id'], data['date'], data['time'], booked=True)
             return jsonify({
                 'success': True,
                 'appointment': result.get('appointment'),
@@ -197,6 +242,7 @@ def book_appointment():
             })
         elif response.status_code == 409:
             # Conflict - time slot not available
+            _record_slot_change(data['user_id'], data['date'], data['time'], booked=False)
             return jsonify({
                 'success': False,
                 'conflict': True,
@@ -244,6 +290,8 @@ def cancel_appointment(appointment_id: str):
                 'error': 'user_id is required'
             }), 400
         
+        slot = _appointment_slot(appointment_id)
+        
         # Forward to frontend API
         response = requests.delete(
             f'{FRONTEND_URL}/api/appointments/{appointment_id}',
@@ -252,6 +300,10 @@ def cancel_appointment(appointment_id: str):
         )
         
         if response.status_code == 200:
+            if slot:
+                from services.slot_availability import get_slot_index
+
+                get_slot_index().record_cancellation(user_id, *slot)
             return jsonify({
                 'success': True,
                 'message': 'Appointment cancelled successfully'
@@ -270,6 +322,36 @@ def cancel_appointment(appointment_id: str):
         }), 500
 
 
+def _record_slot_change(user_id: str, check_date: str, check_time: str, booked: bool) -> None:
+    """Book the slot in the index, or drop the day after a conflict."""
+    try:
+        from services.slot_availability import get_slot_index
+
+        index = get_slot_index()
+        day = date.fromisoformat(check_date)
+        if booked:
+            index.record_booking(user_id, day, check_time)
+        else:
+            index.invalidate(user_id, day)
+    except Exception as e:
+        logger.debug(f"Slot index update skipped: {e}")
+
+
+def _appointment_slot(appointment_id: str):
+    """(date, "HH:MM") of a live appointment, looked up before cancelling."""
+    try:
+        from supabase_client import get_supabase_client
+
+        result = get_supabase_client().table('appointments').select('date, time, status') \
+            .eq('id', appointment_id).limit(1).execute()
+        row = (result.data or [None])[0]
+        if row and row.get('status') != 'cancelled':
+            return date.fromisoformat(str(row['date'])[:10]), str(row['time'])[:5]
+    except Exception as e:
+        logger.debug(f"Appointment lookup failed: {e}")
+    return None
+
+
 # AI Brain integration helpers
 def get_booking_prompt_for_business(user_id: str) -> dict:
     """
@@ -267,11 +267,18 @@ def projection_lag():
 
         result = db.table('projection_checkpoints') \
             .select('*') \
-            .eq('projector_name', 'subscription_status') \
-            .single() \
+            .like('projector_name', 'subscription_status%') \
+            .order('projector_name') \
             .execute()
 
-        return _success({'checkpoint': result.data})
+        rows = result.data or []
+        # Shared checkpoint plus one row per shard of a sharded daemon
+        shared = next((r for r in rows if r['projector_name'] == 'subscription_status'), None)
+        return _success({
+            'checkpoint': shared,
+            'shards': [r for r in rows if r['projector_name'] != 'subscription_status'],
+            'max_lag_seconds': max((r.get('lag_seconds') or 0 for r in rows), default=0),
+        })
 
     except Exception as e:
         logger.error(f"admin_projection_lag_error: {e}", exc_info=True)
@@ -389,18 +389,14 @@ def get_redis_client():
     if _redis_client is not None:
         return _redis_client
     
-    try:
-        import redis
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-        _redis_client = redis.from_url(redis_url, decode_responses=True)
-        # Test connection
-        _redis_client.ping()
+    from connections import get_redis
+
+    _redis_client = get_redis("billing")
+    if _redis_client is not None:
         logger.info("Redis connection established for billing idempotency")
-        return _redis_client
-    except Exception as e:
-        logger.error(f"Failed to connect to Redis: {e}. Idempotency will use fallback.")
-        _redis_client = None
-        return None
+    else:
+        logger.error("Failed to connect to Redis. Idempotency will use fallback.")
+    return _redis_client
 
 
 # =============================================================================
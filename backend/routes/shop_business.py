@@ -22,7 +22,6 @@ from flask import Blueprint, request, jsonify, g
 from typing import Optional
 import logging
 import re
-import threading
 import time
 
 from services.settings_tracing import (
@@ -685,72 +684,37 @@ def _update_business_impl(timer):
                 e,
             )
 
-    # ── CACHE INVALIDATION (fire-and-forget, never blocks write) ─────────
-    # Pass old slug so invalidate_slug_cache clears the stale Redis entry.
-    # Without this, the old cached slug entry survives indefinitely and the
-    # new slug lookup misses cache on first hit (benign but causes confusion).
+    # ── CACHE INVALIDATION (coalesced, never blocks write) ───────────────
+    # Slug cache, Next.js ISR/LRU and the Firestore mirror are refreshed by
+    # the storefront invalidation bus: saves for the same store within the
+    # debounce window collapse into one delivery on a pooled connection.
+    # The old slug is passed so the stale Redis entry is cleared too.
+    from services.storefront_invalidation import (
+        FIRESTORE, NEXTJS, SLUG_CACHE, publish_storefront_invalidation,
+    )
+    targets = {NEXTJS, FIRESTORE}
     if 'business_name' in db_data or 'url_slug' in db_data:
-        _captured_pre_save_slug = pre_save_slug  # Capture for closure
-
-        def _invalidate_cache():
-            try:
-                from utils.slug_resolver import invalidate_slug_cache
-                invalidate_slug_cache(user_id, old_slug=_captured_pre_save_slug)
-                logger.info(f"✅ Slug cache invalidated for user {user_id} (old_slug={_captured_pre_save_slug})")
-            except Exception as e:
-                logger.warning(f"⚠️ Cache invalidation failed (non-critical): {e}")
-
-        thread = threading.Thread(target=_invalidate_cache, daemon=True)
-        thread.start()
-
-    # ── NEXT.JS CACHE INVALIDATION (fire-and-forget) ────────────────────
-    # Notify the Next.js frontend to invalidate its in-memory LRU cache
-    # and trigger ISR revalidation for this store's page.
-    def _invalidate_nextjs_cache():
-        try:
-            import os
-            import requests as req
-            nextjs_url = os.getenv('NEXTJS_URL', 'http://localhost:3001')
-            revalidation_secret = os.getenv('REVALIDATION_SECRET', '')
-            slug = db_data.get('url_slug') or pre_save_slug or user_id
-            req.post(
-                f"{nextjs_url}/api/revalidate",
-                json={
-                    "slug": slug,
-                    "userId": user_id,
-                    "type": "slug_change" if 'url_slug' in db_data else "store",
-                },
-                headers={"Authorization": f"Bearer {revalidation_secret}"},
-                timeout=3,
-            )
-            logger.info(f"✅ Next.js cache invalidated for slug={slug}")
-        except Exception as e:
-            logger.warning(f"⚠️ Next.js cache invalidation failed (non-critical): {e}")
-
-    thread_nextjs = threading.Thread(target=_invalidate_nextjs_cache, daemon=True)
-    thread_nextjs.start()
-
-    # ── FIRESTORE SYNC (fire-and-forget for backward compatibility) ──────
-    def _sync_firestore():
-        try:
-            import firebase_admin
-            from firebase_admin import firestore as firebase_firestore
-            from datetime import datetime
-
-            fs_db = firebase_firestore.client()
-            # Build Firestore-safe data (exclude products, use payload as-is)
-            fs_data = {k: v for k, v in payload.items()
-                       if k not in BLACKLISTED_FIELDS and k != 'products' and k != 'productCategories'}
-            fs_data['userId'] = user_id
-            fs_data['updatedAt'] = datetime.utcnow().isoformat()
-
-            fs_db.collection('businesses').document(user_id).set(fs_data, merge=True)
-            logger.info(f"✅ Firestore sync complete for user {user_id}")
-        except Exception as e:
-            logger.warning(f"⚠️ Firestore sync failed (non-critical): {e}")
-
-    thread = threading.Thread(target=_sync_firestore, daemon=True)
-    thread.start()
+        targets.add(SLUG_CACHE)
+    # Firestore-safe data (exclude products, use payload as-is)
+    fs_data = {k: v for k, v in payload.items()
+               if k not in BLACKLISTED_FIELDS and k != 'products' and k != 'productCategories'}
+    publish_storefront_invalidation(
+        user_id,
+        slug=db_data.get('url_slug') or pre_save_slug,
+        old_slug=pre_save_slug,
+        slug_changed='url_slug' in db_data,
+        targets=targets,
+        firestore_data=fs_data,
+    )
+
+    # ── SHOWCASE SNAPSHOT REBUILD (fire-and-forget) ──────────────────────
+    # Public showcase reads serve a precomputed snapshot; rebuild it here
+    # instead of on the next page view.
+    try:
+        from routes.showcase_api import schedule_showcase_snapshot_rebuild
+        schedule_showcase_snapshot_rebuild(user_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Showcase snapshot rebuild not scheduled (non-critical): {e}")
 
     # ── RESOLVE CONFIGURED STATE + EFFECTIVE SLUG FOR NAVBAR ─────────────
     effective_slug = db_data.get("url_slug")
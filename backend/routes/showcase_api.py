@@ -200,6 +200,219 @@ def map_showcase_item_to_dto(
     return dto
 
 
+# ============================================
+# SNAPSHOT (public storefront payload)
+# ============================================
+
+def build_showcase_data(user_id: str, db) -> Dict[str, Any]:
+    """
+    Build the public showcase payload for one business (everything except
+    canonicalSlug, which depends on the URL that resolved it).
+
+    Runs on writes and background refreshes; public reads serve the stored
+    snapshot (services/showcase_snapshot.py).
+    """
+    # 1. Get settings (with fallback to defaults)
+    settings_result = db.table('showcase_settings').select('*').eq(
+        'user_id', user_id
+    ).execute()
+    
+    if settings_result.data:
+        settings = ShowcaseSettings.from_db(settings_result.data[0])
+    else:
+        # Create default settings if missing
+        settings = create_default_settings(user_id, db)
+    
+    # ✅ Map to DTO (API ≠ DB schema)
+    settings_dto = map_showcase_settings_to_dto(settings)
+    
+    # 2. Get items
+    items_result = db.table('showcase_items').select('*').eq(
+        'user_id', user_id
+    ).eq('is_visible', True).eq('is_deleted', False).order(
+        'is_featured', desc=True
+    ).order('created_at', desc=True).limit(100).execute()
+    
+    # ✅ Map to DTOs
+    items_dto = [
+        map_showcase_item_to_dto(ShowcaseItem.from_db(item), settings)
+        for item in (items_result.data or [])
+    ]
+    
+    # 3. Get business data from Supabase businesses table
+    business_result = db.table('businesses').select('*').eq(
+        'user_id', user_id
+    ).limit(1).execute()
+    
+    business = business_result.data[0] if business_result.data and len(business_result.data) > 0 else {}
+    
+    # 4. Get store settings for logo (OPTIONAL - skip if table doesn't exist)
+    # optimize: avoid querying store_settings if we already have a logo from business or settings
+    store_settings = {}
+
+    
+    
+    # 5. Extract contact information with fallback (flat columns > JSONB)
+    # ✅ ENTERPRISE PATTERN: Support both denormalized and JSONB for backward compatibility
+    contact_data = business.get('contact', {})
+    if isinstance(contact_data, str):
+        try:
+            import json
+            contact_data = json.loads(contact_data)
+        except:
+            contact_data = {}
+    
+    # Fallback to flat columns if JSONB is empty
+    phone = business.get('phone') or contact_data.get('phone')
+    email = business.get('email') or contact_data.get('email')
+    whatsapp = business.get('whatsapp') or contact_data.get('whatsapp') or contact_data.get('whatsappNumber')
+    
+    # 6. Extract location information with fallback (flat columns > JSONB)
+    location_data = business.get('location', {})
+    if isinstance(location_data, str):
+        try:
+            import json
+            location_data = json.loads(location_data)
+        except:
+            location_data = {}
+    
+    # Fallback to flat columns if JSONB is empty
+    address = business.get('address') or location_data.get('address')
+    city = business.get('city') or location_data.get('city')
+    state = business.get('state') or location_data.get('state')
+    pincode = business.get('pincode') or location_data.get('pincode')
+    
+    # 7. Parse social media data and convert usernames to full URLs
+    social_data = {}
+    try:
+        raw_social = business.get('social_media', {})
+        if isinstance(raw_social, str):
+            try:
+                import json
+                raw_social = json.loads(raw_social)
+            except:
+                raw_social = {}
+        
+        if not isinstance(raw_social, dict):
+            raw_social = {}
+            
+        # Convert usernames to full URLs
+        if raw_social.get('instagram'):
+            instagram_value = raw_social['instagram']
+            # Check if it's already a URL
+            if instagram_value.startswith('http'):
+                social_data['instagram'] = instagram_value
+            else:
+                # It's a username, convert to URL
+                social_data['instagram'] = f"https://instagram.com/{instagram_value}"
+        
+        if raw_social.get('facebook'):
+            facebook_value = raw_social['facebook']
+            if facebook_value.startswith('http'):
+                social_data['facebook'] = facebook_value
+            else:
+                social_data['facebook'] = f"https://facebook.com/{facebook_value}"
+        
+        if raw_social.get('twitter'):
+            twitter_value = raw_social['twitter']
+            if twitter_value.startswith('http'):
+                social_data['twitter'] = twitter_value
+            else:
+                social_data['twitter'] = f"https://twitter.com/{twitter_value}"
+        
+        if raw_social.get('linkedin'):
+            linkedin_value = raw_social['linkedin']
+            if linkedin_value.startswith('http'):
+                social_data['linkedin'] = linkedin_value
+            else:
+                social_data['linkedin'] = f"https://linkedin.com/in/{linkedin_value}"
+        
+        if raw_social.get('youtube'):
+            youtube_value = raw_social['youtube']
+            if youtube_value.startswith('http'):
+                social_data['youtube'] = youtube_value
+            else:
+                social_data['youtube'] = f"https://youtube.com/@{youtube_value}"
+                
+    except Exception as e:
+        logger.error(f"Error parsing social_media: {e}")
+    
+    # 8. Build complete address from extracted fields
+    address_parts = []
+    if address:
+        address_parts.append(address)
+    if city:
+        address_parts.append(city)
+    if state:
+        address_parts.append(state)
+    if pincode:
+        address_parts.append(str(pincode))
+    
+    full_address = ', '.join(address_parts) if address_parts else None
+    
+    # 9. Determine logo URL (priority: store_settings > business.logo_url > business.logoUrl)
+    logo_url = (
+        store_settings.get('logo_url') or 
+        business.get('logo_url') or
+        business.get('logoUrl')
+    )
+
+    return {
+        "businessName": business.get('business_name') or business.get('businessName', ''),
+        "logoUrl": logo_url,
+        "userId": user_id,  # ✅ UID for real-time sync
+        "description": business.get('description', ''),
+        "settings": settings_dto,
+        "items": items_dto,
+        "contact": {
+            "phone": phone,
+            "email": email,
+            "address": full_address,
+            "whatsapp": whatsapp
+        },
+        "socialMedia": social_data
+    }
+
+
+def rebuild_showcase_snapshot(user_id: str):
+    """Build and store a fresh snapshot, stamped with the write generation it reflects."""
+    from supabase_client import get_supabase_client
+    from services.showcase_snapshot import current_generation, put_snapshot
+
+    gen = current_generation(user_id)
+    return put_snapshot(user_id, build_showcase_data(user_id, get_supabase_client()), gen)
+
+
+def schedule_showcase_snapshot_rebuild(*user_ids: Optional[str], mark_dirty: bool = True) -> None:
+    """
+    Refresh snapshots in the background (fire-and-forget, never blocks the caller).
+
+    Write routes pass mark_dirty=True so a rebuild already in flight with
+    pre-write data is still treated as stale by the next read.
+    """
+    import threading
+    from services.showcase_snapshot import mark_dirty as _mark_dirty, release_rebuild, try_acquire_rebuild
+
+    targets = [uid for uid in dict.fromkeys(user_ids) if uid]
+    if mark_dirty:
+        for uid in targets:
+            _mark_dirty(uid)
+
+    def _rebuild():
+        for uid in targets:
+            if not try_acquire_rebuild(uid):
+                continue
+            try:
+                rebuild_showcase_snapshot(uid)
+            except Exception as e:
+                logger.warning(f"⚠️ Showcase snapshot rebuild failed for {uid}: {e}")
+            finally:
+                release_rebuild(uid)
+
+    if targets:
+        threading.Thread(target=_rebuild, daemon=True).start()
+
+
 # ============================================
 # ENDPOINTS
 # ============================================
@@ -238,12 +451,9 @@ def get_showcase(slug_or_username: str):
         }
     """
     try:
-        from supabase_client import get_supabase_client
         from utils.slug_resolver import resolve_slug_to_user_id
         from flask import redirect, url_for
         
-        db = get_supabase_client()
-        
         # ✅ ENTERPRISE RESOLUTION: slug → username → uid → 404
         resolution = resolve_slug_to_user_id(slug_or_username)
         
@@ -264,171 +474,25 @@ def get_showcase(slug_or_username: str):
         logger.info(f"✅ Canonical URL: /showcase/{canonical_slug} (user: {user_id[:8]}...)")
 
         
-        # 2. Get settings (with fallback to defaults)
-        settings_result = db.table('showcase_settings').select('*').eq(
-            'user_id', user_id
-        ).execute()
-        
-        if settings_result.data:
-            settings = ShowcaseSettings.from_db(settings_result.data[0])
-        else:
-            # Create default settings if missing
-            settings = create_default_settings(user_id, db)
-        
-        # ✅ Map to DTO (API ≠ DB schema)
-        settings_dto = map_showcase_settings_to_dto(settings)
-        
-        # 3. Get items
-        items_result = db.table('showcase_items').select('*').eq(
-            'user_id', user_id
-        ).eq('is_visible', True).eq('is_deleted', False).order(
-            'is_featured', desc=True
-        ).order('created_at', desc=True).limit(100).execute()
-        
-        # ✅ Map to DTOs
-        items_dto = [
-            map_showcase_item_to_dto(ShowcaseItem.from_db(item), settings)
-            for item in (items_result.data or [])
-        ]
-        
-        # 4. Get business data from Supabase businesses table
-        business_result = db.table('businesses').select('*').eq(
-            'user_id', user_id
-        ).limit(1).execute()
-        
-        business = business_result.data[0] if business_result.data and len(business_result.data) > 0 else {}
-        
-        # 5. Get store settings for logo (OPTIONAL - skip if table doesn't exist)
-        # optimize: avoid querying store_settings if we already have a logo from business or settings
-        store_settings = {}
+        # 2. Serve the precomputed snapshot (stale-while-revalidate)
+        from services.showcase_snapshot import get_snapshot
 
-        
-        
-        # 6. Extract contact information with fallback (flat columns > JSONB)
-        # ✅ ENTERPRISE PATTERN: Support both denormalized and JSONB for backward compatibility
-        contact_data = business.get('contact', {})
-        if isinstance(contact_data, str):
-            try:
-                import json
-                contact_data = json.loads(contact_data)
-            except:
-                contact_data = {}
-        
-        # Fallback to flat columns if JSONB is empty
-        phone = business.get('phone') or contact_data.get('phone')
-        email = business.get('email') or contact_data.get('email')
-        whatsapp = business.get('whatsapp') or contact_data.get('whatsapp') or contact_data.get('whatsappNumber')
-        
-        # 7. Extract location information with fallback (flat columns > JSONB)
-        location_data = business.get('location', {})
-        if isinstance(location_data, str):
-            try:
-                import json
-                location_data = json.loads(location_data)
-            except:
-                location_data = {}
-        
-        # Fallback to flat columns if JSONB is empty
-        address = business.get('address') or location_data.get('address')
-        city = business.get('city') or location_data.get('city')
-        state = business.get('state') or location_data.get('state')
-        pincode = business.get('pincode') or location_data.get('pincode')
-        
-        # 8. Parse social media data and convert usernames to full URLs
-        social_data = {}
-        try:
-            raw_social = business.get('social_media', {})
-            if isinstance(raw_social, str):
-                try:
-                    import json
-                    raw_social = json.loads(raw_social)
-                except:
-                    raw_social = {}
-            
-            if not isinstance(raw_social, dict):
-                raw_social = {}
-                
-            # Convert usernames to full URLs
-            if raw_social.get('instagram'):
-                instagram_value = raw_social['instagram']
-                # Check if it's already a URL
-                if instagram_value.startswith('http'):
-                    social_data['instagram'] = instagram_value
-                else:
-                    # It's a username, convert to URL
-                    social_data['instagram'] = f"https://instagram.com/{instagram_value}"
-            
-            if raw_social.get('facebook'):
-                facebook_value = raw_social['facebook']
-                if facebook_value.startswith('http'):
-                    social_data['facebook'] = facebook_value
-                else:
-                    social_data['facebook'] = f"https://facebook.com/{facebook_value}"
-            
-            if raw_social.get('twitter'):
-                twitter_value = raw_social['twitter']
-                if twitter_value.startswith('http'):
-                    social_data['twitter'] = twitter_value
-                else:
-                    social_data['twitter'] = f"https://twitter.com/{twitter_value}"
-            
-            if raw_social.get('linkedin'):
-                linkedin_value = raw_social['linkedin']
-                if linkedin_value.startswith('http'):
-                    social_data['linkedin'] = linkedin_value
-                else:
-                    social_data['linkedin'] = f"https://linkedin.com/in/{linkedin_value}"
-            
-            if raw_social.get('youtube'):
-                youtube_value = raw_social['youtube']
-                if youtube_value.startswith('http'):
-                    social_data['youtube'] = youtube_value
-                else:
-                    social_data['youtube'] = f"https://youtube.com/@{youtube_value}"
-                    
-        except Exception as e:
-            logger.error(f"Error parsing social_media: {e}")
-        
-        # 9. Build complete address from extracted fields
-        address_parts = []
-        if address:
-            address_parts.append(address)
-        if city:
-            address_parts.append(city)
-        if state:
-            address_parts.append(state)
-        if pincode:
-            address_parts.append(str(pincode))
-        
-        full_address = ', '.join(address_parts) if address_parts else None
-        
-        # 10. Determine logo URL (priority: store_settings > business.logo_url > business.logoUrl)
-        logo_url = (
-            store_settings.get('logo_url') or 
-            business.get('logo_url') or
-            business.get('logoUrl')
-        )
-        
-        # 11. Build response with complete business profile + canonical slug
-        return jsonify({
-            "success": True,
-            "data": {
-                "businessName": business.get('business_name') or business.get('businessName', ''),
-                "logoUrl": logo_url,
-                "userId": user_id,  # ✅ UID for real-time sync
-                "canonicalSlug": canonical_slug,  # ✅ SEO canonical URL
-                "description": business.get('description', ''),
-                "settings": settings_dto,
-                "items": items_dto,
-                "contact": {
-                    "phone": phone,
-                    "email": email,
-                    "address": full_address,
-                    "whatsapp": whatsapp
-                },
-                "socialMedia": social_data
-            }
-        }), 200
+        snapshot = get_snapshot(user_id)
+        if snapshot is None:
+            snapshot = rebuild_showcase_snapshot(user_id)
+        elif snapshot.needs_rebuild():
+            schedule_showcase_snapshot_rebuild(user_id, mark_dirty=False)
+
+        etag = f"{snapshot.etag}-{canonical_slug}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            data = snapshot.data()
+            data["canonicalSlug"] = canonical_slug  # ✅ SEO canonical URL
+            response = jsonify({"success": True, "data": data})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response
         
     except Exception as e:
         logger.error(f"Error fetching showcase for slug '{slug_or_username}': {e}", exc_info=True)
@@ -515,6 +579,7 @@ def save_settings():
                 "error": "No data provided"
             }), 400
         
+        from flask import g
         from supabase_client import get_supabase_client
         db = get_supabase_client()
         
@@ -536,6 +601,7 @@ def save_settings():
         }, on_conflict='user_id').execute()
         
         logger.info(f'Saved showcase settings for user {user_id}')
+        schedule_showcase_snapshot_rebuild(user_id, getattr(g, 'firebase_uid', None))
         
         return jsonify({"success": True}), 200
         
@@ -714,6 +780,7 @@ def create_item():
             raise Exception("Failed to create item")
         
         logger.info(f"Created showcase item for user {g.user_id}: {created_item['id']}")
+        schedule_showcase_snapshot_rebuild(g.user_id, getattr(g, 'firebase_uid', None))
         
         return jsonify({
             "success": True,
@@ -812,6 +879,7 @@ def update_item(item_id: str):
         ).eq('user_id', g.user_id).execute()
         
         logger.info(f"Updated showcase item {item_id} for user {g.user_id}")
+        schedule_showcase_snapshot_rebuild(g.user_id, getattr(g, 'firebase_uid', None))
         
         return jsonify({"success": True}), 200
         
@@ -862,6 +930,7 @@ def delete_item(item_id: str):
         }).eq('id', item_id).eq('user_id', g.user_id).execute()
         
         logger.info(f"Deleted showcase item {item_id} for user {g.user_id}")
+        schedule_showcase_snapshot_rebuild(g.user_id, getattr(g, 'firebase_uid', None))
         
         return jsonify({"success": True}), 200
         
@@ -336,9 +336,8 @@ def _generate_event_id(
 def _is_duplicate_event(event_id: str) -> bool:
     """Check Redis for duplicate event (fast path)."""
     try:
-        import redis as redis_lib
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-        r = redis_lib.from_url(redis_url, decode_responses=True, socket_timeout=1)
+        from connections import get_redis
+        r = get_redis("webhooks", check=False)
         return r.exists(f"webhook_evt:{event_id}") > 0
     except Exception:
         return False  # Fail open
@@ -347,9 +346,8 @@ def _is_duplicate_event(event_id: str) -> bool:
 def _mark_event_seen(event_id: str, channel: str) -> None:
     """Mark event as seen in Redis (24h TTL)."""
     try:
-        import redis as redis_lib
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-        r = redis_lib.from_url(redis_url, decode_responses=True, socket_timeout=1)
+        from connections import get_redis
+        r = get_redis("webhooks", check=False)
         r.set(f"webhook_evt:{event_id}", channel, ex=WEBHOOK_EVENT_TTL)
     except Exception:
         pass
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Per-message CPU for language + intent + order-routing keyword detection.
+
+"before" replays the original per-pattern loops: one compiled regex search
+per language indicator, findall() for every intent pattern, and the
+`any(token in msg_lower ...)` scans of the routing lists. "after" is the
+shared single-pass scanner (ai_brain/keyword_scanner.py), measured for a
+new message and for a rescan of the same text (the language detector, the
+intent detector and the router all look at the same message in AIBrain).
+
+Both paths are checked to agree on every message before timing.
+
+Usage (from backend/):
+  python scripts/perf/keyword_scanner_benchmark.py
+  python scripts/perf/keyword_scanner_benchmark.py --messages 5000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ai_brain.intents import INTENT_KEYWORDS, ROUTING_KEYWORDS, ROUTING_PATTERNS  # noqa: E402
+from ai_brain.keyword_scanner import KeywordScanner, get_message_scanner  # noqa: E402
+from ai_brain.language_detector import ROMAN_INDICATORS  # noqa: E402
+
+SAMPLES = [
+    "hi",
+    "What is the price for haircut?",
+    "bhai kitne ka hai ye, rate batao",
+    "mera order kab aayega",
+    "en order epo varum",
+    "I want 2 pieces of the blue shirt, delivery to Chennai tomorrow",
+    "book appointment 10:30 am saturday",
+    "kem cho, tamari dukan kyare khule che?",
+    "can you deliver to whitefield? free delivery available?",
+    "thanks a lot, ok bye",
+    "cancel my order please, I want a refund",
+    "Do you have any offers on courses and packages this week? Looking for details",
+]
+
+
+class LegacyDetector:
+    """The original per-pattern implementation, kept here for comparison."""
+
+    def __init__(self):
+        self.lang = {k: [re.compile(p, re.IGNORECASE) for p in v] for k, v in ROMAN_INDICATORS.items()}
+        self.intents = {k: [re.compile(p, re.IGNORECASE) for p in v] for k, v in INTENT_KEYWORDS.items()}
+
+    def run(self, message: str):
+        text_lower = message.strip().lower()
+        lang = {k: sum(1 for p in v if p.search(text_lower)) for k, v in self.lang.items()}
+        intents = {k.value: sum(len(p.findall(message.strip())) for p in v) for k, v in self.intents.items()}
+        msg_lower = message.lower()
+        # Routing lists were rebuilt inside the method on every call
+        routing_keywords = {k: list(v) for k, v in ROUTING_KEYWORDS.items()}
+        route = {k: any(t in msg_lower for t in v) for k, v in routing_keywords.items()}
+        route.update({k: any(re.search(p, msg_lower) for p in v) for k, v in ROUTING_PATTERNS.items()})
+        return lang, intents, route
+
+
+def scanner_run(scanner: KeywordScanner, message: str):
+    scan = scanner.scan(message)
+    lang = {k: scan.patterns_hit(f"lang:{k}") for k in ROMAN_INDICATORS}
+    intents = {k.value: scan.count(f"intent:{k.value}") for k in INTENT_KEYWORDS}
+    route = {k: scan.any(f"route:{k}") for k in list(ROUTING_KEYWORDS) + list(ROUTING_PATTERNS)}
+    return lang, intents, route
+
+
+def build_corpus(n: int) -> list[str]:
+    rng = random.Random(42)
+    words = " ".join(SAMPLES).split()
+    corpus = list(SAMPLES)
+    while len(corpus) < n:
+        corpus.append(" ".join(rng.choice(words) for _ in range(rng.randint(2, 24))) + f" #{len(corpus)}")
+    return corpus
+
+
+def time_per_message(fn, corpus: list[str], repeat: int) -> list[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.process_time()
+        for message in corpus:
+            fn(message)
+        runs.append((time.process_time() - start) / len(corpus) * 1e6)
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    legacy = LegacyDetector()
+    shared = get_message_scanner()
+
+    for message in corpus:
+        if legacy.run(message) != scanner_run(shared, message):
+            raise SystemExit(f"Mismatch between legacy and scanner for: {message!r}")
+
+    def cold(message: str):
+        shared._cache.clear()
+        return scanner_run(shared, message)
+
+    def memoized(message: str):
+        # Second and third caller in AIBrain (same text already scanned)
+        return scanner_run(shared, message)
+
+    results = {
+        "before (per-pattern loops)": time_per_message(legacy.run, corpus, args.repeat),
+        "after  (single pass)": time_per_message(cold, corpus, args.repeat),
+        "after  (memoized rescan)": time_per_message(memoized, corpus, args.repeat),
+    }
+
+    print(f"{len(corpus)} messages, {args.repeat} runs; CPU µs per message (median / best)")
+    baseline = statistics.median(next(iter(results.values())))
+    for name, runs in results.items():
+        median = statistics.median(runs)
+        print(f"  {name:<28} {median:8.1f}  {min(runs):8.1f}   x{baseline / median:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Input tokens and build time of the single-pass system prompt per message.
+
+"before" is the prompt as it used to be sent: all 8 layers rebuilt for
+every message, products as one labelled line each. "after" is the
+precompiled per-business prefix (compact product table) plus the
+per-message suffix, reported twice: sent inline (prefix still eligible
+for Gemini implicit caching) and with an explicit context cache, where
+only the suffix is billed as fresh input.
+
+Token counts are estimated at 4 chars/token unless --count-with-gemini is
+given (uses models.count_tokens with GEMINI_API_KEY).
+
+Tenant profiles come from a JSON file (list of business-data dicts) or
+are exported from Supabase by Firebase UID; without either, built-in
+representative profiles are used.
+
+Usage (from backend/):
+  python scripts/perf/prompt_token_benchmark.py
+  python scripts/perf/prompt_token_benchmark.py --export uid1 uid2 > profiles.json
+  python scripts/perf/prompt_token_benchmark.py --profiles profiles.json --count-with-gemini
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ai_brain import prompts  # noqa: E402
+from ai_brain.prompt_artifacts import PromptArtifactCache, estimate_tokens  # noqa: E402
+
+HISTORY = [
+    {"role": "user", "content": "hi, what services do you have?"},
+    {"role": "assistant", "content": "Hello! We offer haircuts, colouring, facials and more. What are you looking for?"},
+    {"role": "user", "content": "price for haircut?"},
+]
+
+WEEK = {
+    day: {"open": "10:00", "close": "20:00", "is_closed": day == "tuesday"}
+    for day in ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+}
+
+
+def _builtin_profiles():
+    salon = {
+        "business_id": "salon", "business_name": "Style Studio", "industry": "salon",
+        "description": "Premium unisex salon offering hair, skin and nail services.",
+        "contact": {"phone": "+91 98765 43210", "email": "hello@stylestudio.in"},
+        "location": {"address": "12 MG Road", "city": "Bangalore"},
+        "timings": WEEK,
+        "products_services": [
+            {"name": "Haircut - Men", "price": 300, "category": "Hair"},
+            {"name": "Haircut - Women", "price": 500, "category": "Hair"},
+            {"name": "Hair Coloring", "price": 1500, "category": "Hair"},
+            {"name": "Facial", "price": 800, "category": "Skin Care"},
+            {"name": "Manicure", "price": 400, "category": "Nails"},
+        ],
+        "policies": {"cancellation": "Free cancellation up to 2 hours before", "payment_methods": ["Cash", "UPI", "Card"]},
+        "faqs": [{"question": "Do you take walk-ins?", "answer": "Yes, but appointments are preferred"}],
+    }
+    store = {
+        "business_id": "store", "business_name": "Kurti Kart", "industry": "ecommerce",
+        "description": "Handcrafted cotton kurtis and dupattas, shipped across India.",
+        "contact": {"phone": "+91 90000 11111", "website": "https://kurtikart.in"},
+        "products_services": [
+            {
+                "name": f"{colour} {style} Kurti", "price": 499 + 100 * i,
+                "category": "Kurtis" if i % 3 else "Dupattas",
+                "stock_status": "in_stock" if i % 4 else "low_stock",
+                "description": f"Pure cotton {style.lower()} kurti with {colour.lower()} block print, sizes S-XXL",
+            }
+            for i, (colour, style) in enumerate(
+                (c, s) for c in ("Indigo", "Mustard", "Rose", "Olive", "Ivory") for s in ("Anarkali", "Straight", "A-Line", "Kaftan")
+            )
+        ],
+        "ecommerce_policies": {
+            "shipping_policy": "Free shipping above ₹999", "estimated_delivery": "3-5 days",
+            "cod_available": True, "return_policy": "Easy 7 day returns", "return_window": 7,
+        },
+        "faqs": [{"question": "Do you ship abroad?", "answer": "Not yet"}],
+    }
+    cafe = {
+        "business_id": "cafe", "business_name": "Filter Kaapi Co", "industry": "restaurant",
+        "location": {"address": "4 Besant Nagar", "city": "Chennai"},
+        "timings": WEEK,
+        "products_services": [
+            {"name": item, "price": price, "category": category}
+            for category, items in (
+                ("Coffee", (("Filter Coffee", 60), ("Cold Brew", 180), ("Cappuccino", 160), ("Mocha", 190))),
+                ("Tiffin", (("Idli Vada", 90), ("Masala Dosa", 120), ("Pongal", 100), ("Rava Dosa", 130))),
+                ("Sweets", (("Mysore Pak", 80), ("Kesari", 70))),
+            )
+            for item, price in items
+        ],
+    }
+    return [salon, store, cafe]
+
+
+def _export(uids):
+    from supabase_client import get_business_data_from_supabase
+
+    return [data for data in (get_business_data_from_supabase(uid) for uid in uids) if data]
+
+
+def _legacy_product_lines(products):
+    """The original one-labelled-line-per-product encoding."""
+    lines = []
+    for p in products:
+        price = p.get("price")
+        line = f"- {p.get('name', '')}: {f'₹{price}' if price else 'Price on request'}"
+        if p.get("category"):
+            line += f" [Category: {p['category']}]"
+        if p.get("stock_status"):
+            line += f" [{p['stock_status']}]"
+        if p.get("description"):
+            line += f" — {p['description'][:80]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _build(business_data, artifacts=None):
+    """Single-pass prompt; without `artifacts` every layer is rebuilt (old behavior)."""
+    suffix_args = ("en", False, HISTORY, "", {"name": "Priya"}, None)
+    if artifacts is None:
+        prefix = prompts._build_single_pass_prefix(business_data)
+    else:
+        prefix, _ = artifacts.get(business_data, "single_pass", prompts._build_single_pass_prefix)
+    return prefix, prompts._build_dynamic_suffix(*suffix_args)
+
+
+def _legacy_prompt(business_data):
+    compact = prompts._format_products_table
+    prompts._format_products_table = _legacy_product_lines
+    try:
+        prefix, suffix = _build(business_data)
+    finally:
+        prompts._format_products_table = compact
+    return f"{prefix}\n\n{suffix}"
+
+
+def _time_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", help="JSON file with a list of business-data dicts")
+    parser.add_argument("--export", nargs="+", metavar="UID", help="print Supabase profiles as JSON and exit")
+    parser.add_argument("--count-with-gemini", action="store_true", help="exact counts via models.count_tokens")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.export:
+        print(json.dumps(_export(args.export), ensure_ascii=False, indent=2, default=str))
+        return
+
+    profiles = json.load(open(args.profiles)) if args.profiles else _builtin_profiles()
+
+    count = estimate_tokens
+    if args.count_with_gemini:
+        from google import genai
+
+        client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+
+        def count(text):
+            return client.models.count_tokens(model=args.model, contents=text).total_tokens
+
+    artifacts = PromptArtifactCache()
+    print(f"{'business':<14}{'products':>9}{'before':>9}{'inline':>9}{'cached':>9}{'saved':>8}"
+          f"{'build µs before':>17}{'after':>8}")
+    totals = [0, 0, 0]
+    for data in profiles:
+        prefix, suffix = _build(data, artifacts)
+        before = count(_legacy_prompt(data))
+        inline = count(f"{prefix}\n\n{suffix}")
+        cached = count(suffix)
+        totals = [totals[0] + before, totals[1] + inline, totals[2] + cached]
+
+        build_before = _time_us(lambda: _build(data), args.repeat)
+        build_after = _time_us(lambda: _build(data, artifacts), args.repeat)
+        name = str(data.get("business_id") or data.get("business_name"))[:13]
+        print(f"{name:<14}{len(data.get('products_services') or []):>9}{before:>9}{inline:>9}{cached:>9}"
+              f"{1 - cached / before:>8.0%}{build_before:>17.0f}{build_after:>8.0f}")
+
+    print(f"\nfresh input tokens/message: before {totals[0]}, compact inline {totals[1]} "
+          f"({1 - totals[1] / totals[0]:.0%} less), context-cached {totals[2]} "
+          f"({1 - totals[2] / totals[0]:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Text to PDF render benchmark for Latin, Tamil and Devanagari documents.
+
+Measures the cold first render (font registration, cmap load) separately from
+warm renders, and reports output size next to the embedded font file size so
+glyph subsetting regressions are obvious.
+
+Usage (from backend/):
+  python scripts/perf/text_to_pdf_benchmark.py
+  python scripts/perf/text_to_pdf_benchmark.py --paragraphs 400 --iterations 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from domains.file_tools.contracts.text_to_pdf import TextPdfGenerateRequest  # noqa: E402
+from domains.file_tools.converters.text_to_pdf.reportlab_converter import ReportLabTextToPdfConverter  # noqa: E402
+
+SAMPLES = {
+    "latin": ("Every tool you need to work with PDFs, in one place. ", "NotoSans-Regular.ttf"),
+    "tamil": ("தமிழ் உரை சோதனை. ", "NotoSansTamil-Regular.ttf"),
+    "devanagari": (
+        "हिन्दी पाठ की जाँच. ",
+        "NotoSansDevanagari-Regular.ttf",
+    ),
+}
+
+
+def build_request(sentence: str, paragraphs: int) -> TextPdfGenerateRequest:
+    blocks: list[dict] = [{"type": "heading", "level": 1, "text": sentence.strip()}]
+    for index in range(paragraphs):
+        if index % 10 == 9:
+            blocks.append({"type": "list", "ordered": True, "items": [sentence.strip()] * 3})
+        else:
+            blocks.append({"type": "paragraph", "text": sentence * 6, "align": "left"})
+    return TextPdfGenerateRequest.parse_or_raise(
+        {
+            "document": {"version": "1", "title": "Benchmark", "blocks": blocks},
+            "options": {
+                "pageSize": "A4",
+                "orientation": "portrait",
+                "fontFamily": "Auto",
+                "fontSize": 12,
+                "lineHeight": 1.4,
+                "header": {"enabled": True, "text": sentence.strip()},
+                "footer": {"enabled": True, "text": "Flowauxi", "pageNumbers": True},
+            },
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    converter = ReportLabTextToPdfConverter()
+    fonts_dir = Path(__file__).resolve().parents[2] / "assets" / "fonts"
+
+    print(f"{'script':<12}{'cold ms':>10}{'warm p50 ms':>14}{'pages':>8}{'pdf KB':>9}{'font KB':>9}")
+    for name, (sentence, font_file) in SAMPLES.items():
+        request = build_request(sentence, args.paragraphs)
+
+        started = time.perf_counter()
+        result = converter.convert(request)
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        warm: list[float] = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            result = converter.convert(request)
+            warm.append((time.perf_counter() - started) * 1000)
+
+        font_path = fonts_dir / font_file
+        font_kb = font_path.stat().st_size / 1024 if font_path.exists() else 0
+        print(
+            f"{name:<12}{cold_ms:>10.1f}{statistics.median(warm):>14.1f}"
+            f"{result.page_count:>8}{len(result.bytes) / 1024:>9.1f}{font_kb:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
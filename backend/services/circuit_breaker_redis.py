@@ -19,7 +19,6 @@ Lua script guarantees atomic state transitions:
 
 import json
 import time
-import os
 import logging
 
 logger = logging.getLogger('reviseit.circuit_breaker_redis')
@@ -150,14 +149,11 @@ class RedisCircuitBreaker:
 
     def _get_redis(self):
         if self._redis is None:
-            try:
-                import redis as redis_mod
-                redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-                self._redis = redis_mod.from_url(redis_url, decode_responses=True)
-                self._redis.ping()
-            except Exception as e:
-                logger.warning(f"Redis unavailable for circuit breaker: {e}")
-                self._redis = None
+            from connections import get_redis
+
+            self._redis = get_redis("circuit_breaker")
+            if self._redis is None:
+                logger.warning("Redis unavailable for circuit breaker")
         return self._redis
 
     def can_execute(self) -> bool:
@@ -2,8 +2,6 @@ import os
 import json
 import logging
 from typing import List, Dict, Any, Optional
-import gspread # pyre-ignore[21]
-from google.oauth2.service_account import Credentials # pyre-ignore[21]
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
@@ -19,10 +17,9 @@ def _get_client():
     if not creds_json:
         raise ValueError("Google Sheets credentials not configured.")
     
-    creds_dict = json.loads(creds_json)
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client
+    # Authorized once per service account and reused across calls
+    from services.sheets_sync_engine import get_sheets_client
+    return get_sheets_client(json.loads(creds_json))
 
 def extract_sheet_id(url: str) -> Optional[str]:
     """Extracts the document ID from a Google Sheets URL."""
@@ -53,6 +53,7 @@ from domain import (
     ErrorCode,
 )
 from repository import InventoryRepository, get_inventory_repository
+from repository.inventory_repository import StockLookupResult
 
 
 logger = logging.getLogger('reviseit.service.inventory')
@@ -104,18 +105,17 @@ class InventoryService:
         """
         Validate stock availability for all items.
         Does NOT create reservations - just checks.
+        
+        One batched lookup for the whole cart, so latency does not grow
+        with the number of items.
         """
         insufficient = []
         
-        for item in items:
-            stock = self.repository.get_available_stock(
-                user_id=user_id,
-                product_id=item.product_id,
-                variant_id=item.variant_id,
-                size=item.size
-            )
-            
-            effective = stock.available - stock.reserved
+        stocks = self._lookup_stock_batch(user_id, items)
+        
+        for item, stock in zip(items, stocks):
+            # Unresolved lookups fail closed (0 available)
+            effective = stock.available - stock.reserved if stock else 0
             
             if effective < item.quantity:
                 insufficient.append(InsufficientStockItem(
@@ -169,16 +169,20 @@ class InventoryService:
             # ═══════════════════════════════════════════════════════════════════
             # SHOWCASE ITEM DETECTION & VALIDATION
             # Showcase items store stock in showcase_items.commerce.inventory
-            # They don't use the products/product_variants tables at all
+            # They don't use the products/product_variants tables at all.
+            # One batched lookup classifies every item and carries showcase
+            # stock, instead of two queries per item.
             # ═══════════════════════════════════════════════════════════════════
             showcase_items = []
+            showcase_stocks = []
             regular_items = []
             
-            for item in items:
-                # Check if this is a showcase item (not in products table)
-                is_showcase = self._is_showcase_item(user_id, item.product_id)
-                if is_showcase:
+            stocks = self._lookup_stock_batch(user_id, items)
+            for item, stock in zip(items, stocks):
+                # Unresolved lookups go to the catalog RPC, which re-validates
+                if stock is not None and stock.is_showcase:
                     showcase_items.append(item)
+                    showcase_stocks.append(stock)
                 else:
                     regular_items.append(item)
             
@@ -188,7 +192,7 @@ class InventoryService:
                     f"📦 [Showcase] Validating {len(showcase_items)} showcase items directly"
                 )
                 showcase_validation = self._validate_showcase_items(
-                    user_id, showcase_items, correlation_id
+                    showcase_items, showcase_stocks
                 )
                 if not showcase_validation.success:
                     return ReservationResult.failed(showcase_validation.insufficient_items)
@@ -387,110 +391,56 @@ class InventoryService:
     # SHOWCASE ITEM HELPERS
     # =========================================================================
     
-    def _is_showcase_item(self, user_id: str, product_id: str) -> bool:
+    def _lookup_stock_batch(
+        self,
+        user_id: str,
+        items: List[StockItem],
+    ) -> List[Optional[StockLookupResult]]:
         """
-        Check if a product_id is a showcase item (not in products table).
+        Batched stock lookup, index-aligned with items.
         
-        Returns True if the item is NOT found in products table,
-        meaning it's a showcase item stored in showcase_items table.
+        A result that does not line up with the cart is never trusted;
+        every slot becomes None so callers fail closed.
         """
-        try:
-            result = self.db.table('products').select('id').eq(
-                'id', product_id
-            ).eq('user_id', user_id).single().execute()
-            
-            # If product exists in products table, it's NOT a showcase item
-            return result.data is None
-        except Exception as e:
-            # If query fails, assume it's a showcase item (safer for stock validation)
-            logger.warning(f"Error checking if showcase item: {e}, assuming showcase=True")
-            return True
+        stocks = self.repository.get_available_stock_batch(user_id, items)
+        if not isinstance(stocks, list) or len(stocks) != len(items):
+            logger.error(
+                f"Stock batch lookup misaligned for {len(items)} items; ignoring result"
+            )
+            return [None] * len(items)
+        return stocks
     
     def _validate_showcase_items(
         self,
-        user_id: str,
         items: List[StockItem],
-        correlation_id: Optional[str] = None
+        stocks: List[StockLookupResult],
     ) -> ValidationResult:
         """
-        Validate stock for showcase items directly from showcase_items table.
+        Validate stock for showcase items from their batched lookups.
         This bypasses the RPC which only knows about products table.
         
-        Reads stock from showcase_items.commerce.inventory.quantity
+        Stock comes from showcase_items.commerce.inventory.quantity;
+        items missing from showcase_items count as 0 stock (fail safe).
         """
         insufficient = []
         
-        for item in items:
-            try:
-                # Query showcase_items table
-                result = self.db.table('showcase_items').select(
-                    'id, title, commerce'
-                ).eq('id', item.product_id).single().execute()
-                
-                if not result.data:
-                    # Item not found - treat as 0 stock
-                    logger.warning(f"Showcase item not found: {item.product_id}")
-                    insufficient.append(InsufficientStockItem(
-                        product_id=item.product_id,
-                        variant_id=None,
-                        size=None,
-                        color=None,
-                        name=item.name or "Unknown",
-                        requested=item.quantity,
-                        available=0
-                    ))
-                    continue
-                
-                # Parse commerce.inventory
-                commerce = result.data.get('commerce') or {}
-                if isinstance(commerce, str):
-                    import json
-                    try:
-                        commerce = json.loads(commerce)
-                    except:
-                        commerce = {}
-                
-                inventory = commerce.get('inventory') or {}
-                
-                # Get available stock
-                if inventory.get('status') == 'out_of_stock':
-                    available = 0
-                else:
-                    available = inventory.get('quantity', 0)
-                
-                name = result.data.get('title', item.name or 'Unknown')
-                
-                logger.info(
-                    f"🎯 [Showcase Validation] Item '{name}': {available} available, "
-                    f"{item.quantity} requested"
-                )
-                
-                # Check if sufficient stock
-                if available < item.quantity:
-                    insufficient.append(InsufficientStockItem(
-                        product_id=item.product_id,
-                        variant_id=None,
-                        size=None,
-                        color=None,
-                        name=name,
-                        requested=item.quantity,
-                        available=available
-                    ))
-                
-            except Exception as e:
-                logger.error(
-                    f"Error validating showcase item {item.product_id}: {e}",
-                    exc_info=True
-                )
-                # Treat errors as 0 stock (fail safe)
+        for item, stock in zip(items, stocks):
+            name = stock.name if stock.name != "Unknown" else (item.name or "Unknown")
+            
+            logger.info(
+                f"🎯 [Showcase Validation] Item '{name}': {stock.available} available, "
+                f"{item.quantity} requested"
+            )
+            
+            if stock.available < item.quantity:
                 insufficient.append(InsufficientStockItem(
                     product_id=item.product_id,
                     variant_id=None,
                     size=None,
                     color=None,
-                    name=item.name or "Unknown",
+                    name=name,
                     requested=item.quantity,
-                    available=0
+                    available=stock.available
                 ))
         
         if insufficient:
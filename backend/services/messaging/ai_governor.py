@@ -21,7 +21,6 @@ Author: FlowAuxi Engineering
 from __future__ import annotations
 
 import logging
-import os
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, Tuple
@@ -267,20 +266,12 @@ def get_ai_governor() -> AIGovernor:
     """Get singleton AIGovernor instance."""
     global _governor_instance
     if _governor_instance is None:
-        try:
-            import redis
-            redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-            redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                socket_timeout=2.0,
-                socket_connect_timeout=2.0,
-                max_connections=5,
-            )
-            redis_client.ping()
-            _governor_instance = AIGovernor(redis_client=redis_client)
-            logger.info("🧠 AIGovernor initialized")
-        except Exception as e:
-            logger.error(f"❌ AIGovernor init failed: {e}")
-            raise
+        from connections import get_redis
+
+        redis_client = get_redis("ai_governor")
+        if redis_client is None:
+            logger.error("❌ AIGovernor init failed: Redis unavailable")
+            raise ConnectionError("Redis unavailable for AIGovernor")
+        _governor_instance = AIGovernor(redis_client=redis_client)
+        logger.info("🧠 AIGovernor initialized")
     return _governor_instance
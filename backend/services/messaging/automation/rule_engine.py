@@ -28,17 +28,32 @@ Action Types:
     ai_response     — Generate AI-powered response
     assign_label    — Add a label to the conversation
 
+Matching:
+    Active rules are compiled per tenant into a CompiledRuleSet (see
+    rule_matcher.py): one Aho-Corasick pass finds every keyword rule that
+    can fire, regexes are precompiled and time-boxed, and other triggers
+    are bucketed by channel and message type. The raw rule list is shared
+    across workers through Redis; invalidate_cache() publishes on
+    RULES_INVALIDATION_CHANNEL so every process drops its compiled copy.
+    Rules are edited outside this service (dashboard → Supabase), so the
+    Redis copy and the compiled copy each expire after 30s: an edit is
+    live within 60s, as before the shared cache.
+    Trigger counts are buffered and written in batches.
+
 Author: FlowAuxi Engineering
 """
 
 from __future__ import annotations
 
+import atexit
+import json
 import logging
-import re
+import os
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..base import (
     Channel,
@@ -47,8 +62,25 @@ from ..base import (
     NormalizedMessage,
 )
 
+from .rule_matcher import CompiledRuleSet, compile_rules, rules_fingerprint
+
 logger = logging.getLogger('flowauxi.messaging.automation.rule_engine')
 
+RULES_REDIS_TTL = int(os.getenv('RULES_REDIS_TTL', '30'))
+RULES_INVALIDATION_CHANNEL = 'automation_rules:invalidate'
+RULE_TRIGGER_FLUSH_INTERVAL_MS = int(os.getenv('RULE_TRIGGER_FLUSH_INTERVAL_MS', '2000'))
+RULE_TRIGGER_BATCH_SIZE = 200
+
+
+def _rules_key(tenant_id: str) -> str:
+    return f"automation_rules:{tenant_id}"
+
+
+def _get_redis():
+    from connections import get_redis
+
+    return get_redis("automation_rules")
+
 
 @dataclass
 class RuleMatch:
@@ -68,8 +100,8 @@ class RuleEngine:
     """
     Priority-ordered rule matching engine.
 
-    Rules are fetched from the database per tenant, cached in memory
-    for the duration of a request, and evaluated in priority order.
+    Rules are fetched per tenant (Redis, then the database), compiled
+    once into a CompiledRuleSet and evaluated in priority order.
 
     Usage:
         engine = RuleEngine(supabase_client)
@@ -88,12 +120,17 @@ class RuleEngine:
                 ai_brain.generate(...)
     """
 
-    # Cache rules per tenant (refresh every 60s)
-    _cache: Dict[str, Tuple[List[Dict], float]] = {}
-    CACHE_TTL = 60.0
+    # Compiled rules per tenant (re-checked every 60s, or on invalidation)
+    _cache: Dict[str, Tuple[CompiledRuleSet, float]] = {}
+    CACHE_TTL = 30.0
+
+    _subscriber: Optional[threading.Thread] = None
+    _subscriber_pid: Optional[int] = None
+    _subscriber_lock = threading.Lock()
 
-    def __init__(self, supabase_client=None):
+    def __init__(self, supabase_client=None, trigger_counter: Optional['TriggerCountBuffer'] = None):
         self._db = supabase_client
+        self._trigger_counter = trigger_counter or TriggerCountBuffer(self._apply_trigger_counts)
 
     def evaluate(
         self,
@@ -119,11 +156,20 @@ class RuleEngine:
         if message.direction != MessageDirection.INBOUND:
             return RuleMatch(matched=False)
 
-        rules = self._get_rules(tenant_id)
-        if not rules:
+        compiled = self._get_compiled(tenant_id)
+        if compiled is None or not compiled.rules:
             return RuleMatch(matched=False)
 
-        for rule in rules:
+        # Only rules that can fire for this message, still in priority order
+        candidates = compiled.candidates(
+            message.text or '',
+            message.channel.value,
+            message.message_type.value,
+            message.postback_payload,
+        )
+
+        for index, keyword_hit in candidates:
+            rule = compiled.rules[index]
             try:
                 # Check channel applicability
                 rule_channels = rule.get('channels', ['instagram', 'whatsapp'])
@@ -137,7 +183,9 @@ class RuleEngine:
                     continue
 
                 # Evaluate trigger
-                matched, keyword = self._evaluate_trigger(rule, message)
+                matched, keyword = self._evaluate_trigger(
+                    rule, message, compiled, index, keyword_hit
+                )
 
                 if matched:
                     elapsed = (time.time() - start) * 1000
@@ -149,7 +197,7 @@ class RuleEngine:
                         f"eval_time={elapsed:.1f}ms"
                     )
 
-                    # Increment trigger count (fire-and-forget)
+                    # Increment trigger count (batched, off the hot path)
                     self._increment_trigger_count(rule['id'])
 
                     return RuleMatch(
@@ -180,10 +228,16 @@ class RuleEngine:
         self,
         rule: Dict[str, Any],
         message: NormalizedMessage,
+        compiled: CompiledRuleSet,
+        index: int,
+        keyword_hit: Optional[str],
     ) -> Tuple[bool, Optional[str]]:
         """
         Evaluate a single trigger against a message.
 
+        Keyword rules were already matched by the compiled automaton
+        (keyword_hit); regexes run precompiled with a time budget.
+
         Returns:
             (matched: bool, matched_keyword: str | None)
         """
@@ -191,10 +245,11 @@ class RuleEngine:
         config = rule.get('trigger_config', {})
 
         if trigger_type == 'keyword':
-            return self._match_keyword(config, message)
+            return keyword_hit is not None, keyword_hit
 
         elif trigger_type == 'regex':
-            return self._match_regex(config, message)
+            matched_text = compiled.regex_search(index, message.text or '')
+            return matched_text is not None, matched_text
 
         elif trigger_type == 'story_mention':
             matched = message.message_type == MessageType.STORY_MENTION
@@ -224,74 +279,6 @@ class RuleEngine:
         logger.debug(f"rule_unknown_trigger type={trigger_type}")
         return False, None
 
-    def _match_keyword(
-        self,
-        config: Dict[str, Any],
-        message: NormalizedMessage,
-    ) -> Tuple[bool, Optional[str]]:
-        """
-        Match message text against keyword list.
-
-        Config:
-            {
-                "keywords": ["hi", "hello", "hey"],
-                "match_type": "contains" | "exact" | "starts_with"
-            }
-        """
-        text = (message.text or '').strip().lower()
-        if not text:
-            return False, None
-
-        keywords = config.get('keywords', [])
-        match_type = config.get('match_type', 'contains')
-
-        for keyword in keywords:
-            kw = keyword.strip().lower()
-            if not kw:
-                continue
-
-            if match_type == 'exact':
-                if text == kw:
-                    return True, keyword
-            elif match_type == 'starts_with':
-                if text.startswith(kw):
-                    return True, keyword
-            else:  # contains (default)
-                if kw in text:
-                    return True, keyword
-
-        return False, None
-
-    def _match_regex(
-        self,
-        config: Dict[str, Any],
-        message: NormalizedMessage,
-    ) -> Tuple[bool, Optional[str]]:
-        """
-        Match message text against regex pattern.
-
-        Config:
-            {"pattern": "order\\s*#?\\d+", "flags": "i"}
-        """
-        text = message.text or ''
-        pattern = config.get('pattern', '')
-        if not pattern:
-            return False, None
-
-        flags_str = config.get('flags', 'i')
-        flags = 0
-        if 'i' in flags_str:
-            flags |= re.IGNORECASE
-
-        try:
-            match = re.search(pattern, text, flags)
-            if match:
-                return True, match.group(0)
-        except re.error as e:
-            logger.warning(f"rule_regex_error pattern={pattern}: {e}")
-
-        return False, None
-
     def _match_first_message(
         self,
         message: NormalizedMessage,
@@ -416,15 +403,43 @@ class RuleEngine:
     # =====================================================================
 
     def _get_rules(self, tenant_id: str) -> List[Dict[str, Any]]:
+        """Active rules for a tenant, sorted by priority (highest first)."""
+        compiled = self._get_compiled(tenant_id)
+        return compiled.rules if compiled else []
+
+    def _get_compiled(self, tenant_id: str) -> Optional[CompiledRuleSet]:
         """
-        Get active rules for a tenant, sorted by priority (highest first).
-        Results are cached for CACHE_TTL seconds.
+        Compiled rules for a tenant. Re-checked every CACHE_TTL seconds;
+        recompiled only when the rule list actually changed.
         """
+        self._ensure_subscriber()
         now = time.time()
         cached = self._cache.get(tenant_id)
         if cached and (now - cached[1]) < self.CACHE_TTL:
             return cached[0]
 
+        rules = self._load_rules(tenant_id)
+        if rules is None:
+            return cached[0] if cached else None
+
+        if cached and cached[0].fingerprint == rules_fingerprint(rules):
+            compiled = cached[0]
+        else:
+            compiled = compile_rules(rules)
+        self._cache[tenant_id] = (compiled, now)
+        return compiled
+
+    def _load_rules(self, tenant_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Rule rows from the shared Redis copy, else the database. None on error."""
+        redis_client = _get_redis()
+        if redis_client is not None:
+            try:
+                raw = redis_client.get(_rules_key(tenant_id))
+                if raw is not None:
+                    return json.loads(raw)
+            except Exception as e:
+                logger.debug(f"rule_cache_read_error tenant={tenant_id[:15]}: {e}")
+
         if not self._db:
             return []
 
@@ -434,34 +449,194 @@ class RuleEngine:
             ).eq('is_active', True).order(
                 'priority', desc=True
             ).execute()
-
             rules = result.data or []
-            self._cache[tenant_id] = (rules, now)
-            return rules
         except Exception as e:
             logger.error(f"rule_load_error tenant={tenant_id[:15]}: {e}")
-            return cached[0] if cached else []
+            return None
+
+        if redis_client is not None:
+            try:
+                redis_client.set(
+                    _rules_key(tenant_id), json.dumps(rules, default=str), ex=RULES_REDIS_TTL
+                )
+            except Exception as e:
+                logger.debug(f"rule_cache_write_error tenant={tenant_id[:15]}: {e}")
+        return rules
 
     def _increment_trigger_count(self, rule_id: str) -> None:
-        """Fire-and-forget: increment rule trigger count."""
+        """Buffer a trigger; counts are written in batches by a background flusher."""
         if not self._db:
             return
+        self._trigger_counter.add(rule_id)
+
+    def _apply_trigger_counts(self, batch: List[Dict[str, Any]]) -> None:
+        """Write buffered trigger counts (one RPC for the whole batch)."""
+        if not self._db or not batch:
+            return
         try:
-            self._db.rpc('increment_rule_trigger', {
-                'p_rule_id': rule_id
+            self._db.rpc('increment_rule_triggers_batch', {
+                'p_counts': batch,
             }).execute()
-        except Exception:
-            # Non-critical — best effort
+            return
+        except Exception as e:
+            logger.debug(f"rule_trigger_batch_rpc_unavailable: {e}")
+
+        # RPC not deployed yet: fall back to the per-rule path
+        for item in batch:
             try:
-                self._db.table('automation_rules').update({
-                    'last_triggered_at': datetime.now(timezone.utc).isoformat(),
-                }).eq('id', rule_id).execute()
+                for _ in range(item['count']):
+                    self._db.rpc('increment_rule_trigger', {
+                        'p_rule_id': item['rule_id']
+                    }).execute()
             except Exception:
-                pass
+                # Non-critical — best effort
+                try:
+                    self._db.table('automation_rules').update({
+                        'last_triggered_at': item['last_triggered_at'],
+                    }).eq('id', item['rule_id']).execute()
+                except Exception:
+                    pass
 
     def invalidate_cache(self, tenant_id: str) -> None:
-        """Clear cached rules for a tenant (after rule CRUD)."""
+        """Clear cached rules for a tenant in every worker (after rule CRUD)."""
         self._cache.pop(tenant_id, None)
+        redis_client = _get_redis()
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(_rules_key(tenant_id))
+            redis_client.publish(RULES_INVALIDATION_CHANNEL, tenant_id)
+        except Exception as e:
+            logger.warning(f"rule_cache_invalidate_error tenant={tenant_id[:15]}: {e}")
+
+    # =====================================================================
+    # Cross-worker invalidation (Redis pub/sub)
+    # =====================================================================
+
+    @classmethod
+    def _ensure_subscriber(cls) -> None:
+        pid = os.getpid()
+        if cls._subscriber_pid == pid and cls._subscriber is not None and cls._subscriber.is_alive():
+            return
+        with cls._subscriber_lock:
+            if cls._subscriber_pid == pid and cls._subscriber is not None and cls._subscriber.is_alive():
+                return
+            if _get_redis() is None:
+                return
+            cls._subscriber_pid = pid
+            cls._subscriber = threading.Thread(
+                target=cls._listen, name='rule-cache-invalidation', daemon=True
+            )
+            cls._subscriber.start()
+
+    @classmethod
+    def _listen(cls) -> None:
+        from redis.exceptions import TimeoutError as RedisTimeoutError
+
+        while True:
+            redis_client = _get_redis()
+            if redis_client is None:
+                time.sleep(5)
+                continue
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(RULES_INVALIDATION_CHANNEL)
+                # Anything cached before the subscription may have been missed
+                cls._cache.clear()
+                while True:
+                    try:
+                        message = pubsub.get_message(timeout=1.0)
+                    except (TimeoutError, RedisTimeoutError):
+                        continue
+                    if message and message.get('type') == 'message':
+                        tenant_id = message.get('data')
+                        if isinstance(tenant_id, bytes):
+                            tenant_id = tenant_id.decode('utf-8', 'replace')
+                        cls._cache.pop(tenant_id, None)
+            except Exception as e:
+                logger.debug(f"rule_cache_subscriber_error: {e}")
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+class TriggerCountBuffer:
+    """
+    Coalesces rule trigger increments; a lazily started daemon flusher
+    hands {'rule_id', 'count', 'last_triggered_at'} batches to apply_fn.
+    """
+
+    def __init__(
+        self,
+        apply_fn: Callable[[List[Dict[str, Any]]], Any],
+        flush_interval: float = RULE_TRIGGER_FLUSH_INTERVAL_MS / 1000,
+        max_batch: int = RULE_TRIGGER_BATCH_SIZE,
+    ):
+        self._apply = apply_fn
+        self._interval = flush_interval
+        self._max_batch = max(1, max_batch)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    def add(self, rule_id: str) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            item = self._pending.get(rule_id)
+            if item is None:
+                self._pending[rule_id] = {'rule_id': rule_id, 'count': 1, 'last_triggered_at': now}
+            else:
+                item['count'] += 1
+                item['last_triggered_at'] = now
+            full = len(self._pending) >= self._max_batch
+            self._ensure_flusher()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything buffered so far. Returns the number of rules flushed."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch = list(self._pending.values())
+            self._pending = {}
+
+        for start in range(0, len(batch), self._max_batch):
+            chunk = batch[start:start + self._max_batch]
+            try:
+                self._apply(chunk)
+            except Exception as e:
+                logger.error(f"rule_trigger_flush_failed rules={len(chunk)}: {e}")
+        return len(batch)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_flusher(self) -> None:
+        # Caller holds self._lock
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(
+            target=self._run, name='rule-trigger-flusher', daemon=True
+        )
+        self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"rule_trigger_flusher_error: {e}")
 
 
 # =========================================================================
@@ -0,0 +1,209 @@
+"""
+Compiled Rule Matcher — Per-Tenant Automaton for the Rule Engine
+=================================================================
+
+RuleEngine.evaluate used to walk every active rule per inbound message,
+re-normalizing keywords and recompiling user regexes each time. The rule
+list is now compiled once per tenant (and again only when it changes):
+
+    rules ──compile──► CompiledRuleSet
+                         ├─ Aho-Corasick automaton over every keyword
+                         │    (contains / starts_with / exact)
+                         ├─ precompiled regexes (timeout-guarded)
+                         ├─ postback payload → rules
+                         └─ channel → trigger buckets
+
+    evaluate(text, channel, message_type, postback)
+        one automaton pass over the text  ─┐
+        + rules bucketed for this message  ├─► candidate rule indexes
+                                           ┘   (priority order preserved)
+
+Evaluation cost is O(len(text) + candidates) regardless of how many
+keyword rules a tenant has. Semantics match the original per-rule checks:
+keywords are stripped and lower-cased, the text is stripped and
+lower-cased, and the first keyword in a rule's list that matches is
+reported.
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.aho_corasick import AhoCorasick
+
+logger = logging.getLogger('flowauxi.messaging.automation.rule_matcher')
+
+# User-supplied patterns run with a time budget (needs the `regex` package,
+# already a dependency); with plain `re` the subject length is capped instead.
+RULE_REGEX_TIMEOUT_MS = int(os.getenv('RULE_REGEX_TIMEOUT_MS', '50'))
+RULE_REGEX_MAX_TEXT = 4096
+
+try:
+    import regex as _regex_engine
+    _REGEX_TIMEOUT_SUPPORTED = True
+except ImportError:  # pragma: no cover - regex is in requirements.txt
+    _regex_engine = re
+    _REGEX_TIMEOUT_SUPPORTED = False
+
+# Triggers that only fire for one message type
+MESSAGE_TYPE_TRIGGERS = {
+    'story_mention': 'story_mention',
+    'story_reply': 'story_reply',
+    'reel_mention': 'reel_mention',
+    'referral': 'referral',
+}
+# Triggers evaluated for every message on the rule's channels
+ALWAYS_EVALUATED_TRIGGERS = ('regex', 'first_message', 'all')
+
+
+@dataclass(frozen=True)
+class _KeywordHit:
+    rule_index: int
+    position: int  # Order of the keyword within the rule's list
+    keyword: str   # As configured (reported back as matched_keyword)
+    length: int
+    match_type: str
+
+
+@dataclass
+class CompiledRuleSet:
+    """Immutable, precompiled view of a tenant's active rules."""
+
+    rules: List[Dict[str, Any]]
+    fingerprint: str
+    automaton: AhoCorasick = field(default_factory=AhoCorasick)
+    regexes: Dict[int, Any] = field(default_factory=dict)
+    postbacks: Dict[str, List[int]] = field(default_factory=dict)
+    # channel -> message_type (or '*') -> rule indexes
+    buckets: Dict[str, Dict[str, List[int]]] = field(default_factory=dict)
+    keyword_rules: int = 0
+
+    def candidates(
+        self,
+        text: str,
+        channel: str,
+        message_type: str,
+        postback: Optional[str] = None,
+    ) -> List[Tuple[int, Optional[str]]]:
+        """
+        Rules that may match this message, in priority order, each with the
+        keyword that matched (keyword rules) or None (everything else).
+        """
+        hits: Dict[int, _KeywordHit] = {}
+        normalized = (text or '').strip().lower()
+        if normalized and self.keyword_rules:
+            last = len(normalized) - 1
+            for end, hit in self.automaton.iter_matches(normalized):
+                start = end - hit.length + 1
+                if hit.match_type == 'exact' and (start != 0 or end != last):
+                    continue
+                if hit.match_type == 'starts_with' and start != 0:
+                    continue
+                current = hits.get(hit.rule_index)
+                if current is None or hit.position < current.position:
+                    hits[hit.rule_index] = hit
+
+        channel_buckets = self.buckets.get(channel, {})
+        indexes: Set[int] = set(channel_buckets.get('*', ()))
+        indexes.update(channel_buckets.get(message_type, ()))
+        if postback:
+            indexes.update(self.postbacks.get(postback, ()))
+        indexes.update(hits)
+
+        return [
+            (i, hits[i].keyword if i in hits else None)
+            for i in sorted(indexes)
+        ]
+
+    def regex_search(self, rule_index: int, text: str) -> Optional[str]:
+        """Run the rule's precompiled pattern; None on no match or timeout."""
+        pattern = self.regexes.get(rule_index)
+        if pattern is None:
+            return None
+        try:
+            if _REGEX_TIMEOUT_SUPPORTED:
+                match = pattern.search(text, timeout=RULE_REGEX_TIMEOUT_MS / 1000)
+            else:
+                match = pattern.search(text[:RULE_REGEX_MAX_TEXT])
+        except TimeoutError:
+            logger.warning(
+                f"rule_regex_timeout rule_id={str(self.rules[rule_index].get('id', '?'))[:15]} "
+                f"budget={RULE_REGEX_TIMEOUT_MS}ms"
+            )
+            return None
+        return match.group(0) if match else None
+
+
+def rules_fingerprint(rules: List[Dict[str, Any]]) -> str:
+    """Stable hash of the rule list; unchanged rules are not recompiled."""
+    raw = json.dumps(rules, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def compile_rules(rules: List[Dict[str, Any]]) -> CompiledRuleSet:
+    """Compile priority-ordered rules into a CompiledRuleSet."""
+    compiled = CompiledRuleSet(rules=list(rules), fingerprint=rules_fingerprint(rules))
+
+    for index, rule in enumerate(compiled.rules):
+        trigger_type = rule.get('trigger_type', '')
+        config = rule.get('trigger_config') or {}
+        channels = rule.get('channels') or ['instagram', 'whatsapp']
+
+        if trigger_type == 'keyword':
+            match_type = config.get('match_type', 'contains')
+            if match_type not in ('exact', 'starts_with'):
+                match_type = 'contains'
+            added = False
+            for position, keyword in enumerate(config.get('keywords', []) or []):
+                kw = str(keyword).strip().lower()
+                if not kw:
+                    continue
+                compiled.automaton.add(kw, _KeywordHit(index, position, keyword, len(kw), match_type))
+                added = True
+            compiled.keyword_rules += int(added)
+            continue
+
+        if trigger_type == 'postback':
+            for payload in config.get('payloads', []) or []:
+                compiled.postbacks.setdefault(payload, []).append(index)
+            continue
+
+        if trigger_type == 'regex':
+            pattern = _compile_regex(rule, config)
+            if pattern is None:
+                continue
+            compiled.regexes[index] = pattern
+            bucket = '*'
+        elif trigger_type in MESSAGE_TYPE_TRIGGERS:
+            bucket = MESSAGE_TYPE_TRIGGERS[trigger_type]
+        elif trigger_type in ALWAYS_EVALUATED_TRIGGERS:
+            bucket = '*'
+        else:
+            logger.debug(f"rule_unknown_trigger type={trigger_type}")
+            continue
+
+        for channel in channels:
+            compiled.buckets.setdefault(channel, {}).setdefault(bucket, []).append(index)
+
+    compiled.automaton.build()
+    return compiled
+
+
+def _compile_regex(rule: Dict[str, Any], config: Dict[str, Any]):
+    pattern = config.get('pattern', '')
+    if not pattern:
+        return None
+    flags = _regex_engine.IGNORECASE if 'i' in config.get('flags', 'i') else 0
+    try:
+        return _regex_engine.compile(pattern, flags)
+    except Exception as e:
+        logger.warning(f"rule_regex_error rule_id={str(rule.get('id', '?'))[:15]} pattern={pattern}: {e}")
+        return None
@@ -31,7 +31,6 @@ Author: FlowAuxi Engineering
 from __future__ import annotations
 
 import logging
-import os
 import time
 from dataclasses import dataclass
 from enum import Enum, IntEnum
@@ -329,19 +328,11 @@ def get_backpressure_controller() -> BackpressureController:
     """Get singleton BackpressureController instance."""
     global _controller_instance
     if _controller_instance is None:
-        redis_client = None
-        try:
-            import redis
-            redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-            redis_client = redis.from_url(
-                redis_url,
-                decode_responses=False,
-                socket_timeout=2.0,
-                socket_connect_timeout=2.0,
-            )
-            redis_client.ping()
-        except Exception as e:
-            logger.warning(f"⚠️ BackpressureController Redis unavailable: {e}")
+        from connections import get_redis
+
+        redis_client = get_redis("backpressure", decode_responses=False)
+        if redis_client is None:
+            logger.warning("⚠️ BackpressureController Redis unavailable")
         
         _controller_instance = BackpressureController(redis_client=redis_client)
         logger.info("⚡ BackpressureController initialized")
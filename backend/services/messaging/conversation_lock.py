@@ -270,24 +270,13 @@ def get_conversation_lock() -> ConversationLock:
     """Get singleton ConversationLock instance."""
     global _lock_instance
     if _lock_instance is None:
-        import os
-        
-        try:
-            import redis
-            redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-            redis_client = redis.from_url(
-                redis_url,
-                decode_responses=False,
-                socket_timeout=3.0,
-                socket_connect_timeout=3.0,
-                retry_on_timeout=True,
-                max_connections=5,
-            )
-            redis_client.ping()
-            _lock_instance = ConversationLock(redis_client)
-            logger.info("🔒 ConversationLock initialized")
-        except Exception as e:
-            logger.error(f"❌ ConversationLock init failed: {e}")
-            raise
+        from connections import get_redis
+
+        redis_client = get_redis("conversation_lock", decode_responses=False)
+        if redis_client is None:
+            logger.error("❌ ConversationLock init failed: Redis unavailable")
+            raise ConnectionError("Redis unavailable for ConversationLock")
+        _lock_instance = ConversationLock(redis_client)
+        logger.info("🔒 ConversationLock initialized")
     
     return _lock_instance
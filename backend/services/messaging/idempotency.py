@@ -381,25 +381,14 @@ def get_idempotency_guard() -> IdempotencyGuard:
     global _guard_instance
     if _guard_instance is None:
         # Lazy import to avoid circular dependencies
-        import os
-        
-        # Redis
-        redis_client = None
-        try:
-            import redis
-            redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-            redis_client = redis.from_url(
-                redis_url,
-                decode_responses=False,  # We handle encoding ourselves
-                socket_timeout=3.0,
-                socket_connect_timeout=3.0,
-                retry_on_timeout=True,
-                max_connections=5,
-            )
-            redis_client.ping()
+        from connections import get_redis
+
+        # Redis (we handle encoding ourselves)
+        redis_client = get_redis("idempotency", decode_responses=False)
+        if redis_client is not None:
             logger.info("✅ IdempotencyGuard Redis connected")
-        except Exception as e:
-            logger.warning(f"⚠️ IdempotencyGuard Redis unavailable: {e}")
+        else:
+            logger.warning("⚠️ IdempotencyGuard Redis unavailable")
         
         # Supabase (optional Layer 2)
         supabase_client = None
@@ -124,13 +124,9 @@ class FlowAuxiMessaging:
         if channel not in self._providers:
             if channel == Channel.INSTAGRAM:
                 # Get Redis for rate limiting
-                redis_client = None
-                try:
-                    import os, redis
-                    redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-                    redis_client = redis.from_url(redis_url, decode_responses=True)
-                except Exception:
-                    pass
+                from connections import get_redis
+
+                redis_client = get_redis("instagram", check=False)
                 self._providers[channel] = InstagramProvider(
                     redis_client=redis_client
                 )
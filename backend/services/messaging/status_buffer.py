@@ -0,0 +1,134 @@
+"""
+Message Status Buffer — Batched Delivery Receipt Ingestion
+===========================================================
+
+Delivered/read receipts outnumber inbound messages ~3:1 for broadcast
+tenants. Applying each one inline cost 5 Supabase round-trips inside the
+webhook request; the buffer instead collects receipts and a background
+flusher applies them with one apply_message_status_batch RPC per batch.
+
+    webhook → add_many() ──► {wamid: most advanced status}
+                                   │  size ≥ STATUS_BATCH_SIZE
+                                   │  or every STATUS_FLUSH_INTERVAL_MS
+                                   ▼
+                      update_message_statuses_batch() (1 RPC)
+
+Receipts for the same wamid collapse to the most advanced status before
+the flush, and the RPC itself refuses backwards transitions, so a late
+"delivered" never overwrites "read".
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger('flowauxi.messaging.status_buffer')
+
+STATUS_BATCH_SIZE = int(os.getenv('STATUS_BATCH_SIZE', '200'))
+STATUS_FLUSH_INTERVAL_MS = int(os.getenv('STATUS_FLUSH_INTERVAL_MS', '500'))
+
+
+def _rank(status: Optional[str]) -> int:
+    from supabase_client import MESSAGE_STATUS_RANK
+
+    return MESSAGE_STATUS_RANK.get((status or '').lower(), 0)
+
+
+class MessageStatusBuffer:
+    """
+    Thread-safe receipt buffer with a lazily started daemon flusher.
+
+    apply_fn receives a list of {'wamid', 'status', 'ts'} records and is
+    called from the flusher thread (or the caller of flush()).
+    """
+
+    def __init__(
+        self,
+        apply_fn: Callable[[List[Dict[str, Any]]], Any],
+        max_batch: int = STATUS_BATCH_SIZE,
+        flush_interval: float = STATUS_FLUSH_INTERVAL_MS / 1000,
+        rank_fn: Callable[[Optional[str]], int] = _rank,
+    ):
+        self._apply = apply_fn
+        self._max_batch = max(1, max_batch)
+        self._interval = flush_interval
+        self._rank = rank_fn
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for record in records:
+                wamid = record.get('wamid')
+                if not wamid or not record.get('status'):
+                    continue
+                current = self._pending.get(wamid)
+                if current is None or self._rank(record['status']) >= self._rank(current['status']):
+                    self._pending[wamid] = record
+            full = len(self._pending) >= self._max_batch
+            self._ensure_flusher()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Apply everything buffered so far. Returns the number of receipts sent."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch = list(self._pending.values())
+            self._pending = {}
+
+        for start in range(0, len(batch), self._max_batch):
+            chunk = batch[start:start + self._max_batch]
+            try:
+                self._apply(chunk)
+            except Exception as e:
+                logger.error(f"status_buffer_flush_failed receipts={len(chunk)}: {e}")
+        return len(batch)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_flusher(self) -> None:
+        # Caller holds self._lock
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(
+            target=self._run, name='message-status-flusher', daemon=True
+        )
+        self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"status_buffer_flusher_error: {e}")
+
+
+_buffer: Optional[MessageStatusBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_status_buffer() -> MessageStatusBuffer:
+    """Process-wide buffer feeding supabase_client.update_message_statuses_batch."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                from supabase_client import update_message_statuses_batch
+
+                _buffer = MessageStatusBuffer(update_message_statuses_batch)
+                atexit.register(_buffer.flush)
+    return _buffer
@@ -0,0 +1,367 @@
+"""
+WhatsApp Webhook Ingest — Fast-ACK Queue for the Legacy Endpoint
+=================================================================
+
+POST /api/whatsapp/webhook used to parse, dedupe, resolve credentials, run
+the AI and send the reply inside the HTTP request, and it only looked at
+entry[0].changes[0].messages[0]. With WHATSAPP_WEBHOOK_INGEST_MODE=queue:
+
+    POST /api/whatsapp/webhook
+    │
+    ├─ HMAC-SHA256 signature verification (same as /api/webhooks/meta)
+    ├─ Enqueue the RAW body (no JSON parse on the request path)
+    └─ 200 ACK
+
+    whatsapp.ingest_webhook (Celery, high)
+    ├─ Fan out EVERY entry → change → status / message
+    ├─ Statuses applied directly
+    └─ Messages pushed to a per-conversation mailbox, one drain task each
+
+    whatsapp.drain_conversation (Celery, high)
+    └─ Single drainer per conversation moves messages strictly in order
+       into a processing list (LMOVE) and removes each one only after
+       its handler returns; the drain lock is kept alive by a heartbeat
+
+Crash safety:
+    A message is never only in worker memory. If a drainer dies mid-reply,
+    its message stays in the processing list; the next drainer of that
+    conversation (or recover() at worker start) puts it back at the head
+    of the mailbox, so it is replied to at least once.
+
+Ordering guarantee:
+    Messages for the same (phone_number_id, sender) are processed one at a
+    time in webhook arrival order (sorted by Meta timestamp within a
+    delivery). Different conversations run in parallel.
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from celery.exceptions import SoftTimeLimitExceeded
+    TIME_LIMIT_EXCEPTIONS: Tuple[type, ...] = (SoftTimeLimitExceeded,)
+except ImportError:  # pragma: no cover - celery is a worker dependency
+    TIME_LIMIT_EXCEPTIONS = ()
+
+logger = logging.getLogger('flowauxi.messaging.whatsapp_ingest')
+
+INGEST_MODE = os.getenv('WHATSAPP_WEBHOOK_INGEST_MODE', 'sync').lower()
+
+MAILBOX_PREFIX = "wa_mailbox"
+MAILBOX_TTL = 86400        # Undrained messages expire after 24h
+DRAIN_LOCK_TTL = 30        # Short: a dead drainer's lock lapses quickly
+DRAIN_HEARTBEAT_SECONDS = 10  # Live drainers extend the lock this often
+
+
+def ingest_queue_enabled() -> bool:
+    """True when the legacy webhook should ACK and enqueue instead of processing inline."""
+    return INGEST_MODE == 'queue'
+
+
+# =========================================================================
+# Payload Fan-Out
+# =========================================================================
+
+def conversation_key(value: Dict[str, Any], message: Dict[str, Any]) -> str:
+    """Ordering key: one conversation = business number + customer number."""
+    phone_number_id = (value.get('metadata') or {}).get('phone_number_id') or 'unknown'
+    return f"{phone_number_id}:{message.get('from') or 'unknown'}"
+
+
+def fan_out_payload(
+    payload: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split a webhook payload into (statuses, message jobs).
+
+    Every entry, change and message is visited. Each job carries a trimmed
+    copy of its change value (metadata + the sender's contact) so it can be
+    processed on its own:
+
+        {'conversation_key': str, 'value': {...}, 'message': {...}}
+
+    Jobs keep payload order, except that messages of one conversation are
+    sorted by Meta timestamp (stable) so a batched delivery replays in the
+    order the customer sent it.
+    """
+    statuses: List[Dict[str, Any]] = []
+    jobs: List[Dict[str, Any]] = []
+
+    for entry in (payload or {}).get('entry') or []:
+        for change in entry.get('changes') or []:
+            value = change.get('value') or {}
+            statuses.extend(value.get('statuses') or [])
+
+            messages = value.get('messages') or []
+            if not messages:
+                continue
+
+            contacts = value.get('contacts') or []
+            for message in messages:
+                sender = message.get('from')
+                contact = next(
+                    (c for c in contacts if c.get('wa_id') == sender),
+                    contacts[0] if len(contacts) == 1 else None,
+                )
+                job_value = {
+                    'messaging_product': value.get('messaging_product'),
+                    'metadata': value.get('metadata') or {},
+                    'contacts': [contact] if contact else [],
+                }
+                jobs.append({
+                    'conversation_key': conversation_key(job_value, message),
+                    'value': job_value,
+                    'message': message,
+                })
+
+    return statuses, _order_within_conversations(jobs)
+
+
+def _order_within_conversations(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort each conversation's jobs by timestamp, keeping slot positions."""
+    slots: Dict[str, List[int]] = {}
+    for position, job in enumerate(jobs):
+        slots.setdefault(job['conversation_key'], []).append(position)
+
+    ordered = list(jobs)
+    for positions in slots.values():
+        if len(positions) < 2:
+            continue
+        group = sorted(
+            (jobs[p] for p in positions),
+            key=lambda job: _timestamp(job['message']),
+        )
+        for position, job in zip(positions, group):
+            ordered[position] = job
+    return ordered
+
+
+def _timestamp(message: Dict[str, Any]) -> int:
+    try:
+        return int(message.get('timestamp') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+# =========================================================================
+# Request Path: Verify + Enqueue
+# =========================================================================
+
+def verify_signature(signature_header: str, raw_body: bytes) -> bool:
+    """
+    Verify X-Hub-Signature-256 with the Meta app secret (constant-time).
+
+    Same secret and header format as /api/webhooks/meta; passes when no
+    secret is configured (dev).
+    """
+    app_secret = os.getenv('META_APP_SECRET', os.getenv('APP_SECRET', ''))
+    if not app_secret:
+        return True
+    if not signature_header or not signature_header.startswith('sha256='):
+        return False
+    expected = hmac.new(app_secret.encode('utf-8'), raw_body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature_header[7:], expected)
+
+
+def enqueue_raw_payload(raw_body: bytes) -> bool:
+    """
+    Hand the untouched body to whatsapp.ingest_webhook.
+
+    Returns False when the broker is unavailable so the caller can fall
+    back to inline processing instead of dropping the delivery.
+    """
+    try:
+        from celery_app import celery_app
+
+        if celery_app is None:
+            return False
+        celery_app.send_task(
+            'whatsapp.ingest_webhook',
+            kwargs={'raw_body': raw_body.decode('utf-8', errors='replace')},
+            queue='high',
+        )
+        return True
+    except Exception as e:
+        logger.error(f"whatsapp_ingest_enqueue_failed: {e}")
+        return False
+
+
+# =========================================================================
+# Per-Conversation Mailbox
+# =========================================================================
+
+class ConversationMailbox:
+    """
+    Redis list per conversation + processing list + single-drainer lock.
+
+    push() appends in arrival order; drain() is safe to call from any number
+    of workers — only the lock holder takes messages, the rest return
+    immediately. After releasing, the drainer re-checks the list so a
+    message pushed between the last LMOVE and the release is never stranded.
+    """
+
+    _RELEASE_SCRIPT = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    else
+        return 0
+    end
+    """
+
+    _EXTEND_SCRIPT = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("EXPIRE", KEYS[1], ARGV[2])
+    else
+        return 0
+    end
+    """
+
+    def __init__(self, redis_client):
+        self._redis = redis_client
+
+    @staticmethod
+    def _list_key(key: str) -> str:
+        return f"{MAILBOX_PREFIX}:{key}"
+
+    @staticmethod
+    def _processing_key(key: str) -> str:
+        return f"{MAILBOX_PREFIX}_processing:{key}"
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{MAILBOX_PREFIX}_lock:{key}"
+
+    def push(self, key: str, job: Dict[str, Any]) -> None:
+        list_key = self._list_key(key)
+        pipe = self._redis.pipeline()
+        pipe.rpush(list_key, json.dumps(job, separators=(',', ':')))
+        pipe.expire(list_key, MAILBOX_TTL)
+        pipe.execute()
+
+    def drain(self, key: str, handler: Callable[[Dict[str, Any]], Any]) -> int:
+        """Process queued jobs for one conversation in order. Returns count handled."""
+        list_key = self._list_key(key)
+        processing_key = self._processing_key(key)
+        lock_key = self._lock_key(key)
+        handled = 0
+
+        while True:
+            token = uuid.uuid4().hex
+            if not self._redis.set(lock_key, token, nx=True, ex=DRAIN_LOCK_TTL):
+                return handled  # Another worker is draining this conversation
+
+            lost = threading.Event()
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(lock_key, token, stop, lost),
+                name=f"wa-mailbox-heartbeat:{key}", daemon=True,
+            )
+            heartbeat.start()
+            try:
+                # A previous drainer died mid-message: that message goes first
+                self._requeue_in_flight(key)
+                while not lost.is_set():
+                    raw = self._redis.lmove(list_key, processing_key, 'LEFT', 'RIGHT')
+                    if raw is None:
+                        break
+                    try:
+                        handler(json.loads(raw))
+                    except TIME_LIMIT_EXCEPTIONS:
+                        # Out of time, not failed: the message stays in the
+                        # processing list and the next drain puts it back first
+                        raise
+                    except Exception as e:
+                        # Permanent failure: drop it so one bad message cannot
+                        # block the rest of the conversation
+                        logger.error(
+                            f"whatsapp_mailbox_job_failed conversation={key}: {e}",
+                            exc_info=True,
+                        )
+                    self._redis.lrem(processing_key, 1, raw)
+                    handled += 1
+            finally:
+                stop.set()
+                heartbeat.join()
+                self._release(lock_key, token)
+
+            if lost.is_set():
+                logger.warning(f"whatsapp_mailbox_lock_lost conversation={key}")
+                return handled
+            if not self._redis.llen(list_key):
+                return handled
+
+    def recover(self) -> List[str]:
+        """
+        Put messages of dead drainers back into their mailboxes (worker
+        start). Returns every conversation key that has queued messages so
+        the caller can schedule a drain for each.
+        """
+        pending = []
+        for list_key in self._redis.scan_iter(match=f"{MAILBOX_PREFIX}_processing:*"):
+            key = _decode(list_key).split(':', 1)[1]
+            if self._redis.exists(self._lock_key(key)):
+                continue  # Its drainer is alive
+            self._requeue_in_flight(key)
+        for list_key in self._redis.scan_iter(match=f"{MAILBOX_PREFIX}:*"):
+            key = _decode(list_key).split(':', 1)[1]
+            if self._redis.llen(list_key):
+                pending.append(key)
+        return pending
+
+    def _requeue_in_flight(self, key: str) -> None:
+        processing_key = self._processing_key(key)
+        list_key = self._list_key(key)
+        while self._redis.lmove(processing_key, list_key, 'RIGHT', 'LEFT') is not None:
+            logger.warning(f"whatsapp_mailbox_requeued conversation={key}")
+        self._redis.expire(list_key, MAILBOX_TTL)
+
+    def _heartbeat(self, lock_key: str, token: str, stop: threading.Event, lost: threading.Event) -> None:
+        while not stop.wait(DRAIN_HEARTBEAT_SECONDS):
+            try:
+                if not self._redis.eval(self._EXTEND_SCRIPT, 1, lock_key, token, DRAIN_LOCK_TTL):
+                    lost.set()
+                    return
+            except Exception as e:
+                # Keep trying; the lock only lapses after DRAIN_LOCK_TTL
+                logger.error(f"whatsapp_mailbox_heartbeat_error key={lock_key}: {e}")
+
+    def _release(self, lock_key: str, token: str) -> None:
+        try:
+            self._redis.eval(self._RELEASE_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.error(f"whatsapp_mailbox_release_error key={lock_key}: {e}")
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+_mailbox: Optional[ConversationMailbox] = None
+_mailbox_checked = False
+
+
+def get_conversation_mailbox() -> Optional[ConversationMailbox]:
+    """Shared mailbox, or None when Redis is unreachable."""
+    global _mailbox, _mailbox_checked
+    if _mailbox_checked:
+        return _mailbox
+    from connections import get_redis
+
+    client = get_redis("whatsapp_ingest")
+    if client is not None:
+        _mailbox = ConversationMailbox(client)
+    else:
+        logger.warning("whatsapp_mailbox_unavailable — processing inline")
+        _mailbox = None
+    _mailbox_checked = True
+    return _mailbox
@@ -45,14 +45,11 @@ CACHE_PREFIX = "monitor:"
 
 def _get_redis():
     """Get Redis connection (lazy, tolerant of missing Redis)."""
-    try:
-        import redis
-        redis_url = os.getenv('REDIS_URL')
-        if redis_url:
-            return redis.from_url(redis_url, decode_responses=True)
-    except Exception:
-        pass
-    return None
+    if not os.getenv('REDIS_URL'):
+        return None
+    from connections import get_redis
+
+    return get_redis("monitoring")
 
 
 def _cache_get(key: str) -> Optional[dict]:
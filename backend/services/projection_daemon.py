@@ -1,41 +1,62 @@
 """
-Standalone Projection Daemon — 100ms Polling Latency
-=====================================================
-High-frequency poller for the subscription_events → subscriptions.status
-projection. Runs as a standalone process (not Celery Beat) to achieve
-100ms latency. For lower-throughput setups, the Celery Beat task at
-2-second intervals is sufficient.
+Standalone Projection Daemon — Push-Driven, Set-Based, Sharded
+===============================================================
+Projects subscription_events → subscriptions.status. Runs as a
+standalone process (not Celery Beat); the Celery Beat task at 2-second
+intervals uses the same process_batch() as a fallback.
 
 Usage:
     python -m services.projection_daemon
-    # or
-    python backend/services/projection_daemon.py
+    # or, N projectors sharded on subscription_id:
+    PROJECTION_SHARD_COUNT=4 PROJECTION_SHARD_INDEX=0 python -m services.projection_daemon
 
 Design:
-  - Polls subscription_events table every POLL_INTERVAL_MS (default 100ms)
-  - Batches up to BATCH_SIZE events (default 100) per cycle
-  - Per-subscription locking via pg_advisory_xact_lock
-  - Updates projection_checkpoints after each batch
+
+    INSERT subscription_events ──► NOTIFY subscription_events
+                                          │  (LISTEN via DATABASE_URL;
+                                          ▼   polling if unavailable)
+    daemon wakes ──► fetch next BATCH_SIZE events of its shard
+                 ──► fold to the latest state per subscription (Python)
+                 ──► apply_subscription_projection RPC:
+                       one transaction = lock checkpoint row,
+                       one UPDATE ... FROM for all states,
+                       advance checkpoint + lag
+                 ──► full batch? fetch again at once : wait for NOTIFY
+
+  - Each shard (hash of subscription_id % PROJECTION_SHARD_COUNT) has its
+    own checkpoint row "subscription_status:<i>/<n>"; with one shard the
+    original "subscription_status" row is used. New shard rows start at
+    the shared checkpoint.
+  - Two instances of the same shard are fenced: the RPC only applies a
+    batch if the checkpoint is still where the batch was read from.
+  - subscriptions.projected_event_id keeps projection monotonic across
+    projectors (migration 107_subscription_projection_batch.sql).
+  - Without psycopg2 or DATABASE_URL the daemon polls every
+    POLL_INTERVAL_MS; with LISTEN it still polls every
+    PROJECTION_FALLBACK_POLL_MS in case a notification is missed.
   - Graceful shutdown on SIGINT/SIGTERM
-  - Health check endpoint on HTTP (optional, for container probes)
 """
 
 import os
-import sys
+import select
 import time
 import signal
 import logging
-from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] projection_daemon: %(message)s',
-)
 logger = logging.getLogger('projection_daemon')
 
 POLL_INTERVAL_MS = int(os.getenv('PROJECTION_POLL_INTERVAL_MS', '100'))
+FALLBACK_POLL_MS = int(os.getenv('PROJECTION_FALLBACK_POLL_MS', '2000'))
+# Short pause after a wake-up so bursts of inserts land in one batch
+NOTIFY_DEBOUNCE_MS = int(os.getenv('PROJECTION_NOTIFY_DEBOUNCE_MS', '10'))
 BATCH_SIZE = int(os.getenv('PROJECTION_BATCH_SIZE', '100'))
+SHARD_INDEX = int(os.getenv('PROJECTION_SHARD_INDEX', '0'))
+SHARD_COUNT = int(os.getenv('PROJECTION_SHARD_COUNT', '1'))
+LISTEN_RECONNECT_SECONDS = 30
+
+PROJECTOR_NAME = 'subscription_status'
+NOTIFY_CHANNEL = 'subscription_events'
 
 EVENT_TO_STATUS = {
     'subscription.created': 'pending',
@@ -75,92 +96,104 @@ def get_db():
     return get_supabase_client()
 
 
-def process_batch(db) -> dict:
-    """Process one batch of unprocessed events."""
-    try:
-        cp = db.table('projection_checkpoints') \
-            .select('last_processed_event_id') \
-            .eq('projector_name', 'subscription_status') \
-            .single() \
-            .execute()
+def checkpoint_name(shard: int = 0, shards: int = 1) -> str:
+    """Checkpoint row of a shard (the shared row when unsharded)."""
+    return PROJECTOR_NAME if shards <= 1 else f'{PROJECTOR_NAME}:{shard}/{shards}'
+
+
+def project_events(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Latest projected state per subscription for a batch ordered by id."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        latest[row['subscription_id']] = row
+
+    states = []
+    for sub_id, event in latest.items():
+        target_status = EVENT_TO_STATUS.get(event['event_type'])
+        if target_status is None and event['event_type'] == 'subscription.reconciled':
+            target_status = (event.get('payload') or {}).get('status')
+        if not target_status:
+            continue
+
+        state = {'subscription_id': sub_id, 'event_id': event['id'], 'status': target_status}
+        if event['event_type'] in PERIOD_EVENTS:
+            payload = event.get('payload') or {}
+            state['current_period_start'] = payload.get('current_period_start')
+            state['current_period_end'] = payload.get('current_period_end')
+        states.append(state)
+    return states
+
+
+def _read_checkpoint(db, name: str) -> int:
+    """Shard checkpoint, or the shared one for a shard that never ran."""
+    result = db.table('projection_checkpoints') \
+        .select('projector_name, last_processed_event_id') \
+        .in_('projector_name', list({name, PROJECTOR_NAME})) \
+        .execute()
+    by_name = {r['projector_name']: r.get('last_processed_event_id') or 0 for r in result.data or []}
+    return by_name.get(name, by_name.get(PROJECTOR_NAME, 0))
 
-        last_id = cp.data.get('last_processed_event_id', 0) if cp.data else 0
 
+def _fetch_events(db, last_id: int, shard: int, shards: int, batch_size: int) -> List[Dict[str, Any]]:
+    if shards <= 1:
         events = db.table('subscription_events') \
             .select('*') \
             .gt('id', last_id) \
             .order('id') \
-            .limit(BATCH_SIZE) \
+            .limit(batch_size) \
             .execute()
+    else:
+        events = db.rpc('fetch_subscription_events_shard', {
+            'p_after_id': last_id,
+            'p_shard': shard,
+            'p_shard_count': shards,
+            'p_limit': batch_size,
+        }).execute()
+    return events.data or []
 
-        rows = events.data or []
+
+def _invalidate_caches(sub_ids) -> None:
+    try:
+        from services.subscription_lifecycle import get_lifecycle_engine
+        engine = get_lifecycle_engine()
+        for sub_id in sub_ids:
+            engine._invalidate_caches_for_subscription(sub_id)
+    except Exception:
+        pass
+
+
+def process_batch(db, shard: int = 0, shards: int = 1, batch_size: int = BATCH_SIZE) -> dict:
+    """Project one batch of a shard's events in a single atomic RPC."""
+    try:
+        name = checkpoint_name(shard, shards)
+        last_id = _read_checkpoint(db, name)
+        rows = _fetch_events(db, last_id, shard, shards, batch_size)
         if not rows:
             return {'processed': 0, 'projected': 0}
 
-        subs_to_events = {}
-        for row in rows:
-            subs_to_events.setdefault(row['subscription_id'], []).append(row)
+        states = project_events(rows)
+        result = db.rpc('apply_subscription_projection', {
+            'p_projector': name,
+            'p_expected_event_id': last_id,
+            'p_last_event_id': rows[-1]['id'],
+            'p_last_event_at': rows[-1]['created_at'],
+            'p_states': states,
+        }).execute()
+        applied = result.data or {}
 
-        projected_count = 0
-        for sub_id, sub_events in subs_to_events.items():
-            try:
-                latest = sub_events[-1]
-                target_status = EVENT_TO_STATUS.get(latest['event_type'])
-
-                if target_status is None and latest['event_type'] == 'subscription.reconciled':
-                    target_status = (latest.get('payload') or {}).get('status')
-
-                if not target_status:
-                    continue
-
-                lock_id = abs(hash(sub_id)) % (2**63)
-                try:
-                    db.rpc('pg_advisory_xact_lock', {'key': lock_id}).execute()
-                except Exception:
-                    pass
-
-                update = {
-                    'status': target_status,
-                    'updated_at': datetime.now(timezone.utc).isoformat(),
-                }
-
-                if latest['event_type'] in PERIOD_EVENTS:
-                    payload = latest.get('payload') or {}
-                    if payload.get('current_period_start'):
-                        update['current_period_start'] = payload['current_period_start']
-                    if payload.get('current_period_end'):
-                        update['current_period_end'] = payload['current_period_end']
-
-                db.table('subscriptions') \
-                    .update(update) \
-                    .eq('id', sub_id) \
-                    .execute()
-
-                projected_count += 1
-
-            except Exception as e:
-                logger.error(f"projection_error sub={sub_id}: {e}")
-
-        new_last_id = rows[-1]['id']
-        now = datetime.now(timezone.utc)
-        lag = int((now - datetime.fromisoformat(
-            rows[-1]['created_at'].replace('Z', '+00:00')
-        )).total_seconds())
-
-        db.table('projection_checkpoints') \
-            .update({
-                'last_processed_event_id': new_last_id,
-                'last_processed_at': now.isoformat(),
-                'lag_seconds': lag,
-            }) \
-            .eq('projector_name', 'subscription_status') \
-            .execute()
+        if not applied.get('applied'):
+            # Another instance of this shard got there first; re-read
+            logger.info(f"checkpoint_moved projector={name} to={applied.get('checkpoint')}")
+            return {'processed': 0, 'projected': 0, 'fenced': True, 'has_more': True}
+
+        _invalidate_caches(s['subscription_id'] for s in states)
 
         return {
             'processed': len(rows),
-            'projected': projected_count,
-            'lag': lag,
-            'checkpoint': new_last_id,
+            'projected': applied.get('projected', 0),
+            'lag': applied.get('lag_seconds', 0),
+            'checkpoint': applied.get('checkpoint'),
+            'has_more': len(rows) >= batch_size,
         }
 
     except Exception as e:
@@ -168,26 +201,92 @@ def process_batch(db) -> dict:
         return {'error': str(e)}
 
 
-def main_loop():
-    """Main polling loop."""
+class EventListener:
+    """
+    LISTEN on the subscription_events channel over a direct Postgres
+    connection (PostgREST cannot LISTEN). Optional: needs psycopg2 and
+    DATABASE_URL; connect() returns False otherwise.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, channel: str = NOTIFY_CHANNEL):
+        self.dsn = dsn or os.getenv('DATABASE_URL')
+        self.channel = channel
+        self._conn = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def connect(self) -> bool:
+        if not self.dsn:
+            return False
+        try:
+            import psycopg2
+            import psycopg2.extensions
+        except ImportError:
+            logger.warning("psycopg2 not installed, projection daemon will poll")
+            return False
+        try:
+            conn = psycopg2.connect(self.dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f'LISTEN {self.channel}')
+        except Exception as e:
+            logger.warning(f"LISTEN {self.channel} failed, polling instead: {e}")
+            return False
+        self._conn = conn
+        logger.info(f"Listening on {self.channel}")
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a notification or timeout; True if notified."""
+        try:
+            self._conn.poll()
+            if not self._conn.notifies:
+                ready, _, _ = select.select([self._conn], [], [], timeout)
+                if ready:
+                    self._conn.poll()
+            notified = bool(self._conn.notifies)
+            self._conn.notifies.clear()
+            return notified
+        except Exception as e:
+            logger.warning(f"LISTEN connection lost, polling until reconnect: {e}")
+            self.close()
+            return False
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+def main_loop(shard: int = SHARD_INDEX, shards: int = SHARD_COUNT):
+    """Project on every notification (or poll tick) until shutdown."""
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    if not 0 <= shard < shards:
+        raise ValueError(f"invalid shard {shard}/{shards}")
+
+    db = get_db()
+    listener = EventListener()
+    listener.connect()
+    last_connect_attempt = time.monotonic()
+
     logger.info(
-        f"Starting projection daemon: "
-        f"interval={POLL_INTERVAL_MS}ms batch={BATCH_SIZE}"
+        f"Starting projection daemon: shard={shard}/{shards} batch={BATCH_SIZE} "
+        f"mode={'listen' if listener.connected else f'poll {POLL_INTERVAL_MS}ms'}"
     )
 
-    db = get_db()
     cycle_count = 0
     total_processed = 0
     total_projected = 0
 
     while not _shutdown:
-        cycle_start = time.monotonic()
-
         try:
-            result = process_batch(db)
+            result = process_batch(db, shard, shards)
 
             if result.get('processed', 0) > 0:
                 total_processed += result['processed']
@@ -203,12 +302,22 @@ def main_loop():
                     )
         except Exception as e:
             logger.error(f"cycle_error: {e}", exc_info=True)
+            result = {}
+
+        if result.get('has_more'):
+            continue  # Backlog: keep draining without waiting
 
-        elapsed_ms = (time.monotonic() - cycle_start) * 1000
-        sleep_ms = max(0, POLL_INTERVAL_MS - elapsed_ms)
-        if sleep_ms > 0:
-            time.sleep(sleep_ms / 1000)
+        if not listener.connected and time.monotonic() - last_connect_attempt > LISTEN_RECONNECT_SECONDS:
+            last_connect_attempt = time.monotonic()
+            listener.connect()
 
+        if listener.connected:
+            if listener.wait(FALLBACK_POLL_MS / 1000) and NOTIFY_DEBOUNCE_MS:
+                time.sleep(NOTIFY_DEBOUNCE_MS / 1000)
+        else:
+            time.sleep(POLL_INTERVAL_MS / 1000)
+
+    listener.close()
     logger.info(
         f"Daemon stopped. cycles={cycle_count} "
         f"total_events={total_processed} total_projected={total_projected}"
@@ -216,6 +325,10 @@ def main_loop():
 
 
 if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] projection_daemon: %(message)s',
+    )
     # Load env before starting
     from dotenv import load_dotenv
     load_dotenv()
@@ -13,18 +13,50 @@ Key design decisions:
   - Auto-heals by INSERT into subscription_events (not direct UPDATE)
   - NEVER heals during Razorpay's 24-hour retry window to avoid duplicates
   - Manual override: set subscription.reconciled_override = 'skip' to bypass
+
+Bulk runs (reconcile_domain_subscriptions, billing_monitor.sync_razorpay_state):
+
+    subscriptions ──► page of PAGE_SIZE rows (keyset: id > cursor)
+                          │
+                          ▼
+                  RazorpayFetcher.fetch_many ── bounded pool, one pooled
+                          │                     HTTP session, token bucket
+                          ▼
+                  compare page ──► paged subscription_events read for the
+                          │        drifted rows, ONE bulk INSERT
+                          ▼
+                  checkpoint cursor (Redis) ──► next page
+
+  - A run that dies (worker restart, soft time limit) resumes after the
+    last finished page; the checkpoint is cleared when a run completes.
+  - RAZORPAY_API_BASE points the fetcher at a local Razorpay stub in tests.
 """
 
+import concurrent.futures
+import json
 import logging
 import os
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger('reviseit.services.reconciliation_engine')
 
 RAZORPAY_RETRY_WINDOW_HOURS = int(os.getenv('RAZORPAY_RETRY_WINDOW_HOURS', '24'))
 RECONCILIATION_DELAY_SECONDS = int(os.getenv('RECONCILIATION_DELAY_SECONDS', '60'))
 
+RAZORPAY_API_BASE = os.getenv('RAZORPAY_API_BASE', 'https://api.razorpay.com/v1')
+RECONCILIATION_PAGE_SIZE = int(os.getenv('RECONCILIATION_PAGE_SIZE', '200'))
+RECONCILIATION_EVENT_PAGE_SIZE = int(os.getenv('RECONCILIATION_EVENT_PAGE_SIZE', '1000'))
+RECONCILIATION_WORKERS = int(os.getenv('RECONCILIATION_WORKERS', '8'))
+# Razorpay throttles per key; stay well under it across all workers
+RAZORPAY_FETCH_RATE = float(os.getenv('RAZORPAY_FETCH_RATE_PER_SECOND', '10'))
+RAZORPAY_FETCH_BURST = int(os.getenv('RAZORPAY_FETCH_BURST', '10'))
+RECONCILIATION_CHECKPOINT_TTL = int(os.getenv('RECONCILIATION_CHECKPOINT_TTL_SECONDS', '86400'))
+RECONCILIATION_LOCK_TTL = int(os.getenv('RECONCILIATION_LOCK_TTL_SECONDS', '900'))
+
 
 def reconcile_subscription(subscription_id: str, razorpay_subscription_id: str) -> Dict[str, Any]:
     """
@@ -73,79 +105,31 @@ def reconcile_subscription(subscription_id: str, razorpay_subscription_id: str)
             result['reason'] = 'razorpay_api_error'
             return result
 
-        local_status = sub.get('status')
-
-        # 3. Compare
-        mapped = _map_razorpay_status(razorpay_status)
-        if mapped == local_status:
-            result['reason'] = 'in_sync'
-            return result
-
-        drift_detected = True
-        result['drift_detected'] = True
-        result['local_status'] = local_status
-        result['razorpay_status'] = razorpay_status
-        result['mapped_status'] = mapped
-
-        # 4a. Check retry window
-        created_str = sub.get('created_at')
-        if created_str:
-            try:
-                created = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
-                if datetime.now(timezone.utc) - created < timedelta(hours=RAZORPAY_RETRY_WINDOW_HOURS):
-                    result['reason'] = 'within_razorpay_retry_window'
-                    return result
-            except (ValueError, TypeError):
-                pass
-
-        # 4b. Check manual override
-        if sub.get('reconciled_override') == 'skip':
-            result['reason'] = 'manual_override_skip'
+        # 3-4b. Compare, retry window, manual override
+        mapped = _assess_drift(sub, razorpay_status, result)
+        if mapped is None:
             return result
 
         # 4c. Fetch event log to see actual event sequence
-        events = db.table('subscription_events') \
-            .select('event_type, new_status') \
-            .eq('subscription_id', subscription_id) \
-            .order('id') \
-            .execute()
+        event_types = _existing_event_types(db, [subscription_id])[subscription_id]
+        rows = _healing_event_rows(sub, razorpay_subscription_id, razorpay_status, mapped, event_types)
 
-        event_types = [e['event_type'] for e in (events.data or [])]
-
-        # Determine if we need to synthesize events
-        missing_events = _detect_missing_events(event_types, local_status, mapped)
-
-        if not missing_events:
+        if not rows:
             result['reason'] = 'projection_lag_only'
             return result
 
-        # Synthesize missing events
-        for event_type, new_status, reason in missing_events:
-            _insert_event(
-                db=db,
-                subscription_id=subscription_id,
-                user_id=sub.get('user_id'),
-                domain=sub.get('product_domain'),
-                event_type=event_type,
-                previous_status=local_status,
-                new_status=new_status,
-                reason=reason,
-                payload={
-                    'status': new_status,
-                    'razorpay_status': razorpay_status,
-                    'reconciled_by': 'reconciliation_engine',
-                    'razorpay_subscription_id': razorpay_subscription_id,
-                },
-            )
+        if not _insert_events(db, rows):
+            result['reason'] = 'event_insert_failed'
+            return result
 
         result['auto_healed'] = True
-        result['events_synthesized'] = len(missing_events)
+        result['events_synthesized'] = len(rows)
         result['reason'] = 'auto_healed'
 
         logger.info(
             f"reconciliation sub={subscription_id} rzp_id={razorpay_subscription_id} "
-            f"local={local_status}→razorpay={razorpay_status} "
-            f"events_synthesized={len(missing_events)}"
+            f"local={sub.get('status')}→razorpay={razorpay_status} "
+            f"events_synthesized={len(rows)}"
         )
 
     except Exception as e:
@@ -155,6 +139,69 @@ def reconcile_subscription(subscription_id: str, razorpay_subscription_id: str)
     return result
 
 
+def _assess_drift(sub: Dict[str, Any], razorpay_status: str, result: Dict[str, Any]) -> Optional[str]:
+    """
+    Mapped Razorpay status if the subscription drifted and may be healed
+    now; otherwise None with result['reason'] set.
+    """
+    local_status = sub.get('status')
+    mapped = _map_razorpay_status(razorpay_status)
+    if mapped == local_status:
+        result['reason'] = 'in_sync'
+        return None
+
+    result['drift_detected'] = True
+    result['local_status'] = local_status
+    result['razorpay_status'] = razorpay_status
+    result['mapped_status'] = mapped
+
+    created_str = sub.get('created_at')
+    if created_str:
+        try:
+            created = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
+            if datetime.now(timezone.utc) - created < timedelta(hours=RAZORPAY_RETRY_WINDOW_HOURS):
+                result['reason'] = 'within_razorpay_retry_window'
+                return None
+        except (ValueError, TypeError):
+            pass
+
+    if sub.get('reconciled_override') == 'skip':
+        result['reason'] = 'manual_override_skip'
+        return None
+
+    return mapped
+
+
+def _healing_event_rows(
+    sub: Dict[str, Any],
+    razorpay_subscription_id: str,
+    razorpay_status: str,
+    mapped: str,
+    existing_events: list,
+) -> List[Dict[str, Any]]:
+    """subscription_events rows that bring the log in line with Razorpay."""
+    return [
+        {
+            'subscription_id': sub['id'],
+            'user_id': sub.get('user_id'),
+            'product_domain': sub.get('product_domain'),
+            'event_type': event_type,
+            'previous_status': sub.get('status'),
+            'new_status': new_status,
+            'reason': reason,
+            'triggered_by': 'reconciliation_engine',
+            'actor': 'reconciliation_engine',
+            'payload': {
+                'status': new_status,
+                'razorpay_status': razorpay_status,
+                'reconciled_by': 'reconciliation_engine',
+                'razorpay_subscription_id': razorpay_subscription_id,
+            },
+        }
+        for event_type, new_status, reason in _detect_missing_events(existing_events, sub.get('status'), mapped)
+    ]
+
+
 def _map_razorpay_status(razorpay_status: str) -> str:
     """Map Razorpay subscription status to our internal status."""
     mapping = {
@@ -205,95 +252,423 @@ def _detect_missing_events(
     return [('subscription.reconciled', target_status, f'reconciliation: status set to {target_status}')]
 
 
-def _insert_event(
-    db,
-    subscription_id: str,
-    user_id: str,
-    domain: str,
-    event_type: str,
-    previous_status: Optional[str],
-    new_status: str,
-    reason: str,
-    payload: Optional[Dict] = None,
-):
-    """Insert a synthetic reconciliation event."""
+# The only event types _detect_missing_events looks for
+_HEALING_EVENT_TYPES = (
+    'subscription.activated',
+    'subscription.cancelled',
+    'subscription.expired',
+    'subscription.halted',
+    'subscription.past_due',
+    'subscription.suspended',
+)
+
+
+def _existing_event_types(db, subscription_ids: List[str]) -> Dict[str, List[str]]:
+    """
+    Healing-relevant event types already logged per subscription.
+
+    Keyset-paged by id until an empty page: PostgREST silently caps each
+    response at max-rows, and a truncated history would make
+    _detect_missing_events synthesize duplicate events.
+    """
+    found: Dict[str, List[str]] = defaultdict(list)
+    after = 0
+    while True:
+        events = db.table('subscription_events') \
+            .select('id, subscription_id, event_type') \
+            .in_('subscription_id', subscription_ids) \
+            .in_('event_type', list(_HEALING_EVENT_TYPES)) \
+            .gt('id', after) \
+            .order('id') \
+            .limit(RECONCILIATION_EVENT_PAGE_SIZE) \
+            .execute()
+        rows = events.data or []
+        if not rows:
+            return found
+        for event in rows:
+            found[event['subscription_id']].append(event['event_type'])
+        after = rows[-1]['id']
+
+
+def _insert_events(db, rows: List[Dict[str, Any]]) -> bool:
+    """Insert synthetic reconciliation events in one statement."""
+    if not rows:
+        return True
     try:
-        db.table('subscription_events').insert({
-            'subscription_id': subscription_id,
-            'user_id': user_id,
-            'product_domain': domain,
-            'event_type': event_type,
-            'previous_status': previous_status,
-            'new_status': new_status,
-            'reason': reason,
-            'triggered_by': 'reconciliation_engine',
-            'actor': 'reconciliation_engine',
-            'payload': payload or {},
-        }).execute()
+        db.table('subscription_events').insert(rows).execute()
+        return True
     except Exception as e:
-        logger.error(f"reconciliation_insert_event_error sub={subscription_id}: {e}")
+        subs = sorted({r['subscription_id'] for r in rows})
+        logger.error(f"reconciliation_insert_events_error subs={subs}: {e}")
+        return False
 
 
-def _fetch_razorpay_subscription_status(razorpay_subscription_id: str) -> Optional[str]:
-    """Fetch subscription status from Razorpay API."""
-    try:
-        import razorpay
-        key_id = os.getenv('RAZORPAY_KEY_ID')
-        key_secret = os.getenv('RAZORPAY_KEY_SECRET')
-        if not key_id or not key_secret:
+# =============================================================================
+# RAZORPAY FETCHER (pooled session, bounded pool, token bucket)
+# =============================================================================
+
+class TokenBucket:
+    """
+    Blocking token bucket shared by the fetch workers. Callers reserve a
+    token under the lock (the balance may go negative) and sleep off
+    their debt outside it, so waiters are served in arrival order.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = max(rate_per_second, 0.001)
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token; returns the seconds spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RazorpayFetcher:
+    """
+    GET /subscriptions/{id} against the Razorpay REST API over one pooled
+    session, paced by a token bucket and fanned out on a bounded pool.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        rate_per_second: float = RAZORPAY_FETCH_RATE,
+        burst: int = RAZORPAY_FETCH_BURST,
+        max_workers: int = RECONCILIATION_WORKERS,
+        timeout: Tuple[float, float] = (5, 15),
+        backoff_factor: float = 0.5,
+    ):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = (base_url or RAZORPAY_API_BASE).rstrip('/')
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_second, burst)
+
+        # 429 honours Retry-After; GET is idempotent so 5xx is safe to retry
+        retry_strategy = Retry(
+            total=3,
+            connect=3,
+            read=3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            backoff_factor=backoff_factor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry_strategy)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.auth = auth or (os.getenv('RAZORPAY_KEY_ID', ''), os.getenv('RAZORPAY_KEY_SECRET', ''))
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="rzp-fetch",
+        )
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'not_found': 0, 'throttled_s': 0.0}
+
+    def fetch(self, razorpay_subscription_id: str) -> Optional[Dict[str, Any]]:
+        """Razorpay subscription entity, or None on any error."""
+        if not all(self.session.auth):
             logger.error("Razorpay credentials not configured")
             return None
 
-        client = razorpay.Client(auth=(key_id, key_secret))
-        sub_data = client.subscription.fetch(razorpay_subscription_id)
-        return sub_data.get('status')
+        waited = self.bucket.acquire()
+        status = None
+        try:
+            response = self.session.get(
+                f"{self.base_url}/subscriptions/{razorpay_subscription_id}",
+                timeout=self.timeout,
+            )
+            status = response.status_code
+            if status == 200:
+                return response.json()
+            logger.error(f"razorpay_fetch_error rzp_id={razorpay_subscription_id}: HTTP {status}")
+            return None
+        except Exception as e:
+            logger.error(f"razorpay_fetch_error rzp_id={razorpay_subscription_id}: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._stats['requests'] += 1
+                self._stats['throttled_s'] += waited
+                if status == 404:
+                    self._stats['not_found'] += 1
+                elif status != 200:
+                    self._stats['errors'] += 1
+
+    def fetch_many(self, razorpay_subscription_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch a page of subscriptions concurrently (order-independent)."""
+        ids = list(dict.fromkeys(razorpay_subscription_ids))
+        return dict(zip(ids, self._executor.map(self.fetch, ids)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['throttled_s'] = round(stats['throttled_s'], 2)
+        stats['base_url'] = self.base_url
+        return stats
+
+
+_fetcher: Optional[RazorpayFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_razorpay_fetcher() -> RazorpayFetcher:
+    """Process-wide fetcher: one session, one pool, one rate budget."""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = RazorpayFetcher()
+    return _fetcher
+
 
-    except Exception as e:
-        logger.error(f"razorpay_fetch_error rzp_id={razorpay_subscription_id}: {e}")
-        return None
+def _fetch_razorpay_subscription_status(razorpay_subscription_id: str) -> Optional[str]:
+    """Fetch subscription status from Razorpay API."""
+    sub_data = get_razorpay_fetcher().fetch(razorpay_subscription_id)
+    return sub_data.get('status') if sub_data else None
+
+
+# =============================================================================
+# RESUMABLE CHECKPOINTS
+# =============================================================================
+
+class _RedisCheckpoints:
+    """Run cursor + run lock per scan name, in Redis."""
+
+    def __init__(self, client):
+        self._r = client
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        raw = self._r.get(f"reconciliation:checkpoint:{name}")
+        return json.loads(raw) if raw else None
+
+    def save(self, name: str, state: Dict[str, Any]) -> None:
+        self._r.set(f"reconciliation:checkpoint:{name}", json.dumps(state), ex=RECONCILIATION_CHECKPOINT_TTL)
+        self._r.expire(f"reconciliation:lock:{name}", RECONCILIATION_LOCK_TTL)
+
+    def clear(self, name: str) -> None:
+        self._r.delete(f"reconciliation:checkpoint:{name}")
+
+    def acquire(self, name: str) -> bool:
+        return bool(self._r.set(f"reconciliation:lock:{name}", '1', nx=True, ex=RECONCILIATION_LOCK_TTL))
+
+    def release(self, name: str) -> None:
+        self._r.delete(f"reconciliation:lock:{name}")
+
+
+class _MemoryCheckpoints:
+    """Single-process fallback (tests, Redis down): resumes within the process."""
+
+    def __init__(self):
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._locks: set = set()
+        self._lock = threading.Lock()
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._state.get(name)
+
+    def save(self, name: str, state: Dict[str, Any]) -> None:
+        self._state[name] = dict(state)
+
+    def clear(self, name: str) -> None:
+        self._state.pop(name, None)
+
+    def acquire(self, name: str) -> bool:
+        with self._lock:
+            if name in self._locks:
+                return False
+            self._locks.add(name)
+            return True
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            self._locks.discard(name)
+
+
+_memory_checkpoints = _MemoryCheckpoints()
+
+
+def get_checkpoint_store():
+    """Redis checkpoints when available, else the in-process fallback."""
+    try:
+        from connections import get_redis
+        client = get_redis("reconciliation")
+    except Exception:
+        client = None
+    return _RedisCheckpoints(client) if client is not None else _memory_checkpoints
 
 
-def reconcile_domain_subscriptions(domain: str) -> Dict[str, Any]:
+# =============================================================================
+# BULK RECONCILIATION
+# =============================================================================
+
+def scan_subscriptions(
+    db,
+    name: str,
+    *,
+    filters: Optional[Callable[[Any], Any]] = None,
+    columns: str = '*',
+    fetcher: Optional[RazorpayFetcher] = None,
+    checkpoints=None,
+    page_size: int = RECONCILIATION_PAGE_SIZE,
+) -> Iterator[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
     """
-    Reconcile all subscriptions for a given domain.
-    Called periodically or on-demand.
+    Yield pages of (subscription row, Razorpay entity or None) for every
+    subscription with a Razorpay id, keyset-paged by id from the last
+    checkpoint of `name`. The cursor advances once the caller has handled
+    a page, and is cleared when the scan completes.
     """
-    try:
-        from supabase_client import get_supabase_client
-        db = get_supabase_client()
+    fetcher = fetcher or get_razorpay_fetcher()
+    checkpoints = checkpoints or get_checkpoint_store()
+    cursor = (checkpoints.load(name) or {}).get('cursor')
 
-        subs = db.table('subscriptions') \
-            .select('id, razorpay_subscription_id') \
-            .eq('product_domain', domain) \
+    while True:
+        query = db.table('subscriptions') \
+            .select(columns) \
             .not_.is_('razorpay_subscription_id', 'null') \
-            .neq('razorpay_subscription_id', '') \
-            .execute()
+            .neq('razorpay_subscription_id', '')
+        if filters is not None:
+            query = filters(query)
+        if cursor:
+            query = query.gt('id', cursor)
+        rows = query.order('id').limit(page_size).execute().data or []
+        if not rows:
+            break
+
+        fetched = fetcher.fetch_many([r['razorpay_subscription_id'] for r in rows])
+        yield [(row, fetched.get(row['razorpay_subscription_id'])) for row in rows]
+
+        cursor = rows[-1]['id']
+        checkpoints.save(name, {'cursor': cursor, 'updated_at': datetime.now(timezone.utc).isoformat()})
+        if len(rows) < page_size:
+            break
+
+    checkpoints.clear(name)
+
+
+def _reconcile_page(db, page) -> List[Dict[str, Any]]:
+    """Compare one fetched page; one event-log read and one bulk insert."""
+    results = []
+    drifted = []
+    for sub, rzp_sub in page:
+        result = {
+            'subscription_id': sub['id'],
+            'razorpay_subscription_id': sub['razorpay_subscription_id'],
+            'drift_detected': False,
+            'auto_healed': False,
+            'reason': None,
+        }
+        results.append(result)
+        razorpay_status = (rzp_sub or {}).get('status')
+        if not razorpay_status:
+            result['reason'] = 'razorpay_api_error'
+            continue
+        mapped = _assess_drift(sub, razorpay_status, result)
+        if mapped is not None:
+            drifted.append((sub, razorpay_status, mapped, result))
 
-        rows = subs.data or []
-        results = []
-        for sub in rows:
-            result = reconcile_subscription(
-                subscription_id=sub['id'],
-                razorpay_subscription_id=sub['razorpay_subscription_id'],
-            )
-            results.append(result)
+    if not drifted:
+        return results
 
-        drifted = [r for r in results if r.get('drift_detected')]
-        healed = [r for r in results if r.get('auto_healed')]
+    event_types = _existing_event_types(db, [sub['id'] for sub, _, _, _ in drifted])
 
-        logger.info(
-            f"domain_reconciliation domain={domain} "
-            f"total={len(rows)} drifted={len(drifted)} healed={len(healed)}"
+    rows = []
+    healing = []
+    for sub, razorpay_status, mapped, result in drifted:
+        sub_rows = _healing_event_rows(
+            sub, sub['razorpay_subscription_id'], razorpay_status, mapped, event_types[sub['id']],
         )
+        if not sub_rows:
+            result['reason'] = 'projection_lag_only'
+            continue
+        rows.extend(sub_rows)
+        healing.append((result, len(sub_rows)))
 
-        return {
-            'domain': domain,
-            'total': len(rows),
-            'drifted': len(drifted),
-            'healed': len(healed),
-            'results': results,
-        }
+    inserted = _insert_events(db, rows)
+    for result, count in healing:
+        if inserted:
+            result.update(auto_healed=True, events_synthesized=count, reason='auto_healed')
+        else:
+            result['reason'] = 'event_insert_failed'
+    return results
+
+
+def reconcile_domain_subscriptions(
+    domain: str,
+    *,
+    db=None,
+    fetcher: Optional[RazorpayFetcher] = None,
+    checkpoints=None,
+    page_size: int = RECONCILIATION_PAGE_SIZE,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Reconcile all subscriptions for a given domain.
+    Called periodically or on-demand; resumes an interrupted run unless
+    resume=False. Only results other than 'in_sync' are returned.
+    """
+    name = f"domain:{domain}"
+    checkpoints = checkpoints or get_checkpoint_store()
+    if not checkpoints.acquire(name):
+        return {'domain': domain, 'status': 'skipped', 'reason': 'locked'}
+
+    try:
+        if db is None:
+            from supabase_client import get_supabase_client
+            db = get_supabase_client()
+        if not resume:
+            checkpoints.clear(name)
+        resumed_from = (checkpoints.load(name) or {}).get('cursor')
+
+        started = time.monotonic()
+        summary = {'domain': domain, 'total': 0, 'drifted': 0, 'healed': 0, 'errors': 0, 'pages': 0}
+        results = []
+        for page in scan_subscriptions(
+            db, name,
+            filters=lambda q: q.eq('product_domain', domain),
+            fetcher=fetcher, checkpoints=checkpoints, page_size=page_size,
+        ):
+            page_results = _reconcile_page(db, page)
+            summary['pages'] += 1
+            summary['total'] += len(page_results)
+            summary['drifted'] += sum(1 for r in page_results if r['drift_detected'])
+            summary['healed'] += sum(1 for r in page_results if r['auto_healed'])
+            summary['errors'] += sum(1 for r in page_results if r['reason'] == 'razorpay_api_error')
+            results.extend(r for r in page_results if r['reason'] != 'in_sync')
+
+        summary['resumed_from'] = resumed_from
+        summary['duration_s'] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"domain_reconciliation domain={domain} total={summary['total']} "
+            f"drifted={summary['drifted']} healed={summary['healed']} errors={summary['errors']} "
+            f"pages={summary['pages']} resumed_from={resumed_from} duration={summary['duration_s']}s"
+        )
+        summary['results'] = results
+        return summary
 
     except Exception as e:
         logger.error(f"domain_reconciliation_error domain={domain}: {e}", exc_info=True)
         return {'error': str(e)}
+
+    finally:
+        checkpoints.release(name)
+
+
+def reconciliation_stats() -> Dict[str, Any]:
+    """Fetcher stats for /api/metrics (without creating the pool)."""
+    return _fetcher.get_stats() if _fetcher is not None else {"initialized": False}
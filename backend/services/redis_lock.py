@@ -16,7 +16,6 @@ Usage:
         # another worker is handling it
 """
 
-import os
 import uuid
 import logging
 
@@ -31,19 +30,15 @@ def get_redis_client():
     global _redis_client, _redis_available
     if _redis_client is not None:
         return _redis_client
-    try:
-        import redis
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-        _redis_client = redis.from_url(redis_url, decode_responses=True)
-        _redis_client.ping()
-        _redis_available = True
+    from connections import get_redis
+
+    _redis_client = get_redis("locks")
+    _redis_available = _redis_client is not None
+    if _redis_available:
         logger.info("Redis connection established for distributed locks")
-        return _redis_client
-    except Exception as e:
-        logger.error(f"Redis unavailable for locks: {e}")
-        _redis_client = None
-        _redis_available = False
-        return None
+    else:
+        logger.error("Redis unavailable for locks")
+    return _redis_client
 
 
 def is_redis_available() -> bool:
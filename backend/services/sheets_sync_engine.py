@@ -0,0 +1,474 @@
+"""
+Google Sheets Sync Engine
+Cached clients, a cached order-row index and coalesced writes for order sheets.
+
+Order sync used to authorize a new gspread client per order, download all of
+column A to find the order's row, and write one row per API call. Busy shops
+hit the Sheets per-minute quota and every sync got slower as the sheet grew.
+
+Now:
+    get_sheets_client(credentials)
+        One authorized client per service account (token refresh is handled
+        by google-auth), shared by order sync and form sync.
+
+    SheetsSyncEngine.write_rows(credentials, spreadsheet_id, sheet_name, rows)
+        Keeps an order_id → row index per worksheet. Each flush makes one
+        batch_get (verifies the cached rows it is about to overwrite and reads
+        only rows appended since the last flush), one batch_update for known
+        orders and one append_rows for new ones. A mismatch (rows sorted or
+        deleted by hand) triggers a full rebuild of the index.
+
+    enqueue_order_row(...) / drain_pending(...) / requeue(...)
+        Pending writes are buffered in Redis per spreadsheet (latest row per
+        order wins) and flushed by the orders.flush_sheets task at most once
+        per SHEETS_FLUSH_INTERVAL_SECONDS.
+
+Quota (429) and 5xx responses raise SheetsRetryableError with a backoff hint;
+the flush task puts the writes back and retries later instead of hammering
+the API.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('reviseit.services.sheets_sync')
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive',
+]
+
+# Column K is a hidden DB UUID column for auditing/reconciliation
+ORDER_SHEET_HEADERS = [
+    "Order ID",
+    "Date",
+    "Customer",
+    "Phone",
+    "Address",
+    "Items",
+    "Total Qty",
+    "Status",
+    "Source",
+    "Notes",
+    "DB Order ID",
+]
+
+SHEETS_FLUSH_INTERVAL_SECONDS = float(os.getenv("SHEETS_FLUSH_INTERVAL_SECONDS", "5"))
+SHEETS_INDEX_FULL_REFRESH_SECONDS = int(os.getenv("SHEETS_INDEX_FULL_REFRESH_SECONDS", "900"))
+SHEETS_MAX_BATCH = int(os.getenv("SHEETS_MAX_BATCH", "500"))
+SHEETS_BACKOFF_BASE_SECONDS = 2.0
+SHEETS_BACKOFF_MAX_SECONDS = 300.0
+SHEETS_MAX_FLUSH_ATTEMPTS = int(os.getenv("SHEETS_MAX_FLUSH_ATTEMPTS", "8"))
+PENDING_TTL_SECONDS = 86400
+FLUSH_LOCK_TTL_SECONDS = 120
+
+_MAX_CLIENTS = 32
+_MAX_INDEXES = 256
+_UPDATED_RANGE_RE = re.compile(r"![A-Z]+(\d+)")
+
+
+class SheetsRetryableError(Exception):
+    """Quota or transient Sheets API failure; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with jitter, never shorter than the server's Retry-After."""
+    delay = min(SHEETS_BACKOFF_MAX_SECONDS, SHEETS_BACKOFF_BASE_SECONDS * (2 ** max(attempt, 0)))
+    delay = max(delay, retry_after or 0)
+    return delay * random.uniform(1.0, 1.25)
+
+
+# =============================================================================
+# Authorized clients (one per service account)
+# =============================================================================
+
+_clients: "OrderedDict[str, Any]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def credentials_fingerprint(credentials: Dict[str, Any]) -> str:
+    raw = "|".join(str(credentials.get(k, "")) for k in ("client_email", "private_key_id", "project_id"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def get_sheets_client(credentials: Dict[str, Any]):
+    """Authorized gspread client for this service account (cached per process)."""
+    key = credentials_fingerprint(credentials)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_info(credentials, scopes=SCOPES)
+    client = gspread.authorize(creds)
+
+    with _clients_lock:
+        _clients[key] = client
+        while len(_clients) > _MAX_CLIENTS:
+            _clients.popitem(last=False)
+    return client
+
+
+def clear_client_cache() -> None:
+    with _clients_lock:
+        _clients.clear()
+
+
+# =============================================================================
+# Row index + batched writes
+# =============================================================================
+
+@dataclass
+class _SheetIndex:
+    worksheet: Any
+    rows: Dict[str, int] = field(default_factory=dict)
+    last_row: int = 1  # Row 1 is the header
+    built_at: float = 0.0
+
+
+class SheetsSyncEngine:
+    """Upserts order rows with a cached order_id → row index per worksheet."""
+
+    def __init__(self, client_factory=get_sheets_client, clock=time.monotonic):
+        self._client_factory = client_factory
+        self._clock = clock
+        self._indexes: "OrderedDict[Tuple[str, str], _SheetIndex]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def write_rows(
+        self,
+        credentials: Dict[str, Any],
+        spreadsheet_id: str,
+        sheet_name: str,
+        rows: Dict[str, List[Any]],
+    ) -> Dict[str, int]:
+        """
+        Upsert `rows` (order_id → row values) in at most three API calls.
+
+        Returns order_id → sheet row number. Raises SheetsRetryableError on
+        quota/transient failures; other gspread errors propagate.
+        """
+        if not rows:
+            return {}
+        key = (spreadsheet_id, sheet_name)
+        with self._sheet_lock(key):
+            try:
+                return self._write_locked(credentials, key, rows)
+            except Exception as e:
+                retryable = _as_retryable(e)
+                if retryable is None:
+                    raise
+                raise retryable from e
+
+    def invalidate(self, spreadsheet_id: str, sheet_name: str) -> None:
+        with self._lock:
+            self._indexes.pop((spreadsheet_id, sheet_name), None)
+
+    def _write_locked(self, credentials, key, rows) -> Dict[str, int]:
+        index = self._get_index(credentials, key)
+        if not self._sync_index(index, rows):
+            logger.info(f"📊 [Sheets Sync] Row index for '{key[1]}' is stale, rebuilding")
+            self._rebuild(index)
+
+        worksheet = index.worksheet
+        located: Dict[str, int] = {}
+        updates = []
+        appends: List[Tuple[str, List[Any]]] = []
+        for order_id, values in rows.items():
+            row_num = index.rows.get(order_id)
+            if row_num:
+                last_col = _column_letter(len(values))
+                updates.append({"range": f"A{row_num}:{last_col}{row_num}", "values": [values]})
+                located[order_id] = row_num
+            else:
+                appends.append((order_id, values))
+
+        if updates:
+            worksheet.batch_update(updates)
+
+        if appends:
+            response = worksheet.append_rows([values for _, values in appends])
+            start = _appended_start_row(response)
+            if start is None:
+                # Unknown placement: rebuild the index on the next flush
+                index.built_at = 0.0
+            else:
+                for offset, (order_id, _) in enumerate(appends):
+                    index.rows.setdefault(order_id, start + offset)
+                    located[order_id] = start + offset
+                index.last_row = max(index.last_row, start + len(appends) - 1)
+
+        logger.info(
+            f"📊 [Sheets Sync] '{key[1]}': {len(updates)} updated, {len(appends)} appended "
+            f"({len(index.rows)} orders indexed)"
+        )
+        return located
+
+    def _get_index(self, credentials, key) -> _SheetIndex:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+
+        if index is None:
+            index = _SheetIndex(worksheet=self._open_worksheet(credentials, *key))
+            with self._lock:
+                self._indexes[key] = index
+                while len(self._indexes) > _MAX_INDEXES:
+                    self._indexes.popitem(last=False)
+
+        if self._clock() - index.built_at > SHEETS_INDEX_FULL_REFRESH_SECONDS:
+            self._rebuild(index)
+        return index
+
+    def _open_worksheet(self, credentials, spreadsheet_id: str, sheet_name: str):
+        import gspread
+
+        spreadsheet = self._client_factory(credentials).open_by_key(spreadsheet_id)
+        try:
+            return spreadsheet.worksheet(sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            logger.warning(f"⚠️ [Sheets Sync] Worksheet '{sheet_name}' not found, creating it with headers")
+            worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=len(ORDER_SHEET_HEADERS))
+            worksheet.batch_update([{"range": "A1:K1", "values": [ORDER_SHEET_HEADERS]}])
+            worksheet.format('A1:K1', {
+                "textFormat": {"bold": True},
+                "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
+            })
+            return worksheet
+
+    def _rebuild(self, index: _SheetIndex) -> None:
+        column = index.worksheet.col_values(1)
+        rows: Dict[str, int] = {}
+        for row_num, value in enumerate(column[1:], start=2):  # Skip header row
+            order_id = str(value).strip() if value is not None else ""
+            if order_id:
+                rows.setdefault(order_id, row_num)
+        index.rows = rows
+        index.last_row = max(len(column), 1)
+        index.built_at = self._clock()
+
+    def _sync_index(self, index: _SheetIndex, rows: Dict[str, List[Any]]) -> bool:
+        """
+        One batch_get: verify the cached rows we are about to overwrite and
+        pick up rows appended since the last flush. False if the index is stale.
+        """
+        targets = [(order_id, index.rows[order_id]) for order_id in rows if order_id in index.rows]
+        ranges = [f"A{row_num}" for _, row_num in targets] + [f"A{index.last_row + 1}:A"]
+        results = index.worksheet.batch_get(ranges)
+
+        for (order_id, _), value_range in zip(targets, results):
+            if _first_cell(value_range) != order_id:
+                return False
+
+        tail = results[len(targets)] if len(results) > len(targets) else []
+        for offset, cells in enumerate(tail):
+            order_id = str(cells[0]).strip() if cells else ""
+            if order_id:
+                row_num = index.last_row + 1 + offset
+                index.rows.setdefault(order_id, row_num)
+        index.last_row += len(tail)
+        return True
+
+    def _sheet_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+_engine: Optional[SheetsSyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_sheets_sync_engine() -> SheetsSyncEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SheetsSyncEngine()
+    return _engine
+
+
+# =============================================================================
+# Pending writes (Redis, per spreadsheet)
+# =============================================================================
+
+_DRAIN_SCRIPT = """
+local entries = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return entries
+"""
+
+
+def _pending_key(spreadsheet_id: str) -> str:
+    return f"sheets:pending:{spreadsheet_id}"
+
+
+def _flush_flag_key(spreadsheet_id: str) -> str:
+    return f"sheets:flush_scheduled:{spreadsheet_id}"
+
+
+def flush_lock_key(spreadsheet_id: str) -> str:
+    return f"lock:sheets_flush:{spreadsheet_id}"
+
+
+def _get_redis():
+    from connections import get_redis
+
+    return get_redis("sheets_sync")
+
+
+def enqueue_order_row(
+    user_id: str,
+    spreadsheet_id: str,
+    sheet_name: str,
+    order_id: str,
+    row: List[Any],
+) -> Optional[bool]:
+    """
+    Buffer a row for the next flush of this spreadsheet.
+
+    Returns True if the caller should schedule a flush (first write since the
+    last flush started), False if one is already scheduled, and None when
+    Redis is unavailable (caller writes directly).
+    """
+    client = _get_redis()
+    if client is None:
+        return None
+    entry = json.dumps({
+        "user_id": user_id,
+        "sheet_name": sheet_name,
+        "order_id": order_id,
+        "row": row,
+    }, default=str)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(_pending_key(spreadsheet_id), f"{sheet_name}\x1f{order_id}", entry)
+        pipe.expire(_pending_key(spreadsheet_id), PENDING_TTL_SECONDS)
+        pipe.set(
+            _flush_flag_key(spreadsheet_id), "1",
+            nx=True, ex=int(SHEETS_FLUSH_INTERVAL_SECONDS + FLUSH_LOCK_TTL_SECONDS),
+        )
+        return bool(pipe.execute()[-1])
+    except Exception as e:
+        logger.warning(f"⚠️ [Sheets Sync] Could not buffer row, writing directly: {e}")
+        return None
+
+
+def drain_pending(spreadsheet_id: str) -> List[Dict[str, Any]]:
+    """Atomically take every pending row for this spreadsheet."""
+    client = _get_redis()
+    if client is None:
+        return []
+    # Writes that arrive from now on schedule a new flush
+    client.delete(_flush_flag_key(spreadsheet_id))
+    raw = client.eval(_DRAIN_SCRIPT, 1, _pending_key(spreadsheet_id)) or []
+    entries = []
+    for value in raw[1::2]:
+        try:
+            entries.append(json.loads(value))
+        except (TypeError, ValueError):
+            continue
+    return entries
+
+
+def requeue(spreadsheet_id: str, entries: List[Dict[str, Any]]) -> bool:
+    """
+    Put unwritten rows back. HSETNX keeps any newer row buffered meanwhile.
+    Returns True if the caller should schedule a flush.
+    """
+    client = _get_redis()
+    if client is None or not entries:
+        return False
+    pipe = client.pipeline()
+    for entry in entries:
+        pipe.hsetnx(
+            _pending_key(spreadsheet_id),
+            f"{entry['sheet_name']}\x1f{entry['order_id']}",
+            json.dumps(entry, default=str),
+        )
+    pipe.expire(_pending_key(spreadsheet_id), PENDING_TTL_SECONDS)
+    pipe.set(_flush_flag_key(spreadsheet_id), "1", nx=True, ex=int(SHEETS_BACKOFF_MAX_SECONDS * 2))
+    return bool(pipe.execute()[-1])
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def _as_retryable(error: Exception) -> Optional[SheetsRetryableError]:
+    if _is_transport_error(error):
+        return SheetsRetryableError(f"Sheets transport error: {error}")
+    try:
+        import gspread
+    except ImportError:
+        return None
+    if not isinstance(error, gspread.exceptions.APIError):
+        return None
+    code = getattr(error, "code", None)
+    response = getattr(error, "response", None)
+    status = code if isinstance(code, int) and code > 0 else getattr(response, "status_code", 0)
+    if status != 429 and not 500 <= (status or 0) < 600:
+        return None
+    retry_after = None
+    try:
+        retry_after = float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return SheetsRetryableError(f"Sheets API {status}: {error}", retry_after=retry_after)
+
+
+def _is_transport_error(error: Exception) -> bool:
+    """Connection resets, timeouts and token refresh failures: the rows are fine."""
+    import requests
+
+    transport: Tuple[type, ...] = (
+        ConnectionError,
+        TimeoutError,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    )
+    try:
+        from google.auth.exceptions import TransportError
+        transport += (TransportError,)
+    except ImportError:
+        pass
+    return isinstance(error, transport)
+
+
+def _first_cell(value_range) -> str:
+    try:
+        return str(value_range[0][0]).strip()
+    except (IndexError, TypeError, KeyError):
+        return ""
+
+
+def _appended_start_row(response) -> Optional[int]:
+    updated_range = ((response or {}).get("updates") or {}).get("updatedRange", "")
+    match = _UPDATED_RANGE_RE.search(updated_range or "")
+    return int(match.group(1)) if match else None
+
+
+def _column_letter(n: int) -> str:
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters or "A"
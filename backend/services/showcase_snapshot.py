@@ -0,0 +1,231 @@
+"""
+Showcase Snapshot Store
+Precomputed, versioned public storefront payload per business.
+
+GET /api/showcase/<slug> used to run four queries (settings, up to 100
+items, business row, store settings) and map DTOs on every anonymous page
+view. The payload is now built once and stored in Redis as compressed JSON:
+
+    showcase:snapshot:v{SNAPSHOT_SCHEMA}:{user_id}  (hash)
+        body       zlib(JSON payload)
+        etag       sha256 of the JSON, used for If-None-Match
+        built_at   unix seconds
+        gen        write generation the snapshot was built from
+        dirty_gen  bumped by every showcase/business write
+
+Reads serve the snapshot as long as it exists (stale-while-revalidate); a
+snapshot older than SHOWCASE_SNAPSHOT_FRESH_SECONDS, or built before the
+latest write (gen != dirty_gen), is served once more while a background
+rebuild runs. Write routes mark the snapshot dirty and rebuild it, so reads
+never pay for the build except on a cold miss.
+
+Without Redis an in-process map keeps the same semantics per worker.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('reviseit.services.showcase_snapshot')
+
+# Bump when the payload shape changes so old snapshots are ignored
+SNAPSHOT_SCHEMA = "1"
+SHOWCASE_SNAPSHOT_FRESH_SECONDS = int(os.getenv("SHOWCASE_SNAPSHOT_FRESH_SECONDS", "300"))
+SHOWCASE_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("SHOWCASE_SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+REBUILD_LOCK_SECONDS = 30
+_MEMORY_MAX_ENTRIES = 512
+
+_redis_client = None
+_redis_checked = False
+_redis_lock = threading.Lock()
+
+_memory: Dict[str, Dict[str, Any]] = {}
+_memory_locks: Dict[str, float] = {}
+_memory_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ShowcaseSnapshot:
+    body: bytes
+    etag: str
+    built_at: float
+    gen: int
+    dirty_gen: int
+
+    def data(self) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(self.body))
+
+    def needs_rebuild(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self.gen != self.dirty_gen or now - self.built_at > SHOWCASE_SNAPSHOT_FRESH_SECONDS
+
+
+def snapshot_key(user_id: str) -> str:
+    return f"showcase:snapshot:v{SNAPSHOT_SCHEMA}:{user_id}"
+
+
+def get_snapshot(user_id: str) -> Optional[ShowcaseSnapshot]:
+    """Return the stored snapshot (fresh or stale), or None on a cold miss."""
+    fields = _read_fields(snapshot_key(user_id))
+    if not fields or not fields.get("body"):
+        return None
+    try:
+        return ShowcaseSnapshot(
+            body=bytes(fields["body"]),
+            etag=_text(fields.get("etag")),
+            built_at=float(_text(fields.get("built_at")) or 0),
+            gen=int(_text(fields.get("gen")) or 0),
+            dirty_gen=int(_text(fields.get("dirty_gen")) or 0),
+        )
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Corrupt showcase snapshot for {user_id}: {e}")
+        return None
+
+
+def current_generation(user_id: str) -> int:
+    fields = _read_fields(snapshot_key(user_id)) or {}
+    try:
+        return int(_text(fields.get("dirty_gen")) or 0)
+    except ValueError:
+        return 0
+
+
+def put_snapshot(user_id: str, data: Dict[str, Any], gen: int) -> ShowcaseSnapshot:
+    """Store a freshly built payload; `gen` is the write generation read before building."""
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    etag = hashlib.sha256(raw).hexdigest()[:32]
+    body = zlib.compress(raw, 6)
+    built_at = time.time()
+    fields = {"body": body, "etag": etag, "built_at": str(built_at), "gen": str(gen)}
+
+    key = snapshot_key(user_id)
+    client = _get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.hset(key, mapping=fields)
+            pipe.hsetnx(key, "dirty_gen", "0")
+            pipe.expire(key, SHOWCASE_SNAPSHOT_MAX_AGE_SECONDS)
+            pipe.hget(key, "dirty_gen")
+            dirty_gen = int(_text(pipe.execute()[-1]) or 0)
+            return ShowcaseSnapshot(body, etag, built_at, gen, dirty_gen)
+        except Exception as e:
+            logger.warning(f"Showcase snapshot write failed: {e}")
+
+    with _memory_lock:
+        entry = _memory.setdefault(key, {"dirty_gen": "0"})
+        entry.update(fields)
+        _evict_memory()
+        dirty_gen = int(entry.get("dirty_gen") or 0)
+    return ShowcaseSnapshot(body, etag, built_at, gen, dirty_gen)
+
+
+def mark_dirty(user_id: str) -> None:
+    """Record a write so any snapshot built before it is treated as stale."""
+    key = snapshot_key(user_id)
+    client = _get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.hincrby(key, "dirty_gen", 1)
+            pipe.expire(key, SHOWCASE_SNAPSHOT_MAX_AGE_SECONDS)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"Showcase snapshot mark_dirty failed: {e}")
+
+    with _memory_lock:
+        entry = _memory.setdefault(key, {"dirty_gen": "0"})
+        entry["dirty_gen"] = str(int(entry.get("dirty_gen") or 0) + 1)
+
+
+def try_acquire_rebuild(user_id: str) -> bool:
+    key = f"{snapshot_key(user_id)}:rebuild"
+    client = _get_redis()
+    if client is not None:
+        try:
+            return bool(client.set(key, b"1", nx=True, ex=REBUILD_LOCK_SECONDS))
+        except Exception as e:
+            logger.warning(f"Showcase rebuild lock failed: {e}")
+
+    now = time.monotonic()
+    with _memory_lock:
+        if _memory_locks.get(key, 0) > now:
+            return False
+        _memory_locks[key] = now + REBUILD_LOCK_SECONDS
+        return True
+
+
+def release_rebuild(user_id: str) -> None:
+    key = f"{snapshot_key(user_id)}:rebuild"
+    client = _get_redis()
+    if client is not None:
+        try:
+            client.delete(key)
+            return
+        except Exception:
+            pass
+    with _memory_lock:
+        _memory_locks.pop(key, None)
+
+
+def clear_memory_store() -> None:
+    with _memory_lock:
+        _memory.clear()
+        _memory_locks.clear()
+
+
+# =============================================================================
+# Storage backends
+# =============================================================================
+
+def _get_redis():
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    with _redis_lock:
+        if _redis_checked:
+            return _redis_client
+        if os.getenv("REDIS_URL"):
+            from connections import get_redis
+
+            # Binary payloads: keep responses as bytes
+            _redis_client = get_redis("showcase", decode_responses=False)
+            if _redis_client is None:
+                logger.warning("⚠️ Redis unavailable for showcase snapshots, using memory")
+        _redis_checked = True
+    return _redis_client
+
+
+def _read_fields(key: str) -> Optional[Dict[str, Any]]:
+    client = _get_redis()
+    if client is not None:
+        try:
+            raw = client.hgetall(key)
+            return {_text(k): v for k, v in raw.items()} if raw else None
+        except Exception as e:
+            logger.warning(f"Showcase snapshot read failed: {e}")
+
+    with _memory_lock:
+        entry = _memory.get(key)
+        return dict(entry) if entry else None
+
+
+def _evict_memory() -> None:
+    # Caller holds _memory_lock
+    while len(_memory) > _MEMORY_MAX_ENTRIES:
+        _memory.pop(next(iter(_memory)))
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
@@ -0,0 +1,524 @@
+"""
+Slot Availability Index — Per-Business, Per-Day Capacity Maps
+=============================================================
+
+Every "which slots are free?" used to re-read ai_capabilities and all of
+the day's appointments (AppointmentHandler, the check_availability tool
+via the frontend API, the appointment routes), and a booking conversation
+asks several times. The index keeps one compact capacity map per
+business, scope and day:
+
+    slots:{business_id}:{scope}:{YYYY-MM-DD}
+        ┌──────────────┬─────────────────┬──────────────────┐
+        │ start, step, │ capacity per    │ remaining per    │
+        │ n  (3 × u16) │ slot  (n × u8)  │ slot  (n × u8)   │
+        └──────────────┴─────────────────┴──────────────────┘
+
+    read  ─► MGET of K day keys ─► missing days loaded in one batch ─► SET NX
+    book  ─► Lua BITFIELD: remaining -= 1 if > 0          (atomic, no read)
+    cancel─► Lua BITFIELD: remaining += 1 if < capacity   (atomic, no read)
+
+A booking that finds no map bumps the day's generation ({key}:gen). A
+load stores its map only if the generation is still the one it read
+before querying the database, so a map built from rows older than that
+booking is never cached.
+
+"next N free slots across the next K days" is one MGET plus at most one
+loader call. Maps expire after SLOT_INDEX_TTL_SECONDS so bookings made
+outside this process (dashboard, booking page) are picked up; a write
+the map cannot account for (slot already full, unknown time) drops the
+day so it is rebuilt from the database on the next read. Maps are for
+suggestions only: the final check before a booking reads the database.
+
+Scopes: "default" is the ai_capabilities grid (business hours, one
+capacity for every slot). Staff-aware availability (voice agents) uses
+"service:<id>" maps loaded from the get_available_slots RPC; since staff
+are shared across services, writes there invalidate the whole day.
+
+Without Redis the same maps live in process memory.
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger('reviseit.slot_availability')
+
+SLOT_INDEX_TTL_SECONDS = int(os.getenv('SLOT_INDEX_TTL_SECONDS', '300'))
+DEFAULT_SCOPE = 'default'
+# Slot times are wall-clock times of the business
+DEFAULT_TIMEZONE = 'Asia/Kolkata'
+DEFAULT_BUSINESS_HOURS = {'start': '09:00', 'end': '18:00', 'duration': 60}
+
+_HEADER = struct.Struct('>HHH')
+
+# Return codes shared by both stores
+MISSING, FULL, NOT_A_SLOT = -1, -2, -3
+
+# KEYS[1] day map, KEYS[2] its generation; ARGV[1] minute of day;
+# ARGV[2] delta (+1 / -1); ARGV[3] generation TTL
+_ADJUST_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  redis.call('INCR', KEYS[2])
+  redis.call('EXPIRE', KEYS[2], ARGV[3])
+  return -1
+end
+local h = redis.call('BITFIELD', KEYS[1], 'GET', 'u16', 0, 'GET', 'u16', 16, 'GET', 'u16', 32)
+local offset = tonumber(ARGV[1]) - h[1]
+if h[2] == 0 or offset < 0 or offset % h[2] ~= 0 or math.floor(offset / h[2]) >= h[3] then
+  return -3
+end
+local i = math.floor(offset / h[2])
+local cap = redis.call('BITFIELD', KEYS[1], 'GET', 'u8', (6 + i) * 8)[1]
+local pos = (6 + h[3] + i) * 8
+local new = redis.call('BITFIELD', KEYS[1], 'GET', 'u8', pos)[1] + tonumber(ARGV[2])
+if new < 0 or new > cap then return -2 end
+redis.call('BITFIELD', KEYS[1], 'SET', 'u8', pos, new)
+return new
+"""
+
+# KEYS[1] day map, KEYS[2] its generation; ARGV[1] map; ARGV[2] generation
+# read before the load; ARGV[3] TTL
+_PUT_LUA = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[2]) then return 0 end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[3]) then return 1 end
+return 0
+"""
+
+
+def _gen_key(key: str) -> str:
+    return f'{key}:gen'
+
+
+def _minute(hhmm: str) -> int:
+    hours, minutes = str(hhmm).split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _hhmm(minute: int) -> str:
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+@dataclass
+class DayGrid:
+    """Capacity and remaining bookings for each slot of one day."""
+
+    start_minute: int
+    step: int
+    capacity: bytes
+    remaining: bytearray
+
+    @classmethod
+    def from_hours(cls, business_hours: Dict[str, Any], capacity: int, booked: Dict[str, int]) -> 'DayGrid':
+        """Grid from ai_capabilities business hours minus existing bookings."""
+        start = _minute(business_hours.get('start', DEFAULT_BUSINESS_HOURS['start']))
+        end = _minute(business_hours.get('end', DEFAULT_BUSINESS_HOURS['end']))
+        step = int(business_hours.get('duration') or DEFAULT_BUSINESS_HOURS['duration'])
+        capacity = max(0, min(255, int(capacity)))
+        n = max(0, (end - start + step - 1) // step)
+        remaining = bytearray(
+            max(0, capacity - booked.get(_hhmm(start + i * step), 0)) for i in range(n)
+        )
+        return cls(start, step, bytes([capacity]) * n, remaining)
+
+    @classmethod
+    def from_slots(cls, slots: Dict[str, tuple], step: int) -> 'DayGrid':
+        """Grid from explicit {"HH:MM": (capacity, remaining)}; gaps are closed."""
+        if not slots:
+            return cls(0, step, b'', bytearray())
+        minutes = {_minute(t): v for t, v in slots.items()}
+        start, last = min(minutes), max(minutes)
+        n = (last - start) // step + 1
+        capacity, remaining = bytearray(n), bytearray(n)
+        for minute, (cap, left) in minutes.items():
+            if (minute - start) % step == 0:
+                i = (minute - start) // step
+                left = max(0, min(255, int(left)))
+                capacity[i] = max(left, min(255, int(cap)))
+                remaining[i] = left
+        return cls(start, step, bytes(capacity), remaining)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> 'DayGrid':
+        start, step, n = _HEADER.unpack_from(blob)
+        body = blob[_HEADER.size:]
+        return cls(start, step, bytes(body[:n]), bytearray(body[n:2 * n]))
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(self.start_minute, self.step, len(self.capacity)) + self.capacity + bytes(self.remaining)
+
+    def slots(self) -> List[Dict[str, Any]]:
+        """Every slot of the day with its capacity and remaining count."""
+        return [
+            {'time': _hhmm(self.start_minute + i * self.step), 'capacity': cap, 'remaining': left}
+            for i, (cap, left) in enumerate(zip(self.capacity, self.remaining))
+            if cap
+        ]
+
+    def free_times(self) -> List[str]:
+        return [_hhmm(self.start_minute + i * self.step) for i, left in enumerate(self.remaining) if left]
+
+    def index_of(self, hhmm: str) -> Optional[int]:
+        offset = _minute(hhmm) - self.start_minute
+        if self.step <= 0 or offset < 0 or offset % self.step:
+            return None
+        i = offset // self.step
+        return i if i < len(self.capacity) else None
+
+    def adjust(self, hhmm: str, delta: int) -> int:
+        """In-place counterpart of the Lua script (same return codes)."""
+        i = self.index_of(hhmm)
+        if i is None:
+            return NOT_A_SLOT
+        new = self.remaining[i] + delta
+        if new < 0 or new > self.capacity[i]:
+            return FULL
+        self.remaining[i] = new
+        return new
+
+
+# =============================================================================
+# STORES
+# =============================================================================
+
+class _RedisSlotStore:
+    def __init__(self, redis_client, ttl_seconds: int):
+        self._redis = redis_client
+        self._ttl = ttl_seconds
+        self._adjust = redis_client.register_script(_ADJUST_LUA)
+        self._put = redis_client.register_script(_PUT_LUA)
+
+    def get_many(self, keys: List[str]) -> Tuple[List[Optional[bytes]], List[int]]:
+        """Maps and their generations, in one MGET."""
+        if not keys:
+            return [], []
+        values = self._redis.mget(keys + [_gen_key(k) for k in keys])
+        return values[:len(keys)], [int(g or 0) for g in values[len(keys):]]
+
+    def put_many(self, items: List[tuple]) -> None:
+        """items: (key, blob, scopes_key, generation) — scopes_key lists a day's maps."""
+        pipe = self._redis.pipeline(transaction=False)
+        for key, blob, scopes_key, generation in items:
+            # NX: never overwrite a map an atomic booking already updated
+            self._put(keys=[key, _gen_key(key)], args=[blob, generation, self._ttl], client=pipe)
+            pipe.sadd(scopes_key, key)
+            pipe.expire(scopes_key, self._ttl * 2)
+        pipe.execute()
+
+    def adjust(self, key: str, minute: int, delta: int) -> int:
+        return int(self._adjust(keys=[key, _gen_key(key)], args=[minute, delta, self._ttl * 2]))
+
+    def delete_day(self, scopes_key: str, keys: Iterable[str] = ()) -> None:
+        members = [m.decode() if isinstance(m, bytes) else m for m in self._redis.smembers(scopes_key)]
+        dropped = set(members) | set(keys)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.delete(scopes_key, *dropped)
+        for key in dropped:
+            # Loads already in flight must not put the dropped maps back
+            pipe.incr(_gen_key(key))
+            pipe.expire(_gen_key(key), self._ttl * 2)
+        pipe.execute()
+
+
+class _MemorySlotStore:
+    def __init__(self, ttl_seconds: int, clock: Callable[[], float] = time.monotonic):
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._maps: Dict[str, tuple] = {}
+        self._scopes: Dict[str, set] = {}
+        self._generations: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Tuple[List[Optional[bytes]], List[int]]:
+        now = self._clock()
+        with self._lock:
+            out = []
+            for key in keys:
+                entry = self._maps.get(key)
+                out.append(entry[0].to_bytes() if entry and entry[1] > now else None)
+            return out, [self._generations[key] for key in keys]
+
+    def put_many(self, items: List[tuple]) -> None:
+        now = self._clock()
+        with self._lock:
+            for key, blob, scopes_key, generation in items:
+                if self._generations[key] != generation:
+                    continue
+                entry = self._maps.get(key)
+                if entry is None or entry[1] <= now:
+                    self._maps[key] = (DayGrid.from_bytes(blob), now + self._ttl)
+                self._scopes.setdefault(scopes_key, set()).add(key)
+
+    def adjust(self, key: str, minute: int, delta: int) -> int:
+        with self._lock:
+            entry = self._maps.get(key)
+            if entry is None or entry[1] <= self._clock():
+                self._generations[key] += 1
+                return MISSING
+            return entry[0].adjust(_hhmm(minute), delta)
+
+    def delete_day(self, scopes_key: str, keys: Iterable[str] = ()) -> None:
+        with self._lock:
+            for key in self._scopes.pop(scopes_key, set()) | set(keys):
+                self._maps.pop(key, None)
+                self._generations[key] += 1
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+# loader(business_id, scope, days) -> {day: DayGrid}
+Loader = Callable[[str, str, List[date]], Dict[date, DayGrid]]
+
+
+class SlotAvailabilityIndex:
+    """Cached per-day capacity maps with atomic book/cancel updates."""
+
+    KEY_PREFIX = 'slots'
+
+    def __init__(self, store, loader: Optional[Loader] = None):
+        self._store = store
+        self._loader = loader
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _key(self, business_id: str, scope: str, day: date) -> str:
+        return f'{self.KEY_PREFIX}:{business_id}:{scope}:{day.isoformat()}'
+
+    def _scopes_key(self, business_id: str, day: date) -> str:
+        return f'{self.KEY_PREFIX}:{business_id}:{day.isoformat()}:scopes'
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += n
+
+    # -----------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------
+
+    def days(
+        self,
+        business_id: str,
+        days: List[date],
+        scope: str = DEFAULT_SCOPE,
+        loader: Optional[Loader] = None,
+    ) -> Dict[date, Optional[DayGrid]]:
+        """Maps for several days: one MGET, one loader call for the misses."""
+        keys = [self._key(business_id, scope, d) for d in days]
+        try:
+            blobs, generations = self._store.get_many(keys)
+        except Exception as e:
+            logger.warning(f'slot index read failed: {e}')
+            blobs, generations = [None] * len(keys), None
+
+        grids: Dict[date, Optional[DayGrid]] = {}
+        missing = []
+        generation: Dict[date, int] = {}
+        for i, (day, blob) in enumerate(zip(days, blobs)):
+            if blob:
+                grids[day] = DayGrid.from_bytes(blob)
+            else:
+                missing.append(day)
+                if generations is not None:
+                    generation[day] = generations[i]
+        self._count('hits', len(days) - len(missing))
+        if not missing:
+            return grids
+
+        self._count('loads', len(missing))
+        load = loader or self._loader
+        try:
+            loaded = load(business_id, scope, missing) if load else {}
+        except Exception as e:
+            logger.error(f'slot availability load failed for {business_id}: {e}')
+            loaded = {}
+        try:
+            # A day whose generation could not be read is served, not stored
+            self._store.put_many([
+                (self._key(business_id, scope, d), g.to_bytes(), self._scopes_key(business_id, d), generation[d])
+                for d, g in loaded.items()
+                if d in generation
+            ])
+        except Exception as e:
+            logger.warning(f'slot index write failed: {e}')
+        for day in missing:
+            grids[day] = loaded.get(day)
+        return grids
+
+    def day(self, business_id: str, day: date, scope: str = DEFAULT_SCOPE, loader: Optional[Loader] = None) -> Optional[DayGrid]:
+        """Map for one day, or None when it could not be loaded."""
+        return self.days(business_id, [day], scope, loader)[day]
+
+    def free_slots(self, business_id: str, day: date, scope: str = DEFAULT_SCOPE, loader: Optional[Loader] = None) -> Optional[List[str]]:
+        """Free "HH:MM" slots, or None when availability is unknown."""
+        grid = self.day(business_id, day, scope, loader)
+        return grid.free_times() if grid is not None else None
+
+    def next_free_slots(
+        self,
+        business_id: str,
+        count: int = 5,
+        days: int = 7,
+        start: Optional[date] = None,
+        now: Optional[datetime] = None,
+        scope: str = DEFAULT_SCOPE,
+        loader: Optional[Loader] = None,
+        tz: str = DEFAULT_TIMEZONE,
+    ) -> List[Dict[str, Any]]:
+        """
+        The next `count` free slots across the next `days` days.
+
+        Past slots are skipped by the business's clock (`tz`), whatever the
+        server's timezone. A naive `now` is taken as business-local time.
+        """
+        if now is None:
+            now = datetime.now(ZoneInfo(tz))
+        elif now.tzinfo is not None:
+            now = now.astimezone(ZoneInfo(tz))
+        start = start or now.date()
+        window = [start + timedelta(days=i) for i in range(days)]
+        now_minute = now.hour * 60 + now.minute
+
+        found: List[Dict[str, Any]] = []
+        for day, grid in self.days(business_id, window, scope, loader).items():
+            if grid is None:
+                continue
+            for slot in grid.slots():
+                if not slot['remaining']:
+                    continue
+                if day == now.date() and _minute(slot['time']) <= now_minute:
+                    continue
+                found.append({'date': day.isoformat(), **slot})
+                if len(found) >= count:
+                    return found
+        return found
+
+    # -----------------------------------------------------------------
+    # Writes
+    # -----------------------------------------------------------------
+
+    def record_booking(self, business_id: str, day: date, hhmm: str, scope: str = DEFAULT_SCOPE) -> None:
+        """Take one unit of capacity after a booking was stored."""
+        self._apply(business_id, day, hhmm, scope, -1)
+
+    def record_cancellation(self, business_id: str, day: date, hhmm: str, scope: str = DEFAULT_SCOPE) -> None:
+        """Give one unit of capacity back after a booking was cancelled."""
+        self._apply(business_id, day, hhmm, scope, +1)
+
+    def _apply(self, business_id: str, day: date, hhmm: str, scope: str, delta: int) -> None:
+        key = self._key(business_id, scope, day)
+        try:
+            result = self._store.adjust(key, _minute(hhmm), delta)
+        except Exception as e:
+            logger.warning(f'slot index update failed: {e}')
+            result = FULL
+        if result >= 0:
+            self._count('bookings' if delta < 0 else 'cancellations')
+        elif result != MISSING:
+            # The map disagrees with the database: rebuild it on next read
+            self._count('resyncs')
+            self.invalidate(business_id, day)
+
+    def invalidate(self, business_id: str, day: date) -> None:
+        """Drop every scope's map for a business day."""
+        self._count('invalidations')
+        key = self._key(business_id, DEFAULT_SCOPE, day)
+        try:
+            self._store.delete_day(self._scopes_key(business_id, day), [key])
+        except Exception as e:
+            logger.warning(f'slot index invalidation failed: {e}')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats.get('hits', 0) + stats.get('loads', 0)
+        stats['hit_rate'] = round(stats.get('hits', 0) / lookups, 3) if lookups else 0.0
+        stats['store'] = 'redis' if isinstance(self._store, _RedisSlotStore) else 'memory'
+        return stats
+
+
+# =============================================================================
+# LOADERS
+# =============================================================================
+
+def appointment_day_loader(supabase_client: Any = None) -> Loader:
+    """
+    Loader for the ai_capabilities grid: business hours, capacity of the
+    first configured service, minus non-cancelled appointments. One query
+    for the config and one for all requested days.
+    """
+
+    def load(business_id: str, scope: str, days: List[date]) -> Dict[date, DayGrid]:
+        client = supabase_client
+        if client is None:
+            from supabase_client import get_supabase_client
+
+            client = get_supabase_client()
+        if client is None:
+            return {}
+
+        config = client.table('ai_capabilities').select(
+            'appointment_business_hours, appointment_services'
+        ).eq('user_id', business_id).single().execute()
+        data = config.data or {}
+        business_hours = data.get('appointment_business_hours') or DEFAULT_BUSINESS_HOURS
+        services = data.get('appointment_services') or []
+        capacity = services[0].get('capacity', 1) if services else 1
+
+        rows = client.table('appointments').select('date, time').eq(
+            'user_id', business_id
+        ).in_('date', [d.isoformat() for d in days]).neq('status', 'cancelled').execute()
+
+        booked: Dict[str, Counter] = {}
+        for row in rows.data or []:
+            booked.setdefault(str(row['date'])[:10], Counter())[str(row['time'])[:5]] += 1
+
+        return {
+            d: DayGrid.from_hours(business_hours, capacity, booked.get(d.isoformat(), {}))
+            for d in days
+        }
+
+    return load
+
+
+# =============================================================================
+# SINGLETON
+# =============================================================================
+
+_index: Optional[SlotAvailabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_slot_index() -> SlotAvailabilityIndex:
+    """Shared index (Redis when available, else in-process)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from connections import get_redis
+
+                redis_client = get_redis('slot_availability', decode_responses=False)
+                store = (
+                    _RedisSlotStore(redis_client, SLOT_INDEX_TTL_SECONDS)
+                    if redis_client is not None
+                    else _MemorySlotStore(SLOT_INDEX_TTL_SECONDS)
+                )
+                _index = SlotAvailabilityIndex(store, appointment_day_loader())
+    return _index
+
+
+def slot_index_stats() -> Dict[str, Any]:
+    """Stats for /api/metrics (without creating the index)."""
+    return _index.get_stats() if _index is not None else {'initialized': False}
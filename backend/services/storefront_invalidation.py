@@ -0,0 +1,386 @@
+"""
+Storefront Invalidation Bus — Coalesced Cache Fan-Out
+=====================================================
+
+Every business/product save used to start its own daemon threads: one to
+clear the slug cache, one to POST Next.js /api/revalidate (a new TCP/TLS
+connection each time) and one to mirror the business into Firestore. A bulk
+product edit produced a storm of threads and identical revalidate calls for
+the same store.
+
+    save ─► publish(user_id, ...) ──► {user_id: pending invalidation}
+                                            │  quiet for INVALIDATION_DEBOUNCE_MS
+                                            │  (at most INVALIDATION_MAX_DELAY_MS)
+                                            ▼
+                         one worker thread, pooled HTTP session
+                           ├─ slug cache   (invalidate_slug_cache per old slug)
+                           ├─ nextjs       (one /api/revalidate per store)
+                           └─ firestore    (one merged document write)
+
+Events for the same business within the window collapse into one delivery:
+targets are unioned, every old slug is kept, the newest slug and Firestore
+fields win. Failed targets are retried with exponential backoff up to
+INVALIDATION_MAX_ATTEMPTS. Publish → delivery lag is reported per target in
+invalidation_stats() (exposed on /api/metrics).
+
+Author: FlowAuxi Engineering
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger('reviseit.storefront_invalidation')
+
+INVALIDATION_DEBOUNCE_MS = int(os.getenv('INVALIDATION_DEBOUNCE_MS', '500'))
+INVALIDATION_MAX_DELAY_MS = int(os.getenv('INVALIDATION_MAX_DELAY_MS', '3000'))
+INVALIDATION_MAX_ATTEMPTS = int(os.getenv('INVALIDATION_MAX_ATTEMPTS', '4'))
+INVALIDATION_RETRY_BASE_MS = 1000
+
+SLUG_CACHE = 'slug_cache'
+NEXTJS = 'nextjs'
+FIRESTORE = 'firestore'
+ALL_TARGETS = frozenset({SLUG_CACHE, NEXTJS, FIRESTORE})
+
+
+@dataclass
+class Invalidation:
+    """Pending invalidation for one business (coalesced across saves)."""
+
+    user_id: str
+    targets: Set[str] = field(default_factory=set)
+    slug: Optional[str] = None
+    old_slugs: Set[str] = field(default_factory=set)
+    slug_changed: bool = False
+    firestore_data: Dict[str, Any] = field(default_factory=dict)
+    first_published: float = 0.0
+    due_at: float = 0.0
+    attempt: int = 0
+    events: int = 0
+
+    def merge(self, other: 'Invalidation') -> None:
+        self.targets |= other.targets
+        self.slug = other.slug or self.slug
+        self.old_slugs |= other.old_slugs
+        self.slug_changed = self.slug_changed or other.slug_changed
+        self.firestore_data.update(other.firestore_data)
+        self.first_published = min(self.first_published, other.first_published)
+        self.events += other.events
+
+    def absorb_retry(self, older: 'Invalidation') -> None:
+        """
+        Fold a failed, OLDER invalidation into this newer one: its targets
+        and old slugs are added, but this save's slug and Firestore fields
+        win (older fields only fill keys this save does not set).
+        """
+        self.targets |= older.targets
+        self.slug = self.slug or older.slug
+        self.old_slugs |= older.old_slugs
+        self.slug_changed = self.slug_changed or older.slug_changed
+        self.firestore_data = {**older.firestore_data, **self.firestore_data}
+        self.first_published = min(self.first_published, older.first_published)
+        self.events += older.events
+
+
+class _LagStats:
+    def __init__(self, window: int = 256):
+        self.delivered = 0
+        self.failed = 0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, lag_ms: float) -> None:
+        self.delivered += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+        self._recent.append(lag_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'lag_ms_p50': round(recent[len(recent) // 2], 1) if recent else 0.0,
+            'lag_ms_p95': round(p95, 1),
+            'lag_ms_max': round(self.max_ms, 1),
+        }
+
+
+class StorefrontInvalidationBus:
+    """
+    Debounces invalidations per business and delivers them from one
+    lazily started daemon worker.
+
+    `deliverers` maps a target name to fn(Invalidation); an exception marks
+    that target for retry.
+    """
+
+    def __init__(
+        self,
+        deliverers: Dict[str, Callable[[Invalidation], Any]],
+        debounce: float = INVALIDATION_DEBOUNCE_MS / 1000,
+        max_delay: float = INVALIDATION_MAX_DELAY_MS / 1000,
+        max_attempts: int = INVALIDATION_MAX_ATTEMPTS,
+        retry_base: float = INVALIDATION_RETRY_BASE_MS / 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._deliverers = deliverers
+        self._debounce = debounce
+        self._max_delay = max(max_delay, debounce)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base = retry_base
+        self._clock = clock
+        self._pending: Dict[str, Invalidation] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._published = 0
+        self._coalesced = 0
+        self._retried = 0
+        self._dropped = 0
+        self._lag = {name: _LagStats() for name in deliverers}
+
+    def publish(
+        self,
+        user_id: str,
+        *,
+        slug: Optional[str] = None,
+        old_slug: Optional[str] = None,
+        slug_changed: bool = False,
+        targets: Iterable[str] = ALL_TARGETS,
+        firestore_data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Schedule cache invalidation for a business; never blocks on I/O."""
+        if not user_id:
+            return
+        now = self._clock()
+        event = Invalidation(
+            user_id=user_id,
+            targets={t for t in targets if t in self._deliverers},
+            slug=slug,
+            old_slugs={old_slug} if old_slug else set(),
+            slug_changed=slug_changed,
+            firestore_data=dict(firestore_data or {}),
+            first_published=now,
+            events=1,
+        )
+        if not event.targets:
+            return
+        with self._lock:
+            self._published += 1
+            current = self._pending.get(user_id)
+            if current is None:
+                event.due_at = now + self._debounce
+                self._pending[user_id] = event
+            else:
+                self._coalesced += 1
+                current.merge(event)
+                # Trailing-edge debounce, bounded so a busy store still refreshes
+                current.due_at = min(now + self._debounce, current.first_published + self._max_delay)
+            self._ensure_worker()
+        self._wake.set()
+
+    def flush(self, force: bool = False) -> int:
+        """Deliver every invalidation that is due (all of them if force). Returns deliveries made."""
+        now = self._clock()
+        with self._lock:
+            due = [inv for inv in self._pending.values() if force or inv.due_at <= now]
+            for inv in due:
+                del self._pending[inv.user_id]
+
+        for inv in due:
+            self._deliver(inv)
+        return len(due)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'published': self._published,
+            'coalesced': self._coalesced,
+            'retried': self._retried,
+            'dropped': self._dropped,
+            'pending': pending,
+            'targets': {name: lag.snapshot() for name, lag in self._lag.items()},
+        }
+
+    def _deliver(self, inv: Invalidation) -> None:
+        failed: Set[str] = set()
+        for target in sorted(inv.targets):
+            try:
+                self._deliverers[target](inv)
+                self._lag[target].record((self._clock() - inv.first_published) * 1000)
+            except Exception as e:
+                self._lag[target].failed += 1
+                failed.add(target)
+                logger.warning(
+                    f"⚠️ Storefront invalidation failed target={target} user={inv.user_id} "
+                    f"attempt={inv.attempt + 1}: {e}"
+                )
+        if not failed:
+            return
+        if inv.attempt + 1 >= self._max_attempts:
+            self._dropped += 1
+            logger.error(f"❌ Giving up storefront invalidation user={inv.user_id} targets={sorted(failed)}")
+            return
+
+        inv.targets = failed
+        inv.attempt += 1
+        inv.due_at = self._clock() + self._retry_base * (2 ** (inv.attempt - 1))
+        with self._lock:
+            self._retried += 1
+            current = self._pending.get(inv.user_id)
+            if current is None:
+                self._pending[inv.user_id] = inv
+            else:
+                # A newer save is already pending; fold the retry into it
+                # without letting the stale payload overwrite the new one
+                current.absorb_retry(inv)
+
+    def _next_wait(self) -> float:
+        with self._lock:
+            if not self._pending:
+                return 60.0
+            return max(0.0, min(inv.due_at for inv in self._pending.values()) - self._clock())
+
+    def _ensure_worker(self) -> None:
+        # Caller holds self._lock
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(
+            target=self._run, name='storefront-invalidation', daemon=True
+        )
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._next_wait())
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"storefront_invalidation_worker_error: {e}")
+
+
+# =============================================================================
+# Deliverers
+# =============================================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _http_session():
+    """One keep-alive session for all revalidate calls (pool + transport retries)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                retry = Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({'POST'}),
+                )
+                session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry))
+                session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry))
+                _session = session
+    return _session
+
+
+def _invalidate_slug_cache(inv: Invalidation) -> None:
+    from utils.slug_resolver import invalidate_slug_cache
+
+    for old_slug in sorted(inv.old_slugs) or [None]:
+        invalidate_slug_cache(inv.user_id, old_slug=old_slug)
+
+
+def _lookup_slug(user_id: str) -> Optional[str]:
+    from connections import get_supabase
+
+    db = get_supabase()
+    if db is None:
+        return None
+    result = db.table('businesses').select('url_slug').eq('user_id', user_id).limit(1).execute()
+    return result.data[0].get('url_slug') if result.data else None
+
+
+def _revalidate_nextjs(inv: Invalidation) -> None:
+    nextjs_url = os.getenv('NEXTJS_URL', 'http://localhost:3001')
+    revalidation_secret = os.getenv('REVALIDATION_SECRET', '')
+    slug = inv.slug or _lookup_slug(inv.user_id) or inv.user_id
+    response = _http_session().post(
+        f"{nextjs_url}/api/revalidate",
+        json={
+            "slug": slug,
+            "userId": inv.user_id,
+            "type": "slug_change" if inv.slug_changed else "store",
+        },
+        headers={"Authorization": f"Bearer {revalidation_secret}"},
+        timeout=3,
+    )
+    if response.status_code >= 500:
+        raise RuntimeError(f"revalidate returned {response.status_code}")
+    logger.info(f"✅ Next.js cache invalidated for slug={slug} ({inv.events} saves coalesced)")
+
+
+def _sync_firestore(inv: Invalidation) -> None:
+    if not inv.firestore_data:
+        return
+    from datetime import datetime
+    from firebase_admin import firestore as firebase_firestore
+
+    data = dict(inv.firestore_data)
+    data['userId'] = inv.user_id
+    data['updatedAt'] = datetime.utcnow().isoformat()
+    firebase_firestore.client().collection('businesses').document(inv.user_id).set(data, merge=True)
+    logger.info(f"✅ Firestore sync complete for user {inv.user_id}")
+
+
+_bus: Optional[StorefrontInvalidationBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_invalidation_bus() -> StorefrontInvalidationBus:
+    """Process-wide bus delivering slug-cache, Next.js and Firestore invalidations."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = StorefrontInvalidationBus({
+                    SLUG_CACHE: _invalidate_slug_cache,
+                    NEXTJS: _revalidate_nextjs,
+                    FIRESTORE: _sync_firestore,
+                })
+                atexit.register(_bus.flush, True)
+    return _bus
+
+
+def publish_storefront_invalidation(user_id: str, **kwargs) -> None:
+    """Convenience wrapper: get_invalidation_bus().publish(...), never raises."""
+    try:
+        get_invalidation_bus().publish(user_id, **kwargs)
+    except Exception as e:
+        logger.warning(f"⚠️ Storefront invalidation not published (non-critical): {e}")
+
+
+def invalidation_stats() -> Dict[str, Any]:
+    if _bus is None:
+        return {'published': 0, 'pending': 0}
+    return _bus.stats()
@@ -1507,11 +1507,10 @@ def get_lifecycle_engine() -> SubscriptionLifecycleEngine:
     """Get singleton SubscriptionLifecycleEngine instance."""
     global _lifecycle_engine
     if _lifecycle_engine is None:
-        import redis as redis_lib
+        from connections import get_redis
         from supabase_client import get_supabase_client
 
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        redis_client = redis_lib.from_url(redis_url, decode_responses=True)
+        redis_client = get_redis("billing", check=False)
 
         _lifecycle_engine = SubscriptionLifecycleEngine(
             supabase=get_supabase_client(),
@@ -9,18 +9,34 @@ Event Sourcing with:
 - Event transformation between versions
 
 This is the FOUNDATION for Stripe-level event reliability.
+
+Storage (migration 108_trial_event_store_snapshots.sql):
+
+    append ──► append_trial_event RPC (idempotency + sequence + INSERT)
+    project ──► cached state / trial_event_snapshots ──► events after it
+    replay_all ──► pages of trial_events by position (generator)
 """
 
 import hashlib
 import json
 import logging
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, Iterator, List, Callable, Tuple
 
 logger = logging.getLogger('reviseit.trial_event_store')
 
+# Write a snapshot once this many events follow the previous one
+TRIAL_SNAPSHOT_EVERY = int(os.getenv('TRIAL_SNAPSHOT_EVERY', '50'))
+TRIAL_PROJECTION_CACHE_SIZE = int(os.getenv('TRIAL_PROJECTION_CACHE_SIZE', '1024'))
+TRIAL_REPLAY_PAGE_SIZE = int(os.getenv('TRIAL_REPLAY_PAGE_SIZE', '500'))
+# Bump when TrialProjection._apply_event changes; older snapshots are ignored
+TRIAL_PROJECTION_VERSION = 1
+
 
 # =============================================================================
 # EVENT SCHEMA VERSIONS
@@ -202,6 +218,11 @@ class TrialEventStore:
     - Causation tracking
     - Correlation grouping
     - Full replay capability
+    - Aggregate snapshots
+
+    Events live in trial_events: aggregate_id is trial_id, the payload is
+    event_data and the versioned type is stored as the bare type plus
+    event_version (the table's CHECK lists bare types).
     """
 
     def __init__(self, supabase_client):
@@ -216,43 +237,36 @@ class TrialEventStore:
         """
         Append event to store (idempotent).
 
-        If idempotency_key exists, returns existing event.
+        One RPC checks the idempotency key, assigns the next sequence and
+        inserts. If idempotency_key exists, returns existing event.
         """
-        # Check idempotency
-        if event.idempotency_key:
-            existing = self._get_by_idempotency_key(event.idempotency_key)
-            if existing:
-                self._logger.info(f"event_already_exists idempotency_key={event.idempotency_key}")
-                return existing
-
-        # Get next sequence
-        sequence = self._get_next_sequence(event.aggregate_id)
-
-        # Create event with sequence
-        event_with_sequence = TrialEvent(
-            event_id=event.event_id,
-            event_type=event.event_type,
-            event_version=event.event_version,
-            aggregate_id=event.aggregate_id,
-            aggregate_type=event.aggregate_type,
-            timestamp=event.timestamp,
-            sequence=sequence,
-            idempotency_key=event.idempotency_key,
-            causation_id=event.causation_id,
-            correlation_id=event.correlation_id,
-            payload=event.payload,
-            metadata=event.metadata,
-        )
-
-        # Persist
-        self._db.table('trial_events').insert(event_with_sequence.to_dict()).execute()
+        result = self._db.rpc('append_trial_event', {
+            'p_event_id': event.event_id,
+            'p_trial_id': event.aggregate_id,
+            'p_event_type': event.event_type.split('.v')[0],
+            'p_event_version': event.event_version,
+            'p_created_at': event.timestamp.isoformat(),
+            'p_event_data': event.payload,
+            'p_triggered_by': event.metadata.get('triggered_by', 'system'),
+            'p_idempotency_key': event.idempotency_key,
+            'p_causation_id': event.causation_id,
+            'p_correlation_id': event.correlation_id,
+            'p_metadata': event.metadata,
+        }).execute()
+
+        row = result.data or {}
+        stored = self._dict_to_event(row)
+
+        if row.get('duplicate'):
+            self._logger.info(f"event_already_exists idempotency_key={event.idempotency_key}")
+            return stored
 
         self._logger.info(
-            f"event_appended event_id={event.event_id} "
-            f"type={event.event_type} sequence={sequence}"
+            f"event_appended event_id={stored.event_id} "
+            f"type={stored.event_type} sequence={stored.sequence}"
         )
 
-        return event_with_sequence
+        return stored
 
     def get_by_id(
         self,
@@ -260,7 +274,7 @@ class TrialEventStore:
     ) -> Optional[TrialEvent]:
         """Get event by ID."""
         result = self._db.table('trial_events').select('*').eq(
-            'event_id', event_id
+            'id', event_id
         ).execute()
 
         if not result.data:
@@ -275,7 +289,7 @@ class TrialEventStore:
     ) -> List[TrialEvent]:
         """Get all events for an aggregate (in order)."""
         result = self._db.table('trial_events').select('*').eq(
-            'aggregate_id', aggregate_id
+            'trial_id', aggregate_id
         ).gte('sequence', from_sequence).order('sequence').execute()
 
         return [self._dict_to_event(r) for r in result.data]
@@ -299,32 +313,44 @@ class TrialEventStore:
         self,
         from_timestamp: Optional[datetime] = None,
         event_types: Optional[List[str]] = None,
-    ) -> List[TrialEvent]:
+        page_size: int = TRIAL_REPLAY_PAGE_SIZE,
+    ) -> Iterator[TrialEvent]:
         """
-        Replay ALL events matching criteria.
+        Stream ALL events matching criteria, in insertion order.
+
+        Reads page_size rows at a time (keyset on position), so memory
+        stays flat however large the log is. event_types match on the
+        type regardless of version.
 
         Used for:
         - Building read models
         - Analytics
         - Event processor recovery
         """
-        query = self._db.table('trial_events').select('*')
+        types = sorted({t.split('.v')[0] for t in event_types}) if event_types else None
+        after = 0
 
-        if from_timestamp:
-            query = query.gte('timestamp', from_timestamp.isoformat())
+        while True:
+            query = self._db.table('trial_events').select('*').gt('position', after)
 
-        if event_types:
-            query = query.in_('event_type', event_types)
+            if from_timestamp:
+                query = query.gte('created_at', from_timestamp.isoformat())
 
-        query = query.order('timestamp')
+            if types:
+                query = query.in_('event_type', types)
 
-        result = query.execute()
-        return [self._dict_to_event(r) for r in result.data]
+            rows = query.order('position').limit(page_size).execute().data or []
+            for row in rows:
+                yield self._dict_to_event(row)
+
+            if len(rows) < page_size:
+                return
+            after = rows[-1]['position']
 
     def get_last_event(self, aggregate_id: str) -> Optional[TrialEvent]:
         """Get the last event for an aggregate."""
         result = self._db.table('trial_events').select('*').eq(
-            'aggregate_id', aggregate_id
+            'trial_id', aggregate_id
         ).order('sequence', desc=True).limit(1).execute()
 
         if not result.data:
@@ -333,46 +359,59 @@ class TrialEventStore:
         return self._dict_to_event(result.data[0])
 
     # =========================================================================
-    # PRIVATE HELPERS
+    # SNAPSHOTS
     # =========================================================================
 
-    def _get_by_idempotency_key(self, key: str) -> Optional[TrialEvent]:
-        """Check if event with idempotency key exists."""
-        result = self._db.table('trial_events').select('*').eq(
-            'idempotency_key', key
-        ).limit(1).execute()
+    def get_snapshot(self, aggregate_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(sequence, state) of the aggregate's snapshot, if current."""
+        result = self._db.table('trial_event_snapshots').select(
+            'sequence, projection_version, state'
+        ).eq('trial_id', aggregate_id).limit(1).execute()
 
         if not result.data:
             return None
 
-        return self._dict_to_event(result.data[0])
-
-    def _get_next_sequence(self, aggregate_id: str) -> int:
-        """Get next sequence number for aggregate."""
-        result = self._db.table('trial_events').select('sequence').eq(
-            'aggregate_id', aggregate_id
-        ).order('sequence', desc=True).limit(1).execute()
+        row = result.data[0]
+        if row.get('projection_version') != TRIAL_PROJECTION_VERSION:
+            return None
 
-        if not result.data:
-            return 1
+        return row['sequence'], row.get('state') or {}
+
+    def save_snapshot(self, aggregate_id: str, sequence: int, state: Dict[str, Any]) -> None:
+        """Replace the aggregate's snapshot (best effort)."""
+        try:
+            self._db.table('trial_event_snapshots').upsert({
+                'trial_id': aggregate_id,
+                'sequence': sequence,
+                'projection_version': TRIAL_PROJECTION_VERSION,
+                'state': state,
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+            }, on_conflict='trial_id').execute()
+        except Exception as e:
+            self._logger.warning(f"snapshot_save_failed trial_id={aggregate_id} sequence={sequence}: {e}")
 
-        return result.data[0]['sequence'] + 1
+    # =========================================================================
+    # PRIVATE HELPERS
+    # =========================================================================
 
     def _dict_to_event(self, data: Dict[str, Any]) -> TrialEvent:
         """Convert database row to TrialEvent."""
+        version = data.get('event_version') or 1
+        metadata = data.get('metadata') or {}
+        if data.get('triggered_by'):
+            metadata = {'triggered_by': data['triggered_by'], **metadata}
         return TrialEvent(
-            event_id=data['event_id'],
-            event_type=data['event_type'],
-            event_version=data['event_version'],
-            aggregate_id=data['aggregate_id'],
-            aggregate_type=data.get('aggregate_type', 'trial'),
-            timestamp=datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00')),
+            event_id=data['id'],
+            event_type=f"{data['event_type']}.v{version}",
+            event_version=version,
+            aggregate_id=data['trial_id'],
+            timestamp=datetime.fromisoformat(data['created_at'].replace('Z', '+00:00')),
             sequence=data['sequence'],
             idempotency_key=data.get('idempotency_key'),
             causation_id=data.get('causation_id'),
             correlation_id=data.get('correlation_id'),
-            payload=data.get('payload', {}),
-            metadata=data.get('metadata', {}),
+            payload=data.get('event_data') or {},
+            metadata=metadata,
         )
 
 
@@ -384,13 +423,28 @@ class TrialProjection:
     """
     Projects events into read models.
 
+    State is built from the newest of: this instance's cached projection,
+    the stored snapshot, or nothing — plus the events after it. A snapshot
+    is saved once snapshot_every events follow the previous one, so a
+    projection never replays more than that many events from storage.
+
     Usage:
         projection = TrialProjection(event_store)
         state = projection.project('trial-uuid')
     """
 
-    def __init__(self, event_store: TrialEventStore):
+    def __init__(
+        self,
+        event_store: TrialEventStore,
+        snapshot_every: int = TRIAL_SNAPSHOT_EVERY,
+        cache_size: int = TRIAL_PROJECTION_CACHE_SIZE,
+    ):
         self._event_store = event_store
+        self._snapshot_every = max(snapshot_every, 1)
+        self._cache_size = cache_size
+        # trial_id -> (sequence, state, snapshot sequence)
+        self._cache: 'OrderedDict[str, Tuple[int, Dict[str, Any], int]]' = OrderedDict()
+        self._lock = threading.Lock()
 
     def project(self, trial_id: str) -> Dict[str, Any]:
         """
@@ -398,17 +452,34 @@ class TrialProjection:
 
         Returns current state as dict.
         """
-        events = self._event_store.get_events_for_aggregate(trial_id)
+        with self._lock:
+            cached = self._cache.get(trial_id)
 
-        if not events:
-            return {}
+        if cached is not None:
+            sequence, state, snapshot_sequence = cached
+        else:
+            snapshot = self._event_store.get_snapshot(trial_id)
+            sequence, state = snapshot if snapshot else (0, {})
+            snapshot_sequence = sequence
 
         # Apply events in order
-        state = {}
-        for event in events:
+        tail = self._event_store.get_events_for_aggregate(trial_id, from_sequence=sequence + 1)
+        for event in tail:
             state = self._apply_event(state, event)
+            sequence = event.sequence
 
-        return state
+        if state and sequence - snapshot_sequence >= self._snapshot_every:
+            self._event_store.save_snapshot(trial_id, sequence, state)
+            snapshot_sequence = sequence
+
+        if state and self._cache_size > 0:
+            with self._lock:
+                self._cache[trial_id] = (sequence, state, snapshot_sequence)
+                self._cache.move_to_end(trial_id)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return dict(state)
 
     def _apply_event(self, state: Dict[str, Any], event: TrialEvent) -> Dict[str, Any]:
         """Apply single event to state."""
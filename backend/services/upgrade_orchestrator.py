@@ -731,15 +731,13 @@ def get_upgrade_orchestrator() -> UpgradeOrchestrator:
     """Get singleton UpgradeOrchestrator instance with proper dependency injection."""
     global _orchestrator_instance
     if _orchestrator_instance is None:
-        import os
-        import redis as redis_lib
+        from connections import get_redis
         from supabase_client import get_supabase_client
         from services.pricing_service import get_pricing_service
         from services.feature_gate_engine import get_feature_gate_engine
         from routes.payments import get_razorpay_client
 
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        redis_client = redis_lib.from_url(redis_url, decode_responses=True)
+        redis_client = get_redis("billing", check=False)
 
         _orchestrator_instance = UpgradeOrchestrator(
             supabase=get_supabase_client(),
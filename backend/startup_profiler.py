@@ -0,0 +1,168 @@
+"""
+Startup Profiler — Import-Time Budget for Worker Cold Starts
+============================================================
+
+Gunicorn recycles workers every `max_requests`, so the cost of importing
+app.py is paid over and over. This module records where that time goes:
+
+    from startup_profiler import checkpoint, finish_startup
+
+    checkpoint("core_imports")      # time since the previous checkpoint
+    ...
+    finish_startup()                # log the report / enforce the budget
+
+Each checkpoint stores elapsed wall time, how many modules were imported
+and the process RSS. finish_startup() logs the table when
+STARTUP_PROFILE=true, and logs a warning when the total exceeds
+STARTUP_IMPORT_BUDGET_MS (0 = no budget). It also flags heavy optional
+SDKs that should only load on first use (DEFERRED_MODULES) but were
+imported eagerly. The report is exposed on /api/metrics.
+
+For a per-module breakdown run:
+
+    python startup_profiler.py [--top 30]
+
+which imports app under `python -X importtime` and prints the slowest
+modules by cumulative time.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('reviseit.startup')
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() in ("1", "true", "yes")
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "0"))
+
+# Heavy SDKs that must stay off the import path; loaded by the first request
+# that needs them (Gemini, PDF rendering, OCR, Sheets). Pillow is not listed:
+# the image upload validator imports it eagerly to install the
+# decompression-bomb limit (Image.MAX_IMAGE_PIXELS) before any decode.
+DEFERRED_MODULES = ("google.genai", "reportlab", "pytesseract", "gspread")
+
+_started_at = time.perf_counter()
+_last_at = _started_at
+_last_module_count = len(sys.modules)
+_phases: List[Dict[str, Any]] = []
+_finished: Optional[Dict[str, Any]] = None
+_lock = threading.Lock()
+
+
+def checkpoint(name: str) -> None:
+    """Close the current startup phase under `name`."""
+    global _last_at, _last_module_count
+    now = time.perf_counter()
+    modules = len(sys.modules)
+    with _lock:
+        _phases.append({
+            "name": name,
+            "ms": round((now - _last_at) * 1000, 1),
+            "modules": modules - _last_module_count,
+        })
+        _last_at = now
+        _last_module_count = modules
+
+
+def startup_report() -> Dict[str, Any]:
+    """Phases recorded so far plus totals; frozen once finish_startup() ran."""
+    if _finished is not None:
+        return _finished
+    with _lock:
+        phases = list(_phases)
+    total_ms = round((_last_at - _started_at) * 1000, 1)
+    return {
+        "total_ms": total_ms,
+        "budget_ms": STARTUP_IMPORT_BUDGET_MS or None,
+        "over_budget": bool(STARTUP_IMPORT_BUDGET_MS) and total_ms > STARTUP_IMPORT_BUDGET_MS,
+        "modules_loaded": len(sys.modules),
+        "rss_mb": _rss_mb(),
+        "eager_heavy_modules": [m for m in DEFERRED_MODULES if m in sys.modules],
+        "phases": phases,
+    }
+
+
+def finish_startup() -> Dict[str, Any]:
+    """Record the final phase, then log the report and any budget violation."""
+    global _finished
+    checkpoint("finalize")
+    report = startup_report()
+    _finished = report
+
+    if STARTUP_PROFILE:
+        lines = [f"  {p['name']:<24} {p['ms']:>8.1f} ms  {p['modules']:>5} modules" for p in report["phases"]]
+        logger.info(
+            "⏱️ Startup profile: %.1f ms, %d modules, %s MB RSS\n%s",
+            report["total_ms"], report["modules_loaded"], report["rss_mb"], "\n".join(lines),
+        )
+    if report["eager_heavy_modules"]:
+        logger.info(f"Startup imported deferred modules eagerly: {report['eager_heavy_modules']}")
+    if report["over_budget"]:
+        slowest = max(report["phases"], key=lambda p: p["ms"], default=None)
+        logger.warning(
+            f"⚠️ Startup took {report['total_ms']} ms (budget {STARTUP_IMPORT_BUDGET_MS} ms); "
+            f"slowest phase: {slowest['name'] if slowest else 'n/a'}"
+        )
+    return report
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # Peak RSS: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except Exception:
+        return None
+
+
+# =============================================================================
+# CLI: per-module import breakdown
+# =============================================================================
+
+def _importtime_report(top: int) -> int:
+    import subprocess
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    total = max((r[0] for r in rows if r[2].strip() == "app"), default=0)
+    print(f"import app: {total / 1000:.1f} ms cumulative ({len(rows)} modules)")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+    eager = sorted({r[2].strip() for r in rows if r[2].strip() in DEFERRED_MODULES})
+    if eager:
+        print(f"\nDeferred modules imported at startup: {', '.join(eager)}")
+    return proc.returncode
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile app import time")
+    parser.add_argument("--top", type=int, default=30)
+    sys.exit(_importtime_report(parser.parse_args().top))
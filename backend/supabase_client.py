@@ -1362,6 +1362,47 @@ def update_message_status(
         return False
 
 
+
+# Monotonic delivery order; mirrors message_status_rank() in migration 105
+MESSAGE_STATUS_RANK = {'pending': 0, 'sent': 1, 'delivered': 2, 'read': 3, 'failed': 4}
+
+
+def update_message_statuses_batch(updates: list[dict]) -> int:
+    """
+    Apply a batch of status receipts with ONE apply_message_status_batch RPC.
+
+    The RPC updates whatsapp_messages by wamid, resolves the tenant and folds
+    delivered/read/failed increments into analytics_daily in the same
+    statement. Statuses only move forward (no read -> delivered).
+
+    Args:
+        updates: [{'wamid': str, 'status': str, 'ts': Optional[str]}]
+
+    Returns:
+        Number of messages whose status advanced (receipts applied one by
+        one via update_message_status if the RPC is unavailable).
+    """
+    if not updates:
+        return 0
+    client = get_supabase_client()
+    if not client:
+        return 0
+
+    try:
+        result = client.rpc('apply_message_status_batch', {'p_updates': updates}).execute()
+        data = result.data or {}
+        updated = int(data.get('updated', 0)) if isinstance(data, dict) else 0
+        print(f"📊 Message statuses applied: {updated}/{len(updates)} advanced")
+        return updated
+    except Exception as e:
+        logger.warning(f"apply_message_status_batch failed, applying per receipt: {e}")
+
+    updated = 0
+    for update in updates:
+        if update_message_status(update['wamid'], update['status'], update.get('ts')):
+            updated += 1
+    return updated
+
 def get_user_push_tokens(user_id: str) -> list[str]:
     """
     Fetch all active FCM push tokens for a user.
@@ -24,7 +24,6 @@ Design:
 """
 
 import logging
-import os
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 
@@ -47,9 +46,8 @@ def _acquire_monitor_lock(lock_name: str, ttl_seconds: int = 600) -> bool:
     The next scheduled run (10 min later) will succeed when Redis recovers.
     """
     try:
-        import redis as redis_lib
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        r = redis_lib.from_url(redis_url, decode_responses=True)
+        from connections import get_redis
+        r = get_redis("task_locks", check=False)
         return bool(r.set(f"billing_monitor:{lock_name}", '1', nx=True, ex=ttl_seconds))
     except Exception as e:
         logger.error(f"monitor_lock_error lock={lock_name}: {e} — skipping run (fail closed)")
@@ -59,9 +57,8 @@ def _acquire_monitor_lock(lock_name: str, ttl_seconds: int = 600) -> bool:
 def _release_monitor_lock(lock_name: str):
     """Release a monitor lock."""
     try:
-        import redis as redis_lib
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        r = redis_lib.from_url(redis_url, decode_responses=True)
+        from connections import get_redis
+        r = get_redis("task_locks", check=False)
         r.delete(f"billing_monitor:{lock_name}")
     except Exception:
         pass
@@ -478,7 +475,9 @@ def sync_razorpay_state(self) -> Dict[str, Any]:
     Periodic sync: Verify subscription state with Razorpay API.
 
     Catches cases where webhooks were missed, delayed, or lost.
-    Runs every 6 hours as a safety net.
+    Runs every 6 hours as a safety net. Subscriptions are paged by id and
+    fetched from Razorpay concurrently (reconciliation_engine); a run cut
+    short by the time limit resumes after its last finished page.
     """
     if not _acquire_monitor_lock('razorpay_sync', ttl_seconds=900):
         return {'status': 'skipped', 'reason': 'locked'}
@@ -488,62 +487,62 @@ def sync_razorpay_state(self) -> Dict[str, Any]:
     try:
         from supabase_client import get_supabase_client
         from services.subscription_lifecycle import get_lifecycle_engine
-        from routes.payments import razorpay_client
+        from services.reconciliation_engine import scan_subscriptions
 
         supabase = get_supabase_client()
         lifecycle = get_lifecycle_engine()
 
-        # Get all active/past_due/grace_period subscriptions with Razorpay IDs
-        result = supabase.table('subscriptions').select(
-            'id, user_id, status, razorpay_subscription_id, product_domain'
-        ).in_(
-            'status', ['active', 'past_due', 'grace_period', 'trialing']
-        ).not_.is_(
-            'razorpay_subscription_id', 'null'
-        ).limit(200).execute()
-
-        for sub in (result.data or []):
-            rzp_sub_id = sub['razorpay_subscription_id']
-            try:
-                rzp_sub = razorpay_client.subscription.fetch(rzp_sub_id)
-                rzp_status = rzp_sub.get('status', '')
-
-                our_status = sub['status']
-                mismatch = False
-
-                # Check for mismatches
-                if rzp_status == 'halted' and our_status != 'halted':
-                    lifecycle.handle_halt(sub['id'])
-                    mismatch = True
-
-                elif rzp_status == 'cancelled' and our_status not in ('cancelled', 'expired'):
-                    lifecycle.handle_cancellation(sub['id'])
-                    mismatch = True
-
-                elif rzp_status in ('active', 'authenticated') and our_status in ('past_due', 'grace_period'):
-                    lifecycle.handle_payment_success(
-                        subscription_id=sub['id'],
-                        period_start=_parse_ts(rzp_sub.get('current_start')),
-                        period_end=_parse_ts(rzp_sub.get('current_end')),
-                    )
-                    mismatch = True
-
-                elif rzp_status == 'paused' and our_status != 'paused':
-                    lifecycle.handle_pause(sub['id'])
-                    mismatch = True
-
-                if mismatch:
-                    summary['mismatches'] += 1
-                    logger.warning(
-                        f"razorpay_sync_mismatch sub={sub['id']} "
-                        f"our={our_status} razorpay={rzp_status}"
-                    )
-
-                summary['synced'] += 1
-
-            except Exception as e:
-                summary['errors'] += 1
-                logger.error(f"razorpay_sync_error sub={sub['id']}: {e}")
+        # All active/past_due/grace_period subscriptions with Razorpay IDs
+        pages = scan_subscriptions(
+            supabase,
+            'razorpay_sync',
+            columns='id, user_id, status, razorpay_subscription_id, product_domain',
+            filters=lambda q: q.in_('status', ['active', 'past_due', 'grace_period', 'trialing']),
+        )
+
+        for page in pages:
+            for sub, rzp_sub in page:
+                try:
+                    if rzp_sub is None:
+                        raise RuntimeError(f"razorpay fetch failed for {sub['razorpay_subscription_id']}")
+                    rzp_status = rzp_sub.get('status', '')
+
+                    our_status = sub['status']
+                    mismatch = False
+
+                    # Check for mismatches
+                    if rzp_status == 'halted' and our_status != 'halted':
+                        lifecycle.handle_halt(sub['id'])
+                        mismatch = True
+
+                    elif rzp_status == 'cancelled' and our_status not in ('cancelled', 'expired'):
+                        lifecycle.handle_cancellation(sub['id'])
+                        mismatch = True
+
+                    elif rzp_status in ('active', 'authenticated') and our_status in ('past_due', 'grace_period'):
+                        lifecycle.handle_payment_success(
+                            subscription_id=sub['id'],
+                            period_start=_parse_ts(rzp_sub.get('current_start')),
+                            period_end=_parse_ts(rzp_sub.get('current_end')),
+                        )
+                        mismatch = True
+
+                    elif rzp_status == 'paused' and our_status != 'paused':
+                        lifecycle.handle_pause(sub['id'])
+                        mismatch = True
+
+                    if mismatch:
+                        summary['mismatches'] += 1
+                        logger.warning(
+                            f"razorpay_sync_mismatch sub={sub['id']} "
+                            f"our={our_status} razorpay={rzp_status}"
+                        )
+
+                    summary['synced'] += 1
+
+                except Exception as e:
+                    summary['errors'] += 1
+                    logger.error(f"razorpay_sync_error sub={sub['id']}: {e}")
 
         logger.info(
             f"razorpay_sync_complete synced={summary['synced']} "
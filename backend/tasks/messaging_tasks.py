@@ -120,25 +120,14 @@ def _generate_trace_id() -> str:
 # Shared Redis Client (Prevents Connection Leaks)
 # =========================================================================
 
-_shared_redis = None
-
 def _get_shared_redis():
-    global _shared_redis
-    if _shared_redis is None:
-        try:
-            import redis as _redis_mod
-            import os
-            url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-            # Use a strict connection pool max to prevent exhausting cloud Redis free tier
-            pool = _redis_mod.ConnectionPool.from_url(
-                url, decode_responses=True, max_connections=5, socket_timeout=2.0
-            )
-            _shared_redis = _redis_mod.Redis(connection_pool=pool)
-            _shared_redis.ping()
-        except Exception as e:
-            logger.error(f"Failed to init shared redis: {e}")
-            _shared_redis = None
-    return _shared_redis
+    # Process-wide bounded pool from the connection registry
+    from connections import get_redis
+
+    client = get_redis("messaging_tasks")
+    if client is None:
+        logger.error("Failed to init shared redis")
+    return client
 
 
 # =========================================================================
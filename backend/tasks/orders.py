@@ -22,13 +22,7 @@ except ImportError:
     CELERY_AVAILABLE = False
     celery_app = None
 
-# Import gspread for exception handling
-try:
-    import gspread
-    GSPREAD_AVAILABLE = True
-except ImportError:
-    GSPREAD_AVAILABLE = False
-    gspread = None
+from services import sheets_sync_engine as sheets_sync
 
 logger = logging.getLogger('reviseit.tasks.orders')
 
@@ -351,7 +345,7 @@ def sync_order_to_sheets(
         # Format data for sheets
         row_data = _format_order_for_sheets(data)
         
-        # Connect to Google Sheets API
+        # Validate credentials up front (the authorized client is cached per service account)
         sheets_client = _get_sheets_client(sheets_config)
         
         if not sheets_client:
@@ -359,7 +353,6 @@ def sync_order_to_sheets(
             result["reason"] = "client_unavailable"
             return result
         
-        # Find or create row for this order (idempotent)
         spreadsheet_id = sheets_config.get("spreadsheet_id")
         sheet_name = sheets_config.get("sheet_name", "Orders")
         
@@ -386,20 +379,35 @@ def sync_order_to_sheets(
         db_uuid = data.get("id", order_id) if data else order_id
         row_data_with_uuid = row_data + [db_uuid] if row_data else [db_uuid]
         
-        # Append or update row
+        result["spreadsheet_id"] = spreadsheet_id
+        
+        # Coalesce: buffer the row and let one flush per spreadsheet write every
+        # pending order in a single batch (see services/sheets_sync_engine.py)
+        if CELERY_AVAILABLE:
+            schedule = sheets_sync.enqueue_order_row(
+                user_id, spreadsheet_id, sheet_name, sheet_order_id, row_data_with_uuid,
+            )
+            if schedule is not None:
+                if schedule:
+                    flush_sheets_writes.apply_async(
+                        args=[spreadsheet_id],
+                        countdown=sheets_sync.SHEETS_FLUSH_INTERVAL_SECONDS,
+                    )
+                logger.info(f"📊 Queued order {sheet_order_id} (db_id={order_id}) for sheet {sheet_name}")
+                result["queued"] = True
+                return result
+        
+        # No Redis/Celery: write this row directly
         logger.info(f"📊 Upserting order {sheet_order_id} (db_id={order_id}) to sheet {sheet_name}")
-        synced = _upsert_sheet_row(
-            client=sheets_client,
-            spreadsheet_id=spreadsheet_id,
-            sheet_name=sheet_name,
-            order_id=sheet_order_id,
-            row_data=row_data_with_uuid,
+        located = sheets_sync.get_sheets_sync_engine().write_rows(
+            sheets_config["credentials"],
+            spreadsheet_id,
+            sheet_name,
+            {sheet_order_id: row_data_with_uuid},
         )
+        result["synced"] = sheet_order_id in located
         
-        result["synced"] = synced
-        result["spreadsheet_id"] = spreadsheet_id
-        
-        if synced:
+        if result["synced"]:
             logger.info(f"✅ Order {order_id} synced to Google Sheets successfully")
         else:
             logger.warning(f"⚠️ Order {order_id} sync returned False")
@@ -415,6 +423,96 @@ def sync_order_to_sheets(
     return result
 
 
+@background_task(
+    name="orders.flush_sheets",
+    bind=True,
+    max_retries=0,
+)
+def flush_sheets_writes(
+    self=None,
+    spreadsheet_id: str = None,
+    attempt: int = 0,
+) -> Dict[str, Any]:
+    """
+    Write every buffered order row for one spreadsheet.
+    
+    One batch_update + one append_rows per worksheet instead of one API call
+    per order. On quota (429) / 5xx / transport errors, or when the sheets
+    config could not be read, the rows are put back and the flush is
+    rescheduled with exponential backoff (up to SHEETS_MAX_FLUSH_ATTEMPTS).
+    Rows are dropped only when sync is no longer configured.
+    """
+    from services.redis_lock import acquire_lock, release_lock
+    
+    result = {"spreadsheet_id": spreadsheet_id, "written": 0, "requeued": 0}
+    lock_key = sheets_sync.flush_lock_key(spreadsheet_id)
+    token = acquire_lock(lock_key, sheets_sync.FLUSH_LOCK_TTL_SECONDS)
+    if token is None:
+        # Another flush is writing this spreadsheet; appends must not race
+        flush_sheets_writes.apply_async(
+            args=[spreadsheet_id],
+            countdown=sheets_sync.SHEETS_FLUSH_INTERVAL_SECONDS,
+        )
+        result["reason"] = "flush_in_progress"
+        return result
+    
+    failed: List[Dict[str, Any]] = []
+    retry_after = None
+    try:
+        entries = sheets_sync.drain_pending(spreadsheet_id)
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            groups.setdefault((entry["user_id"], entry["sheet_name"]), []).append(entry)
+        
+        configs: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending_groups = list(groups.items())
+        for position, ((user_id, sheet_name), group) in enumerate(pending_groups):
+            if user_id not in configs:
+                configs[user_id] = _get_sheets_config(user_id)
+            config = configs[user_id]
+            if config is None:
+                # The lookup failed (Supabase error), which says nothing
+                # about whether sync is still configured: keep the rows
+                logger.warning(f"⚠️ [Sheets Flush] Config lookup failed for user {user_id}; keeping {len(group)} rows")
+                failed.extend(group)
+                continue
+            if not config.get("enabled") or config.get("spreadsheet_id") != spreadsheet_id:
+                logger.info(f"📊 [Sheets Flush] Dropping {len(group)} rows for user {user_id}: sync no longer configured")
+                continue
+            
+            rows = {entry["order_id"]: entry["row"] for entry in group}
+            try:
+                located = sheets_sync.get_sheets_sync_engine().write_rows(
+                    config["credentials"], spreadsheet_id, sheet_name, rows,
+                )
+                result["written"] += len(located)
+            except sheets_sync.SheetsRetryableError as e:
+                logger.warning(f"⚠️ [Sheets Flush] {e}; backing off")
+                retry_after = e.retry_after
+                for _, remaining in pending_groups[position:]:
+                    failed.extend(remaining)
+                break
+            except Exception as e:
+                logger.error(f"❌ [Sheets Flush] Failed to write {len(rows)} rows to '{sheet_name}': {e}", exc_info=True)
+    finally:
+        release_lock(lock_key, token)
+    
+    if failed and attempt + 1 >= sheets_sync.SHEETS_MAX_FLUSH_ATTEMPTS:
+        logger.error(f"❌ [Sheets Flush] Giving up on {len(failed)} rows after {attempt + 1} attempts")
+        result["dropped"] = len(failed)
+    elif failed:
+        result["requeued"] = len(failed)
+        if sheets_sync.requeue(spreadsheet_id, failed):
+            flush_sheets_writes.apply_async(
+                args=[spreadsheet_id],
+                kwargs={"attempt": attempt + 1},
+                countdown=sheets_sync.backoff_seconds(attempt, retry_after),
+            )
+    
+    logger.info(f"📊 [Sheets Flush] {spreadsheet_id[:20]}...: {result['written']} written, {result['requeued']} requeued")
+    return result
+
+
 def _get_sheets_config(user_id: str) -> Optional[Dict[str, Any]]:
     """Get Google Sheets configuration for a business."""
     import os
@@ -562,14 +660,9 @@ def _get_sheets_config(user_id: str) -> Optional[Dict[str, Any]]:
 
 def _get_sheets_client(config: Dict[str, Any]):
     """Get Google Sheets API client."""
-    logger.info(f"📊 [Sheets Client] Creating Google Sheets client (credential_source={config.get('credential_source', 'unknown')})")
+    logger.debug(f"📊 [Sheets Client] Getting Google Sheets client (credential_source={config.get('credential_source', 'unknown')})")
     
     try:
-        import gspread
-        from google.oauth2.service_account import Credentials
-        
-        logger.debug("📊 [Sheets Client] Successfully imported gspread and google.auth packages")
-        
         credentials_data = config.get("credentials")
         if not credentials_data:
             logger.error("❌ [Sheets Client] No credentials provided in config")
@@ -586,25 +679,12 @@ def _get_sheets_client(config: Dict[str, Any]):
             logger.error(f"❌ [Sheets Client] Credentials missing required fields: {missing_fields}")
             return None
         
-        logger.info(f"📊 [Sheets Client] Valid credentials structure detected "
+        logger.debug(f"📊 [Sheets Client] Valid credentials structure detected "
                    f"(project_id={credentials_data.get('project_id', 'unknown')[:30]}...)")
         
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive',
-        ]
-        
-        logger.debug(f"📊 [Sheets Client] Creating credentials with scopes: {scopes}")
-        credentials = Credentials.from_service_account_info(
-            credentials_data,
-            scopes=scopes,
-        )
-        
-        logger.debug(f"📊 [Sheets Client] Authorizing gspread client with service account: "
-                    f"{credentials_data.get('client_email', 'unknown')}")
-        client = gspread.authorize(credentials)
+        client = sheets_sync.get_sheets_client(credentials_data)
         
-        logger.info("✅ [Sheets Client] Google Sheets client created successfully")
+        logger.debug("✅ [Sheets Client] Google Sheets client ready")
         return client
         
     except ImportError as e:
@@ -673,129 +753,6 @@ def _format_order_for_sheets(data: Dict[str, Any]) -> List[Any]:
     ]
 
 
-def _upsert_sheet_row(
-    client,
-    spreadsheet_id: str,
-    sheet_name: str,
-    order_id: str,
-    row_data: List[Any],
-) -> bool:
-    """Insert or update row in Google Sheet (idempotent).
-    
-    CRITICAL FIX: Properly searches for existing order to prevent duplicates.
-    """
-    logger.info(f"📊 [Sheets Upsert] Starting upsert for order {order_id} to "
-               f"spreadsheet {spreadsheet_id[:20]}..., sheet '{sheet_name}'")
-    try:
-        logger.debug(f"📊 [Sheets Upsert] Opening spreadsheet by key: {spreadsheet_id[:20]}...")
-        spreadsheet = client.open_by_key(spreadsheet_id)
-        logger.debug(f"📊 [Sheets Upsert] Successfully opened spreadsheet: {spreadsheet.title}")
-        
-        logger.debug(f"📊 [Sheets Upsert] Accessing worksheet: {sheet_name}")
-        sheet = spreadsheet.worksheet(sheet_name)
-        logger.info(f"📊 [Sheets Upsert] Successfully accessed worksheet '{sheet_name}' "
-                   f"({sheet.row_count} rows, {sheet.col_count} cols)")
-        
-        # CRITICAL FIX: Get ALL values in column A (Order ID column) to find exact match
-        logger.debug(f"📊 [Sheets Upsert] Fetching all Order IDs from column A...")
-        try:
-            # Get all values in column A (Order ID column)
-            order_id_column = sheet.col_values(1)  # Column A = index 1
-            logger.debug(f"📊 [Sheets Upsert] Found {len(order_id_column)} rows in Order ID column")
-            
-            # Search for exact match (case-sensitive)
-            existing_row_num = None
-            for idx, cell_value in enumerate(order_id_column, start=1):
-                if str(cell_value).strip() == str(order_id).strip():
-                    existing_row_num = idx
-                    logger.info(f"📊 [Sheets Upsert] Found existing order '{order_id}' at row {existing_row_num}")
-                    break
-            
-            if existing_row_num and existing_row_num > 1:  # Skip header row
-                # Update existing row (including hidden DB UUID column K)
-                logger.info(f"📊 [Sheets Upsert] Updating existing order at row {existing_row_num}...")
-                range_notation = f"A{existing_row_num}:K{existing_row_num}"
-                logger.debug(f"📊 [Sheets Upsert] Updating range: {range_notation}")
-                sheet.update(range_notation, [row_data])
-                logger.info(f"✅ [Sheets Upsert] Successfully updated existing order {order_id} at row {existing_row_num}")
-                return True
-            else:
-                logger.debug(f"📊 [Sheets Upsert] Order ID '{order_id}' not found in existing rows")
-                
-        except Exception as col_error:
-            logger.warning(f"⚠️ [Sheets Upsert] Error reading column values: {col_error}, will append new row")
-        
-        # Append new row (order not found)
-        logger.info(f"📊 [Sheets Upsert] Appending new row for order {order_id}")
-        logger.debug(f"📊 [Sheets Upsert] Row data: {row_data}")
-        sheet.append_row(row_data)
-        logger.info(f"✅ [Sheets Upsert] Successfully appended new order {order_id}")
-        return True
-        
-    except gspread.exceptions.WorksheetNotFound:
-        # Auto-create the missing worksheet
-        logger.warning(f"⚠️ [Sheets Upsert] Worksheet '{sheet_name}' not found in spreadsheet {spreadsheet_id[:20]}...")
-        logger.info(f"🔧 [Sheets Upsert] Attempting to auto-create worksheet '{sheet_name}' with headers...")
-        
-        try:
-            # Create new worksheet with appropriate size
-            new_sheet = spreadsheet.add_worksheet(
-                title=sheet_name,
-                rows=1000,  # Start with 1000 rows
-                cols=11     # 11 columns: 10 visible + 1 hidden DB UUID for auditing
-            )
-            
-            # Add header row (Column K is hidden UUID for auditing/reconciliation)
-            headers = [
-                "Order ID",
-                "Date", 
-                "Customer",
-                "Phone",
-                "Address",
-                "Items",
-                "Total Qty",
-                "Status",
-                "Source",
-                "Notes",
-                "DB Order ID"  # Hidden column for full UUID (auditing only)
-            ]
-            new_sheet.update('A1:K1', [headers])
-            
-            # Format header row (bold)
-            new_sheet.format('A1:K1', {
-                "textFormat": {"bold": True},
-                "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}
-            })
-            
-            logger.info(f"✅ [Sheets Upsert] Successfully created worksheet '{sheet_name}' with headers")
-            
-            # Retry the append operation
-            logger.info(f"📊 [Sheets Upsert] Retrying append for order {order_id} on new worksheet")
-            new_sheet.append_row(row_data)
-            logger.info(f"✅ [Sheets Upsert] Successfully appended order {order_id} to new worksheet")
-            return True
-            
-        except Exception as create_error:
-            logger.error(
-                f"❌ [Sheets Upsert] Failed to auto-create worksheet '{sheet_name}': {create_error}. "
-                f"Please manually create a sheet named '{sheet_name}' in the spreadsheet.",
-                exc_info=True
-            )
-            return False
-    except gspread.exceptions.SpreadsheetNotFound:
-        logger.error(f"❌ [Sheets Upsert] Spreadsheet not found: {spreadsheet_id[:20]}... "
-                    f"Check if the spreadsheet exists and service account has access")
-        return False
-    except gspread.exceptions.APIError as api_error:
-        logger.error(f"❌ [Sheets Upsert] Google Sheets API error: {api_error}. "
-                    f"Status: {getattr(api_error.response, 'status_code', 'unknown')}, "
-                    f"Details: {getattr(api_error, 'message', str(api_error))}")
-        return False
-    except Exception as e:
-        logger.error(f"❌ [Sheets Upsert] Failed to upsert sheet row for order {order_id}: {e}", exc_info=True)
-        return False
-
-
 
 
 # =============================================================================
@@ -1017,13 +974,13 @@ def send_invoice_whatsapp(
     correlation_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    NON-BLOCKING INVOICE PIPELINE (NO STORAGE)
+    NON-BLOCKING INVOICE PIPELINE
     
     Flow:
-    1. Generate PDF in memory (pure function)
+    1. Get the order's shared invoice PDF (rendered once, reused by email)
     2. Upload to WhatsApp Media API
     3. Send document message
-    4. Discard PDF bytes
+    4. Discard local PDF bytes (shared artifact expires on its own TTL)
     
     CRITICAL:
     - Order creation MUST NOT wait for this task
@@ -1048,18 +1005,16 @@ def send_invoice_whatsapp(
     
     try:
         # Import invoice modules
-        from utils.invoice_generator import generate_invoice_pdf, generate_invoice_number
+        from utils.invoice_generator import generate_invoice_number
+        from utils.invoice_store import get_or_render_invoice_pdf
         from services.whatsapp_media import upload_and_send_document
         
         logger.info(f"📄 Starting invoice generation for order {order_id}")
         
-        # Defensive: Ensure business_data has valid brand_color before PDF generation
-        if not business_data.get("brandColor"):
-            business_data["brandColor"] = "#22c55e"
-            logger.warning(f"⚠️ Missing brandColor for order {order_id}, using default #22c55e")
+        _prepare_invoice_inputs(order_id, order_data, business_data)
         
-        # Step 1: Generate PDF in memory
-        pdf_bytes = generate_invoice_pdf(order_data, business_data)
+        # Step 1: Get (or render once) the shared invoice PDF
+        pdf_bytes = get_or_render_invoice_pdf(order_data, business_data)
         
         if not pdf_bytes:
             logger.error(f"Failed to generate PDF for order {order_id}")
@@ -1162,7 +1117,8 @@ def send_invoice_email(
         from supabase_client import get_supabase_client
         import os
         import resend
-        from utils.invoice_generator import generate_invoice_pdf, generate_invoice_number
+        from utils.invoice_generator import generate_invoice_number
+        from utils.invoice_store import get_or_render_invoice_pdf
         
         client = get_supabase_client()
         if not client:
@@ -1213,42 +1169,10 @@ def send_invoice_email(
             result["reason"] = "limit_reached"
             return result
             
-        # Determine Payment Info
-        # CRITICAL: Detect payment method from order source and notes.
-        # - source='api' → Razorpay online checkout → PAID ONLINE
-        # - source='ai' with payment indicators in notes → PAID ONLINE
-        # - Otherwise → fallback to get_payment_label() logic in invoice generator
-        source = str(order_data.get("source", "manual")).lower()
-        notes = str(order_data.get("notes") or "")
-        
-        has_payment_id = any(indicator in notes.lower() for indicator in [
-            "payment id", "razorpay_payment_id", "razorpay payment",
-            "paid via razorpay", "paid online", "payment successful",
-        ])
-        
-        # API source = Razorpay checkout flow → always online payment
-        is_online_payment = source == "api" or has_payment_id
-        
-        payment_method = "online" if is_online_payment else "cod"
-        payment_status = "paid" if is_online_payment else "pending"
-        
-        # Merge into order_data for generate_invoice_pdf
-        # CRITICAL: Use snake_case keys — get_payment_label() reads 'payment_method', NOT 'paymentMethod'
-        order_data["payment_method"] = payment_method
-        order_data["payment_status"] = payment_status
+        _prepare_invoice_inputs(order_id, order_data, business_data)
         
-        logger.info(
-            f"💳 Payment detection for order {order_id}: source={source}, "
-            f"method={payment_method}, status={payment_status}, has_payment_id={has_payment_id}"
-        )
-        
-        # Defensive: Ensure business_data has valid brand_color before PDF generation
-        if not business_data.get("brandColor"):
-            business_data["brandColor"] = "#22c55e"
-            logger.warning(f"⚠️ Missing brandColor in email invoice for order {order_id}, using default #22c55e")
-        
-        # Generate PDF Bytes
-        pdf_bytes = generate_invoice_pdf(order_data, business_data)
+        # Shared PDF Bytes (same artifact the WhatsApp delivery uses)
+        pdf_bytes = get_or_render_invoice_pdf(order_data, business_data)
         if not pdf_bytes:
             raise Exception("PDF generation returned empty bytes")
             
@@ -1314,6 +1238,109 @@ def send_invoice_email(
     return result
 
 
+def _prepare_invoice_inputs(
+    order_id: str,
+    order_data: Dict[str, Any],
+    business_data: Dict[str, Any],
+) -> None:
+    """
+    Normalize invoice inputs in place, identically for every delivery channel.
+
+    Both channels must feed the renderer the same data so they share one
+    stored PDF (see utils/invoice_store.py) and the customer never receives
+    two invoices with different payment labels for the same order.
+    """
+    # Determine Payment Info
+    # CRITICAL: Detect payment method from order source and notes.
+    # - source='api' → Razorpay online checkout → PAID ONLINE
+    # - source='ai' with payment indicators in notes → PAID ONLINE
+    # - Otherwise → fallback to get_payment_label() logic in invoice generator
+    source = str(order_data.get("source", "manual")).lower()
+    notes = str(order_data.get("notes") or "")
+    
+    has_payment_id = any(indicator in notes.lower() for indicator in [
+        "payment id", "razorpay_payment_id", "razorpay payment",
+        "paid via razorpay", "paid online", "payment successful",
+    ])
+    
+    # API source = Razorpay checkout flow → always online payment
+    is_online_payment = source == "api" or has_payment_id
+    
+    payment_method = "online" if is_online_payment else "cod"
+    payment_status = "paid" if is_online_payment else "pending"
+    
+    # CRITICAL: Use snake_case keys — get_payment_label() reads 'payment_method', NOT 'paymentMethod'
+    order_data["payment_method"] = payment_method
+    order_data["payment_status"] = payment_status
+    
+    logger.info(
+        f"💳 Payment detection for order {order_id}: source={source}, "
+        f"method={payment_method}, status={payment_status}, has_payment_id={has_payment_id}"
+    )
+    
+    # Defensive: Ensure business_data has valid brand_color before PDF generation
+    if not business_data.get("brandColor"):
+        business_data["brandColor"] = "#22c55e"
+        logger.warning(f"⚠️ Missing brandColor for invoice of order {order_id}, using default #22c55e")
+
+
+@background_task(
+    name="orders.render_invoice_batch",
+    bind=True,
+    max_retries=1,
+    default_retry_delay=300,
+)
+def render_invoice_batch(
+    self=None,
+    user_id: str = None,
+    orders: List[Dict[str, Any]] = None,
+    correlation_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    END-OF-DAY BULK INVOICE RUN
+    
+    Renders invoices for many orders of one business in a single pass:
+    business data, logo and header template are resolved once, and each PDF
+    lands in the shared invoice store so later deliveries reuse it.
+    """
+    result = {
+        "user_id": user_id,
+        "correlation_id": correlation_id,
+        "rendered": 0,
+        "reused": 0,
+        "failed": [],
+    }
+    
+    if not orders:
+        return result
+    
+    try:
+        from utils.invoice_store import render_invoice_batch as render_batch
+        
+        business_data = _get_business_data_for_invoice(user_id)
+        if not business_data:
+            result["error"] = "no_business_data"
+            return result
+        
+        for order in orders:
+            _prepare_invoice_inputs(
+                str(order.get("order_id") or order.get("id") or ""),
+                order,
+                business_data,
+            )
+        
+        result.update(render_batch(orders, business_data))
+        logger.info(
+            f"📄 Invoice batch for user {str(user_id)[:15]}...: "
+            f"rendered={result['rendered']} reused={result['reused']} failed={len(result['failed'])}"
+        )
+    except Exception as e:
+        logger.error(f"Invoice batch failed for user {user_id}: {e}")
+        result["error"] = str(e)
+    
+    return result
+
+
 def _get_whatsapp_credentials(user_id: str) -> Optional[Dict[str, str]]:
     """
     Get WhatsApp credentials for a business.
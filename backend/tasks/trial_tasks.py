@@ -21,7 +21,6 @@ Design:
 """
 
 import logging
-import os
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 
@@ -41,9 +40,8 @@ def _acquire_trial_lock(lock_name: str, ttl_seconds: int = 600) -> bool:
     Fail CLOSED: if Redis is down, skip the run.
     """
     try:
-        import redis
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        r = redis.from_url(redis_url, decode_responses=True)
+        from connections import get_redis
+        r = get_redis("task_locks", check=False)
         return bool(r.set(f"trial_tasks:{lock_name}", '1', nx=True, ex=ttl_seconds))
     except Exception as e:
         logger.error(f"trial_lock_error lock={lock_name}: {e} — skipping run (fail closed)")
@@ -53,9 +51,8 @@ def _acquire_trial_lock(lock_name: str, ttl_seconds: int = 600) -> bool:
 def _release_trial_lock(lock_name: str):
     """Release a task lock."""
     try:
-        import redis
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-        r = redis.from_url(redis_url, decode_responses=True)
+        from connections import get_redis
+        r = get_redis("task_locks", check=False)
         r.delete(f"trial_tasks:{lock_name}")
     except Exception:
         pass
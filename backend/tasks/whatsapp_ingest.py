@@ -0,0 +1,111 @@
+"""
+Celery tasks for the legacy WhatsApp webhook ingest queue.
+
+See services/messaging/whatsapp_ingest.py for the flow and ordering
+guarantee. Message processing itself is app.process_whatsapp_message,
+the same code the synchronous webhook path runs.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict
+
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_ready
+
+from celery_app import celery_app
+from services.messaging.whatsapp_ingest import fan_out_payload, get_conversation_mailbox
+
+logger = logging.getLogger('reviseit.tasks.whatsapp_ingest')
+
+
+def _process_job(job: Dict[str, Any]) -> None:
+    from app import app, process_whatsapp_message
+
+    with app.app_context():
+        process_whatsapp_message(job['value'], job['message'])
+
+
+@celery_app.task(
+    name="whatsapp.ingest_webhook",
+    bind=True,
+    queue="high",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=3,
+    default_retry_delay=5,
+)
+def ingest_webhook(self, raw_body: str):
+    """Fan a raw webhook body out into status updates and per-conversation jobs."""
+    start = time.time()
+    try:
+        payload = json.loads(raw_body or '{}')
+    except ValueError:
+        logger.warning("whatsapp_ingest_invalid_json — dropped")
+        return {'statuses': 0, 'messages': 0}
+
+    statuses, jobs = fan_out_payload(payload)
+
+    if statuses:
+        from app import apply_whatsapp_statuses
+        apply_whatsapp_statuses(statuses, buffered=False)
+
+    mailbox = get_conversation_mailbox()
+    if mailbox is None:
+        # No Redis: this task is the only consumer of its own jobs, so
+        # processing them here in sequence still preserves their order.
+        for job in jobs:
+            _process_job(job)
+    else:
+        try:
+            for job in jobs:
+                mailbox.push(job['conversation_key'], job)
+        except Exception as e:
+            raise self.retry(exc=e)
+        for key in dict.fromkeys(job['conversation_key'] for job in jobs):
+            drain_conversation.delay(key)
+
+    logger.info(
+        f"whatsapp_ingest_fanned_out statuses={len(statuses)} messages={len(jobs)} "
+        f"latency={(time.time() - start) * 1000:.0f}ms"
+    )
+    return {'statuses': len(statuses), 'messages': len(jobs)}
+
+
+@celery_app.task(
+    name="whatsapp.drain_conversation",
+    queue="high",
+    acks_late=True,
+    soft_time_limit=600,
+    time_limit=660,
+)
+def drain_conversation(conversation_key: str):
+    """Process one conversation's queued messages in order (no-op if already draining)."""
+    mailbox = get_conversation_mailbox()
+    if mailbox is None:
+        return 0
+    try:
+        return mailbox.drain(conversation_key, _process_job)
+    except SoftTimeLimitExceeded:
+        # The unfinished message is still in the processing list; a fresh
+        # drain re-queues it ahead of the rest
+        logger.warning(f"whatsapp_mailbox_drain_timeout conversation={conversation_key}")
+        drain_conversation.delay(conversation_key)
+        raise
+
+
+@worker_ready.connect
+def requeue_stranded_conversations(**_kwargs):
+    """Re-queue messages of drainers that died and schedule their drains."""
+    try:
+        mailbox = get_conversation_mailbox()
+        if mailbox is None:
+            return
+        keys = mailbox.recover()
+        for key in keys:
+            drain_conversation.delay(key)
+        if keys:
+            logger.info(f"whatsapp_mailbox_recovered conversations={len(keys)}")
+    except Exception as e:
+        logger.error(f"whatsapp_mailbox_recover_failed: {e}")
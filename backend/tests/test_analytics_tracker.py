@@ -0,0 +1,82 @@
+"""Tests for the bucketed, per-business AnalyticsTracker."""
+
+import pytest
+
+from ai_brain import analytics
+from ai_brain.analytics import AnalyticsTracker, ResolutionOutcome, SatisfactionLevel
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(analytics.time, "time", fake)
+    return fake
+
+
+def _track(tracker, business_id="biz-1", user_id="user-1", intent="pricing", ms=200, **kwargs):
+    return tracker.track_interaction(
+        business_id=business_id, user_id=user_id, intent=intent, confidence=0.8,
+        user_message=kwargs.pop("message", ""), ai_response="", response_time_ms=ms,
+        tokens_used=100, outcome=kwargs.pop("outcome", ResolutionOutcome.RESOLVED), **kwargs,
+    )
+
+
+def test_aggregates_and_quantiles_per_business(clock):
+    tracker = AnalyticsTracker()
+    for i in range(100):
+        _track(tracker, user_id=f"user-{i % 7}", ms=100 if i < 90 else 4000, is_cached=i % 2 == 0,
+               message="price?" if i % 3 else "timings?")
+    _track(tracker, business_id="biz-2", intent="greeting", outcome=ResolutionOutcome.ESCALATED)
+
+    stats = tracker.get_business_analytics("biz-1")
+
+    assert stats.total_interactions == 100 and stats.unique_users == 7
+    assert stats.intents == {"pricing": 100} and stats.escalated_count == 0
+    assert stats.avg_response_time_ms == pytest.approx(490)
+    assert 100 <= stats.p50_response_time_ms <= 120
+    assert 4000 <= stats.p95_response_time_ms <= 4800
+    assert stats.cache_hit_rate == 0.5 and stats.total_tokens == 10_000
+    assert stats.top_queries[0] == "pricing:price?"
+    assert tracker.get_business_analytics("biz-2").escalated_count == 1
+    assert tracker.get_global_stats()["total_businesses"] == 2
+
+
+def test_window_retention_and_ring_buffer_are_bounded(clock):
+    tracker = AnalyticsTracker(max_events_per_business=5, retention_hours=2)
+    _track(tracker, intent="hours")
+    clock.now += 3 * 3600
+    for _ in range(8):
+        _track(tracker)
+
+    log = tracker._logs["biz-1"]
+    assert len(log.events) == 5 and len(log.buckets) == 1
+    assert tracker.get_business_analytics("biz-1", hours=1).intents == {"pricing": 8}
+    assert tracker.get_business_analytics("biz-1", hours=24).total_interactions == 8
+    assert len(tracker.export_events("biz-1")) == 5
+
+
+def test_feedback_is_counted_and_idle_businesses_are_evicted(clock):
+    tracker = AnalyticsTracker(max_businesses=3)
+    event_id = _track(tracker, business_id="biz_under_score")
+    tracker.track_feedback(event_id, SatisfactionLevel.POSITIVE)
+    assert tracker.get_business_analytics("biz_under_score").satisfaction_positive == 1
+
+    # user_id[:8] with "_" used to resolve the business as "biz_under"
+    event_id = _track(tracker, business_id="biz_under_score", user_id="wa_91_98765")
+    tracker.track_feedback(event_id, SatisfactionLevel.NEGATIVE)
+    assert tracker.get_business_analytics("biz_under_score").satisfaction_negative == 1
+
+    for i in range(3):
+        clock.now += 1
+        _track(tracker, business_id=f"biz-{i}")
+
+    assert "biz_under_score" not in tracker._logs
+    assert set(tracker._logs) == {"biz-0", "biz-1", "biz-2"}
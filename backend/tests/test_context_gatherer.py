@@ -0,0 +1,121 @@
+"""Tests for the concurrent pre-LLM context gatherer."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_brain.context_gatherer import ContextGatherer, Lookup
+
+
+def _sleepy(value, seconds=0.1):
+    def fn(_):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_independent_lookups_overlap_and_dependents_get_values():
+    gatherer = ContextGatherer(max_workers=4, default_timeout_ms=2000)
+    start = time.perf_counter()
+
+    result = gatherer.gather([
+        Lookup("facts", _sleepy({"has_recent_order": True})),
+        Lookup("memory", _sleepy(("profile", "summary"))),
+        Lookup("budget", _sleepy("ok")),
+        Lookup("booking_type", lambda v: "order_tracking" if v["facts"]["has_recent_order"] else None,
+               deps=("facts",)),
+    ])
+
+    assert time.perf_counter() - start < 0.25
+    assert result["booking_type"] == "order_tracking" and result["memory"] == ("profile", "summary")
+    stats = gatherer.get_stats()
+    assert stats["gathers"] == 1 and stats["avg_sequential_ms"] > 2 * stats["avg_wall_ms"]
+    assert stats["lookups"]["facts"]["count"] == 1
+
+
+def test_timeouts_and_errors_fall_back_to_defaults():
+    gatherer = ContextGatherer(max_workers=4, default_timeout_ms=2000)
+    release = threading.Event()
+
+    def boom(_):
+        raise RuntimeError("supabase down")
+
+    start = time.perf_counter()
+    result = gatherer.gather([
+        Lookup("slow", lambda _: release.wait(2), default="fallback", timeout_ms=50),
+        Lookup("dependent", lambda v: f"saw {v['slow']}", deps=("slow",)),
+        Lookup("broken", boom, default=False),
+    ])
+    release.set()
+
+    assert time.perf_counter() - start < 0.5
+    assert result.values == {"slow": "fallback", "dependent": "saw fallback", "broken": False}
+    assert result.timed_out == ["slow"] and result.failed == ["broken"]
+    lookups = gatherer.get_stats()["lookups"]
+    assert lookups["slow"]["timeouts"] == 1 and lookups["broken"]["errors"] == 1
+
+
+def test_sequential_mode_and_graph_validation():
+    gatherer = ContextGatherer(parallel=False)
+    order = []
+    result = gatherer.gather([
+        Lookup("b", lambda v: order.append("b") or v["a"] + 1, deps=("a",)),
+        Lookup("a", lambda _: order.append("a") or 1),
+    ])
+    assert result.values == {"a": 1, "b": 2} and order == ["a", "b"]
+
+    with pytest.raises(ValueError):
+        gatherer.gather([Lookup("x", lambda v: 1, deps=("missing",))])
+    with pytest.raises(ValueError):
+        gatherer.gather([Lookup("x", lambda v: 1, deps=("y",)), Lookup("y", lambda v: 1, deps=("x",))])
+
+
+def test_deadline_starts_when_a_worker_picks_the_lookup_up():
+    gatherer = ContextGatherer(max_workers=1, default_timeout_ms=2000)
+    ran = []
+
+    result = gatherer.gather([
+        Lookup("first", _sleepy("a", 0.1)),
+        # Queued 0.1s behind "first", then runs 0.1s: within 150ms of starting
+        Lookup("queued", _sleepy("b", 0.1), timeout_ms=150),
+    ])
+    assert result.values == {"first": "a", "queued": "b"} and not result.timed_out
+
+    result = gatherer.gather([
+        Lookup("hog", _sleepy("a", 0.3)),
+        Lookup("starved", lambda _: ran.append(1), default="fallback", timeout_ms=50),
+    ])
+    # Never got a worker: cancelled, so it does not run later either
+    assert result.values["starved"] == "fallback" and result.timed_out == ["starved"]
+    time.sleep(0.1)
+    assert ran == []
+
+
+@pytest.mark.parametrize("booking_type, expect_llm_lookups", [("order_tracking", False), (None, True)])
+def test_reply_skips_llm_path_lookups_when_routing_answers_first(booking_type, expect_llm_lookups):
+    from ai_brain.ai_brain import AIBrain
+
+    calls = []
+    brain = SimpleNamespace(
+        conversation_manager=SimpleNamespace(get_state=lambda user_id: None),
+        _gather_context_facts=lambda user_id, business: {},
+        _empty_context_facts=dict,
+        _classify_booking_type=lambda *args, **kwargs: booking_type,
+        appointment_handler=None,
+        memory_manager=SimpleNamespace(
+            get_or_create_profile=lambda user_id: calls.append("profile"),
+            get_conversation_summary=lambda user_id, biz_id: None,
+        ),
+        usage_tracker=SimpleNamespace(can_use_llm=lambda biz_id, plan: calls.append("budget")),
+        _try_cache=lambda *args: calls.append("cache"),
+    )
+
+    context = AIBrain._gather_reply_context(
+        brain, user_id="91999", biz_id="biz-1", plan="starter", user_message="where is my order",
+        business={}, history=None, probe_cache=True,
+    )
+
+    assert sorted(calls) == (["budget", "cache", "profile"] if expect_llm_lookups else [])
+    assert context["memory"] == (None, None) and not context.failed
@@ -0,0 +1,137 @@
+"""Tests for delta-persisted conversation state."""
+
+import json
+
+from ai_brain.conversation_manager import ConversationManager, FlowStatus
+from ai_brain.conversation_state_store import ConversationStateStore
+
+
+class FakeRedis:
+    """Dict-backed subset of the redis-py API used by the state store."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key))
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def hset(self, key, mapping):
+        self.commands.append(("hset", key, sorted(mapping)))
+        self.data.setdefault(key, {}).update({k.encode(): v for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def rpush(self, key, *values):
+        self.commands.append(("rpush", key, len(values)))
+        self.data.setdefault(key, []).extend(values)
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:]
+
+    def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    def expire(self, key, ttl):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+def _manager(redis):
+    manager = ConversationManager(redis_url=None)
+    manager._redis = redis
+    manager._redis_available = True
+    manager._state_store = ConversationStateStore(redis, manager.REDIS_STATE_TTL)
+    return manager
+
+
+FLOW_CONFIG = {"business_owner_id": "biz-1", "order_fields": [{"id": "name"}, {"id": "phone"}] * 20}
+
+
+def test_turns_write_only_changed_fields_and_new_messages():
+    redis = FakeRedis()
+    manager = _manager(redis)
+    manager.start_flow("u1", "order_booking", ["name", "phone"], dict(FLOW_CONFIG))
+    first = manager._state_store.stats()["bytes_written"]
+    redis.commands.clear()
+
+    manager.add_message("u1", "user", "Ravi")
+    manager.update_flow_field("u1", "name", "Ravi")
+
+    hsets = [c for c in redis.commands if c[0] == "hset"]
+    assert not [c for c in redis.commands if c[0] == "set"]  # flow_config not rewritten
+    assert "flow_config_delta" not in hsets[-1][2] and "context" not in hsets[-1][2]
+    assert "collected_fields" in hsets[-1][2]
+    assert [c for c in redis.commands if c[0] == "rpush"] == [("rpush", "conversation_state:v2:u1:msgs", 1)]
+    assert manager._state_store.stats()["bytes_written"] - first < first / 4
+
+
+def test_state_round_trips_with_per_user_flow_config_delta():
+    redis = FakeRedis()
+    manager = _manager(redis)
+    manager.start_flow("u1", "appointment_booking", ["date", "time"], dict(FLOW_CONFIG))
+    manager.start_flow("u2", "appointment_booking", ["date", "time"], dict(FLOW_CONFIG))
+    manager.add_message("u1", "user", "tomorrow")
+    manager.update_flow_field("u1", "date", "2026-10-19")
+    manager.get_state("u1").flow_config["_available_slots"] = ["10:00", "11:00"]
+    manager.persist_state("u1")
+
+    assert len([k for k in redis.data if k.startswith("conversation_flow_config:")]) == 1
+
+    restored = _manager(redis).get_state("u1")
+    assert restored.flow_config == dict(FLOW_CONFIG, _available_slots=["10:00", "11:00"])
+    assert restored.collected_fields == {"date": "2026-10-19"}
+    assert restored.current_field == "time" and restored.flow_status == FlowStatus.IN_PROGRESS
+    assert _manager(redis).get_history("u1")[-1]["content"] == "tomorrow"
+
+
+def test_legacy_json_state_is_recovered_and_replaced():
+    redis = FakeRedis()
+    redis.data["conversation_state:u1"] = json.dumps({
+        "active_flow": "order_booking", "flow_status": "in_progress",
+        "collected_fields": {"name": "Ravi"}, "missing_fields": ["phone"], "current_field": "phone",
+        "flow_config": {"order_fields": []}, "recent_messages": [{"role": "user", "content": "hi"}],
+    }).encode()
+    manager = _manager(redis)
+
+    assert manager.update_flow_field("u1", "phone", "9876543210") is None
+
+    assert "conversation_state:u1" not in redis.data
+    assert _manager(redis).get_state("u1").collected_fields == {"name": "Ravi", "phone": "9876543210"}
+
+
+def test_cancel_deletes_state_and_sessions_are_lru_bounded():
+    redis = FakeRedis()
+    manager = _manager(redis)
+    manager.max_sessions = 2
+    manager.start_flow("u1", "order_booking", ["name"])
+    manager.cancel_flow("u1")
+    assert not any(k.startswith("conversation_state:v2:u1") for k in redis.data)
+
+    for user_id in ("u2", "u3", "u1"):
+        manager.get_or_create_session(user_id)
+
+    assert list(manager._sessions) == ["u3", "u1"]
@@ -9,6 +9,7 @@ from PIL import Image
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from domains.file_tools.application.cleanup_service import CleanupService
 from domains.file_tools.application.conversion_orchestrator import ConversionOrchestrator
 from domains.file_tools.application.rate_limit_service import InMemoryRateLimitService
 from domains.file_tools.application.tool_registry import ToolRegistry
@@ -19,6 +20,7 @@ from domains.file_tools.converters.image_converter.pillow_converter import Pillo
 from domains.file_tools.domain.entities import FileToolOwner
 from domains.file_tools.domain.enums import OwnerType
 from domains.file_tools.domain.errors import ConversionError, StorageError, ValidationError
+from domains.file_tools.infrastructure.observability import content_cache_metrics_snapshot
 from domains.file_tools.infrastructure.repositories import FileToolsRepository
 from domains.file_tools.infrastructure.storage.local_dev_storage import LocalDevStorage
 from domains.file_tools.validators.image_converter_validator import ImageConverterValidator, supported_output_formats
@@ -30,11 +32,13 @@ def reset_file_tool_memory():
     FileToolsRepository._memory_artifacts.clear()
     FileToolsRepository._memory_drafts.clear()
     FileToolsRepository._memory_events.clear()
+    FileToolsRepository._memory_content_cache.clear()
     yield
     FileToolsRepository._memory_jobs.clear()
     FileToolsRepository._memory_artifacts.clear()
     FileToolsRepository._memory_drafts.clear()
     FileToolsRepository._memory_events.clear()
+    FileToolsRepository._memory_content_cache.clear()
 
 
 def image_bytes(fmt: str = "PNG", mode: str = "RGB", color=None, size=(12, 10)) -> bytes:
@@ -158,6 +162,103 @@ def test_image_orchestrator_idempotency_reuses_succeeded_artifact(tmp_path):
     assert len(FileToolsRepository._memory_artifacts) == 1
 
 
+def test_image_orchestrator_reuses_cached_output_across_owners(tmp_path):
+    repository = FileToolsRepository(supabase_client=None)
+    storage = LocalDevStorage(root=str(tmp_path))
+    registry = ToolRegistry()
+    converter = registry.get("image_converter").converter
+    calls: list[str] = []
+    original_convert = converter.convert
+
+    def counting_convert(request):
+        calls.append(request.filename)
+        return original_convert(request)
+
+    converter.convert = counting_convert
+    orchestrator = ConversionOrchestrator(registry, repository, storage, InMemoryRateLimitService())
+    content = image_bytes("PNG", color=(10, 20, 30))
+    other_owner = RequestContext(
+        owner=FileToolOwner(OwnerType.GUEST, "image-test-other-guest"),
+        request_id="req-image-test-2",
+        ip_address="127.0.0.2",
+    )
+    hits_before = content_cache_metrics_snapshot().get("image_converter", {}).get("hit", 0)
+
+    first = orchestrator.generate_image_conversion(request_for(content, filename="logo.png"), owner_context())
+    second = orchestrator.generate_image_conversion(request_for(content, filename="brand.png"), other_owner)
+    different = orchestrator.generate_image_conversion(request_for(content, output_format="png"), other_owner)
+
+    assert calls == ["logo.png", "sample.png"]
+    assert second.artifact.id != first.artifact.id
+    assert second.artifact.filename == "brand.jpg"
+    first_artifact = repository.get_artifact(first.artifact.id)
+    second_artifact = repository.get_artifact(second.artifact.id)
+    assert first_artifact.storage_key == second_artifact.storage_key
+    assert repository.get_artifact(different.artifact.id).storage_key != first_artifact.storage_key
+    assert content_cache_metrics_snapshot()["image_converter"]["hit"] == hits_before + 1
+
+
+def test_cleanup_keeps_cached_object_until_last_reference_expires(tmp_path):
+    repository = FileToolsRepository(supabase_client=None)
+    storage = LocalDevStorage(root=str(tmp_path))
+    orchestrator = ConversionOrchestrator(ToolRegistry(), repository, storage, InMemoryRateLimitService())
+    content = image_bytes("PNG", color=(40, 50, 60))
+    first = orchestrator.generate_image_conversion(request_for(content), owner_context())
+    second = orchestrator.generate_image_conversion(request_for(content), owner_context())
+    storage_key = repository.get_artifact(first.artifact.id).storage_key
+    past = "2000-01-01T00:00:00+00:00"
+
+    FileToolsRepository._memory_artifacts[first.artifact.id]["retention_expires_at"] = past
+    result = CleanupService(repository, storage).cleanup_expired()
+
+    assert result["deletedObjects"] == 0
+    assert storage.get_bytes(storage_key)
+
+    FileToolsRepository._memory_artifacts[second.artifact.id]["retention_expires_at"] = past
+    result = CleanupService(repository, storage).cleanup_expired()
+
+    assert result["deletedObjects"] == 1
+    assert not FileToolsRepository._memory_content_cache
+    with pytest.raises(Exception):
+        storage.get_bytes(storage_key)
+
+
+def test_failed_cache_release_keeps_the_artifact_row_and_retries(tmp_path, monkeypatch):
+    class FailingRpc:
+        def rpc(self, *_args):
+            raise ConnectionError("supabase unavailable")
+
+    with pytest.raises(StorageError):
+        FileToolsRepository(supabase_client=FailingRpc()).release_content_cache_reference("local", "k")
+
+    repository = FileToolsRepository(supabase_client=None)
+    storage = LocalDevStorage(root=str(tmp_path))
+    orchestrator = ConversionOrchestrator(ToolRegistry(), repository, storage, InMemoryRateLimitService())
+    first = orchestrator.generate_image_conversion(request_for(image_bytes("PNG", color=(9, 8, 7))), owner_context())
+    storage_key = repository.get_artifact(first.artifact.id).storage_key
+    FileToolsRepository._memory_artifacts[first.artifact.id]["retention_expires_at"] = "2000-01-01T00:00:00+00:00"
+    release = repository.release_content_cache_reference
+
+    def failing_release(*_args):
+        raise StorageError("Content cache release failed.")
+
+    monkeypatch.setattr(repository, "release_content_cache_reference", failing_release)
+    result = CleanupService(repository, storage).cleanup_expired()
+
+    assert result["deletedObjects"] == 0 and result["deferredReleases"] == 1
+    assert storage.get_bytes(storage_key)
+    # The artifact row is the durable record of the pending release
+    assert repository.get_artifact(first.artifact.id) is not None
+
+    monkeypatch.setattr(repository, "release_content_cache_reference", release)
+    result = CleanupService(repository, storage).cleanup_expired()
+
+    assert result["deletedObjects"] == 1 and result["deferredReleases"] == 0
+    assert repository.get_artifact(first.artifact.id) is None
+    with pytest.raises(Exception):
+        storage.get_bytes(storage_key)
+
+
 def test_image_orchestrator_timeout_returns_structured_error(monkeypatch):
     orchestrator = ConversionOrchestrator(
         ToolRegistry(),
@@ -17,6 +17,7 @@ from domains.file_tools.application.tool_registry import ToolRegistry
 from domains.file_tools.contracts.common import RequestContext
 from domains.file_tools.contracts.text_to_pdf import ListBlock, TextPdfGenerateRequest
 from domains.file_tools.converters.text_to_pdf.reportlab_converter import ReportLabTextToPdfConverter
+from domains.file_tools.converters.text_to_pdf import layout_mapper
 from domains.file_tools.converters.text_to_pdf.layout_mapper import paragraph_style
 from domains.file_tools.domain.entities import FileToolOwner
 from domains.file_tools.domain.enums import OwnerType
@@ -33,10 +34,16 @@ def reset_pdf_font_engine_caches():
     pdf_font_engine._REGISTERED_FONTS.clear()
     pdf_font_engine._REGISTERED_FONT_PATHS.clear()
     pdf_font_engine._CMAP_CACHE.clear()
+    pdf_font_engine._SHAPING_STACK_READY = False
+    layout_mapper._STYLE_CACHE.clear()
+    FileToolsRepository._memory_content_cache.clear()
     yield
     pdf_font_engine._REGISTERED_FONTS.clear()
     pdf_font_engine._REGISTERED_FONT_PATHS.clear()
     pdf_font_engine._CMAP_CACHE.clear()
+    pdf_font_engine._SHAPING_STACK_READY = False
+    layout_mapper._STYLE_CACHE.clear()
+    FileToolsRepository._memory_content_cache.clear()
 
 
 def decoded_pdf_streams(pdf_bytes: bytes) -> bytes:
@@ -278,6 +285,39 @@ def test_paragraph_style_only_enables_shaping_for_complex_scripts():
     assert paragraph_style(tamil_request.options, text="\u0ba4\u0bae\u0bbf\u0bb4\u0bcd").shaping == 1
 
 
+def test_paragraph_styles_are_reused_across_documents_with_same_options():
+    first = TextPdfGenerateRequest.parse_or_raise(sample_payload("Plain English PDF text."))
+    second = TextPdfGenerateRequest.parse_or_raise(sample_payload("Another English paragraph."))
+    larger_payload = sample_payload("Plain English PDF text.")
+    larger_payload["options"]["fontSize"] = 14
+    larger = TextPdfGenerateRequest.parse_or_raise(larger_payload)
+
+    style = paragraph_style(first.options, text="Plain English PDF text.")
+
+    assert paragraph_style(second.options, text="Another English paragraph.") is style
+    assert paragraph_style(larger.options, text="Plain English PDF text.").fontSize == 14
+    assert paragraph_style(first.options, text="\u0ba4\u0bae\u0bbf\u0bb4\u0bcd") is not style
+
+
+def test_registered_shaped_font_skips_repeat_shaping_checks(monkeypatch):
+    import lib.fonts.pdf_font_engine as pdf_font_engine
+
+    calls = {"count": 0}
+    original = pdf_font_engine.assert_shaping_stack_available
+
+    def counting_check():
+        calls["count"] += 1
+        original()
+
+    monkeypatch.setattr(pdf_font_engine, "assert_shaping_stack_available", counting_check)
+
+    first = pdf_font_engine.resolve_pdf_font_name("Auto", text="\u0ba4\u0bae\u0bbf\u0bb4\u0bcd")
+    second = pdf_font_engine.resolve_pdf_font_name("Auto", text="\u0ba4\u0bae\u0bbf\u0bb4\u0bcd \u0b89\u0bb0\u0bc8")
+
+    assert first == second == "FlowauxiNotoSansTamilRegularShaped"
+    assert calls["count"] == 1
+
+
 def test_reportlab_converter_does_not_emit_trailing_blank_page():
     payload = sample_payload("Only one real page.")
     payload["document"]["blocks"] = [{"type": "paragraph", "text": "Only one real page.", "align": "left"}]
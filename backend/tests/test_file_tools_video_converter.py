@@ -12,11 +12,11 @@ from domains.file_tools.application.video_conversion_service import VideoConvers
 from domains.file_tools.contracts.common import RequestContext
 from domains.file_tools.contracts.video_converter import VideoConversionOptions, VideoUploadSessionRequest
 from domains.file_tools.converters.video_converter.ffmpeg_service import FfmpegService
-from domains.file_tools.converters.video_converter.ffprobe_service import VideoProbeResult
-from domains.file_tools.converters.video_converter.processing_plan import build_processing_plan
+from domains.file_tools.converters.video_converter.ffprobe_service import VideoProbeResult, parse_keyframe_times
+from domains.file_tools.converters.video_converter.processing_plan import build_processing_plan, plan_segments
 from domains.file_tools.domain.entities import FileToolOwner
 from domains.file_tools.domain.enums import OwnerType
-from domains.file_tools.domain.errors import ConflictError, GoneError, ValidationError
+from domains.file_tools.domain.errors import ConflictError, ConversionError, GoneError, ValidationError
 from domains.file_tools.infrastructure.repositories import FileToolsRepository
 from domains.file_tools.infrastructure.storage.local_dev_storage import LocalDevStorage
 from domains.file_tools.validators.video_converter_validator import VideoConverterValidator
@@ -220,3 +220,102 @@ def test_ffmpeg_progress_reader_does_not_block_on_noisy_stderr(tmp_path):
 
     assert progress
     assert progress[-1]["percent"] == 99.0
+
+
+def test_plan_segments_cuts_on_keyframes_and_folds_short_tail():
+    keyframes = [0.0, 10.0, 20.0, 31.0, 40.0, 52.0, 60.0, 95.0]
+
+    segments = plan_segments(keyframes, 100.0, 30.0)
+
+    assert [(segment.start_seconds, segment.end_seconds) for segment in segments] == [
+        (0.0, 31.0),
+        (31.0, 100.0),
+    ]
+
+
+def test_parse_keyframe_times_keeps_only_keyframes_relative_to_start():
+    output = "1.400000,K_\n1.433333,__\n3.400000,K_\nN/A,K_\n"
+
+    assert parse_keyframe_times(output, start_time=1.4) == [0.0, 2.0]
+
+
+def _fake_segment_ffmpeg(tmp_path: Path, fail_segment: str | None = None) -> Path:
+    script = tmp_path / "fake_ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "args = sys.argv[1:]\n"
+        "out = args[-1]\n"
+        f"if {fail_segment!r} and out.endswith({fail_segment!r}):\n"
+        "    sys.exit(1)\n"
+        "if '-t' in args:\n"
+        "    duration_us = int(float(args[args.index('-t') + 1]) * 1000000)\n"
+        "    time.sleep(0.2)\n"
+        "    sys.stdout.write(f'out_time_ms={duration_us}\\nspeed=2.0x\\nprogress=end\\n')\n"
+        "    sys.stdout.flush()\n"
+        "if '-progress' not in args and '-f' in args and 'concat' in args:\n"
+        "    listed = open(args[args.index('-i') + 1]).read()\n"
+        "    assert listed.count('file ') >= 2\n"
+        "open(out, 'wb').write(b'data')\n",
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    return script
+
+
+def test_segmented_conversion_aggregates_progress_and_concatenates(tmp_path):
+    options = VideoConversionOptions.parse_or_raise({"qualityPreset": "best_quality"})
+    plan = build_processing_plan(options, tmp_path / "in.mov", tmp_path / "out.mp4")
+    segments = plan_segments([0.0, 40.0, 80.0], 120.0, 40.0)
+    progress: list[dict[str, object]] = []
+
+    FfmpegService(binary=str(_fake_segment_ffmpeg(tmp_path))).convert_segmented(
+        plan,
+        segments,
+        include_audio=True,
+        workers=3,
+        on_progress=progress.append,
+        should_cancel=lambda: False,
+    )
+
+    assert (tmp_path / "out.mp4").exists()
+    assert not (tmp_path / "segments").exists()
+    assert progress[-1]["segmentsCompleted"] == 3
+    assert progress[-1]["processedMs"] == 120000
+
+
+def test_segmented_conversion_failure_aborts_sibling_segments(tmp_path):
+    options = VideoConversionOptions.parse_or_raise({})
+    plan = build_processing_plan(options, tmp_path / "in.mov", tmp_path / "out.mp4")
+    segments = plan_segments([0.0, 40.0, 80.0], 120.0, 40.0)
+
+    with pytest.raises(ConversionError) as exc:
+        FfmpegService(binary=str(_fake_segment_ffmpeg(tmp_path, fail_segment="segment-00001.ts"))).convert_segmented(
+            plan,
+            segments,
+            include_audio=False,
+            workers=3,
+            on_progress=lambda progress: None,
+            should_cancel=lambda: False,
+        )
+
+    assert exc.value.code == "VIDEO_CONVERSION_FAILED"
+    assert not (tmp_path / "out.mp4").exists()
+
+
+def test_segmented_conversion_cancellation_stops_all_segments(tmp_path):
+    options = VideoConversionOptions.parse_or_raise({})
+    plan = build_processing_plan(options, tmp_path / "in.mov", tmp_path / "out.mp4")
+    segments = plan_segments([0.0, 40.0, 80.0], 120.0, 40.0)
+
+    with pytest.raises(ConversionError) as exc:
+        FfmpegService(binary=str(_fake_segment_ffmpeg(tmp_path))).convert_segmented(
+            plan,
+            segments,
+            include_audio=False,
+            workers=3,
+            on_progress=lambda progress: None,
+            should_cancel=lambda: True,
+        )
+
+    assert exc.value.code == "VIDEO_CONVERSION_CANCELLED"
@@ -739,6 +739,96 @@ class TestConcurrentReservationIdempotency:
             assert result.success is True
 
 
+
+class TestBatchedStockLookup:
+    """
+    Checkout stock reads are one round-trip regardless of cart size.
+    """
+    
+    def _repo_with_rows(self, rows):
+        from repository.inventory_repository import InventoryRepository
+        
+        mock_db = MagicMock()
+        mock_db.rpc.return_value.execute.return_value = MagicMock(data=rows)
+        return InventoryRepository(mock_db), mock_db
+    
+    def test_batch_lookup_is_single_rpc_and_index_aligned(self):
+        from domain import StockItem
+        
+        repo, mock_db = self._repo_with_rows([
+            {'idx': 1, 'in_products': False, 'found': False, 'showcase_found': True,
+             'showcase_name': 'Showcase Mug', 'showcase_available': 4},
+            {'idx': 0, 'in_products': True, 'found': True, 'name': 'Shirt',
+             'available': 10, 'reserved': 3},
+        ])
+        items = [
+            StockItem(product_id='prod_1', variant_id='var_1', size='M', quantity=2, name='Shirt'),
+            StockItem(product_id='show_1', quantity=1, name='Mug'),
+        ]
+        
+        stocks = repo.get_available_stock_batch('test_user', items)
+        
+        mock_db.rpc.assert_called_once()
+        assert mock_db.rpc.call_args.args[0] == 'get_stock_batch'
+        mock_db.table.assert_not_called()
+        assert (stocks[0].name, stocks[0].available, stocks[0].reserved, stocks[0].is_showcase) == ('Shirt', 10, 3, False)
+        assert (stocks[1].name, stocks[1].available, stocks[1].is_showcase) == ('Showcase Mug', 4, True)
+    
+    def test_batch_lookup_falls_back_to_per_item_when_rpc_missing(self):
+        from domain import StockItem
+        from repository.inventory_repository import InventoryRepository, StockLookupResult
+        
+        mock_db = MagicMock()
+        mock_db.rpc.return_value.execute.side_effect = Exception("function get_stock_batch does not exist")
+        repo = InventoryRepository(mock_db)
+        fallback = StockLookupResult('prod_1', None, None, 'Shirt', 5, 0)
+        
+        with patch.object(repo, '_get_available_stock_single', return_value=fallback) as single:
+            stocks = repo.get_available_stock_batch('test_user', [StockItem(product_id='prod_1', quantity=1, name='Shirt')])
+        
+        single.assert_called_once()
+        assert stocks == [fallback]
+    
+    def test_validate_and_reserve_splits_showcase_items_without_extra_queries(self):
+        from domain import StockItem
+        from repository.inventory_repository import StockLookupResult
+        from services.inventory_service import InventoryService
+        
+        mock_repo = MagicMock()
+        mock_repo.get_available_stock_batch.return_value = [
+            StockLookupResult('prod_1', 'var_1', 'M', 'Shirt', 10, 0),
+            StockLookupResult('show_1', None, None, 'Mug', 0, 0, is_showcase=True),
+        ]
+        service = InventoryService(repository=mock_repo)
+        
+        result = service.validate_and_reserve(
+            user_id='test_user',
+            items=[
+                StockItem(product_id='prod_1', variant_id='var_1', size='M', quantity=1, name='Shirt'),
+                StockItem(product_id='show_1', quantity=2, name='Mug'),
+            ],
+            source='website',
+            session_id='checkout_1',
+        )
+        
+        assert result.success is False
+        assert [i.product_id for i in result.insufficient_items] == ['show_1']
+        mock_repo.get_available_stock_batch.assert_called_once()
+        mock_repo.db.table.assert_not_called()
+        mock_repo.db.rpc.assert_not_called()
+    
+    def test_validate_stock_fails_closed_on_misaligned_lookup(self):
+        from domain import StockItem
+        from services.inventory_service import InventoryService
+        
+        mock_repo = MagicMock()
+        mock_repo.get_available_stock_batch.return_value = []
+        service = InventoryService(repository=mock_repo)
+        
+        result = service.validate_stock('test_user', [StockItem(product_id='prod_1', quantity=1, name='Shirt')])
+        
+        assert result.success is False
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-
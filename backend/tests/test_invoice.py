@@ -332,5 +332,86 @@ class TestWhatsAppMediaService:
         assert result["message_id"] == "msg_123"
 
 
+
+# =============================================================================
+# Asset Cache & Shared Artifact Tests
+# =============================================================================
+
+def _png_bytes() -> bytes:
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestInvoiceAssetCaches:
+    """Logos are fetched once per URL and revalidated by ETag."""
+
+    def setup_method(self):
+        from utils.invoice_generator import clear_asset_caches
+        from utils import invoice_store
+
+        clear_asset_caches()
+        invoice_store.clear_memory_store()
+
+    teardown_method = setup_method
+
+    @patch('utils.invoice_generator.requests.get')
+    def test_logo_fetched_once_across_invoices(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200, content=_png_bytes(), headers={"ETag": '"v1"'})
+        business = {**SAMPLE_BUSINESS, "logoUrl": "https://cdn.example.com/logo.png"}
+
+        for _ in range(3):
+            assert generate_invoice_pdf(SAMPLE_ORDER_COD, business)[:5] == b'%PDF-'
+
+        assert mock_get.call_count == 1
+
+    @patch('utils.invoice_generator.requests.get')
+    def test_stale_logo_revalidates_with_etag(self, mock_get):
+        from utils.invoice_generator import LogoCache
+
+        cache = LogoCache(ttl_seconds=0)
+        mock_get.return_value = MagicMock(status_code=200, content=_png_bytes(), headers={"ETag": '"v1"'})
+        first = cache.get("https://cdn.example.com/logo.png")
+
+        mock_get.return_value = MagicMock(status_code=304, content=b"", headers={})
+        second = cache.get("https://cdn.example.com/logo.png")
+
+        assert second is first
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    @patch('utils.invoice_generator.requests.get')
+    def test_logo_cache_evicts_least_recently_used(self, mock_get):
+        from utils.invoice_generator import LogoCache
+
+        cache = LogoCache(max_entries=2)
+        mock_get.return_value = MagicMock(status_code=200, content=_png_bytes(), headers={})
+        for name in ("a", "b", "c"):
+            cache.get(f"https://cdn.example.com/{name}.png")
+
+        assert list(cache._entries) == ["https://cdn.example.com/b.png", "https://cdn.example.com/c.png"]
+
+    def test_bulk_mode_renders_each_order(self):
+        from utils.invoice_generator import generate_invoice_pdfs
+
+        orders = [{**SAMPLE_ORDER_COD, "order_id": f"ORDER{i}"} for i in range(3)]
+        rendered = generate_invoice_pdfs(orders, SAMPLE_BUSINESS)
+
+        assert sorted(rendered) == ["ORDER0", "ORDER1", "ORDER2"]
+        assert all(pdf[:5] == b'%PDF-' for pdf in rendered.values())
+
+    def test_shared_artifact_rendered_once_per_order(self):
+        from utils import invoice_store
+
+        with patch('utils.invoice_store.generate_invoice_pdf', wraps=generate_invoice_pdf) as render:
+            first = invoice_store.get_or_render_invoice_pdf(dict(SAMPLE_ORDER_COD), dict(SAMPLE_BUSINESS))
+            second = invoice_store.get_or_render_invoice_pdf(dict(SAMPLE_ORDER_COD), dict(SAMPLE_BUSINESS))
+            invoice_store.get_or_render_invoice_pdf(dict(SAMPLE_ORDER_PAID), dict(SAMPLE_BUSINESS))
+
+        assert first is second
+        assert render.call_count == 2
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
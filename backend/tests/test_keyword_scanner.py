@@ -0,0 +1,59 @@
+"""Tests for the single-pass keyword scanner."""
+
+import random
+import re
+
+from ai_brain.keyword_scanner import KeywordScanner, get_message_scanner
+from ai_brain.intents import INTENT_KEYWORDS, IntentDetector, IntentType
+from ai_brain.language_detector import Language, LanguageDetector
+
+
+def test_literal_patterns_match_findall_counts():
+    patterns = [
+        r"\b(ok bye|bye|see you)\b",
+        r"\b(price|rs|₹)\b",
+        r"^(hi|hello)$",
+        r"^(and|also)\b",
+        r"\b\d+\s*(x|pieces?)\b",  # Not a literal: stays a regex
+    ]
+    scanner = KeywordScanner()
+    for i, pattern in enumerate(patterns):
+        scanner.add_patterns(f"p{i}", [pattern])
+    compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+
+    rng = random.Random(3)
+    vocab = ["ok", "bye", "see", "you", "price", "rs", "₹", "hi", "hello", "and", "also", "2x", "3 pieces", "_", "x₹y"]
+    messages = ["hi", "Hello", "ok bye bye", "price₹ rs500 ₹ rs", "and also", "andy"]
+    messages += [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 6))) for _ in range(300)]
+
+    for message in messages:
+        scan = scanner.scan(message)
+        text = message.strip()
+        for i, pattern in enumerate(compiled):
+            assert scan.count(f"p{i}") == len(pattern.findall(text)), (patterns[i], message)
+
+
+def test_substring_groups_and_memoized_scans():
+    scanner = KeywordScanner()
+    scanner.add_substrings("own", ["my", "en"])
+    scanner.add_substrings("cancel", ["cancel order"])
+
+    scan = scanner.scan("When will it come")
+
+    assert scan.any("own") and scan.patterns_hit("own") == 1  # "en" inside "when"
+    assert not scan.any("cancel")
+    assert scanner.scan("  when will it come ") is scan
+
+
+def test_shared_scanner_serves_language_intent_and_routing():
+    scan = get_message_scanner().scan("mera order kab aayega")
+
+    assert scan.patterns_hit("lang:hinglish") >= 1
+    assert scan.count(f"intent:{IntentType.ORDER_STATUS.value}") >= 1
+    assert scan.any("route:ownership") and scan.any("route:tracking")
+    assert set(f"intent:{i.value}" for i in INTENT_KEYWORDS) <= set(get_message_scanner()._groups)
+
+
+def test_detectors_keep_their_results():
+    assert LanguageDetector().detect("vanakkam enna vilai").language == Language.TAMIL
+    assert IntentDetector().detect("rate batao")[0] == IntentType.PRICING
@@ -0,0 +1,110 @@
+"""Tests for the adaptive multi-key Gemini scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from ai_brain.llm_scheduler import LLMScheduler, SchedulerTimeout, plan_weights
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limited_key_is_blocked_and_slowed():
+    clock = FakeClock()
+    scheduler = LLMScheduler(num_keys=2, rate_per_key=4.0, burst=1, max_wait=0, clock=clock)
+
+    first = scheduler.acquire("biz-1")
+    scheduler.release(first, ok=False, retry_after=30)
+    clock.now += 1
+
+    leases = []
+    for _ in range(3):
+        clock.now += 0.5
+        leases.append(scheduler.acquire("biz-1"))
+
+    assert {lease.key_index for lease in leases} == {1 - first.key_index}
+    stats = scheduler.get_stats()["keys"][first.key_index]
+    assert stats["rate_per_s"] == 2.0 and stats["rate_limited"] == 1
+    assert stats["blocked_for_s"] == pytest.approx(27.5, abs=0.1)
+
+
+def test_queue_wait_is_bounded():
+    scheduler = LLMScheduler(num_keys=1, rate_per_key=0.1, burst=1, max_wait=0.05)
+    scheduler.acquire("biz-1")
+
+    start = time.monotonic()
+    with pytest.raises(SchedulerTimeout) as exc:
+        scheduler.acquire("biz-1")
+
+    assert time.monotonic() - start < 0.5
+    assert exc.value.retry_after > 5
+    assert scheduler.get_stats()["timeouts"] == 1
+
+
+def test_waiters_are_served_by_plan_weight():
+    assert plan_weights()["pro"] > plan_weights()["starter"] > plan_weights()["free"]
+
+    scheduler = LLMScheduler(num_keys=1, rate_per_key=20.0, burst=1, max_wait=5)
+    scheduler.acquire("warmup")  # Drain the burst so everyone queues
+    order = []
+
+    def worker(tenant, plan):
+        scheduler.acquire(tenant, plan)
+        order.append(plan)
+
+    threads = []
+    for _ in range(3):
+        for tenant, plan in (("free-biz", "free"), ("pro-biz", "pro")):
+            t = threading.Thread(target=worker, args=(tenant, plan))
+            t.start()
+            threads.append(t)
+    for t in threads:
+        t.join()
+
+    assert order[:3].count("pro") >= 2
+    assert scheduler.get_stats()["peak_queue"] >= 4
+
+
+def test_hedge_uses_another_key_within_budget():
+    scheduler = LLMScheduler(num_keys=2, rate_per_key=100.0, burst=5, hedge_min_delay=0.2, hedge_max_ratio=0.5)
+    assert scheduler.hedge_delay() is None  # Not enough latency samples yet
+
+    for _ in range(20):
+        scheduler.release(scheduler.acquire("biz-1"), ok=True, latency=1.0)
+    primary = scheduler.acquire("biz-1")
+
+    hedge = scheduler.try_acquire_hedge([primary.key_index], "biz-1")
+
+    assert scheduler.hedge_delay() == 1.0
+    assert hedge.hedge and hedge.key_index != primary.key_index
+    scheduler.record_hedge_win()
+    stats = scheduler.get_stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["queue_wait_ms"]["max"] < 50
+
+
+def test_hedged_calls_share_a_bounded_pool(monkeypatch):
+    from ai_brain import gemini_client
+
+    monkeypatch.setattr(gemini_client, "_hedge_slots", threading.BoundedSemaphore(1))
+    gate = threading.Event()
+
+    first = gemini_client._submit_hedged(gate.wait, 5)
+    # Saturated: the caller runs unhedged instead of queueing
+    assert gemini_client._submit_hedged(lambda: None) is None
+
+    gate.set()
+    first.result(timeout=5)
+    # The thread is handed back by the future's done callback
+    assert gemini_client._hedge_slots.acquire(timeout=5)
+    gemini_client._hedge_slots.release()
+    second = gemini_client._submit_hedged(lambda: "ok")
+    assert second is not None and second.result(timeout=5) == "ok"
+    assert gemini_client._hedge_pool is not None
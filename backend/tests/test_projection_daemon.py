@@ -0,0 +1,131 @@
+"""Tests for the set-based, sharded subscription projection daemon."""
+
+from services import projection_daemon
+from services.projection_daemon import checkpoint_name, process_batch, project_events
+
+
+def _event(event_id, sub_id, event_type, **payload):
+    return {
+        "id": event_id,
+        "subscription_id": sub_id,
+        "event_type": event_type,
+        "payload": payload,
+        "created_at": "2026-10-18T10:00:00+00:00",
+    }
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.after, self.names, self.count = db, table, 0, None, None
+
+    def select(self, *_args):
+        return self
+
+    def in_(self, _column, values):
+        self.names = set(values)
+        return self
+
+    def gt(self, _column, value):
+        self.after = value
+        return self
+
+    def order(self, *_args):
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        if self.table == "projection_checkpoints":
+            return Result([
+                {"projector_name": n, "last_processed_event_id": v}
+                for n, v in self.db.checkpoints.items() if n in self.names
+            ])
+        return Result([e for e in self.db.events if e["id"] > self.after][: self.count])
+
+
+class FakeDb:
+    """Python model of the migration 107 RPCs."""
+
+    def __init__(self, events, checkpoints=None):
+        self.events = events
+        self.checkpoints = dict(checkpoints or {})
+        self.subscriptions = {}
+        self.rpcs = []
+        self.fence = False
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        self.rpcs.append(name)
+        if name == "fetch_subscription_events_shard":
+            rows = [
+                e for e in self.events
+                if e["id"] > params["p_after_id"]
+                and int(e["subscription_id"][-1]) % params["p_shard_count"] == params["p_shard"]
+            ]
+            return Result(rows[: params["p_limit"]])
+        current = self.checkpoints.setdefault(params["p_projector"], params["p_expected_event_id"])
+        if self.fence or current != params["p_expected_event_id"]:
+            return Result({"applied": False, "checkpoint": current})
+        for state in params["p_states"]:
+            self.subscriptions[state["subscription_id"]] = state["status"]
+        self.checkpoints[params["p_projector"]] = params["p_last_event_id"]
+        return Result({
+            "applied": True, "projected": len(params["p_states"]),
+            "checkpoint": params["p_last_event_id"], "lag_seconds": 0,
+        })
+
+
+def test_batch_folds_to_the_latest_state_per_subscription():
+    states = project_events([
+        _event(1, "sub-1", "subscription.created"),
+        _event(2, "sub-2", "subscription.activated", current_period_end="2026-11-18"),
+        _event(3, "sub-1", "subscription.activated"),
+        _event(4, "sub-2", "subscription.reconciled", status="past_due"),
+        _event(5, "sub-3", "subscription.reconciled"),
+    ])
+
+    assert states == [
+        {"subscription_id": "sub-1", "event_id": 3, "status": "active",
+         "current_period_start": None, "current_period_end": None},
+        {"subscription_id": "sub-2", "event_id": 4, "status": "past_due",
+         "current_period_start": None, "current_period_end": None},
+    ]
+
+
+def test_shards_start_from_the_shared_checkpoint_and_drain_in_one_rpc_per_batch(monkeypatch):
+    monkeypatch.setattr(projection_daemon, "_invalidate_caches", lambda sub_ids: list(sub_ids))
+    events = [_event(i, f"sub-{i % 4}", "subscription.activated") for i in range(1, 13)]
+    db = FakeDb(events, {checkpoint_name(): 4})
+
+    first = process_batch(db, shard=1, shards=2, batch_size=2)
+    second = process_batch(db, shard=1, shards=2, batch_size=2)
+    third = process_batch(db, shard=1, shards=2, batch_size=2)
+
+    assert checkpoint_name(1, 2) == "subscription_status:1/2"
+    assert first["processed"] == 2 and first["has_more"] and first["checkpoint"] == 7
+    assert second["checkpoint"] == 11 and third["processed"] == 0
+    assert db.subscriptions == {"sub-1": "active", "sub-3": "active"}
+    assert db.checkpoints == {"subscription_status": 4, "subscription_status:1/2": 11}
+    assert db.rpcs.count("apply_subscription_projection") == 2
+
+
+def test_a_fenced_batch_is_not_counted_and_is_retried():
+    db = FakeDb([_event(1, "sub-1", "subscription.cancelled")])
+    db.fence = True
+
+    result = process_batch(db)
+
+    assert result == {"processed": 0, "projected": 0, "fenced": True, "has_more": True}
+    assert db.subscriptions == {}
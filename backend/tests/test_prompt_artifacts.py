@@ -0,0 +1,161 @@
+"""Tests for precompiled prompt prefixes and Gemini context caching."""
+
+import copy
+from types import SimpleNamespace
+
+from ai_brain.gemini_client import GeminiClient
+from ai_brain.prompt_artifacts import ContextCacheRegistry, PromptArtifactCache, SplitPrompt
+from ai_brain.prompts import build_single_pass_prompt, format_business_data_for_prompt
+
+BUSINESS = {
+    "business_id": "biz-1",
+    "business_name": "Style Studio",
+    "industry": "salon",
+    "products_services": [
+        {"name": "Haircut", "price": 300, "category": "Hair", "description": "Classic | cut\nwith wash"},
+        {"name": "Hair Spa", "price": None, "category": "Hair"},
+        {"name": "Facial", "price": 800, "category": "Skin", "stock_status": "available"},
+    ],
+}
+
+
+def test_prefix_is_reused_until_business_data_changes():
+    artifacts = PromptArtifactCache()
+    builds = []
+
+    def build(data):
+        builds.append(1)
+        return f"prefix for {len(data['products_services'])} products"
+
+    first = artifacts.get(BUSINESS, "single_pass", build)
+    assert artifacts.get(dict(BUSINESS, _cached_at=123), "single_pass", build) == first
+
+    edited = copy.deepcopy(BUSINESS)
+    edited["products_services"][0]["price"] = 350
+    prefix, cache_key = artifacts.get(edited, "single_pass", build)
+
+    assert len(builds) == 2 and cache_key != first[1]
+    assert cache_key.startswith("biz-1:single_pass:")
+    assert artifacts.get_stats()["rebuilds"] == 1 and artifacts.get_stats()["entries"] == 1
+
+
+def test_single_pass_prompt_puts_business_data_in_the_static_prefix():
+    prompt = build_single_pass_prompt(
+        BUSINESS, "price?", user_profile={"name": "Priya"},
+        conversation_history=[{"role": "user", "content": "hi"}],
+    )
+    other_customer = build_single_pass_prompt(BUSINESS, "hours?", user_profile={"name": "Ravi"})
+
+    assert isinstance(prompt, SplitPrompt) and prompt == f"{prompt.prefix}\n\n{prompt.suffix}"
+    assert prompt.prefix == other_customer.prefix and prompt.cache_key == other_customer.cache_key
+    assert "BUSINESS DATA:" in prompt.prefix and '"intent": "<intent_name>"' in prompt.prefix
+    assert "Priya" in prompt.suffix and "BUSINESS DATA" not in prompt.suffix
+
+
+def test_products_are_encoded_as_a_compact_table():
+    block = format_business_data_for_prompt(BUSINESS)
+    table = block.split("no others exist):\n", 1)[1].splitlines()
+
+    assert table == [
+        "name | price | stock | note",
+        "[Hair]",
+        "Haircut | ₹300 |  | Classic / cut with wash",
+        "Hair Spa | on request",
+        "[Skin]",
+        "Facial | ₹800 | available",
+    ]
+
+
+def test_context_cache_is_created_once_per_key_and_failures_back_off():
+    registry = ContextCacheRegistry(min_tokens=10, min_uses=1)
+    prompt = SplitPrompt("static " * 50, "dynamic", "biz-1:single_pass:v1")
+    created = []
+
+    def create():
+        created.append(1)
+        return f"cachedContents/{len(created)}"
+
+    assert registry.get_or_create(0, "m", prompt, create) == "cachedContents/1"
+    assert registry.get_or_create(0, "m", prompt, create) == "cachedContents/1"
+    assert registry.get_or_create(1, "m", prompt, create) == "cachedContents/2"
+    assert registry.get_or_create(0, "m", SplitPrompt("tiny", "", "k"), create) is None
+
+    def fail():
+        created.append(1)
+        raise RuntimeError("model does not support caching")
+
+    other = SplitPrompt("static " * 50, "", "biz-2:single_pass:v1")
+    assert registry.get_or_create(0, "m", other, fail) is None
+    assert registry.get_or_create(0, "m", other, fail) is None
+    stats = registry.get_stats()
+    assert len(created) == 3 and stats["failures"] == 1 and stats["skipped_small"] == 1
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_context_cache_waits_for_reuse_and_is_shared_across_processes():
+    redis = FakeRedis()
+    worker_a = ContextCacheRegistry(min_tokens=10, redis_client=redis)
+    worker_b = ContextCacheRegistry(min_tokens=10, redis_client=redis)
+    prompt = SplitPrompt("static " * 50, "dynamic", "biz-1:single_pass:v1")
+    created = []
+
+    def create():
+        created.append(1)
+        return f"cachedContents/{len(created)}"
+
+    # First sight of the prefix goes inline; the second use (any worker) caches it
+    assert worker_a.get_or_create(0, "m", prompt, create) is None
+    assert worker_b.get_or_create(0, "m", prompt, create) == "cachedContents/1"
+    assert worker_a.get_or_create(0, "m", prompt, create) == "cachedContents/1"
+    assert len(created) == 1 and worker_a.get_stats()["shared_hits"] == 1
+
+    worker_a.invalidate("cachedContents/1")
+    assert worker_b.get_or_create(0, "m", prompt, create) == "cachedContents/1"  # Its own copy
+    assert worker_a.get_or_create(0, "m", prompt, create) == "cachedContents/2"
+
+
+def test_client_sends_only_the_suffix_when_the_prefix_is_cached(monkeypatch):
+    registry = ContextCacheRegistry(min_tokens=10, min_uses=1)
+    monkeypatch.setattr("ai_brain.gemini_client.get_context_caches", lambda: registry)
+    sent = {}
+
+    class FakeApi:
+        caches = SimpleNamespace(create=lambda model, config: SimpleNamespace(name="cachedContents/abc"))
+
+        class models:
+            @staticmethod
+            def generate_content(model, contents, config):
+                sent.update(contents=contents, config=config)
+                return SimpleNamespace(text="ok", candidates=[], usage_metadata=None)
+
+    client = GeminiClient(api_key="test-key")
+    client._clients = {i: FakeApi() for i in range(len(client._api_keys))}
+    prompt = build_single_pass_prompt(BUSINESS, "price?", user_profile={"name": "Priya"})
+
+    client.generate("gemini-2.5-flash", prompt, [{"role": "user", "content": "price?"}], json_mode=True)
+
+    assert sent["config"].cached_content == "cachedContents/abc"
+    assert sent["config"].system_instruction is None
+    assert sent["config"].response_mime_type == "application/json"
+    assert [c.parts[0].text for c in sent["contents"]] == [prompt.suffix, "price?"]
@@ -0,0 +1,211 @@
+"""Tests for paged, concurrent Razorpay reconciliation against a local stub."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.reconciliation_engine import (
+    RazorpayFetcher,
+    TokenBucket,
+    _MemoryCheckpoints,
+    reconcile_domain_subscriptions,
+)
+
+OLD = "2026-01-01T00:00:00+00:00"
+
+
+@pytest.fixture
+def razorpay_stub():
+    """Razorpay stub: GET /v1/subscriptions/<id> -> {"id", "status"}."""
+    statuses, hits = {}, []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            rzp_id = self.path.rsplit("/", 1)[-1]
+            hits.append(rzp_id)
+            if rzp_id not in statuses:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = json.dumps({"id": rzp_id, "status": statuses[rzp_id]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", statuses, hits
+    server.shutdown()
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters, self.count = db, table, [], None
+
+    @property
+    def not_(self):
+        return self
+
+    def select(self, *_args):
+        return self
+
+    def is_(self, column, _value):
+        self.filters.append(lambda r: r.get(column) is not None)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda r: r.get(column) != value)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def order(self, *_args):
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def insert(self, rows):
+        self.db.inserts.append(rows)
+        self.db.add_events(rows)
+        return Result(rows)
+
+    def execute(self):
+        self.db.reads.append(self.table)
+        rows = self.db.subscriptions if self.table == "subscriptions" else self.db.events
+        rows = sorted((r for r in rows if all(f(r) for f in self.filters)), key=lambda r: r["id"])
+        # PostgREST caps every response at max-rows, whatever the limit
+        return Result(rows[: min(self.count or self.db.max_rows, self.db.max_rows)])
+
+
+class FakeDb:
+    def __init__(self, subscriptions, events=(), max_rows=1000):
+        self.subscriptions = subscriptions
+        self.events = []
+        self.max_rows = max_rows
+        self.inserts, self.reads = [], []
+        self.add_events(events)
+
+    def add_events(self, rows):
+        for row in rows:
+            self.events.append({"id": len(self.events) + 1, **row})
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def _sub(n, status="active", domain="shop"):
+    return {
+        "id": f"sub-{n}", "user_id": f"user-{n}", "status": status, "product_domain": domain,
+        "razorpay_subscription_id": f"rzp_{n}", "created_at": OLD,
+    }
+
+
+def _fetcher(base_url):
+    return RazorpayFetcher(base_url, auth=("key", "secret"), rate_per_second=1000, burst=100, max_workers=4)
+
+
+def test_domain_run_pages_fetches_concurrently_and_heals_in_bulk(razorpay_stub):
+    base_url, statuses, hits = razorpay_stub
+    statuses.update({f"rzp_{n}": "active" for n in range(1, 6)})
+    statuses["rzp_2"] = "cancelled"
+    statuses["rzp_4"] = "halted"
+    del statuses["rzp_5"]
+    subs = [_sub(n) for n in range(1, 6)] + [_sub(9, domain="other")]
+    db = FakeDb(subs, [{"subscription_id": "sub-4", "event_type": "subscription.activated"}])
+    checkpoints = _MemoryCheckpoints()
+    fetcher = _fetcher(base_url)
+
+    summary = reconcile_domain_subscriptions(
+        "shop", db=db, fetcher=fetcher, checkpoints=checkpoints, page_size=2,
+    )
+
+    assert sorted(hits) == ["rzp_1", "rzp_2", "rzp_3", "rzp_4", "rzp_5"]
+    assert {k: summary[k] for k in ("total", "drifted", "healed", "errors", "pages")} == {
+        "total": 5, "drifted": 2, "healed": 2, "errors": 1, "pages": 3,
+    }
+    # One bulk insert per page with drift, never one insert per event
+    assert [[(r["subscription_id"], r["event_type"]) for r in rows] for rows in db.inserts] == [
+        [("sub-2", "subscription.cancelled")],
+        [("sub-4", "subscription.halted")],
+    ]
+    assert {r["subscription_id"]: r["reason"] for r in summary["results"]} == {
+        "sub-2": "auto_healed", "sub-4": "auto_healed", "sub-5": "razorpay_api_error",
+    }
+    assert checkpoints.load("domain:shop") is None
+    assert fetcher.get_stats()["not_found"] == 1
+
+
+def test_interrupted_run_resumes_after_the_last_finished_page(razorpay_stub):
+    base_url, statuses, hits = razorpay_stub
+    statuses.update({f"rzp_{n}": "active" for n in range(1, 6)})
+    db = FakeDb([_sub(n) for n in range(1, 6)])
+    checkpoints = _MemoryCheckpoints()
+    checkpoints.save("domain:shop", {"cursor": "sub-3"})
+
+    summary = reconcile_domain_subscriptions(
+        "shop", db=db, fetcher=_fetcher(base_url), checkpoints=checkpoints, page_size=2,
+    )
+
+    assert sorted(hits) == ["rzp_4", "rzp_5"]
+    assert summary["resumed_from"] == "sub-3" and summary["total"] == 2
+    assert summary["drifted"] == 0 and "subscription_events" not in db.reads
+
+    checkpoints.acquire("domain:shop")
+    assert reconcile_domain_subscriptions("shop", db=db, checkpoints=checkpoints)["reason"] == "locked"
+
+
+def test_long_event_histories_are_read_past_the_response_cap(razorpay_stub):
+    base_url, statuses, _ = razorpay_stub
+    statuses["rzp_1"] = "active"
+    history = [{"subscription_id": "sub-1", "event_type": "subscription.past_due"}] * 5
+    history.append({"subscription_id": "sub-1", "event_type": "subscription.activated"})
+    db = FakeDb([_sub(1, status="past_due")], history, max_rows=3)
+
+    summary = reconcile_domain_subscriptions(
+        "shop", db=db, fetcher=_fetcher(base_url), checkpoints=_MemoryCheckpoints(),
+    )
+
+    # The activation (event 6) is past the first response: no duplicate
+    assert summary["healed"] == 1
+    assert [(r["event_type"], r["new_status"]) for r in db.inserts[0]] == [
+        ("subscription.reconciled", "active"),
+    ]
+    assert db.reads.count("subscription_events") == 3
+
+
+def test_token_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate_per_second=50, burst=2)
+    start = time.monotonic()
+
+    waits = [bucket.acquire() for _ in range(6)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert time.monotonic() - start >= 0.07
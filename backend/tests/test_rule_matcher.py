@@ -0,0 +1,127 @@
+"""Tests for the compiled automation rule matcher and RuleEngine."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.messaging.automation import rule_engine as rule_engine_module
+from services.messaging.automation.rule_engine import RuleEngine, TriggerCountBuffer
+from services.messaging.automation.rule_matcher import AhoCorasick, compile_rules
+from services.messaging.base import Channel, MessageType, NormalizedMessage
+
+
+def _rule(rule_id, trigger_type, config=None, channels=None, **extra):
+    rule = {
+        'id': rule_id,
+        'name': rule_id,
+        'trigger_type': trigger_type,
+        'trigger_config': config or {},
+        'action_type': 'reply_text',
+        'action_config': {'message': rule_id},
+        'channels': channels or ['instagram', 'whatsapp'],
+    }
+    rule.update(extra)
+    return rule
+
+
+RULES = [
+    _rule('exact-hi', 'keyword', {'keywords': [' Hi '], 'match_type': 'exact'}),
+    _rule('price', 'keyword', {'keywords': ['cost', 'price'], 'match_type': 'contains'}),
+    _rule('order', 'regex', {'pattern': r'order\s*#?\d+'}),
+    _rule('menu', 'keyword', {'keywords': ['menu'], 'match_type': 'starts_with'}, channels=['instagram']),
+    _rule('story', 'story_mention'),
+    _rule('start', 'postback', {'payloads': ['GET_STARTED']}),
+    _rule('fallback', 'all'),
+]
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.setattr(rule_engine_module, '_get_redis', lambda: None)
+    monkeypatch.setattr(RuleEngine, '_cache', {})
+
+
+def _engine(rules):
+    db = MagicMock()
+    db.table.return_value.select.return_value.eq.return_value.eq.return_value \
+        .order.return_value.execute.return_value.data = rules
+    counter = TriggerCountBuffer(lambda batch: None, flush_interval=60)
+    counter._ensure_flusher = lambda: None
+    return RuleEngine(db, trigger_counter=counter), db, counter
+
+
+def _msg(text=None, channel=Channel.WHATSAPP, message_type=MessageType.TEXT, postback=None):
+    return NormalizedMessage(
+        channel=channel, text=text, message_type=message_type, postback_payload=postback,
+    )
+
+
+class TestAhoCorasick:
+    def test_finds_overlapping_patterns(self):
+        ac = AhoCorasick()
+        for word in ('he', 'she', 'his', 'hers'):
+            ac.add(word, word)
+
+        found = sorted((end, word) for end, word in ac.iter_matches('ushers'))
+
+        assert found == [(3, 'he'), (3, 'she'), (5, 'hers')]
+
+
+class TestCompiledRules:
+    def test_match_types_and_priority(self):
+        engine, _, _ = _engine(RULES)
+
+        assert engine.evaluate(_msg('hi'), 't').rule_id == 'exact-hi'
+        assert engine.evaluate(_msg('hi there'), 't').rule_id == 'fallback'
+        match = engine.evaluate(_msg('What is the PRICE and cost?'), 't')
+        assert (match.rule_id, match.matched_keyword) == ('price', 'cost')
+        assert engine.evaluate(_msg('Order #42 status'), 't').matched_keyword == 'Order #42'
+
+    def test_channel_and_message_type_buckets(self):
+        engine, _, _ = _engine(RULES)
+
+        assert engine.evaluate(_msg('menu please'), 't').rule_id == 'fallback'
+        assert engine.evaluate(_msg('menu please', channel=Channel.INSTAGRAM), 't').rule_id == 'menu'
+        assert engine.evaluate(_msg(message_type=MessageType.STORY_MENTION), 't').rule_id == 'story'
+        assert engine.evaluate(_msg(postback='GET_STARTED'), 't').rule_id == 'start'
+
+    def test_candidates_skip_unmatched_keyword_rules(self):
+        rules = [_rule(f'kw{i}', 'keyword', {'keywords': [f'word{i}x']}) for i in range(500)]
+        compiled = compile_rules(rules)
+
+        assert compiled.candidates('say word42x now', 'whatsapp', 'text') == [(42, 'word42x')]
+
+    def test_invalid_regex_is_skipped_at_compile_time(self):
+        compiled = compile_rules([_rule('bad', 'regex', {'pattern': '(unclosed'})])
+
+        assert compiled.candidates('anything', 'whatsapp', 'text') == []
+
+
+class TestRuleCachingAndCounts:
+    def test_rules_are_loaded_and_compiled_once(self, monkeypatch):
+        engine, db, _ = _engine(RULES)
+        compiles = []
+        original = rule_engine_module.compile_rules
+        monkeypatch.setattr(rule_engine_module, 'compile_rules', lambda r: compiles.append(1) or original(r))
+
+        for _ in range(5):
+            engine.evaluate(_msg('price?'), 't')
+        # TTL expiry reloads the rows but reuses the compiled set when unchanged
+        monkeypatch.setattr(RuleEngine, 'CACHE_TTL', -1)
+        engine.evaluate(_msg('price?'), 't')
+
+        assert compiles == [1]
+        assert db.table.call_count == 2
+
+    def test_trigger_counts_are_batched(self):
+        engine, db, counter = _engine(RULES)
+        applied = []
+        counter._apply = applied.append
+
+        for _ in range(3):
+            engine.evaluate(_msg('price?'), 't')
+        engine.evaluate(_msg('hi'), 't')
+
+        db.rpc.assert_not_called()
+        assert counter.flush() == 2
+        assert {i['rule_id']: i['count'] for i in applied[0]} == {'price': 3, 'exact-hi': 1}
@@ -0,0 +1,204 @@
+"""Tests for the Google Sheets sync engine (row index + batched writes)."""
+
+import pytest
+
+from services import sheets_sync_engine as sse
+
+
+class FakeWorksheet:
+    def __init__(self, rows):
+        self.rows = [list(r) for r in rows]
+        self.calls = []
+
+    def col_values(self, col):
+        self.calls.append("col_values")
+        return [r[col - 1] if len(r) >= col else "" for r in self.rows]
+
+    def batch_get(self, ranges):
+        self.calls.append("batch_get")
+        out = []
+        for rng in ranges:
+            if rng.endswith(":A"):
+                start = int(rng[1:-2])
+                out.append([[r[0]] for r in self.rows[start - 1:]])
+            else:
+                n = int(rng[1:])
+                out.append([[self.rows[n - 1][0]]] if n <= len(self.rows) else [])
+        return out
+
+    def batch_update(self, updates):
+        self.calls.append("batch_update")
+        for u in updates:
+            n = int(u["range"].split(":")[0][1:])
+            self.rows[n - 1] = list(u["values"][0])
+
+    def append_rows(self, values):
+        self.calls.append("append_rows")
+        start = len(self.rows) + 1
+        self.rows.extend(list(v) for v in values)
+        return {"updates": {"updatedRange": f"Orders!A{start}:K{len(self.rows)}"}}
+
+
+class FakeClient:
+    def __init__(self, worksheet):
+        self.worksheet_obj = worksheet
+
+    def open_by_key(self, key):
+        return self
+
+    def worksheet(self, name):
+        return self.worksheet_obj
+
+
+@pytest.fixture
+def sheet():
+    return FakeWorksheet([sse.ORDER_SHEET_HEADERS, ["AAA", "old"], ["BBB", "old"]])
+
+
+@pytest.fixture
+def engine(sheet):
+    return sse.SheetsSyncEngine(client_factory=lambda creds: FakeClient(sheet))
+
+
+def test_updates_and_appends_are_batched(engine, sheet):
+    located = engine.write_rows({}, "sid", "Orders", {"BBB": ["BBB", "new"], "CCC": ["CCC", "new"]})
+
+    assert located == {"BBB": 3, "CCC": 4}
+    assert sheet.rows[2] == ["BBB", "new"] and sheet.rows[3] == ["CCC", "new"]
+    assert sheet.calls == ["col_values", "batch_get", "batch_update", "append_rows"]
+
+
+def test_index_is_reused_and_refreshed_incrementally(engine, sheet):
+    engine.write_rows({}, "sid", "Orders", {"AAA": ["AAA", "v1"]})
+    sheet.rows.append(["DDD", "added by hand"])
+    sheet.calls.clear()
+
+    located = engine.write_rows({}, "sid", "Orders", {"DDD": ["DDD", "v2"], "CCC": ["CCC", "v1"]})
+
+    # No full column download: the new row was picked up by the tail read
+    assert "col_values" not in sheet.calls
+    assert located == {"DDD": 4, "CCC": 5}
+    assert [r[0] for r in sheet.rows[1:]] == ["AAA", "BBB", "DDD", "CCC"]
+
+
+def test_stale_index_triggers_rebuild(engine, sheet):
+    engine.write_rows({}, "sid", "Orders", {"AAA": ["AAA", "v1"]})
+    # Someone sorted the sheet
+    sheet.rows[1], sheet.rows[2] = sheet.rows[2], sheet.rows[1]
+
+    located = engine.write_rows({}, "sid", "Orders", {"AAA": ["AAA", "v2"]})
+
+    assert located == {"AAA": 3}
+    assert sheet.rows[2] == ["AAA", "v2"] and sheet.rows[1][0] == "BBB"
+
+
+def test_quota_errors_are_retryable(engine, sheet):
+    import gspread
+
+    class Response:
+        status_code = 429
+        headers = {"Retry-After": "30"}
+        text = ""
+
+        def json(self):
+            return {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+
+    def fail(updates):
+        raise gspread.exceptions.APIError(Response())
+
+    sheet.batch_update = fail
+
+    with pytest.raises(sse.SheetsRetryableError) as exc:
+        engine.write_rows({}, "sid", "Orders", {"AAA": ["AAA", "x"]})
+    assert exc.value.retry_after == 30
+    assert sse.backoff_seconds(0, exc.value.retry_after) >= 30
+    assert sse.backoff_seconds(20) <= sse.SHEETS_BACKOFF_MAX_SECONDS * 1.25
+
+
+def test_client_cache_is_per_service_account(monkeypatch):
+    import gspread
+
+    sse.clear_client_cache()
+    monkeypatch.setattr("google.oauth2.service_account.Credentials.from_service_account_info",
+                        lambda info, scopes: info["client_email"])
+    monkeypatch.setattr(gspread, "authorize", lambda creds: object())
+
+    a = sse.get_sheets_client({"client_email": "a@x", "private_key_id": "1"})
+    assert sse.get_sheets_client({"client_email": "a@x", "private_key_id": "1"}) is a
+    assert sse.get_sheets_client({"client_email": "b@x", "private_key_id": "1"}) is not a
+    sse.clear_client_cache()
+
+
+def test_transport_errors_are_retryable(engine, sheet):
+    import requests
+
+    def fail(updates):
+        raise requests.exceptions.ConnectionError("connection reset")
+
+    sheet.batch_update = fail
+
+    with pytest.raises(sse.SheetsRetryableError):
+        engine.write_rows({}, "sid", "Orders", {"AAA": ["AAA", "x"]})
+
+
+@pytest.fixture
+def flush(monkeypatch):
+    """flush_sheets_writes with Redis, Celery and Supabase replaced by fakes."""
+    from services import redis_lock
+    from tasks import orders
+
+    state = {"pending": [], "requeued": [], "scheduled": [], "configs": {}, "writes": []}
+
+    class Engine:
+        def write_rows(self, credentials, spreadsheet_id, sheet_name, rows):
+            if state.get("write_error"):
+                raise state["write_error"]
+            state["writes"].append(rows)
+            return {order_id: n for n, order_id in enumerate(rows, start=2)}
+
+    monkeypatch.setattr(redis_lock, "acquire_lock", lambda key, ttl: "token")
+    monkeypatch.setattr(redis_lock, "release_lock", lambda key, token: True)
+    monkeypatch.setattr(sse, "drain_pending", lambda sid: state["pending"])
+    monkeypatch.setattr(sse, "requeue", lambda sid, entries: state["requeued"].extend(entries) or True)
+    monkeypatch.setattr(sse, "get_sheets_sync_engine", Engine)
+    monkeypatch.setattr(orders, "_get_sheets_config", lambda user_id: state["configs"].get(user_id))
+    monkeypatch.setattr(
+        orders.flush_sheets_writes, "apply_async",
+        lambda args, kwargs=None, countdown=None: state["scheduled"].append(kwargs),
+    )
+    return orders.flush_sheets_writes, state
+
+
+def _entry(user_id, order_id):
+    return {"user_id": user_id, "sheet_name": "Orders", "order_id": order_id, "row": [order_id]}
+
+
+def test_flush_keeps_rows_when_the_config_lookup_fails(flush):
+    run, state = flush
+    state["pending"] = [_entry("u1", "A"), _entry("u2", "B"), _entry("u3", "C")]
+    state["configs"] = {
+        "u1": {"enabled": True, "spreadsheet_id": "sid", "credentials": {}},
+        "u3": {"enabled": False, "reason": "sync_disabled"},
+    }
+
+    result = run(spreadsheet_id="sid")
+
+    # u2's lookup failed (None): requeued, not dropped; u3 is really off
+    assert result["written"] == 1 and result["requeued"] == 1
+    assert [e["order_id"] for e in state["requeued"]] == ["B"]
+    assert state["scheduled"] == [{"attempt": 1}]
+
+
+def test_flush_requeues_transport_errors_until_the_attempt_cap(flush):
+    import requests
+
+    run, state = flush
+    state["pending"] = [_entry("u1", "A")]
+    state["configs"] = {"u1": {"enabled": True, "spreadsheet_id": "sid", "credentials": {}}}
+    state["write_error"] = sse._as_retryable(requests.exceptions.Timeout("read timed out"))
+
+    assert run(spreadsheet_id="sid", attempt=0)["requeued"] == 1
+
+    result = run(spreadsheet_id="sid", attempt=sse.SHEETS_MAX_FLUSH_ATTEMPTS - 1)
+    assert result["requeued"] == 0 and result["dropped"] == 1
+    assert len(state["requeued"]) == 1 and len(state["scheduled"]) == 1
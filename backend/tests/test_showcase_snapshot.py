@@ -0,0 +1,75 @@
+"""Tests for the precomputed showcase snapshot store (in-memory backend)."""
+
+import time
+
+import pytest
+
+from services import showcase_snapshot as snap
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(monkeypatch):
+    monkeypatch.setattr(snap, "_redis_client", None)
+    monkeypatch.setattr(snap, "_redis_checked", True)
+    snap.clear_memory_store()
+    yield
+    snap.clear_memory_store()
+
+
+PAYLOAD = {"businessName": "Asha Crafts", "items": [{"id": "i1", "title": "Necklace"}]}
+
+
+def test_cold_miss_then_round_trip():
+    assert snap.get_snapshot("u1") is None
+
+    stored = snap.put_snapshot("u1", PAYLOAD, gen=0)
+    loaded = snap.get_snapshot("u1")
+
+    assert loaded.data() == PAYLOAD
+    assert loaded.etag == stored.etag
+    assert not loaded.needs_rebuild()
+
+
+def test_etag_tracks_content():
+    first = snap.put_snapshot("u1", PAYLOAD, gen=0).etag
+    same = snap.put_snapshot("u1", dict(PAYLOAD), gen=0).etag
+    changed = snap.put_snapshot("u1", {**PAYLOAD, "businessName": "Bala"}, gen=0).etag
+
+    assert first == same
+    assert first != changed
+
+
+def test_write_marks_snapshot_stale_until_rebuilt_at_new_generation():
+    snap.put_snapshot("u1", PAYLOAD, gen=snap.current_generation("u1"))
+    snap.mark_dirty("u1")
+
+    stale = snap.get_snapshot("u1")
+    assert stale.needs_rebuild()
+    # Still servable while the rebuild runs
+    assert stale.data() == PAYLOAD
+
+    snap.put_snapshot("u1", PAYLOAD, gen=snap.current_generation("u1"))
+    assert not snap.get_snapshot("u1").needs_rebuild()
+
+
+def test_rebuild_that_started_before_a_write_stays_stale():
+    gen_before_write = snap.current_generation("u1")
+    snap.mark_dirty("u1")
+
+    snap.put_snapshot("u1", PAYLOAD, gen=gen_before_write)
+
+    assert snap.get_snapshot("u1").needs_rebuild()
+
+
+def test_old_snapshot_needs_refresh():
+    snapshot = snap.put_snapshot("u1", PAYLOAD, gen=0)
+
+    assert snapshot.needs_rebuild(now=time.time() + snap.SHOWCASE_SNAPSHOT_FRESH_SECONDS + 1)
+
+
+def test_rebuild_lock_is_exclusive():
+    assert snap.try_acquire_rebuild("u1") is True
+    assert snap.try_acquire_rebuild("u1") is False
+
+    snap.release_rebuild("u1")
+    assert snap.try_acquire_rebuild("u1") is True
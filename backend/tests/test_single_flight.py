@@ -0,0 +1,121 @@
+"""Tests for single-flight coalescing of identical Gemini calls."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from ai_brain.gemini_client import extract_json, extract_usage
+from ai_brain.observability import AIMetrics
+from ai_brain.single_flight import (
+    FALLTHROUGH, FOLLOWER, LEADER, CompletionSnapshot, SingleFlight, flight_key,
+)
+
+
+def _text_response(text):
+    return SimpleNamespace(text=text, candidates=[], usage_metadata=SimpleNamespace(
+        prompt_token_count=900, candidates_token_count=40, total_token_count=940,
+    ))
+
+
+def _tool_response():
+    call = SimpleNamespace(name="escalate_to_human", args={})
+    part = SimpleNamespace(function_call=call, text=None)
+    return SimpleNamespace(text="", candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def _run_concurrently(flight, key, fn, n=8):
+    roles, results = [], []
+    barrier = threading.Barrier(n)
+
+    def worker():
+        barrier.wait()
+        response, role = flight.do(key, fn, business_id="biz-1")
+        roles.append(role)
+        results.append(response)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return roles, results
+
+
+def test_identical_calls_in_process_share_one_llm_call():
+    metrics = AIMetrics()
+    flight = SingleFlight(metrics=metrics, wait_seconds=2)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.2)
+        return _text_response('{"response": "Haircut is Rs 300"}')
+
+    roles, results = _run_concurrently(flight, "biz-1:single_pass:abc", generate)
+
+    assert len(calls) == 1
+    assert sorted(roles) == [FOLLOWER] * 7 + [LEADER]
+    follower = next(r for r in results if isinstance(r, CompletionSnapshot))
+    assert extract_json(follower)["response"] == "Haircut is Rs 300"
+    assert extract_usage(follower)["prompt_tokens"] == 0
+    stats = metrics.get_coalescing_stats()
+    assert stats["total_coalesced"] == 7
+    assert stats["per_business"]["biz-1"]["leaders"] == 1
+
+
+def test_tool_calls_are_not_shared():
+    flight = SingleFlight(metrics=AIMetrics(), wait_seconds=2)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return _tool_response()
+
+    roles, _ = _run_concurrently(flight, "biz-1:booking:abc", generate, n=4)
+
+    assert len(calls) == 4
+    assert sorted(roles) == [FALLTHROUGH] * 3 + [LEADER]
+
+
+class _RemoteRedis:
+    """Another worker holds the lock and publishes after a short delay."""
+
+    def __init__(self, text):
+        self.text = text
+        self.polls = 0
+
+    def set(self, *args, **kwargs):
+        return False
+
+    def pipeline(self, transaction=False):
+        redis = self
+
+        class Pipe:
+            def get(self, key):
+                pass
+
+            def exists(self, key):
+                pass
+
+            def execute(self):
+                redis.polls += 1
+                return [redis.text if redis.polls >= 3 else None, 1]
+
+        return Pipe()
+
+
+def test_result_fans_out_across_workers():
+    flight = SingleFlight(redis_client=_RemoteRedis("Open 10am to 8pm"), metrics=AIMetrics(), wait_seconds=2)
+
+    response, role = flight.do("biz-1:hours:abc", lambda: _text_response("unused"), business_id="biz-1")
+
+    assert role == FOLLOWER and response.text == "Open 10am to 8pm"
+
+
+def test_keys_differ_for_different_prompts():
+    base = dict(model="m", system_prompt="p", messages=[{"role": "user", "content": "price?"}])
+
+    assert flight_key("b", "single_pass", **base) == flight_key("b", "single_pass", **dict(base))
+    assert flight_key("b", "single_pass", **base) != flight_key("b", "single_pass", **dict(base, system_prompt="q"))
+    assert flight_key("b", "single_pass", **base).startswith("b:single_pass:")
@@ -0,0 +1,141 @@
+"""Tests for the per-day appointment slot availability index."""
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from services.slot_availability import DayGrid, SlotAvailabilityIndex, _MemorySlotStore
+
+HOURS = {"start": "09:00", "end": "12:00", "duration": 60}
+MONDAY = date(2026, 3, 2)
+
+
+def _index(loads):
+    def loader(business_id, scope, days):
+        loads.append(list(days))
+        booked = {MONDAY.isoformat(): {"09:00": 2, "10:00": 1}}
+        return {d: DayGrid.from_hours(HOURS, 2, booked.get(d.isoformat(), {})) for d in days}
+
+    return SlotAvailabilityIndex(_MemorySlotStore(300), loader)
+
+
+def test_grid_round_trips_and_subtracts_bookings():
+    grid = DayGrid.from_hours(HOURS, 2, {"09:00": 2, "10:00": 1})
+    copy = DayGrid.from_bytes(grid.to_bytes())
+
+    assert copy == grid
+    assert copy.slots() == [
+        {"time": "09:00", "capacity": 2, "remaining": 0},
+        {"time": "10:00", "capacity": 2, "remaining": 1},
+        {"time": "11:00", "capacity": 2, "remaining": 2},
+    ]
+    assert copy.free_times() == ["10:00", "11:00"]
+    assert DayGrid.from_slots({"10:00": (3, 1), "11:00": (3, 0)}, 30).free_times() == ["10:00"]
+
+
+def test_bookings_update_the_cached_map_and_conflicts_force_a_reload():
+    loads = []
+    index = _index(loads)
+
+    assert index.free_slots("biz-1", MONDAY) == ["10:00", "11:00"]
+    index.record_booking("biz-1", MONDAY, "10:00")
+    assert index.free_slots("biz-1", MONDAY) == ["11:00"]
+    index.record_cancellation("biz-1", MONDAY, "09:00")
+    assert index.free_slots("biz-1", MONDAY) == ["09:00", "11:00"]
+    assert len(loads) == 1
+
+    # Booking a slot the map thinks is full means it is out of date
+    index.record_booking("biz-1", MONDAY, "10:00")
+    assert index.free_slots("biz-1", MONDAY) == ["10:00", "11:00"]
+    stats = index.get_stats()
+    assert len(loads) == 2 and stats["resyncs"] == 1 and stats["bookings"] == 1
+    assert stats["cancellations"] == 1 and stats["store"] == "memory"
+
+
+def test_next_free_slots_spans_days_with_one_load_and_skips_the_past():
+    loads = []
+    index = _index(loads)
+    now = datetime(2026, 3, 1, 10, 30)
+
+    slots = index.next_free_slots("biz-1", count=4, days=3, now=now)
+
+    assert [(s["date"], s["time"]) for s in slots] == [
+        ("2026-03-01", "11:00"),
+        ("2026-03-02", "10:00"),
+        ("2026-03-02", "11:00"),
+        ("2026-03-03", "09:00"),
+    ]
+    assert loads == [[date(2026, 3, 1), MONDAY, date(2026, 3, 3)]]
+    index.next_free_slots("biz-1", count=4, days=3, now=now)
+    assert len(loads) == 1 and index.get_stats()["hits"] == 3
+
+
+def test_next_free_slots_uses_the_business_clock_not_the_servers():
+    index = _index([])
+    # 04:30 UTC is 10:00 in Kolkata: the 09:00 and 10:00 slots are past
+    now = datetime(2026, 3, 3, 4, 30, tzinfo=timezone.utc)
+
+    slots = index.next_free_slots("biz-1", count=2, days=1, now=now, tz="Asia/Kolkata")
+
+    assert [(s["date"], s["time"]) for s in slots] == [("2026-03-03", "11:00")]
+
+
+def test_a_booking_during_a_load_keeps_the_stale_map_out_of_the_cache():
+    loads = []
+    index = None
+
+    def loader(business_id, scope, days):
+        loads.append(list(days))
+        grids = {d: DayGrid.from_hours(HOURS, 1, {}) for d in days}  # Rows read first...
+        if len(loads) == 1:
+            # ...then a booking lands before the map is stored
+            index.record_booking("biz-1", MONDAY, "09:00")
+            return grids
+        return {d: DayGrid.from_hours(HOURS, 1, {"09:00": 1}) for d in days}
+
+    index = SlotAvailabilityIndex(_MemorySlotStore(300), loader)
+
+    assert index.free_slots("biz-1", MONDAY) == ["09:00", "10:00", "11:00"]
+    assert index.free_slots("biz-1", MONDAY) == ["10:00", "11:00"]
+    assert index.free_slots("biz-1", MONDAY) == ["10:00", "11:00"]
+    assert len(loads) == 2
+
+
+def test_final_booking_check_reads_the_database_not_the_cached_map(monkeypatch):
+    from ai_brain.appointment_handler import AppointmentHandler
+    from services import slot_availability
+
+    class Query:
+        def __init__(self, db, table):
+            self.db, self.table = db, table
+
+        def __getattr__(self, _name):
+            return lambda *args, **kwargs: self
+
+        def insert(self, row):
+            self.db.inserted.append(row)
+            return self
+
+        def execute(self):
+            if self.table == "ai_capabilities":
+                return SimpleNamespace(data={"appointment_business_hours": HOURS})
+            return SimpleNamespace(data=self.db.appointments)
+
+    class Db:
+        appointments = [{"date": MONDAY.isoformat(), "time": "10:00"}]  # Booked on the dashboard
+        inserted = []
+
+        def table(self, name):
+            return Query(self, name)
+
+    index = _index([])
+    monkeypatch.setattr(slot_availability, "_index", index)
+    assert "10:00" in index.free_slots("biz-1", MONDAY)  # Stale cached map
+
+    handler = AppointmentHandler(Db())
+    handler.booking_sessions["biz-1:91"] = {
+        "collected_data": {"date": MONDAY.isoformat(), "time": "10:00", "name": "A"},
+    }
+    result = handler.book_appointment("biz-1", "91")
+
+    assert result["conflict"] and Db.inserted == []
+    assert index.get_stats()["invalidations"] == 1
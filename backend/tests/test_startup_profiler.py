@@ -0,0 +1,59 @@
+"""Tests for the startup import-time profiler and deferred startup imports."""
+
+import pytest
+
+import startup_profiler as sp
+
+
+@pytest.fixture(autouse=True)
+def fresh_profiler(monkeypatch):
+    monkeypatch.setattr(sp, "_phases", [])
+    monkeypatch.setattr(sp, "_finished", None)
+    monkeypatch.setattr(sp, "_started_at", sp.time.perf_counter())
+    monkeypatch.setattr(sp, "_last_at", sp._started_at)
+
+
+def test_checkpoints_record_consecutive_phases():
+    sp.checkpoint("imports")
+    sp.checkpoint("routes")
+
+    report = sp.startup_report()
+
+    assert [p["name"] for p in report["phases"]] == ["imports", "routes"]
+    assert report["total_ms"] == pytest.approx(sum(p["ms"] for p in report["phases"]), abs=0.2)
+    assert report["budget_ms"] is None and report["over_budget"] is False
+
+
+def test_finish_freezes_report_and_flags_budget(monkeypatch, caplog):
+    monkeypatch.setattr(sp, "STARTUP_IMPORT_BUDGET_MS", 1)
+    sp.time.sleep(0.005)
+
+    report = sp.finish_startup()
+    sp.checkpoint("late")
+
+    assert report["over_budget"] is True
+    assert report["phases"][-1]["name"] == "finalize"
+    assert sp.startup_report() is report
+    assert "budget 1 ms" in caplog.text
+
+
+def test_tool_registry_builds_converters_on_first_use():
+    from domains.file_tools.application.tool_registry import ToolRegistry
+
+    calls = []
+    tool = ToolRegistry().get("text_to_pdf")
+    object.__setattr__(tool, "converter_factory", lambda: calls.append(1) or object())
+
+    first = tool.converter
+
+    assert tool.converter is first
+    assert calls == [1]
+    assert ToolRegistry().get("ocr").converter is None
+
+
+def test_routes_package_exports_are_lazy():
+    import routes
+
+    with pytest.raises(AttributeError):
+        routes.not_a_blueprint
+    assert "billing_bp" in routes.__all__
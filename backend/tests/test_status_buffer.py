@@ -0,0 +1,95 @@
+"""Tests for batched delivery-status ingestion."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from services.messaging.status_buffer import MessageStatusBuffer
+
+RANK = {'sent': 1, 'delivered': 2, 'read': 3, 'failed': 4}
+
+
+def _buffer(apply_fn, **kwargs):
+    kwargs.setdefault('flush_interval', 60)
+    return MessageStatusBuffer(apply_fn, rank_fn=lambda s: RANK.get(s, 0), **kwargs)
+
+
+class TestMessageStatusBuffer:
+    def test_receipts_collapse_to_most_advanced_status(self):
+        applied = []
+        buffer = _buffer(applied.append)
+
+        buffer.add_many([
+            {'wamid': 'w1', 'status': 'read', 'ts': '2026-01-01T00:00:02'},
+            {'wamid': 'w1', 'status': 'delivered', 'ts': '2026-01-01T00:00:01'},
+            {'wamid': 'w2', 'status': 'sent', 'ts': None},
+            {'wamid': 'w2', 'status': 'delivered', 'ts': None},
+        ])
+
+        assert buffer.flush() == 2
+        assert {r['wamid']: r['status'] for r in applied[0]} == {'w1': 'read', 'w2': 'delivered'}
+        assert buffer.pending_count() == 0
+
+    def test_flush_chunks_by_batch_size(self):
+        applied = []
+        buffer = _buffer(applied.append, max_batch=2)
+        # Stop the flusher from racing the explicit flush below
+        buffer._ensure_flusher = lambda: None
+
+        buffer.add_many({'wamid': f'w{i}', 'status': 'delivered'} for i in range(5))
+        buffer.flush()
+
+        assert [len(chunk) for chunk in applied] == [2, 2, 1]
+
+    def test_full_buffer_wakes_flusher(self):
+        done = threading.Event()
+        applied = []
+
+        def apply_fn(chunk):
+            applied.append(chunk)
+            done.set()
+
+        buffer = _buffer(apply_fn, max_batch=3)
+        buffer.add_many({'wamid': f'w{i}', 'status': 'read'} for i in range(3))
+
+        assert done.wait(2)
+        assert len(applied[0]) == 3
+
+    def test_apply_error_does_not_raise(self):
+        buffer = _buffer(MagicMock(side_effect=RuntimeError('db down')))
+        buffer._ensure_flusher = lambda: None
+        buffer.add_many([{'wamid': 'w1', 'status': 'read'}])
+
+        assert buffer.flush() == 1
+
+
+class TestUpdateMessageStatusesBatch:
+    def test_single_rpc_per_batch(self):
+        import supabase_client
+
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = {'updated': 2, 'analytics_rows': 1}
+        updates = [
+            {'wamid': 'w1', 'status': 'read', 'ts': None},
+            {'wamid': 'w2', 'status': 'delivered', 'ts': None},
+        ]
+
+        with patch.object(supabase_client, 'get_supabase_client', return_value=client):
+            assert supabase_client.update_message_statuses_batch(updates) == 2
+
+        client.rpc.assert_called_once_with('apply_message_status_batch', {'p_updates': updates})
+        client.table.assert_not_called()
+
+    def test_falls_back_per_receipt_when_rpc_missing(self):
+        import supabase_client
+
+        client = MagicMock()
+        client.rpc.side_effect = Exception('function apply_message_status_batch does not exist')
+
+        with patch.object(supabase_client, 'get_supabase_client', return_value=client), \
+                patch.object(supabase_client, 'update_message_status', return_value=True) as single:
+            updated = supabase_client.update_message_statuses_batch(
+                [{'wamid': 'w1', 'status': 'read', 'ts': None}]
+            )
+
+        assert updated == 1
+        single.assert_called_once_with('w1', 'read', None)
@@ -0,0 +1,114 @@
+"""Tests for the coalesced storefront invalidation bus."""
+
+from services.storefront_invalidation import (
+    FIRESTORE,
+    NEXTJS,
+    SLUG_CACHE,
+    StorefrontInvalidationBus,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _bus(deliverers, clock, **kwargs):
+    bus = StorefrontInvalidationBus(deliverers, clock=clock, **kwargs)
+    # Drive delivery explicitly instead of racing the worker thread
+    bus._ensure_worker = lambda: None
+    return bus
+
+
+class TestStorefrontInvalidationBus:
+    def test_saves_for_one_store_coalesce_into_one_delivery(self):
+        clock = Clock()
+        calls = []
+        bus = _bus({
+            SLUG_CACHE: lambda inv: calls.append((SLUG_CACHE, sorted(inv.old_slugs))),
+            NEXTJS: lambda inv: calls.append((NEXTJS, inv.slug, inv.slug_changed)),
+            FIRESTORE: lambda inv: calls.append((FIRESTORE, inv.firestore_data)),
+        }, clock, debounce=0.5)
+
+        bus.publish('u1', slug='a', targets={NEXTJS, FIRESTORE}, firestore_data={'x': 1})
+        bus.publish('u1', slug='b', old_slug='a', slug_changed=True, firestore_data={'y': 2})
+        for i in range(20):
+            bus.publish('u1', targets={NEXTJS})
+
+        assert bus.flush() == 0  # Still inside the debounce window
+        clock.now += 0.5
+        assert bus.flush() == 1
+
+        assert sorted(calls, key=str) == sorted([
+            (FIRESTORE, {'x': 1, 'y': 2}),
+            (NEXTJS, 'b', True),
+            (SLUG_CACHE, ['a']),
+        ], key=str)
+        stats = bus.stats()
+        assert stats['published'] == 22 and stats['coalesced'] == 21
+        assert stats['targets'][NEXTJS]['delivered'] == 1
+        assert stats['targets'][NEXTJS]['lag_ms_max'] == 500.0
+
+    def test_debounce_is_bounded_by_max_delay(self):
+        clock = Clock()
+        delivered = []
+        bus = _bus({NEXTJS: delivered.append}, clock, debounce=1, max_delay=2)
+
+        bus.publish('u1')
+        for _ in range(4):
+            clock.now += 0.75
+            bus.publish('u1')
+            bus.flush()
+
+        assert len(delivered) == 1
+
+    def test_failed_targets_retry_with_backoff_then_drop(self):
+        clock = Clock()
+        ok = []
+
+        def flaky(inv):
+            raise ConnectionError('down')
+
+        bus = _bus({NEXTJS: flaky, SLUG_CACHE: ok.append}, clock,
+                   debounce=0, max_attempts=2, retry_base=1)
+
+        bus.publish('u1')
+        bus.flush()
+        assert len(ok) == 1 and bus.pending_count() == 1
+
+        # Only the failed target is retried, after the backoff
+        assert bus.flush() == 0
+        clock.now += 1
+        assert bus.flush() == 1
+        assert len(ok) == 1
+
+        stats = bus.stats()
+        assert stats['retried'] == 1 and stats['dropped'] == 1
+        assert stats['targets'][NEXTJS]['failed'] == 2
+        assert bus.pending_count() == 0
+
+    def test_save_during_a_failed_delivery_keeps_the_newer_payload(self):
+        clock = Clock()
+        pushed = []
+        failing = [True]
+
+        def firestore(inv):
+            if failing[0]:
+                # The store is saved again while this delivery is failing
+                bus.publish('u1', slug='new', targets={FIRESTORE}, firestore_data={'name': 'new'})
+                raise RuntimeError('firestore down')
+            pushed.append((inv.slug, inv.firestore_data, sorted(inv.targets)))
+
+        bus = _bus({NEXTJS: lambda inv: None, FIRESTORE: firestore}, clock, debounce=0.5, retry_base=1)
+        bus.publish('u1', slug='old', targets={FIRESTORE},
+                    firestore_data={'name': 'old', 'logo': 'l.png'})
+        clock.now += 0.5
+        assert bus.flush() == 1
+
+        failing[0] = False
+        clock.now += 1
+        assert bus.flush() == 1
+        assert pushed == [('new', {'name': 'new', 'logo': 'l.png'}, [FIRESTORE])]
@@ -0,0 +1,160 @@
+"""Tests for trial event store appends, snapshots and streaming replay."""
+
+import uuid
+from datetime import datetime, timezone
+
+from services.trial_event_store import TrialEvent, TrialEventStore, TrialProjection
+
+TRIAL = "trial-1"
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters, self.count, self.desc = db, table, [], None, False
+
+    def select(self, *_args):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.key, self.desc = column, desc
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def upsert(self, row, on_conflict):
+        self.db.snapshots[row[on_conflict]] = row
+        return Result(row)
+
+    def execute(self):
+        self.db.reads.append(self.table)
+        rows = self.db.events if self.table == "trial_events" else list(self.db.snapshots.values())
+        rows = [r for r in rows if all(f(r) for f in self.filters)]
+        if hasattr(self, "key"):
+            rows.sort(key=lambda r: r[self.key], reverse=self.desc)
+        return Result(rows[: self.count] if self.count else rows)
+
+
+class FakeDb:
+    """Python model of the migration 108 append_trial_event RPC."""
+
+    def __init__(self):
+        self.events, self.snapshots, self.reads, self.rpcs = [], {}, [], 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        assert name == "append_trial_event"
+        self.rpcs += 1
+        for row in self.events:
+            if params["p_idempotency_key"] and row["idempotency_key"] == params["p_idempotency_key"]:
+                return Result({**row, "duplicate": True})
+        row = {
+            "id": params["p_event_id"],
+            "trial_id": params["p_trial_id"],
+            "event_type": params["p_event_type"],
+            "event_version": params["p_event_version"],
+            "event_data": params["p_event_data"],
+            "triggered_by": params["p_triggered_by"],
+            "idempotency_key": params["p_idempotency_key"],
+            "causation_id": params["p_causation_id"],
+            "correlation_id": params["p_correlation_id"],
+            "metadata": params["p_metadata"],
+            "created_at": params["p_created_at"],
+            "sequence": sum(1 for r in self.events if r["trial_id"] == params["p_trial_id"]) + 1,
+            "position": len(self.events) + 1,
+        }
+        self.events.append(row)
+        return Result(row)
+
+
+def _event(event_type="trial.extended.v1", trial=TRIAL, key=None, **payload):
+    return TrialEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        event_version=1,
+        aggregate_id=trial,
+        timestamp=datetime(2026, 10, 18, tzinfo=timezone.utc),
+        idempotency_key=key,
+        payload=payload,
+    )
+
+
+def test_append_is_one_rpc_that_sequences_per_trial_and_dedupes():
+    db = FakeDb()
+    store = TrialEventStore(db)
+
+    first = store.append(_event("trial.started.v1", key="start-1", plan="starter"))
+    other = store.append(_event("trial.started.v1", trial="trial-2"))
+    second = store.append(_event(days=7))
+    again = store.append(_event("trial.started.v1", key="start-1"))
+
+    assert [first.sequence, other.sequence, second.sequence] == [1, 1, 2]
+    assert again == first and again.event_type == "trial.started.v1"
+    assert first.payload == {"plan": "starter"} and first.metadata == {"triggered_by": "system"}
+    assert db.rpcs == 4 and db.reads == [] and len(db.events) == 3
+
+
+def test_projection_starts_from_snapshot_or_cache_and_replays_only_the_tail():
+    db = FakeDb()
+    store = TrialEventStore(db)
+    store.append(_event("trial.started.v1", plan="starter"))
+    for day in range(6):
+        store.append(_event(days=day))
+
+    state = TrialProjection(store, snapshot_every=3).project(TRIAL)
+
+    assert state["status"] == "active" and state["payload"] == {"days": 5}
+    assert db.snapshots[TRIAL]["sequence"] == 7
+
+    store.append(_event("trial.expired.v1"))
+    db.reads.clear()
+    projection = TrialProjection(store, snapshot_every=3)
+    assert projection.project(TRIAL)["status"] == "expired"
+    assert projection.project(TRIAL)["status"] == "expired"
+
+    # Snapshot read once, then only tails after sequence 7 and 8
+    assert db.reads == ["trial_event_snapshots", "trial_events", "trial_events"]
+    assert db.snapshots[TRIAL]["sequence"] == 7
+
+
+def test_replay_all_streams_pages_lazily_and_filters_by_type():
+    db = FakeDb()
+    store = TrialEventStore(db)
+    for n in range(5):
+        store.append(_event("trial.started.v1" if n % 2 else "trial.extended.v1", trial=f"trial-{n}"))
+
+    stream = store.replay_all(page_size=2)
+    first = next(stream)
+    assert first.aggregate_id == "trial-0" and db.reads == ["trial_events"]
+
+    assert [e.aggregate_id for e in stream] == ["trial-1", "trial-2", "trial-3", "trial-4"]
+    assert len(db.reads) == 3
+    started = store.replay_all(event_types=["trial.started.v1"], page_size=2)
+    assert [e.aggregate_id for e in started] == ["trial-1", "trial-3"]
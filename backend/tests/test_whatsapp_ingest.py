@@ -0,0 +1,256 @@
+"""Tests for the legacy WhatsApp webhook ingest queue (fan-out + per-conversation mailbox)."""
+
+import hashlib
+import hmac
+import json
+from unittest.mock import patch
+
+import pytest
+
+from services.messaging.whatsapp_ingest import ConversationMailbox, fan_out_payload, verify_signature
+
+
+def _message(msg_id, sender, ts, body='hi'):
+    return {'id': msg_id, 'from': sender, 'timestamp': str(ts), 'type': 'text', 'text': {'body': body}}
+
+
+def _change(phone_number_id, messages=None, statuses=None, contacts=None):
+    return {
+        'field': 'messages',
+        'value': {
+            'messaging_product': 'whatsapp',
+            'metadata': {'phone_number_id': phone_number_id, 'display_phone_number': '+100'},
+            'contacts': contacts or [],
+            'messages': messages or [],
+            'statuses': statuses or [],
+        },
+    }
+
+
+class _FakeRedis:
+    """Just enough of redis-py for ConversationMailbox."""
+
+    def __init__(self):
+        self.lists = {}
+        self.values = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def lmove(self, src, dest, wherefrom, whereto):
+        items = self.lists.get(src) or []
+        if not items:
+            return None
+        value = items.pop(0 if wherefrom == 'LEFT' else -1)
+        target = self.lists.setdefault(dest, [])
+        if whereto == 'LEFT':
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    def lrem(self, key, count, value):
+        items = self.lists.get(key) or []
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def llen(self, key):
+        return len(self.lists.get(key) or [])
+
+    def expire(self, key, ttl):
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip('*')
+        return [k for k in list(self.lists) if k.startswith(prefix)]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self.values.get(key) != token:
+            return 0
+        if 'DEL' in script:
+            del self.values[key]
+        return 1
+
+
+class TestFanOut:
+    def test_every_entry_change_and_message_is_visited(self):
+        payload = {
+            'entry': [
+                {'changes': [
+                    _change('pn-1', messages=[_message('m1', '91a', 1), _message('m2', '91b', 1)]),
+                    _change('pn-1', statuses=[{'id': 'w1', 'status': 'read'}]),
+                ]},
+                {'changes': [_change('pn-2', messages=[_message('m3', '91a', 2)])]},
+            ]
+        }
+
+        statuses, jobs = fan_out_payload(payload)
+
+        assert [s['id'] for s in statuses] == ['w1']
+        assert [job['message']['id'] for job in jobs] == ['m1', 'm2', 'm3']
+        assert [job['conversation_key'] for job in jobs] == ['pn-1:91a', 'pn-1:91b', 'pn-2:91a']
+
+    def test_messages_of_one_conversation_sorted_by_timestamp(self):
+        payload = {'entry': [{'changes': [_change('pn-1', messages=[
+            _message('late', '91a', 30),
+            _message('other', '91b', 10),
+            _message('early', '91a', 20),
+        ])]}]}
+
+        _, jobs = fan_out_payload(payload)
+
+        assert [job['message']['id'] for job in jobs] == ['early', 'other', 'late']
+
+    def test_each_job_carries_only_its_senders_contact(self):
+        contacts = [
+            {'wa_id': '91a', 'profile': {'name': 'Asha'}},
+            {'wa_id': '91b', 'profile': {'name': 'Bala'}},
+        ]
+        payload = {'entry': [{'changes': [_change(
+            'pn-1', messages=[_message('m1', '91b', 1)], contacts=contacts,
+        )]}]}
+
+        _, jobs = fan_out_payload(payload)
+
+        assert jobs[0]['value']['contacts'] == [contacts[1]]
+        assert jobs[0]['value']['metadata']['phone_number_id'] == 'pn-1'
+        assert 'messages' not in jobs[0]['value']
+
+
+class TestConversationMailbox:
+    def test_drain_processes_in_push_order(self):
+        mailbox = ConversationMailbox(_FakeRedis())
+        for i in range(3):
+            mailbox.push('pn-1:91a', {'n': i})
+
+        seen = []
+        handled = mailbox.drain('pn-1:91a', lambda job: seen.append(job['n']))
+
+        assert handled == 3
+        assert seen == [0, 1, 2]
+
+    def test_second_drainer_backs_off_while_first_holds_lock(self):
+        redis_client = _FakeRedis()
+        mailbox = ConversationMailbox(redis_client)
+        mailbox.push('pn-1:91a', {'n': 0})
+        mailbox.push('pn-1:91a', {'n': 1})
+
+        seen = []
+
+        def handler(job):
+            # A concurrent drain for the same conversation must not run
+            assert mailbox.drain('pn-1:91a', lambda j: seen.append(('nested', j['n']))) == 0
+            seen.append(job['n'])
+
+        mailbox.drain('pn-1:91a', handler)
+
+        assert seen == [0, 1]
+        assert redis_client.values == {}
+
+    def test_failing_job_does_not_block_the_rest(self):
+        mailbox = ConversationMailbox(_FakeRedis())
+        mailbox.push('k', {'n': 0})
+        mailbox.push('k', {'n': 1})
+
+        seen = []
+
+        def handler(job):
+            if job['n'] == 0:
+                raise RuntimeError('boom')
+            seen.append(job['n'])
+
+        assert mailbox.drain('k', handler) == 2
+        assert seen == [1]
+
+
+    def test_message_of_a_crashed_drainer_is_replayed_first(self):
+        redis_client = _FakeRedis()
+        mailbox = ConversationMailbox(redis_client)
+        mailbox.push('k', {'n': 0})
+        mailbox.push('k', {'n': 1})
+
+        def crash(job):
+            raise SystemExit('worker killed')
+
+        try:
+            mailbox.drain('k', crash)
+        except SystemExit:
+            pass
+
+        # Still held for the dead drainer, not lost
+        assert redis_client.lists['wa_mailbox_processing:k'] == ['{"n":0}']
+        assert mailbox.recover() == ['k']
+
+        seen = []
+        assert mailbox.drain('k', lambda job: seen.append(job['n'])) == 2
+        assert seen == [0, 1]
+        assert redis_client.lists['wa_mailbox_processing:k'] == []
+
+    def test_time_limit_keeps_the_message_for_the_next_drain(self):
+        from celery.exceptions import SoftTimeLimitExceeded
+
+        redis_client = _FakeRedis()
+        mailbox = ConversationMailbox(redis_client)
+        mailbox.push('k', {'n': 0})
+
+        def slow(job):
+            raise SoftTimeLimitExceeded()
+
+        with pytest.raises(SoftTimeLimitExceeded):
+            mailbox.drain('k', slow)
+
+        assert redis_client.lists['wa_mailbox_processing:k'] == ['{"n":0}']
+        seen = []
+        assert mailbox.drain('k', lambda job: seen.append(job['n'])) == 1
+        assert seen == [0]
+
+    def test_heartbeat_keeps_the_lock_through_a_slow_reply(self, monkeypatch):
+        import time
+        from services.messaging import whatsapp_ingest
+
+        monkeypatch.setattr(whatsapp_ingest, 'DRAIN_HEARTBEAT_SECONDS', 0.01)
+        redis_client = _FakeRedis()
+        extends = []
+        evaluate = redis_client.eval
+
+        def eval_(script, numkeys, key, token, *args):
+            if 'EXPIRE' in script:
+                extends.append(key)
+            return evaluate(script, numkeys, key, token, *args)
+
+        redis_client.eval = eval_
+        mailbox = ConversationMailbox(redis_client)
+        mailbox.push('k', {'n': 0})
+
+        mailbox.drain('k', lambda job: time.sleep(0.1))
+
+        assert len(extends) >= 3 and set(extends) == {'wa_mailbox_lock:k'}
+        assert redis_client.values == {}
+
+
+class TestSignature:
+    def test_valid_and_tampered_bodies(self):
+        body = json.dumps({'entry': []}).encode()
+        sig = 'sha256=' + hmac.new(b'secret', body, hashlib.sha256).hexdigest()
+
+        with patch.dict('os.environ', {'META_APP_SECRET': 'secret'}):
+            assert verify_signature(sig, body) is True
+            assert verify_signature(sig, body + b' ') is False
+            assert verify_signature('', body) is False
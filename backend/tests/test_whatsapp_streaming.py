@@ -0,0 +1,105 @@
+"""Tests for streaming single-pass replies into WhatsApp messages."""
+
+import json
+
+from ai_brain.chatgpt_engine import ChatGPTEngine
+from ai_brain.intents import IntentType
+from ai_brain.streaming import JsonFieldStream
+from ai_brain.whatsapp_formatter import MessageSegmenter
+
+PARAGRAPHS = [
+    "Here is what we offer at Style Studio, with prices for each service so you can pick what suits you best.",
+    "Haircut: ₹300 for a classic cut and ₹450 for a styled cut. Beard trim is ₹150 and takes about 15 minutes.",
+    "Hair spa starts at ₹800. We are open 10am to 8pm every day except Tuesday. Would you like to book a slot?",
+]
+
+
+class StreamingClient:
+    """Yields the single-pass JSON in small chunks, recording what was sent meanwhile."""
+
+    def __init__(self, payload, sent, chunk_size=9):
+        self.raw = json.dumps(payload, ensure_ascii=False)
+        self.sent = sent
+        self.chunk_size = chunk_size
+        self.sent_while_streaming = []
+
+    def generate_stream(self, usage=None, **kwargs):
+        assert kwargs["json_mode"] is True
+        for i in range(0, len(self.raw), self.chunk_size):
+            self.sent_while_streaming.append(len(self.sent))
+            yield self.raw[i:i + self.chunk_size]
+        usage.update(prompt_tokens=900, completion_tokens=120, total_tokens=1020)
+
+
+def _engine(payload, sent):
+    engine = ChatGPTEngine()
+    engine._client = StreamingClient(payload, sent)
+    return engine
+
+
+def test_segmenter_releases_paragraphs_in_order_within_limits():
+    segmenter = MessageSegmenter(min_chars=80)
+    text = "\n\n".join(PARAGRAPHS + ["Extra detail sentence. " * 40])
+    out = []
+    for i in range(0, len(text), 7):
+        out += segmenter.feed(text[i:i + 7])
+    out += segmenter.flush()
+
+    assert out[:3] == PARAGRAPHS
+    assert all(len(segment) <= segmenter.max_chars for segment in out)
+    assert " ".join(out).replace("\n\n", " ").split() == text.replace("\n\n", " ").split()
+
+
+def test_json_field_stream_decodes_escapes_split_across_chunks():
+    payload = {"intent": "pricing", "response": 'Say "hi" 😊\nnext \\ line', "language": "en"}
+    raw = json.dumps(payload)  # ASCII escapes, emoji as a surrogate pair
+    stream = JsonFieldStream("response")
+
+    decoded = "".join(stream.feed(raw[i:i + 2]) for i in range(0, len(raw), 2))
+
+    assert decoded == payload["response"]
+    assert stream.done and stream.field_before("intent") == "pricing"
+
+
+def test_reply_is_sent_while_it_is_generated():
+    sent = []
+    payload = {"intent": "pricing", "confidence": 0.9, "response": "\n\n".join(PARAGRAPHS), "language": "en"}
+    engine = _engine(payload, sent)
+
+    result = engine.process_message_streaming("prices?", {"business_id": "biz-1"}, on_segment=sent.append)
+
+    assert len(sent) >= 2
+    # The first message went out before the model finished
+    assert engine._client.sent_while_streaming[-1] >= 1
+    # Short opening paragraph is merged with the next one
+    assert sent[0] == PARAGRAPHS[0] + "\n\n" + PARAGRAPHS[1]
+    assert sent[1].startswith("Hair spa starts at ₹800")
+    assert result.intent == IntentType.PRICING
+    assert result.metadata["streamed_segments"] == len(sent)
+    assert result.metadata["stream_remainder"] == ""
+    assert result.metadata["completion_tokens"] == 120
+    assert result.reply == "\n\n".join(sent)
+
+
+def test_tool_intents_and_failed_sends_are_not_lost():
+    sent = []
+    payload = {"intent": "order_status", "confidence": 0.9, "response": "\n\n".join(PARAGRAPHS)}
+    engine = _engine(payload, sent)
+    engine.generate_response = lambda **kwargs: "two-step"
+
+    assert engine.process_message_streaming("where is my order", {}, on_segment=sent.append) == "two-step"
+    assert sent == []
+
+    payload["intent"] = "pricing"
+    engine = _engine(payload, sent)
+    calls = []
+
+    def flaky_send(text):
+        calls.append(text)
+        return len(calls) == 1  # Second send fails
+
+    result = engine.process_message_streaming("prices?", {}, on_segment=flaky_send)
+
+    assert result.metadata["streamed_segments"] == 1
+    assert result.metadata["stream_remainder"]
+    assert result.reply == calls[0] + "\n\n" + result.metadata["stream_remainder"]
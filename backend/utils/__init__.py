@@ -2,6 +2,7 @@
 Backend utilities package.
 """
 from .validators import is_valid_uuid, is_opaque_button_id, sanitize_phone
+from .aho_corasick import AhoCorasick
 from .availability import (
     compute_sellable_options,
     get_stock_for_selection,
@@ -32,6 +33,8 @@ __all__ = [
     'is_valid_uuid',
     'is_opaque_button_id',
     'sanitize_phone',
+    # Matching
+    'AhoCorasick',
     # Availability
     'compute_sellable_options',
     'get_stock_for_selection',
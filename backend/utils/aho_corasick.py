@@ -0,0 +1,66 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+One automaton over many literals finds every occurrence of every pattern
+in a single pass over the text. Shared by the automation rule matcher
+(services/messaging/automation/rule_matcher.py) and the AI message
+keyword scanner (ai_brain/keyword_scanner.py); each attaches its own
+payload to a pattern and applies its own boundary rules to the hits.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (one pass over the text)."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Any]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload: Any) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(payload)
+        self._built = False
+
+    def build(self) -> 'AhoCorasick':
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, Any]]:
+        """Yield (end_index, payload) for every occurrence of every pattern."""
+        if not self._built:
+            self.build()
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for payload in out[node]:
+                yield i, payload
@@ -3,11 +3,21 @@ Invoice PDF Generator - PURE FUNCTION
 No side effects, no database, no filesystem, no WhatsApp.
 Same input → same PDF bytes.
 
+Business logos and per-business header templates (brand colour, contact
+lines, store QR) are cached in-process; see LogoCache and
+prepare_header_template. Delivery-side sharing of rendered PDFs lives in
+utils/invoice_store.py.
+
 Enterprise-grade, deterministic, testable.
 """
 
 import io
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
@@ -27,6 +37,16 @@ logger = logging.getLogger('reviseit.utils.invoice')
 
 INVOICE_STORAGE_MODE = "NONE"  # Future: "SUPABASE" / "S3"
 
+# Bump whenever the rendered layout changes; part of the shared artifact key
+# (see utils/invoice_store.py) so stale PDFs are never handed out.
+INVOICE_RENDERER_VERSION = "2"
+
+LOGO_CACHE_MAX_ENTRIES = int(os.getenv("INVOICE_LOGO_CACHE_MAX_ENTRIES", "128"))
+LOGO_CACHE_MAX_BYTES = int(os.getenv("INVOICE_LOGO_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+LOGO_CACHE_TTL_SECONDS = int(os.getenv("INVOICE_LOGO_CACHE_TTL_SECONDS", "900"))
+LOGO_FAILURE_TTL_SECONDS = 60
+HEADER_TEMPLATE_CACHE_MAX_ENTRIES = 256
+
 
 # =============================================================================
 # Invoice Number Generation
@@ -225,6 +245,197 @@ def hex_to_rgb(hex_color: str) -> tuple:
     return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
 
 
+# =============================================================================
+# Asset Caches (logos, per-business header templates)
+# =============================================================================
+
+@dataclass
+class _LogoEntry:
+    reader: Optional[ImageReader]
+    etag: Optional[str]
+    size_bytes: int
+    fetched_at: float
+
+
+class LogoCache:
+    """
+    Process-wide LRU of decoded business logos, keyed by URL.
+
+    Entries are revalidated with If-None-Match once they are older than the
+    TTL, so a changed logo is picked up without re-downloading unchanged ones.
+    Failed fetches are remembered briefly to avoid hammering a broken URL on
+    every invoice; a stale entry is served if revalidation fails.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LOGO_CACHE_MAX_ENTRIES,
+        max_bytes: int = LOGO_CACHE_MAX_BYTES,
+        ttl_seconds: int = LOGO_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _LogoEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[ImageReader]:
+        if not url:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                ttl = self.ttl_seconds if entry.reader is not None else LOGO_FAILURE_TTL_SECONDS
+                if now - entry.fetched_at < ttl:
+                    return entry.reader
+
+        entry = self._fetch(url, entry)
+        with self._lock:
+            self._store(url, entry)
+        return entry.reader
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _fetch(self, url: str, previous: Optional[_LogoEntry]) -> _LogoEntry:
+        headers = {}
+        if previous is not None and previous.reader is not None and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        try:
+            response = requests.get(url, timeout=5, headers=headers)
+            if response.status_code == 304 and previous is not None:
+                return _LogoEntry(previous.reader, previous.etag, previous.size_bytes, time.monotonic())
+            if response.status_code == 200:
+                content = response.content
+                reader = ImageReader(io.BytesIO(content))
+                # Decode once here; drawImage on later invoices reuses the pixels.
+                reader.getRGBData()
+                logger.debug(f"Logo loaded successfully from {url[:50]}...")
+                return _LogoEntry(reader, response.headers.get("ETag"), len(content), time.monotonic())
+            logger.warning(f"Failed to load logo from URL: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Failed to load logo from URL: {e}")
+        if previous is not None and previous.reader is not None:
+            return _LogoEntry(previous.reader, previous.etag, previous.size_bytes, time.monotonic())
+        return _LogoEntry(None, None, 0, time.monotonic())
+
+    def _store(self, url: str, entry: _LogoEntry) -> None:
+        previous = self._entries.pop(url, None)
+        if previous is not None:
+            self._total_bytes -= previous.size_bytes
+        if entry.size_bytes > self.max_bytes:
+            return
+        self._entries[url] = entry
+        self._total_bytes += entry.size_bytes
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size_bytes
+
+
+_logo_cache = LogoCache()
+
+
+def get_logo_cache() -> LogoCache:
+    return _logo_cache
+
+
+@dataclass(frozen=True)
+class InvoiceHeaderTemplate:
+    """Per-business invoice inputs that do not change between orders."""
+
+    brand_color: str
+    brand_hex: HexColor
+    business_name: str
+    phone: str
+    address_display: str
+    logo_url: str
+    store_slug: str
+    qr_reader: Optional[ImageReader]
+
+
+_header_templates: "OrderedDict[tuple, InvoiceHeaderTemplate]" = OrderedDict()
+_header_templates_lock = threading.Lock()
+
+
+def prepare_header_template(business: Dict[str, Any]) -> InvoiceHeaderTemplate:
+    """
+    Resolve the business-level parts of an invoice once and cache them.
+
+    The logo is deliberately not held here: it goes through LogoCache on each
+    render so ETag revalidation still applies to long-lived templates.
+    """
+    brand_color = business.get("brandColor") or DEFAULT_BRAND_COLOR
+    business_name = business.get("businessName") or "Store"
+    business_phone = business.get("contact", {}).get("phone", "") if isinstance(business.get("contact"), dict) else business.get("phone") or ""
+    business_address = _get_business_address(business)
+    logo_url = business.get("logoUrl") or ""
+    store_slug = business.get("storeSlug") or business.get("businessId") or ""
+
+    key = (brand_color, business_name, business_phone, business_address, logo_url, store_slug)
+    with _header_templates_lock:
+        template = _header_templates.get(key)
+        if template is not None:
+            _header_templates.move_to_end(key)
+            return template
+
+    address_display = business_address[:60] + "..." if len(business_address) > 60 else business_address
+    template = InvoiceHeaderTemplate(
+        brand_color=brand_color,
+        brand_hex=safe_hex_color(brand_color),
+        business_name=business_name,
+        phone=business_phone,
+        address_display=address_display,
+        logo_url=logo_url,
+        store_slug=store_slug,
+        qr_reader=_build_store_qr(store_slug),
+    )
+    with _header_templates_lock:
+        _header_templates[key] = template
+        while len(_header_templates) > HEADER_TEMPLATE_CACHE_MAX_ENTRIES:
+            _header_templates.popitem(last=False)
+    return template
+
+
+def clear_asset_caches() -> None:
+    """Drop cached logos and header templates (tests, logo rotation)."""
+    _logo_cache.clear()
+    with _header_templates_lock:
+        _header_templates.clear()
+
+
+def _build_store_qr(store_slug: str) -> Optional[ImageReader]:
+    if not store_slug:
+        return None
+    try:
+        store_url = f"https://shop.flowauxi.com/store/{store_slug}"
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=2,
+        )
+        qr.add_data(store_url)
+        qr.make(fit=True)
+        qr_img = qr.make_image(fill_color="black", back_color="white")
+
+        # Convert to bytes for ReportLab
+        qr_buffer = io.BytesIO()
+        qr_img.save(qr_buffer, format='PNG')
+        qr_buffer.seek(0)
+        logger.debug(f"QR code generated for {store_url}")
+        return ImageReader(qr_buffer)
+    except Exception as e:
+        logger.warning(f"Failed to generate QR code: {e}")
+        return None
+
+
 # =============================================================================
 # PDF Generation (PURE FUNCTION)
 # =============================================================================
@@ -253,6 +464,35 @@ def generate_invoice_pdf(order: Dict[str, Any], business: Dict[str, Any]) -> byt
     Returns:
         PDF bytes
     """
+    return _render_invoice(order, prepare_header_template(business))
+
+
+def generate_invoice_pdfs(
+    orders: List[Dict[str, Any]],
+    business: Dict[str, Any],
+) -> Dict[str, bytes]:
+    """
+    Bulk mode for end-of-day runs: render many orders for one business.
+
+    The header template, logo and store QR are prepared once for the batch.
+    A failing order is logged and left out of the result instead of aborting
+    the run.
+
+    Returns:
+        {order_id: PDF bytes}
+    """
+    template = prepare_header_template(business)
+    rendered: Dict[str, bytes] = {}
+    for order in orders:
+        order_key = str(order.get("order_id") or order.get("id") or "")
+        try:
+            rendered[order_key] = _render_invoice(order, template)
+        except Exception as e:
+            logger.error(f"Bulk invoice render failed for order {order_key}: {e}")
+    return rendered
+
+
+def _render_invoice(order: Dict[str, Any], template: InvoiceHeaderTemplate) -> bytes:
     # Create buffer
     buffer = io.BytesIO()
     
@@ -260,13 +500,7 @@ def generate_invoice_pdf(order: Dict[str, Any], business: Dict[str, Any]) -> byt
     width, height = A4
     c = canvas.Canvas(buffer, pagesize=A4)
     
-    # Extract business info — use `or` for null-safe defaults (DB may return NULL)
-    brand_color = business.get("brandColor") or DEFAULT_BRAND_COLOR
-    business_name = business.get("businessName") or "Store"
-    business_phone = business.get("contact", {}).get("phone", "") if isinstance(business.get("contact"), dict) else business.get("phone") or ""
-    business_address = _get_business_address(business)
-    logo_url = business.get("logoUrl") or ""
-    store_slug = business.get("storeSlug") or business.get("businessId") or ""
+    brand_color = template.brand_color
     
     # Extract order info
     invoice_number = generate_invoice_number(order.get("order_id", order.get("id", "UNKNOWN")))
@@ -304,8 +538,7 @@ def generate_invoice_pdf(order: Dict[str, Any], business: Dict[str, Any]) -> byt
     # HEADER (Brand colored background)
     # ==========================================================================
     header_height = 25 * mm
-    _draw_header(c, width, height, brand_color, business_name, business_phone, 
-                 business_address, logo_url, header_height)
+    _draw_header(c, width, height, template, header_height)
     
     y = height - header_height - 15 * mm
     
@@ -327,7 +560,7 @@ def generate_invoice_pdf(order: Dict[str, Any], business: Dict[str, Any]) -> byt
     # ==========================================================================
     # Totals Section (with QR code)
     # ==========================================================================
-    y = _draw_totals_section(c, y, width, subtotal, shipping, total, store_slug)
+    y = _draw_totals_section(c, y, width, subtotal, shipping, total, template.qr_reader)
     
     # ==========================================================================
     # Footer
@@ -359,67 +592,60 @@ def _get_business_address(business: Dict[str, Any]) -> str:
     return business.get("address", "")
 
 
-def _draw_header(c, width, height, brand_color, business_name, phone, address, logo_url, header_height):
+def _draw_header(c, width, height, template: InvoiceHeaderTemplate, header_height):
     """Draw branded header section."""
-    # Background — safe_hex_color handles None/invalid brand_color
-    c.setFillColor(safe_hex_color(brand_color))
+    # Background — brand_hex was resolved through safe_hex_color
+    c.setFillColor(template.brand_hex)
     c.rect(0, height - header_height, width, header_height, fill=True, stroke=False)
     
     # Business name
     c.setFillColor(white)
     c.setFont("Helvetica-Bold", 18)
-    c.drawString(20 * mm, height - 12 * mm, business_name)
+    c.drawString(20 * mm, height - 12 * mm, template.business_name)
     
     # Contact details
     c.setFont("Helvetica", 9)
-    if phone:
-        c.drawString(20 * mm, height - 17 * mm, phone)
-    if address:
-        # Truncate long addresses
-        addr_display = address[:60] + "..." if len(address) > 60 else address
-        c.drawString(20 * mm, height - 21 * mm, addr_display)
+    if template.phone:
+        c.drawString(20 * mm, height - 17 * mm, template.phone)
+    if template.address_display:
+        c.drawString(20 * mm, height - 21 * mm, template.address_display)
     
     # Logo (right side)
     logo_x = width - 25 * mm
     logo_y = height - 20 * mm
     logo_size = 15 * mm
     
-    # Try to load logo from URL
+    # Logo comes from the process-wide cache (fetched and decoded once per URL)
     logo_loaded = False
-    if logo_url:
+    logo_image = _logo_cache.get(template.logo_url)
+    if logo_image is not None:
         try:
-            response = requests.get(logo_url, timeout=5)
-            if response.status_code == 200:
-                logo_buffer = io.BytesIO(response.content)
-                logo_image = ImageReader(logo_buffer)
-                
-                # Draw circular clip mask (white background)
-                c.setFillColor(white)
-                c.circle(logo_x, logo_y, logo_size / 2 + 1, fill=True, stroke=False)
-                
-                # Draw the logo (centered)
-                c.drawImage(
-                    logo_image,
-                    logo_x - logo_size / 2,
-                    logo_y - logo_size / 2,
-                    width=logo_size,
-                    height=logo_size,
-                    mask='auto',
-                    preserveAspectRatio=True,
-                    anchor='c'
-                )
-                logo_loaded = True
-                logger.debug(f"Logo loaded successfully from {logo_url[:50]}...")
+            # Draw circular clip mask (white background)
+            c.setFillColor(white)
+            c.circle(logo_x, logo_y, logo_size / 2 + 1, fill=True, stroke=False)
+            
+            # Draw the logo (centered)
+            c.drawImage(
+                logo_image,
+                logo_x - logo_size / 2,
+                logo_y - logo_size / 2,
+                width=logo_size,
+                height=logo_size,
+                mask='auto',
+                preserveAspectRatio=True,
+                anchor='c'
+            )
+            logo_loaded = True
         except Exception as e:
-            logger.warning(f"Failed to load logo from URL: {e}")
+            logger.warning(f"Failed to draw logo: {e}")
     
     # Fallback: Draw circle with first letter if logo failed
     if not logo_loaded:
         c.setFillColor(white)
         c.circle(logo_x, logo_y, logo_size / 2, fill=True, stroke=False)
-        c.setFillColor(safe_hex_color(brand_color))
+        c.setFillColor(template.brand_hex)
         c.setFont("Helvetica-Bold", 14)
-        c.drawCentredString(logo_x, logo_y - 4, business_name[0].upper())
+        c.drawCentredString(logo_x, logo_y - 4, template.business_name[0].upper())
 
 
 def _draw_bill_to(c, y, name, phone, email, address):
@@ -572,44 +798,23 @@ def _draw_items_table(c, y, width, items):
     return y - 5 * mm
 
 
-def _draw_totals_section(c, y, width, subtotal, shipping, total, store_slug):
+def _draw_totals_section(c, y, width, subtotal, shipping, total, qr_reader):
     """Draw totals box (right side) and QR code (left side)."""
-    # QR Code (left side)
+    # QR Code (left side) — pre-rendered per store in the header template
     qr_size = 25 * mm
     qr_x = 20 * mm
     qr_y = y - qr_size - 5 * mm
     
-    if store_slug:
+    if qr_reader is not None:
         try:
-            # Generate QR code for store URL
-            store_url = f"https://shop.flowauxi.com/store/{store_slug}"
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=2,
-            )
-            qr.add_data(store_url)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Convert to bytes for ReportLab
-            qr_buffer = io.BytesIO()
-            qr_img.save(qr_buffer, format='PNG')
-            qr_buffer.seek(0)
-            qr_reader = ImageReader(qr_buffer)
-            
-            # Draw QR code
             c.drawImage(qr_reader, qr_x, qr_y, width=qr_size, height=qr_size)
             
             # Label below QR
             c.setFillColor(HexColor("#888888"))
             c.setFont("Helvetica", 7)
             c.drawString(qr_x, qr_y - 4 * mm, "Scan to visit store")
-            
-            logger.debug(f"QR code generated for {store_url}")
         except Exception as e:
-            logger.warning(f"Failed to generate QR code: {e}")
+            logger.warning(f"Failed to draw QR code: {e}")
     
     # Totals box (right side)
     box_width = 60 * mm
@@ -0,0 +1,198 @@
+"""
+Invoice Artifact Store
+Render each order's invoice PDF once and share it between delivery channels.
+
+send_invoice_whatsapp and send_invoice_email run as separate tasks, often on
+different workers. Both go through get_or_render_invoice_pdf(), which keys the
+PDF by order id plus a digest of everything the renderer reads, so:
+- identical inputs → one render, one stored artifact
+- changed order/business data → new digest, fresh render
+
+Redis (binary-safe client) is the shared store; without Redis an in-process
+TTL map still dedupes the synchronous fallback path.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.invoice_generator import (
+    INVOICE_RENDERER_VERSION,
+    generate_invoice_pdf,
+    generate_invoice_pdfs,
+)
+
+logger = logging.getLogger('reviseit.utils.invoice_store')
+
+INVOICE_ARTIFACT_TTL_SECONDS = int(os.getenv("INVOICE_ARTIFACT_TTL_SECONDS", "3600"))
+INVOICE_RENDER_LOCK_SECONDS = 30
+INVOICE_RENDER_WAIT_SECONDS = 5.0
+_MEMORY_MAX_ENTRIES = 256
+
+_redis_client = None
+_redis_checked = False
+_redis_lock = threading.Lock()
+
+_memory: Dict[str, Tuple[float, bytes]] = {}
+_memory_lock = threading.Lock()
+
+
+def invoice_artifact_key(order: Dict[str, Any], business: Dict[str, Any]) -> str:
+    """Deterministic key: order id + digest of renderer inputs and version."""
+    order_key = str(order.get("order_id") or order.get("id") or "unknown")
+    material = json.dumps(
+        {"v": INVOICE_RENDERER_VERSION, "order": order, "business": business},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+    return f"invoice:pdf:{order_key}:{digest}"
+
+
+def get_or_render_invoice_pdf(order: Dict[str, Any], business: Dict[str, Any]) -> bytes:
+    """
+    Return the shared invoice PDF for this order, rendering it at most once.
+
+    While another worker holds the render lock we poll briefly for its
+    artifact, then fall back to rendering locally rather than delaying the
+    delivery further.
+    """
+    key = invoice_artifact_key(order, business)
+    cached = _load(key)
+    if cached:
+        logger.info(f"📄 Invoice artifact reused: {key}")
+        return cached
+
+    client = _get_redis()
+    lock_key = f"{key}:lock"
+    owns_lock = False
+    if client is not None:
+        try:
+            owns_lock = bool(client.set(lock_key, b"1", nx=True, ex=INVOICE_RENDER_LOCK_SECONDS))
+        except Exception as e:
+            logger.warning(f"Invoice render lock failed: {e}")
+            owns_lock = True
+        if not owns_lock:
+            deadline = time.monotonic() + INVOICE_RENDER_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(0.2)
+                cached = _load(key)
+                if cached:
+                    return cached
+
+    try:
+        pdf_bytes = generate_invoice_pdf(order, business)
+        if pdf_bytes:
+            _save(key, pdf_bytes)
+        return pdf_bytes
+    finally:
+        if owns_lock and client is not None:
+            try:
+                client.delete(lock_key)
+            except Exception:
+                pass
+
+
+def render_invoice_batch(
+    orders: List[Dict[str, Any]],
+    business: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    End-of-day bulk run: render every order not already stored, in one pass.
+
+    Returns counts plus the order ids that failed to render.
+    """
+    pending: List[Dict[str, Any]] = []
+    keys: Dict[str, str] = {}
+    reused = 0
+    for order in orders:
+        key = invoice_artifact_key(order, business)
+        if _load(key):
+            reused += 1
+            continue
+        order_key = str(order.get("order_id") or order.get("id") or "")
+        keys[order_key] = key
+        pending.append(order)
+
+    rendered = generate_invoice_pdfs(pending, business) if pending else {}
+    for order_key, pdf_bytes in rendered.items():
+        _save(keys[order_key], pdf_bytes)
+
+    return {
+        "rendered": len(rendered),
+        "reused": reused,
+        "failed": [order_key for order_key in keys if order_key not in rendered],
+    }
+
+
+def clear_memory_store() -> None:
+    with _memory_lock:
+        _memory.clear()
+
+
+# =============================================================================
+# Storage backends
+# =============================================================================
+
+def _get_redis():
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    with _redis_lock:
+        if _redis_checked:
+            return _redis_client
+        if os.getenv("REDIS_URL"):
+            from connections import get_redis
+
+            # Binary payloads: keep responses as bytes
+            _redis_client = get_redis("invoice_store", decode_responses=False)
+            if _redis_client is None:
+                logger.warning("⚠️ Redis unavailable for invoice artifacts, using memory")
+        _redis_checked = True
+    return _redis_client
+
+
+def _load(key: str) -> Optional[bytes]:
+    client = _get_redis()
+    if client is not None:
+        try:
+            value = client.get(key)
+            if value:
+                return bytes(value)
+        except Exception as e:
+            logger.warning(f"Invoice artifact read failed: {e}")
+
+    now = time.monotonic()
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        expires_at, pdf_bytes = entry
+        if now >= expires_at:
+            _memory.pop(key, None)
+            return None
+        return pdf_bytes
+
+
+def _save(key: str, pdf_bytes: bytes) -> None:
+    client = _get_redis()
+    if client is not None:
+        try:
+            client.set(key, pdf_bytes, ex=INVOICE_ARTIFACT_TTL_SECONDS)
+            return
+        except Exception as e:
+            logger.warning(f"Invoice artifact write failed: {e}")
+
+    with _memory_lock:
+        if len(_memory) >= _MEMORY_MAX_ENTRIES:
+            now = time.monotonic()
+            for stale in [k for k, (exp, _) in _memory.items() if exp <= now]:
+                _memory.pop(stale, None)
+            while len(_memory) >= _MEMORY_MAX_ENTRIES:
+                _memory.pop(next(iter(_memory)))
+        _memory[key] = (time.monotonic() + INVOICE_ARTIFACT_TTL_SECONDS, pdf_bytes)
@@ -13,24 +13,18 @@ Canonical URLs are always lowercase.
 """
 
 import logging
-import redis
-import os
 from typing import Optional, Tuple
 from supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
-# Redis connection for caching
-REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
-redis_client = None
 
-try:
-    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-    redis_client.ping()
-    logger.info(f"✅ Redis connected for slug cache: {REDIS_URL}")
-except Exception as e:
-    logger.warning(f"⚠️ Redis unavailable for slug cache: {e}")
-    redis_client = None
+def _get_redis():
+    """Shared Redis client (lazy; read-mostly keys use client-side caching)."""
+    from connections import get_redis
+
+    return get_redis("slug_cache", client_side_cache=True)
+
 
 CACHE_TTL = 600  # 10 minutes
 
@@ -89,6 +83,7 @@ def resolve_slug_to_user_id(slug_or_username: str) -> Optional[Tuple[str, str, b
     normalized = normalize_slug(slug_or_username)
     cache_key = f"slug:{normalized}"
     
+    redis_client = _get_redis()
     # Try cache first
     if redis_client:
         try:
@@ -209,6 +204,7 @@ def invalidate_slug_cache(user_id: str, old_slug: Optional[str] = None):
         user_id: Firebase UID
         old_slug: Previous slug (if changed)
     """
+    redis_client = _get_redis()
     if not redis_client:
         return
     
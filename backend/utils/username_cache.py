@@ -8,26 +8,20 @@ Critical for scale:
 - Target: >95% cache hit rate, <10ms resolution time
 """
 
-import os
 import logging
 from typing import Optional
 from functools import wraps
-import redis
 from supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
-# Redis connection
-REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
-redis_client = None
 
-try:
-    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-    redis_client.ping()
-    logger.info(f"✅ Redis connected: {REDIS_URL}")
-except Exception as e:
-    logger.warning(f"⚠️ Redis unavailable, falling back to DB-only mode: {e}")
-    redis_client = None
+def _get_redis():
+    """Shared Redis client (lazy; read-mostly keys use client-side caching)."""
+    from connections import get_redis
+
+    return get_redis("username_cache", client_side_cache=True)
+
 
 # Cache TTL in seconds (10 minutes)
 CACHE_TTL = 600
@@ -66,6 +60,7 @@ def resolve_username_to_user_id(username: str) -> Optional[str]:
     username_lower = username.lower().strip()
     cache_key = f"username:{username_lower}"
     
+    redis_client = _get_redis()
     # Try cache first
     if redis_client:
         try:
@@ -121,6 +116,7 @@ def resolve_user_id_to_username(user_id: str) -> Optional[str]:
     
     cache_key = f"userid:{user_id}"
     
+    redis_client = _get_redis()
     # Try cache first
     if redis_client:
         try:
@@ -172,6 +168,7 @@ def invalidate_username_cache(user_id: str, old_username: Optional[str] = None):
         user_id: Firebase UID
         old_username: Previous username (if known)
     """
+    redis_client = _get_redis()
     if not redis_client:
         return
     
@@ -197,6 +194,7 @@ def get_cache_stats() -> dict:
     Returns:
         Dict with cache metrics
     """
+    redis_client = _get_redis()
     if not redis_client:
         return {
             'enabled': False,
@@ -238,6 +236,7 @@ def health_check() -> bool:
     Returns:
         True if Redis is responding, False otherwise
     """
+    redis_client = _get_redis()
     if not redis_client:
         return False
     